@@ -1,17 +1,23 @@
 """
 Admin API 라우터 (사용자 관리 + 시스템 설정)
 """
+import asyncio
 import logging
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Dict, List
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app.database.connection import get_db
 from app.database.user_repository import UserRepository
+from app.database.gemini_usage_repository import GeminiUsageRepository
 from app.services.auth_service import get_current_admin
 from app.models.user import UserResponse
 from app.database.models import UserDB
+from app.services.analysis_scheduler import analysis_scheduler
+from app.services.gemini_client import gemini_client_pool
+from app.services.universe_snapshot import universe_snapshot_job, universe_snapshots
 
 router = APIRouter(prefix="/admin", tags=["관리자"])
 
@@ -193,3 +199,55 @@ def update_log_level(
         current_level=level_str,
         available_levels=valid_levels
     )
+
+
+@router.get("/system/gemini-scheduler")
+def get_gemini_scheduler_stats(
+    current_admin: UserDB = Depends(get_current_admin)
+) -> Dict[str, Any]:
+    """Gemini 분석 스케줄러 상태 조회 (대기 시간, 실행 중 작업 수) (Admin 전용)"""
+    stats = analysis_scheduler.stats()
+    stats["client_pool_size"] = gemini_client_pool.size
+    return stats
+
+
+@router.get("/system/universe-snapshot")
+def get_universe_snapshot(
+    current_admin: UserDB = Depends(get_current_admin)
+) -> Dict[str, Any]:
+    """현재 유니버스 스냅샷 정보 (기준일, 티커 수, 파일 크기) (Admin 전용)"""
+    snapshot = universe_snapshots.current()
+    return {
+        "root": str(universe_snapshot_job.root),
+        "schedule_hour_utc": universe_snapshot_job.hour_utc,
+        "snapshot": snapshot.info() if snapshot else None,
+    }
+
+
+@router.post("/system/universe-snapshot")
+async def rebuild_universe_snapshot(
+    current_admin: UserDB = Depends(get_current_admin)
+) -> Dict[str, Any]:
+    """유니버스 스냅샷 즉시 생성 (Admin 전용)"""
+    logging.info(f"📸 스냅샷 수동 생성 요청 (Admin: {current_admin.username})")
+    info = await asyncio.to_thread(universe_snapshot_job.build)
+    if info is None:
+        raise HTTPException(status_code=409, detail="저장된 일봉 이력이 없거나 다른 프로세스가 스냅샷을 생성 중입니다.")
+    return {"snapshot": info}
+
+
+@router.get("/gemini/usage")
+def get_gemini_usage(
+    days: int = Query(7, ge=1, le=90, description="집계 기간 (일)"),
+    current_admin: UserDB = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """Gemini 토큰/지연시간 사용량 집계 - 사용자별·일별, 티커별 (Admin 전용)"""
+    # created_at은 DB 서버 시각(UTC) 기준
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+    usage_repo = GeminiUsageRepository(db)
+    return {
+        "since": since.date().isoformat(),
+        "by_user_day": usage_repo.aggregate_by_user_day(since),
+        "by_ticker": usage_repo.aggregate_by_ticker(since),
+    }
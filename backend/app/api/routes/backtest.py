@@ -0,0 +1,69 @@
+"""
+백테스트 API 엔드포인트
+"""
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException
+from app.services.backtest import STRATEGIES, backtest_service
+from app.models.backtest import (
+    BacktestRequest, BacktestResponse, BacktestResult, StrategyInfo, StrategyListResponse
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/backtest/strategies", response_model=StrategyListResponse)
+async def list_strategies() -> StrategyListResponse:
+    """사용 가능한 백테스트 전략과 기본 파라미터"""
+    return StrategyListResponse(
+        success=True,
+        data=[StrategyInfo(name=name, params=defaults) for name, (defaults, _, _) in STRATEGIES.items()]
+    )
+
+
+@router.post("/backtest", response_model=BacktestResponse)
+async def run_backtest(body: BacktestRequest) -> BacktestResponse:
+    """
+    전략 백테스트
+
+    로컬에 저장된 일봉으로 전략을 시뮬레이션합니다. 저장된 이력이 기간보다 짧거나
+    오래되었으면 하루 한 번 Yahoo Finance에서 받아 저장한 뒤 사용합니다.
+
+    Example:
+        POST /api/backtest
+        Body: {
+            "ticker": "AAPL",
+            "strategy": "ma_cross",
+            "params": {"fast": 50, "slow": 200},
+            "period": "20y",
+            "fee_bps": 5
+        }
+    """
+    logger.info(f"📈 백테스트: POST /backtest ({body.ticker}, {body.strategy}, {body.period})")
+    try:
+        result = await asyncio.to_thread(
+            backtest_service.run,
+            body.ticker,
+            body.strategy,
+            params=body.params,
+            period=body.period,
+            initial_capital=body.initial_capital,
+            fee_bps=body.fee_bps,
+            max_hold=body.max_hold,
+            include_curve=body.include_curve,
+        )
+    except ValueError as e:
+        if "429" in str(e) or "요청 제한 초과" in str(e):
+            raise HTTPException(status_code=429, detail=str(e))
+        if "찾을 수 없습니다" in str(e) or "조회 실패" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    metrics = result['metrics']
+    logger.info(
+        f"   ✅ {metrics['bars']}봉, 거래 {metrics['trades']}건, "
+        f"CAGR {metrics['cagr_pct']:.2f}%, MDD {metrics['max_drawdown_pct']:.2f}%"
+    )
+    return BacktestResponse(success=True, data=BacktestResult(**result))
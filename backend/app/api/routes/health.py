@@ -4,8 +4,8 @@
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
 from typing import Dict
-import google.generativeai as genai
 from app.config import settings
+from app.services.gemini_client import gemini_client_pool
 import asyncio
 import logging
 
@@ -45,22 +45,18 @@ async def gemini_health_check() -> Dict:
     try:
         logger.info("[Health] Gemini 테스트 시작")
         
-        # Gemini 초기화
-        genai.configure(api_key=settings.gemini_api_key)
-        model = genai.GenerativeModel('models/gemini-flash-latest')
+        # 환경변수 키 전용 클라이언트로 모델 생성
+        model = gemini_client_pool.get_model(settings.gemini_api_key)
         
         # 간단한 테스트 프롬프트
         def _test():
             logger.info("[Health] Gemini API 호출 중...")
-            result = model.generate_content("Say 'Hello' in Korean")
+            result = model.generate_content("Say 'Hello' in Korean", request_options={"timeout": 10})
             logger.info("[Health] Gemini API 응답 받음")
             return result
         
-        # 타임아웃 10초
-        response = await asyncio.wait_for(
-            asyncio.to_thread(_test),
-            timeout=10.0
-        )
+        # 분석 스케줄러 대기열을 거치지 않고 직접 호출 (분석이 밀려 있어도 연결 상태만 확인, 타임아웃 10초)
+        response = await asyncio.wait_for(asyncio.to_thread(_test), timeout=10.0)
         
         logger.info("[Health] Gemini 테스트 성공")
         return {
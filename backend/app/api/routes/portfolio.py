@@ -1,19 +1,42 @@
 """
 포트폴리오 API 엔드포인트
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import logging
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from app.database.connection import get_db
 from app.database.repository import PortfolioRepository
 from app.database.models import UserDB
 from app.services.auth_service import get_current_user
+from app.services.stock_service import stock_service
+from app.services.analysis_scheduler import AnalysisTimeoutError, AnalysisCancelledError
+from app.services.analysis_job_service import require_gemini_key
+from app.services.portfolio_analysis import PortfolioHolding
+from app.services.portfolio_valuation import portfolio_valuation_service
+from app.services.portfolio_risk import portfolio_risk_service
+from app.services.portfolio_equity import portfolio_equity_service
+from app.services.portfolio_simulation import portfolio_simulation_service
 from app.models.portfolio import (
     PortfolioCreate,
     PortfolioUpdate,
     ApiResponse,
     PortfolioResponse,
+    PortfolioAnalysisResponse,
+    PortfolioValuation,
+    PortfolioValuationResponse,
+    PortfolioRisk,
+    PortfolioRiskResponse,
+    PortfolioEquityCurve,
+    PortfolioEquityResponse,
+    SimulationRequest,
+    PortfolioSimulation,
+    PortfolioSimulationResponse,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -47,6 +70,195 @@ async def get_all_portfolios(
     )
 
 
+@router.get("/portfolio/valuation", response_model=PortfolioValuationResponse)
+async def get_portfolio_valuation(
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> PortfolioValuationResponse:
+    """
+    포트폴리오 평가 (현재가 기준 평가금액, 손익, 수익률, 비중)
+
+    보유 종목 현재가를 한 번에 조회해 계산하고, 종목별 last_price / profit_percent /
+    last_updated를 함께 갱신합니다.
+
+    Example:
+        GET /api/portfolio/valuation
+        Headers: { "Authorization": "Bearer <token>" }
+    """
+    logger.info(f"💰 포트폴리오 평가: GET /portfolio/valuation (사용자: {current_user.username})")
+    try:
+        valuation = await asyncio.to_thread(portfolio_valuation_service.valuate, db, current_user.id)
+    except ValueError as e:
+        if "429" in str(e) or "요청 제한 초과" in str(e):
+            raise HTTPException(status_code=429, detail=str(e))
+        raise HTTPException(status_code=502, detail=str(e))
+
+    logger.info(
+        f"   ✅ {len(valuation['items'])}종목 평가 (총 {valuation['total_value']:,.2f}, 현재가 없음: {len(valuation['missing'])})"
+    )
+    return PortfolioValuationResponse(success=True, data=PortfolioValuation(**valuation))
+
+
+@router.get("/portfolio/risk", response_model=PortfolioRiskResponse)
+async def get_portfolio_risk(
+    period: Literal["1y", "2y", "5y", "10y"] = Query("1y", description="수익률 계산 기간"),
+    confidence: float = Query(0.95, ge=0.8, le=0.999, description="VaR 신뢰수준"),
+    benchmark: Optional[str] = Query(None, max_length=10, description="베타 기준 지수 (기본: RISK_BENCHMARK)"),
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> PortfolioRiskResponse:
+    """
+    포트폴리오 리스크 분석 (공분산/상관계수, 베타, 변동성, VaR/CVaR, 리스크 기여도)
+
+    저장된 일봉으로 계산하며 같은 보유 구성/파라미터는 하루 동안 캐시됩니다.
+
+    Example:
+        GET /api/portfolio/risk?period=2y&confidence=0.99
+        Headers: { "Authorization": "Bearer <token>" }
+    """
+    logger.info(f"📉 포트폴리오 리스크: GET /portfolio/risk ({period}, {confidence}, 사용자: {current_user.username})")
+    try:
+        risk = await asyncio.to_thread(
+            portfolio_risk_service.analyze, db, current_user.id, period, confidence, benchmark
+        )
+    except ValueError as e:
+        if "429" in str(e) or "요청 제한 초과" in str(e):
+            raise HTTPException(status_code=429, detail=str(e))
+        if "보유 종목이 없습니다" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        f"   ✅ {len(risk['holdings'])}종목, 변동성 {risk['portfolio_volatility_pct']}%, "
+        f"VaR {risk['var_historical_pct']}% (캐시: {risk['cached']})"
+    )
+    return PortfolioRiskResponse(success=True, data=PortfolioRisk(**risk))
+
+
+@router.get("/portfolio/equity", response_model=PortfolioEquityResponse)
+async def get_portfolio_equity(
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> PortfolioEquityResponse:
+    """
+    포트폴리오 자산곡선 (매수일 이후 일별 평가금액, 낙폭, 종목별 기여)
+
+    보유 수량과 매수일(없으면 등록일), 저장된 일봉으로 계산합니다. 이전 조회 결과에
+    새 봉만 이어 붙이므로 보유 구성이 바뀌지 않으면 전체를 다시 계산하지 않습니다.
+
+    Example:
+        GET /api/portfolio/equity
+        Headers: { "Authorization": "Bearer <token>" }
+    """
+    logger.info(f"📈 포트폴리오 자산곡선: GET /portfolio/equity (사용자: {current_user.username})")
+    try:
+        curve = await asyncio.to_thread(portfolio_equity_service.curve, db, current_user.id)
+    except ValueError as e:
+        if "429" in str(e) or "요청 제한 초과" in str(e):
+            raise HTTPException(status_code=429, detail=str(e))
+        if "보유 종목이 없습니다" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        f"   ✅ {curve['start_date']} ~ {curve['as_of']} ({len(curve['dates'])}일, 새로 계산 {curve['recomputed_bars']}봉)"
+    )
+    return PortfolioEquityResponse(success=True, data=PortfolioEquityCurve(**curve))
+
+
+@router.post("/portfolio/simulation", response_model=PortfolioSimulationResponse)
+async def simulate_portfolio(
+    request: SimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> PortfolioSimulationResponse:
+    """
+    포트폴리오 몬테카를로 시뮬레이션 (미래 평가금액 백분위 구간, 손실 확률)
+
+    저장된 일봉으로 상관 GBM 또는 블록 부트스트랩 경로를 만들며, 보유 수량은
+    고정(리밸런싱 없음)으로 가정합니다.
+
+    Example:
+        POST /api/portfolio/simulation
+        Headers: { "Authorization": "Bearer <token>" }
+        Body: { "method": "bootstrap", "paths": 100000, "horizon_days": 252, "seed": 42 }
+    """
+    logger.info(
+        f"🎲 포트폴리오 시뮬레이션: POST /portfolio/simulation "
+        f"({request.method}, {request.paths}경로 × {request.horizon_days}일, 사용자: {current_user.username})"
+    )
+    try:
+        simulation = await asyncio.to_thread(
+            portfolio_simulation_service.simulate, db, current_user.id, **request.model_dump()
+        )
+    except ValueError as e:
+        if "429" in str(e) or "요청 제한 초과" in str(e):
+            raise HTTPException(status_code=429, detail=str(e))
+        if "보유 종목이 없습니다" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(
+        f"   ✅ 손실 확률 {simulation['probability_of_loss'] * 100:.1f}%, "
+        f"중앙값 {simulation['final_percentiles']['p50']} ({simulation['elapsed_ms']:.0f}ms)"
+    )
+    return PortfolioSimulationResponse(success=True, data=PortfolioSimulation(**simulation))
+
+
+@router.post("/portfolio/analysis", response_model=PortfolioAnalysisResponse)
+async def analyze_portfolio(
+    request: Request,
+    refresh: bool = Query(False, description="캐시를 무시하고 다시 분석"),
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> PortfolioAnalysisResponse:
+    """
+    포트폴리오 전체 AI 분석 (단일 Gemini 호출)
+
+    보유 종목 전체를 하나의 압축 프롬프트로 분석하여 종목별 섹션과
+    자산 배분 관점을 함께 반환합니다. 보유 구성(티커/평단가/수량)이 같으면
+    캐시된 결과를 반환합니다.
+
+    Example:
+        POST /api/portfolio/analysis
+        Headers: { "Authorization": "Bearer <token>" }
+    """
+    logger.info(f"💡 포트폴리오 분석 요청: POST /portfolio/analysis (사용자: {current_user.username})")
+
+    gemini_key = require_gemini_key(db, current_user)
+
+    holdings = [
+        PortfolioHolding(
+            ticker=p.ticker,
+            purchase_price=float(p.purchase_price) if p.purchase_price is not None else None,
+            quantity=p.quantity,
+        )
+        for p in PortfolioRepository.get_all(db, current_user.id)
+    ]
+    if not holdings:
+        raise HTTPException(status_code=404, detail="포트폴리오에 보유 종목이 없습니다.")
+
+    try:
+        analysis = await stock_service.get_portfolio_analysis(
+            holdings,
+            user_api_key=gemini_key,
+            user_id=current_user.id,
+            is_disconnected=request.is_disconnected,
+            refresh=refresh
+        )
+        logger.info(f"   ✅ 포트폴리오 분석 완료 ({len(holdings)}종목, 캐시: {analysis.cached})")
+        return PortfolioAnalysisResponse(success=True, data=analysis)
+    except AnalysisTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except AnalysisCancelledError as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except ValueError as e:
+        logger.error(f"   ❌ 포트폴리오 분석 실패: {str(e)}")
+        if "429" in str(e) or "요청 제한 초과" in str(e):
+            raise HTTPException(status_code=429, detail=str(e))
+        raise HTTPException(status_code=502, detail=str(e))
+
+
 @router.get("/portfolio/{ticker}")
 async def get_portfolio(
     ticker: str,
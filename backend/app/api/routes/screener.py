@@ -0,0 +1,67 @@
+"""
+스크리너 API 엔드포인트
+"""
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database.connection import get_db
+from app.database.models import UserDB
+from app.services.auth_service import get_current_user
+from app.services.screener import screener_service
+from app.models.screener import ScreenerRequest, ScreenerResponse, ScreenerResult
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/screener", response_model=ScreenerResponse)
+async def run_screener(
+    body: ScreenerRequest,
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> ScreenerResponse:
+    """
+    다중 티커 스크리너
+
+    로컬에 저장된 일봉 이력/재무 스냅샷으로 조건을 한 번에 평가합니다 (외부 API 호출 없음).
+    종목 조회/차트 조회로 이력이 저장된 티커만 평가되며, 이력이 없는 티커는 missing에 표시됩니다.
+
+    Example:
+        POST /api/screener
+        Body: {
+            "conditions": [
+                {"field": "rsi14", "op": "<", "value": 30},
+                {"field": "sma50", "op": "crosses_above", "ref": "sma200", "within": 5}
+            ],
+            "match": "any",
+            "universe": "portfolio",
+            "sort_by": "rsi14",
+            "descending": false
+        }
+    """
+    logger.info(f"🔎 스크리너: POST /screener (조건 {len(body.conditions)}개, 사용자: {current_user.username})")
+
+    # 저장소(SQLite) 로드와 지표 계산은 동기 작업이므로 이벤트 루프 밖에서 실행
+    tickers = await asyncio.to_thread(
+        screener_service.resolve_universe, db, current_user.id, body.universe, body.tickers
+    )
+    if not tickers:
+        raise HTTPException(status_code=400, detail="평가할 티커가 없습니다. 종목을 먼저 조회하거나 티커를 지정해주세요.")
+
+    try:
+        result = await asyncio.to_thread(
+            screener_service.screen,
+            tickers,
+            [condition.model_dump() for condition in body.conditions],
+            match=body.match,
+            sort_by=body.sort_by,
+            descending=body.descending,
+            limit=body.limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logger.info(f"   ✅ {len(result['matches'])}건 일치 ({result['evaluated']}/{result['universe_size']}개 평가, {result['elapsed_ms']}ms)")
+    return ScreenerResponse(success=True, data=ScreenerResult(**result))
@@ -2,32 +2,56 @@
 주식 데이터 API 엔드포인트
 """
 import logging
-from fastapi import APIRouter, HTTPException, Query, Depends
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.models.stock import (
     StockResponse, StockData, NewsResponse, NewsItem, 
-    AnalysisResponse, AIAnalysis, ChartResponse
+    AnalysisResponse, AIAnalysis, ChartResponse, AnalysisJob, AnalysisJobResponse,
+    SentimentResponse, SentimentBatchRequest, SentimentBatchResponse
 )
-from app.services.stock_service import StockService
+from app.services.stock_service import stock_service
+from app.services.analysis_scheduler import AnalysisTimeoutError, AnalysisCancelledError
 from app.services.auth_service import get_current_user
-from app.database.connection import get_db
-from app.database.user_repository import UserRepository
-from app.database.repository import PortfolioRepository
+from app.database.connection import get_db, SessionLocal
+from app.database.analysis_job_repository import AnalysisJobRepository, JOB_FINISHED_STATUSES
 from app.database.models import UserDB
+from app.services.analysis_job_service import analysis_job_manager, require_gemini_key, get_holding_context
+from app.services.sentiment_service import sentiment_service
+from app.services.indicator_engine import IndicatorSpec, parse_indicator_spec
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-stock_service = StockService()
 
 logger.info("📌 Stock 라우터 초기화 완료")
 
 
+def indicator_spec_query(
+    sma: Optional[str] = Query(None, description="SMA 기간 목록 (예: 10,30,100, 기본값: 20,50,200)"),
+    ema: Optional[str] = Query(None, description="EMA 기간 목록 (예: 9,21, 기본값: 12,26)"),
+    rsi: Optional[str] = Query(None, description="RSI 기간 (예: 7, 기본값: 14)"),
+    macd: Optional[str] = Query(None, description="MACD fast,slow,signal (기본값: 12,26,9)"),
+    bb: Optional[str] = Query(None, description="볼린저밴드 기간,표준편차 배수 (기본값: 20,2)"),
+    atr: Optional[str] = Query(None, description="ATR 기간 (기본값: 14)"),
+    stoch: Optional[str] = Query(None, description="스토캐스틱 %K 기간,%D 평활 기간 (기본값: 14,3)"),
+    adx: Optional[str] = Query(None, description="ADX/DMI 기간 (기본값: 14)"),
+) -> IndicatorSpec:
+    """쿼리 문자열로 기술적 지표 파라미터 지정 (잘못된 값이면 400)"""
+    try:
+        return parse_indicator_spec(sma=sma, ema=ema, rsi=rsi, macd=macd, bb=bb, atr=atr, stoch=stoch, adx=adx)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/stock/{ticker}", response_model=StockResponse)
 async def get_stock(
     ticker: str,
     include_technical: bool = Query(False, description="기술적 지표 포함 여부"),
-    include_chart: bool = Query(False, description="차트 데이터 포함 여부")
+    include_chart: bool = Query(False, description="차트 데이터 포함 여부"),
+    spec: IndicatorSpec = Depends(indicator_spec_query)
 ) -> StockResponse:
     """
     주식 실시간 데이터 조회
@@ -36,6 +60,7 @@ async def get_stock(
         ticker: 주식 티커 심볼 (예: AAPL, TSLA, GOOGL)
         include_technical: 기술적 지표 포함 여부 (기본값: False)
         include_chart: 차트 데이터 포함 여부 (기본값: False)
+        spec: 기술적 지표 파라미터 (sma, ema, rsi, macd, bb, atr, stoch, adx 쿼리)
 
     Returns:
         StockResponse: 주식 데이터 또는 에러 정보
@@ -44,6 +69,7 @@ async def get_stock(
         - GET /api/stock/AAPL
         - GET /api/stock/AAPL?include_technical=true
         - GET /api/stock/AAPL?include_technical=true&include_chart=true
+        - GET /api/stock/AAPL?include_technical=true&sma=10,30,100&rsi=7
         - GET /api/stock/TSLA
     """
     logger.info(f"📈 주식 데이터 조회: GET /stock/{ticker}")
@@ -51,7 +77,8 @@ async def get_stock(
         stock_data = stock_service.get_stock_data(
             ticker,
             include_technical=include_technical,
-            include_chart=include_chart
+            include_chart=include_chart,
+            spec=spec
         )
         return StockResponse(
             success=True,
@@ -96,10 +123,84 @@ async def get_stock_news(
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
 
 
+# 일괄 감성 분석 최대 티커 수
+MAX_SENTIMENT_TICKERS = 20
+
+
+async def _run_sentiment(tickers, request: Request, current_user: UserDB, db: Session, escalate: bool):
+    """감성 분석 실행 + 공통 에러 매핑 (escalate=False면 Gemini 없이 사전 채점만)"""
+    gemini_key = require_gemini_key(db, current_user) if escalate else None
+    try:
+        return await sentiment_service.get_ticker_sentiments(
+            tickers, gemini_key, current_user.id, is_disconnected=request.is_disconnected
+        )
+    except AnalysisTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except AnalysisCancelledError as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    except Exception as e:
+        logger.error(f"   ❌ 감성 분석 실패: {type(e).__name__}: {str(e)}")
+        if "429" in str(e) or "quota" in str(e).lower():
+            raise HTTPException(status_code=429, detail=f"Gemini API 요청 제한 초과: {str(e)}")
+        raise HTTPException(status_code=502, detail=f"감성 분석 중 오류 발생: {str(e)}")
+
+
+@router.get("/stock/{ticker}/sentiment", response_model=SentimentResponse)
+async def get_stock_sentiment(
+    ticker: str,
+    request: Request,
+    escalate: bool = Query(True, description="애매하거나 영향이 큰 헤드라인을 Gemini로 다시 채점"),
+    current_user: UserDB = Depends(get_current_user),  # 인증 필수
+    db: Session = Depends(get_db)
+) -> SentimentResponse:
+    """
+    뉴스 헤드라인 감성 분석
+
+    기사별 점수(-1.0 ~ 1.0)와 티커 종합 점수(-100 ~ 100)를 반환합니다.
+    모든 기사는 오프라인 사전으로 먼저 채점하고, 애매하거나 영향이 큰 기사만
+    Gemini로 다시 채점합니다 (escalate=false면 사전 채점만, API 키 불필요).
+    Gemini로 채점한 기사는 캐시된 점수를 재사용합니다.
+
+    Examples:
+        - GET /api/stock/AAPL/sentiment
+    """
+    logger.info(f"🧭 감성 분석: GET /stock/{ticker}/sentiment")
+    results = await _run_sentiment([ticker], request, current_user, db, escalate)
+    return SentimentResponse(success=True, data=results[0])
+
+
+@router.post("/sentiment/batch", response_model=SentimentBatchResponse)
+async def get_batch_sentiment(
+    body: SentimentBatchRequest,
+    request: Request,
+    escalate: bool = Query(True, description="애매하거나 영향이 큰 헤드라인을 Gemini로 다시 채점"),
+    current_user: UserDB = Depends(get_current_user),  # 인증 필수
+    db: Session = Depends(get_db)
+) -> SentimentBatchResponse:
+    """
+    여러 티커 뉴스 감성 일괄 분석
+
+    모든 티커의 헤드라인을 모아 한 번의 Gemini 호출로 채점합니다.
+
+    Example:
+        POST /api/sentiment/batch
+        Body: { "tickers": ["AAPL", "MSFT", "NVDA"] }
+    """
+    logger.info(f"🧭 일괄 감성 분석: POST /sentiment/batch ({len(body.tickers)}개 티커)")
+    if not body.tickers:
+        raise HTTPException(status_code=400, detail="티커를 하나 이상 지정해주세요.")
+    if len(body.tickers) > MAX_SENTIMENT_TICKERS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_SENTIMENT_TICKERS}개 티커까지 분석할 수 있습니다.")
+
+    results = await _run_sentiment(body.tickers, request, current_user, db, escalate)
+    return SentimentBatchResponse(success=True, data=results)
+
+
 @router.get("/stock/{ticker}/chart-data", response_model=ChartResponse)
 async def get_chart_data(
     ticker: str,
-    period: str = Query("1y", description="차트 데이터 기간 (예: 1y, 2y, 5y, max)")
+    period: str = Query("1y", description="차트 데이터 기간 (예: 1y, 2y, 5y, max)"),
+    spec: IndicatorSpec = Depends(indicator_spec_query)
 ) -> ChartResponse:
     """
     차트용 시계열 데이터 조회 (기술적 지표 포함)
@@ -107,17 +208,16 @@ async def get_chart_data(
     Args:
         ticker: 주식 티커 심볼
         period: 조회 기간
+        spec: 기술적 지표 파라미터 (sma, ema, rsi, macd, bb, atr, stoch, adx 쿼리)
 
     Returns:
         ChartResponse: 차트 데이터 또는 에러 정보
     """
     try:
-        chart_data = stock_service.get_chart_data(ticker, period)
-        return ChartResponse(
-            success=True,
-            data=chart_data,
-            error=None
-        )
+        # 서비스가 만든 포인트는 이미 JSON 호환 값(None/float/int/str)이므로 ChartDataPoint
+        # 재검증 없이 메모된 직렬화 본문을 그대로 응답 (스키마는 response_model로 문서화)
+        body = stock_service.get_chart_json(ticker, period, spec)
+        return Response(content=body, media_type="application/json")
     except ValueError as e:
         if "429" in str(e) or "요청 제한 초과" in str(e):
             raise HTTPException(status_code=429, detail=str(e))
@@ -130,6 +230,8 @@ async def get_chart_data(
 async def get_stock_analysis(
     ticker: str,
     stock_data: StockData,
+    request: Request,
+    structured: bool = Query(False, description="구조화(JSON 스키마) 분석 결과 포함 여부"),
     current_user: UserDB = Depends(get_current_user),  # 인증 필수
     db: Session = Depends(get_db)
 ) -> AnalysisResponse:
@@ -146,6 +248,8 @@ async def get_stock_analysis(
     Args:
         ticker: 주식 티커 심볼 (예: AAPL, TSLA, GOOGL)
         stock_data: 이미 조회된 주식 데이터 (기술적 지표 포함 권장)
+        request: 요청 객체 (클라이언트 연결 종료 시 분석 취소용)
+        structured: True이면 투자의견/지지·저항선/리스크를 구조화된 필드(structured)로 함께 반환
         current_user: 현재 로그인한 사용자 (자동 주입)
         db: 데이터베이스 세션 (자동 주입)
 
@@ -162,33 +266,8 @@ async def get_stock_analysis(
     logger.info(f"   📊 데이터 티커: {stock_data.ticker}")
     
     try:
-        # 유저의 Gemini API 키 조회
-        user_repo = UserRepository(db)
-        gemini_key = user_repo.get_gemini_key(current_user.id)
-        
-        # API 키가 없는 경우
-        if not gemini_key:
-            # Admin인 경우 환경변수 키 사용 (fallback)
-            if current_user.role == "admin":
-                from app.config import settings
-                if settings.gemini_api_key:
-                    logger.info(f"   🔑 Admin 사용자 - 환경변수 API 키 사용")
-                    gemini_key = settings.gemini_api_key
-                else:
-                    logger.error(f"   ❌ 환경변수에 Gemini API 키가 설정되지 않음")
-                    raise HTTPException(
-                        status_code=500,
-                        detail="서버에 Gemini API 키가 설정되지 않았습니다. 관리자에게 문의하세요."
-                    )
-            else:
-                # 일반 유저는 반드시 자신의 키를 등록해야 함
-                logger.error(f"   ❌ Gemini API 키 없음 (사용자: {current_user.username})")
-                raise HTTPException(
-                    status_code=400,
-                    detail="Gemini API 키가 등록되지 않았습니다. 설정에서 API 키를 등록해주세요."
-                )
-        else:
-            logger.info(f"   🔑 사용자 API 키 확인 완료")
+        # 유저의 Gemini API 키 조회 (Admin은 환경변수 키로 대체 가능)
+        gemini_key = require_gemini_key(db, current_user)
         
         # 티커 일치 여부 확인
         if stock_data.ticker.upper() != ticker.upper():
@@ -200,16 +279,9 @@ async def get_stock_analysis(
         logger.info(f"   ✅ 티커 일치 확인 완료")
         
         # 포트폴리오에서 평단가 정보 조회 (유저별)
-        portfolio_item = PortfolioRepository.get_by_ticker(db, current_user.id, ticker)
+        user_avg_price, user_profit_loss_ratio, user_weight = get_holding_context(db, current_user.id, ticker)
         
-        user_avg_price = None
-        user_profit_loss_ratio = None
-        user_weight = None
-        
-        if portfolio_item and portfolio_item.purchase_price:
-            user_avg_price = float(portfolio_item.purchase_price)
-            if portfolio_item.profit_percent:
-                user_profit_loss_ratio = float(portfolio_item.profit_percent)
+        if user_avg_price is not None:
             logger.info(f"   📊 포트폴리오 정보: 평단가={user_avg_price}, 수익률={user_profit_loss_ratio}%")
         else:
             logger.info(f"   📊 포트폴리오 정보 없음 - 일반 분석 진행")
@@ -222,7 +294,10 @@ async def get_stock_analysis(
             user_api_key=gemini_key,
             user_avg_price=user_avg_price,
             user_profit_loss_ratio=user_profit_loss_ratio,
-            user_weight=user_weight
+            user_weight=user_weight,
+            user_id=current_user.id,
+            is_disconnected=request.is_disconnected,
+            structured=structured
         )
 
         logger.info(f"   ✅ Gemini AI 분석 완료")
@@ -232,6 +307,14 @@ async def get_stock_analysis(
             data=analysis_result,
             error=None
         )
+    except HTTPException:
+        raise
+    except AnalysisTimeoutError as e:
+        logger.error(f"   ⏱️ 분석 시간 초과: {str(e)}")
+        raise HTTPException(status_code=504, detail=str(e))
+    except AnalysisCancelledError as e:
+        logger.info(f"   🚫 분석 취소: {str(e)}")
+        raise HTTPException(status_code=499, detail=str(e))
     except ValueError as e:
         logger.error(f"   ❌ ValueError: {str(e)}")
         if "API 키가 설정되지 않았습니다" in str(e):
@@ -242,3 +325,152 @@ async def get_stock_analysis(
     except Exception as e:
         logger.error(f"   ❌ Exception: {str(e)}")
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+
+
+@router.post("/stock/{ticker}/analysis/jobs", response_model=AnalysisJobResponse, status_code=202)
+async def submit_stock_analysis_job(
+    ticker: str,
+    stock_data: StockData,
+    structured: bool = Query(False, description="구조화(JSON 스키마) 분석 결과 포함 여부"),
+    current_user: UserDB = Depends(get_current_user),  # 인증 필수
+    db: Session = Depends(get_db)
+) -> AnalysisJobResponse:
+    """
+    Gemini AI 종합 분석 작업 제출 (비동기)
+
+    분석이 끝날 때까지 연결을 유지하지 않고 즉시 job id를 반환합니다.
+    결과는 GET /analysis/jobs/{job_id} (폴링) 또는
+    GET /analysis/jobs/{job_id}/events (SSE)로 조회합니다.
+    작업은 DB에 저장되므로 서버가 재시작되어도 이어서 처리됩니다.
+
+    Args:
+        ticker: 주식 티커 심볼
+        stock_data: 이미 조회된 주식 데이터 (기술적 지표 포함 권장)
+        structured: 구조화(JSON 스키마) 분석 결과 포함 여부
+        current_user: 현재 로그인한 사용자 (자동 주입)
+        db: 데이터베이스 세션 (자동 주입)
+
+    Returns:
+        AnalysisJobResponse: 생성된 작업 (pending 상태)
+
+    Example:
+        POST /api/stock/AAPL/analysis/jobs
+        Headers: { "Authorization": "Bearer <token>" }
+        Body: { "ticker": "AAPL", "timestamp": "2024-01-01T00:00:00", ... }
+    """
+    logger.info(f"💡 분석 작업 제출: POST /stock/{ticker}/analysis/jobs (사용자: {current_user.username})")
+
+    # 키가 없으면 작업을 만들지 않고 즉시 실패
+    require_gemini_key(db, current_user)
+
+    if stock_data.ticker.upper() != ticker.upper():
+        raise HTTPException(
+            status_code=400,
+            detail=f"URL의 티커({ticker})와 요청 본문의 티커({stock_data.ticker})가 일치하지 않습니다."
+        )
+
+    job = await analysis_job_manager.submit(db, current_user.id, stock_data, structured=structured)
+    return AnalysisJobResponse(
+        success=True,
+        data=AnalysisJob.model_validate(job),
+        error=None
+    )
+
+
+@router.get("/analysis/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_stock_analysis_job(
+    job_id: str,
+    current_user: UserDB = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> AnalysisJobResponse:
+    """
+    AI 분석 작업 상태/결과 조회 (폴링)
+
+    Args:
+        job_id: 작업 ID
+        current_user: 현재 로그인한 사용자 (자동 주입)
+        db: 데이터베이스 세션 (자동 주입)
+
+    Returns:
+        AnalysisJobResponse: 작업 상태 (completed이면 report 포함)
+    """
+    job = AnalysisJobRepository(db).get_for_user(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"분석 작업을 찾을 수 없습니다: {job_id}")
+
+    return AnalysisJobResponse(
+        success=True,
+        data=AnalysisJob.model_validate(job),
+        error=None
+    )
+
+
+# SSE 상태 확인 주기 / keep-alive 주기 (초)
+JOB_EVENTS_POLL_INTERVAL = 1.0
+JOB_EVENTS_KEEPALIVE_INTERVAL = 15.0
+
+
+@router.get("/analysis/jobs/{job_id}/events")
+async def stream_stock_analysis_job(
+    job_id: str,
+    request: Request,
+    current_user: UserDB = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """
+    AI 분석 작업 상태 스트리밍 (Server-Sent Events)
+
+    상태가 바뀔 때마다 `event: status` 이벤트로 AnalysisJob JSON을 전송하고,
+    completed/failed 상태가 되면 스트림을 종료합니다.
+
+    Args:
+        job_id: 작업 ID
+        request: 요청 객체 (클라이언트 연결 종료 감지용)
+        current_user: 현재 로그인한 사용자 (자동 주입)
+        db: 데이터베이스 세션 (자동 주입)
+    """
+    if not AnalysisJobRepository(db).get_for_user(job_id, current_user.id):
+        raise HTTPException(status_code=404, detail=f"분석 작업을 찾을 수 없습니다: {job_id}")
+
+    user_id = current_user.id
+
+    async def event_stream():
+        # 의존성 세션은 응답 전송 전에 닫히므로 스트림 전용 세션 사용
+        stream_db = SessionLocal()
+        repo = AnalysisJobRepository(stream_db)
+
+        def fetch() -> Optional[AnalysisJob]:
+            stream_db.expire_all()  # 워커가 커밋한 최신 상태 조회
+            job = repo.get_for_user(job_id, user_id)
+            return AnalysisJob.model_validate(job) if job else None
+
+        last_status = None
+        idle = 0.0
+        try:
+            while not await request.is_disconnected():
+                # SQLite 조회가 이벤트 루프를 막지 않도록 스레드에서 실행
+                job = await asyncio.to_thread(fetch)
+                if job is None:
+                    return
+
+                if job.status != last_status:
+                    last_status = job.status
+                    idle = 0.0
+                    payload = job.model_dump_json()
+                    yield f"event: status\ndata: {payload}\n\n"
+                    if job.status in JOB_FINISHED_STATUSES:
+                        return
+                elif idle >= JOB_EVENTS_KEEPALIVE_INTERVAL:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+
+                await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+                idle += JOB_EVENTS_POLL_INTERVAL
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,117 @@
+"""
+파라미터 스윕 API 엔드포인트 (NDJSON 스트리밍)
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.database.connection import get_db
+from app.database.models import UserDB
+from app.services.auth_service import get_current_user
+from app.services.screener import screener_service
+from app.services.sweep import sweep_runner
+from app.models.sweep import BacktestSweepRequest, ScreenerSweepRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _ndjson(lines: AsyncIterator[dict]) -> AsyncIterator[str]:
+    """한 줄에 JSON 하나씩 (결과가 끝나는 대로 전송)"""
+    async for line in lines:
+        yield json.dumps(line, ensure_ascii=False, default=str) + "\n"
+
+
+@router.post("/sweep/backtest")
+async def sweep_backtest(
+    body: BacktestSweepRequest,
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    백테스트 파라미터 스윕
+
+    파라미터 격자의 모든 조합 × 티커를 프로세스 풀에서 병렬로 백테스트하고,
+    결과를 끝나는 순서대로 NDJSON으로 스트리밍합니다. 저장된 일봉만 사용합니다.
+
+    Example:
+        POST /api/sweep/backtest
+        Body: {
+            "strategy": "rsi",
+            "grid": {"period": [7, 14, 21], "lower": [20, 30], "max_hold": [10, 20]},
+            "tickers": ["AAPL", "MSFT"],
+            "period": "10y"
+        }
+    """
+    logger.info(f"🧪 백테스트 스윕: POST /sweep/backtest ({body.strategy}, 사용자: {current_user.username})")
+
+    tickers = await asyncio.to_thread(
+        screener_service.resolve_universe, db, current_user.id, body.universe, body.tickers
+    )
+    if not tickers:
+        raise HTTPException(status_code=400, detail="평가할 티커가 없습니다. 종목을 먼저 조회하거나 티커를 지정해주세요.")
+
+    try:
+        # 파라미터 검증과 가격 로드(SQLite)는 동기 작업이므로 이벤트 루프 밖에서 실행
+        lines = await asyncio.to_thread(
+            sweep_runner.backtest_sweep,
+            tickers,
+            body.strategy,
+            body.grid,
+            period=body.period,
+            initial_capital=body.initial_capital,
+            fee_bps=body.fee_bps,
+            objective=body.objective,
+            top=body.top,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(_ndjson(lines), media_type="application/x-ndjson")
+
+
+@router.post("/sweep/screener")
+async def sweep_screener(
+    body: ScreenerSweepRequest,
+    db: Session = Depends(get_db),
+    current_user: UserDB = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    스크리너 파라미터 스윕
+
+    조건의 {이름} 자리에 격자 값을 대입한 조합마다 스크리너를 평가합니다.
+
+    Example:
+        POST /api/sweep/screener
+        Body: {
+            "conditions": [{"field": "rsi{period}", "op": "<", "value": "{threshold}"}],
+            "grid": {"period": [7, 14, 21], "threshold": [20, 25, 30]}
+        }
+    """
+    logger.info(f"🧪 스크리너 스윕: POST /sweep/screener (조건 {len(body.conditions)}개, 사용자: {current_user.username})")
+
+    tickers = await asyncio.to_thread(
+        screener_service.resolve_universe, db, current_user.id, body.universe, body.tickers
+    )
+    if not tickers:
+        raise HTTPException(status_code=400, detail="평가할 티커가 없습니다. 종목을 먼저 조회하거나 티커를 지정해주세요.")
+
+    try:
+        lines = await asyncio.to_thread(
+            sweep_runner.screener_sweep,
+            tickers,
+            [condition.model_dump() for condition in body.conditions],
+            body.grid,
+            match=body.match,
+            sort_by=body.sort_by,
+            descending=body.descending,
+            limit=body.limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(_ndjson(lines), media_type="application/x-ndjson")
@@ -15,6 +15,64 @@ class Settings:
     def __init__(self):
         # Gemini API
         self.gemini_api_key = os.getenv("GEMINI_API_KEY", "")
+        self.gemini_model = os.getenv("GEMINI_MODEL", "models/gemini-flash-latest")
+
+        # Gemini 클라이언트 풀 (API 키별 클라이언트 재사용)
+        self.gemini_client_idle_ttl_minutes = int(os.getenv("GEMINI_CLIENT_IDLE_TTL_MINUTES", "30"))
+        self.gemini_client_pool_max_size = int(os.getenv("GEMINI_CLIENT_POOL_MAX_SIZE", "100"))
+
+        # Gemini 분석 스케줄러 (전용 스레드 풀, 동시성 제한, 타임아웃)
+        self.gemini_max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+        self.gemini_per_user_concurrency = int(os.getenv("GEMINI_PER_USER_CONCURRENCY", "1"))
+        self.gemini_timeout_seconds = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "120"))
+
+        # Gemini 프롬프트 토큰 예산 (초과 시 우선순위 낮은 지표부터 제외, 0이면 제한 없음)
+        self.gemini_prompt_token_budget = int(os.getenv("GEMINI_PROMPT_TOKEN_BUDGET", "1500"))
+
+        # 뉴스 캐시 TTL (분)
+        self.news_cache_ttl_minutes = int(os.getenv("NEWS_CACHE_TTL_MINUTES", "10"))
+
+        # 뉴스 감성 분석 (한 번의 Gemini 호출에 넣을 최대 헤드라인 수, 기사별 점수 캐시 크기)
+        self.sentiment_batch_size = int(os.getenv("SENTIMENT_BATCH_SIZE", "40"))
+        self.sentiment_cache_max_size = int(os.getenv("SENTIMENT_CACHE_MAX_SIZE", "5000"))
+
+        # 기술적 지표 메모 캐시 최대 항목 수 (티커 + 지표 파라미터 + 마지막 봉 기준)
+        self.indicator_memo_max_size = int(os.getenv("INDICATOR_MEMO_MAX_SIZE", "512"))
+
+        # 스크리너 (평가 대상 티커 목록, 비우면 이력이 저장된 전체 / 지표 계산에 쓰는 최근 봉 수)
+        self.screener_universe = os.getenv("SCREENER_UNIVERSE", "")
+        self.screener_history_bars = int(os.getenv("SCREENER_HISTORY_BARS", "400"))
+
+        # 유니버스 스냅샷 (메모리 맵 파일 위치, 비우면 DB 디렉토리의 snapshots / 매일 생성 시각 UTC, 음수면 끔 / 저장 봉 수)
+        self.universe_snapshot_dir = os.getenv("UNIVERSE_SNAPSHOT_DIR", "")
+        self.universe_snapshot_hour_utc = int(os.getenv("UNIVERSE_SNAPSHOT_HOUR_UTC", "22"))
+        self.universe_snapshot_bars = int(os.getenv("UNIVERSE_SNAPSHOT_BARS", "600"))
+
+        # 포트폴리오 리스크 분석 벤치마크 지수 (베타 기준)
+        self.risk_benchmark = os.getenv("RISK_BENCHMARK", "^GSPC")
+
+        # AI 기본 보고서 캐시 TTL (티커 단위 보고서를 사용자 간 공유)
+        self.analysis_base_cache_ttl_minutes = int(os.getenv("ANALYSIS_BASE_CACHE_TTL_MINUTES", "30"))
+
+        # 포트폴리오 일괄 분석 캐시 TTL (보유 구성 지문 단위)
+        self.portfolio_analysis_cache_ttl_minutes = int(os.getenv("PORTFOLIO_ANALYSIS_CACHE_TTL_MINUTES", "30"))
+
+        # AI 기본 보고서 / 포트폴리오 분석 캐시 최대 항목 수 (초과 시 오래 사용되지 않은 것부터 정리)
+        self.analysis_cache_max_size = int(os.getenv("ANALYSIS_CACHE_MAX_SIZE", "500"))
+
+        # AI 분석 작업 큐 (백그라운드 워커 수, 완료 작업 보관 기간, 최대 실행 횟수)
+        self.analysis_job_workers = int(os.getenv("ANALYSIS_JOB_WORKERS", "2"))
+        self.analysis_job_retention_days = int(os.getenv("ANALYSIS_JOB_RETENTION_DAYS", "7"))
+        self.analysis_job_max_attempts = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+
+        # 파라미터 스윕 프로세스 풀 (워커 수, 0이면 CPU 코어 수와 메모리 제한 기준 / 요청당 최대 조합 수, 조합 × 티커 수)
+        self.sweep_workers = int(os.getenv("SWEEP_WORKERS", "2"))
+        self.sweep_max_combinations = int(os.getenv("SWEEP_MAX_COMBINATIONS", "2000"))
+        self.sweep_max_evaluations = int(os.getenv("SWEEP_MAX_EVALUATIONS", "200000"))
+
+        # 포트폴리오 몬테카를로 시뮬레이션 (요청당 최대 경로 수 / 한 번에 계산할 묶음 배열 크기 MB)
+        self.simulation_max_paths = int(os.getenv("SIMULATION_MAX_PATHS", "200000"))
+        self.simulation_chunk_mb = int(os.getenv("SIMULATION_CHUNK_MB", "64"))
 
         # Environment
         self.environment = os.getenv("ENVIRONMENT", "development")
@@ -54,6 +112,11 @@ class Settings:
         """CORS 허용 오리진 목록"""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
 
+    @property
+    def screener_tickers(self) -> List[str]:
+        """스크리너 기본 유니버스 티커 목록"""
+        return [ticker.strip().upper() for ticker in self.screener_universe.split(",") if ticker.strip()]
+
 
 # 전역 설정 인스턴스
 settings = Settings()
@@ -0,0 +1,132 @@
+"""
+AI 분석 작업 Repository
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.database.models import AnalysisJobDB
+
+# 작업 상태
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED)
+
+
+class AnalysisJobRepository:
+    """AI 분석 작업 CRUD Repository"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, user_id: int, ticker: str, stock_data_json: str, structured_mode: bool = False) -> AnalysisJobDB:
+        """작업 생성 (pending 상태)"""
+        job = AnalysisJobDB(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            ticker=ticker.upper(),
+            status=JOB_PENDING,
+            stock_data=stock_data_json,
+            structured_mode=structured_mode,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_by_id(self, job_id: str) -> Optional[AnalysisJobDB]:
+        """ID로 작업 조회"""
+        return self.db.query(AnalysisJobDB).filter(AnalysisJobDB.id == job_id).first()
+
+    def get_for_user(self, job_id: str, user_id: int) -> Optional[AnalysisJobDB]:
+        """ID로 작업 조회 (유저별)"""
+        return self.db.query(AnalysisJobDB).filter(
+            AnalysisJobDB.id == job_id,
+            AnalysisJobDB.user_id == user_id
+        ).first()
+
+    def mark_running(self, job_id: str) -> Optional[AnalysisJobDB]:
+        """작업 시작 처리 (pending 상태인 경우만)"""
+        job = self.get_by_id(job_id)
+        if not job or job.status != JOB_PENDING:
+            return None
+        job.status = JOB_RUNNING
+        job.started_at = datetime.now()
+        job.attempts = (job.attempts or 0) + 1
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def mark_completed(self, job_id: str, report: str, structured_report_json: Optional[str] = None) -> None:
+        """작업 완료 처리"""
+        job = self.get_by_id(job_id)
+        if job:
+            job.status = JOB_COMPLETED
+            job.report = report
+            job.structured_report = structured_report_json
+            job.error = None
+            job.finished_at = datetime.now()
+            self.db.commit()
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        """작업 실패 처리"""
+        job = self.get_by_id(job_id)
+        if job:
+            job.status = JOB_FAILED
+            job.error = error
+            job.finished_at = datetime.now()
+            self.db.commit()
+
+    def fail_exhausted(self, max_attempts: int, error: str) -> int:
+        """
+        max_attempts번 이상 시작되었는데 실행 중 상태로 남은 작업을 실패 처리
+
+        실행 중에 프로세스를 죽이는 작업이 재시작마다 반복되지 않도록 requeue_running 전에 호출합니다.
+
+        Returns:
+            실패 처리한 작업 수
+        """
+        count = self.db.query(AnalysisJobDB).filter(
+            AnalysisJobDB.status == JOB_RUNNING,
+            AnalysisJobDB.attempts >= max_attempts
+        ).update({
+            AnalysisJobDB.status: JOB_FAILED,
+            AnalysisJobDB.error: error,
+            AnalysisJobDB.finished_at: datetime.now(),
+        })
+        self.db.commit()
+        return count
+
+    def requeue_running(self) -> int:
+        """
+        실행 중 상태로 남은 작업을 pending으로 되돌림
+
+        서버 재시작 시 중단된 작업을 다시 처리하기 위해 사용합니다.
+
+        Returns:
+            되돌린 작업 수
+        """
+        count = self.db.query(AnalysisJobDB).filter(
+            AnalysisJobDB.status == JOB_RUNNING
+        ).update({AnalysisJobDB.status: JOB_PENDING, AnalysisJobDB.started_at: None})
+        self.db.commit()
+        return count
+
+    def get_pending_ids(self) -> List[str]:
+        """대기 중인 작업 ID 목록 (생성 순)"""
+        rows = self.db.query(AnalysisJobDB.id).filter(
+            AnalysisJobDB.status == JOB_PENDING
+        ).order_by(AnalysisJobDB.created_at).all()
+        return [row.id for row in rows]
+
+    def delete_finished_before(self, days: int) -> int:
+        """보관 기간이 지난 완료/실패 작업 삭제"""
+        cutoff = datetime.now() - timedelta(days=days)
+        count = self.db.query(AnalysisJobDB).filter(
+            AnalysisJobDB.status.in_(JOB_FINISHED_STATUSES),
+            AnalysisJobDB.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return count
@@ -0,0 +1,101 @@
+"""
+Gemini 사용량 Repository
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.database.models import GeminiUsageDB, UserDB
+
+
+class GeminiUsageRepository:
+    """Gemini 호출 기록 및 집계 Repository"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(
+        self,
+        kind: str,
+        model: str,
+        latency_ms: int,
+        outcome: str,
+        user_id: Optional[int] = None,
+        ticker: Optional[str] = None,
+        prompt_tokens: Optional[int] = None,
+        output_tokens: Optional[int] = None,
+        wait_ms: int = 0,
+    ) -> GeminiUsageDB:
+        """호출 기록 저장"""
+        usage = GeminiUsageDB(
+            user_id=user_id,
+            ticker=ticker.upper() if ticker else None,
+            kind=kind,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            latency_ms=latency_ms,
+            wait_ms=wait_ms,
+            outcome=outcome,
+        )
+        self.db.add(usage)
+        self.db.commit()
+        return usage
+
+    @staticmethod
+    def _aggregates():
+        """공통 집계 컬럼"""
+        return (
+            func.count(GeminiUsageDB.id).label("calls"),
+            func.sum(case((GeminiUsageDB.outcome == "ok", 0), else_=1)).label("failures"),
+            func.coalesce(func.sum(GeminiUsageDB.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(GeminiUsageDB.output_tokens), 0).label("output_tokens"),
+            func.avg(GeminiUsageDB.latency_ms).label("avg_latency_ms"),
+            func.max(GeminiUsageDB.latency_ms).label("max_latency_ms"),
+            func.avg(GeminiUsageDB.wait_ms).label("avg_wait_ms"),
+        )
+
+    @staticmethod
+    def _to_dict(row, keys: List[str]) -> Dict:
+        result = {key: getattr(row, key) for key in keys}
+        result.update(
+            calls=row.calls,
+            failures=int(row.failures or 0),
+            prompt_tokens=int(row.prompt_tokens),
+            output_tokens=int(row.output_tokens),
+            avg_latency_ms=round(row.avg_latency_ms or 0),
+            max_latency_ms=row.max_latency_ms,
+            avg_wait_ms=round(row.avg_wait_ms or 0),
+        )
+        return result
+
+    def aggregate_by_user_day(self, since: datetime) -> List[Dict]:
+        """사용자별/일별 집계"""
+        day = func.date(GeminiUsageDB.created_at).label("day")
+        rows = self.db.query(
+            day,
+            GeminiUsageDB.user_id,
+            UserDB.username,
+            *self._aggregates()
+        ).outerjoin(
+            UserDB, UserDB.id == GeminiUsageDB.user_id
+        ).filter(
+            GeminiUsageDB.created_at >= since
+        ).group_by(
+            day, GeminiUsageDB.user_id, UserDB.username
+        ).order_by(day.desc(), func.count(GeminiUsageDB.id).desc()).all()
+        return [self._to_dict(row, ["day", "user_id", "username"]) for row in rows]
+
+    def aggregate_by_ticker(self, since: datetime, limit: int = 20) -> List[Dict]:
+        """티커별 집계 (토큰 사용량 많은 순)"""
+        total_tokens = func.coalesce(func.sum(GeminiUsageDB.prompt_tokens), 0) + func.coalesce(func.sum(GeminiUsageDB.output_tokens), 0)
+        rows = self.db.query(
+            GeminiUsageDB.ticker,
+            *self._aggregates()
+        ).filter(
+            GeminiUsageDB.created_at >= since,
+            GeminiUsageDB.ticker.isnot(None)
+        ).group_by(
+            GeminiUsageDB.ticker
+        ).order_by(total_tokens.desc()).limit(limit).all()
+        return [self._to_dict(row, ["ticker"]) for row in rows]
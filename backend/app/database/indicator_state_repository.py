@@ -0,0 +1,41 @@
+"""
+기술적 지표 증분 상태 Repository
+"""
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.database.models import IndicatorStateDB
+
+
+class IndicatorStateRepository:
+    """티커별 지표 상태 조회/저장 Repository"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, ticker: str, spec_key: str) -> Optional[IndicatorStateDB]:
+        """상태 조회"""
+        return self.db.query(IndicatorStateDB).filter(
+            IndicatorStateDB.ticker == ticker.upper(),
+            IndicatorStateDB.spec_key == spec_key
+        ).first()
+
+    def upsert(self, ticker: str, spec_key: str, last_date: date, bars: int, state_json: str) -> IndicatorStateDB:
+        """상태 저장 (없으면 생성)"""
+        row = self.get(ticker, spec_key)
+        if row is None:
+            row = IndicatorStateDB(ticker=ticker.upper(), spec_key=spec_key)
+            self.db.add(row)
+        row.last_date = last_date
+        row.bars = bars
+        row.state = state_json
+        self.db.commit()
+        return row
+
+    def delete(self, ticker: str) -> int:
+        """티커의 모든 상태 삭제 (재계산 강제용)"""
+        count = self.db.query(IndicatorStateDB).filter(
+            IndicatorStateDB.ticker == ticker.upper()
+        ).delete()
+        self.db.commit()
+        return count
@@ -0,0 +1,101 @@
+"""
+일봉 이력 / 재무 스냅샷 Repository
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, func, or_, select, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from app.database.models import FundamentalsDB, PriceHistoryDB
+
+# (날짜, 시가, 고가, 저가, 종가, 거래량)
+HistoryRow = Tuple[date, Optional[float], Optional[float], Optional[float], Optional[float], Optional[float]]
+
+
+def _changed(model, statement, columns: Sequence[str]):
+    """upsert 충돌 시 값이 하나라도 다른지 (NULL 포함 비교, SQLite IS NOT)"""
+    return or_(*(getattr(model, column).is_not(statement.excluded[column]) for column in columns))
+
+
+class MarketDataRepository:
+    """스크리너용 일봉 이력 / 재무 스냅샷 조회·저장 Repository"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_history(self, ticker: str, rows: Sequence[HistoryRow]) -> int:
+        """
+        일봉 저장 (같은 날짜는 값이 바뀐 경우에만 덮어씀)
+
+        Returns:
+            실제로 추가/변경된 행 수
+        """
+        if not rows:
+            return 0
+        values = [
+            {'ticker': ticker.upper(), 'date': d, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for d, o, h, l, c, v in rows
+        ]
+        columns = ('open', 'high', 'low', 'close', 'volume')
+        statement = insert(PriceHistoryDB)
+        statement = statement.on_conflict_do_update(
+            index_elements=['ticker', 'date'],
+            set_={column: statement.excluded[column] for column in columns},
+            where=_changed(PriceHistoryDB, statement, columns)
+        )
+        # ORM bulk insert 결과에는 rowcount가 없으므로 Core 연결로 실행
+        result = self.db.connection().execute(statement, values)
+        self.db.commit()
+        return max(result.rowcount, 0)
+
+    def history_tickers(self) -> List[str]:
+        """이력이 저장된 티커 목록"""
+        rows = self.db.execute(select(PriceHistoryDB.ticker).distinct().order_by(PriceHistoryDB.ticker))
+        return [row[0] for row in rows]
+
+    def recent_dates(self, tickers: Sequence[str], limit: Optional[int]) -> List[date]:
+        """티커들의 최근 봉 날짜 (최신순, 최대 limit개, None이면 전체)"""
+        rows = self.db.execute(
+            select(PriceHistoryDB.date).where(
+                PriceHistoryDB.ticker.in_([t.upper() for t in tickers])
+            ).distinct().order_by(PriceHistoryDB.date.desc()).limit(limit)
+        )
+        return [row[0] for row in rows]
+
+    def load_history(self, tickers: Sequence[str], since: date) -> List[tuple]:
+        """
+        since 이후 일봉 (ticker, date, high, low, close, volume) 튜플 목록
+
+        스크리너가 수만 행을 한 번에 읽으므로 ORM 타입 변환 없이 읽습니다
+        (date는 'YYYY-MM-DD' 문자열 그대로).
+        """
+        statement = text(
+            "SELECT ticker, date, high, low, close, volume FROM price_history "
+            "WHERE ticker IN :tickers AND date >= :since"
+        ).bindparams(bindparam("tickers", expanding=True))
+        return self.db.execute(
+            statement, {"tickers": [t.upper() for t in tickers], "since": since.isoformat()}
+        ).all()
+
+    def upsert_fundamentals(self, ticker: str, values: Dict[str, Optional[float]]) -> bool:
+        """
+        재무 스냅샷 저장 (없으면 생성, 값이 같으면 쓰지 않음)
+
+        Returns:
+            추가/변경 여부
+        """
+        statement = insert(FundamentalsDB).values(ticker=ticker.upper(), **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=['ticker'],
+            set_={**{column: statement.excluded[column] for column in values}, 'updated_at': func.now()},
+            where=_changed(FundamentalsDB, statement, values)
+        )
+        result = self.db.connection().execute(statement)
+        self.db.commit()
+        return result.rowcount > 0
+
+    def load_fundamentals(self, tickers: Sequence[str]) -> List[FundamentalsDB]:
+        """티커들의 재무 스냅샷"""
+        return self.db.query(FundamentalsDB).filter(
+            FundamentalsDB.ticker.in_([t.upper() for t in tickers])
+        ).all()
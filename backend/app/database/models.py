@@ -1,7 +1,9 @@
 """
 SQLAlchemy ORM 모델
 """
-from sqlalchemy import Column, Integer, String, Numeric, Date, Text, DateTime, Boolean, ForeignKey, UniqueConstraint
+import json
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Numeric, Float, Date, Text, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -53,3 +55,111 @@ class PortfolioDB(Base):
 
     # Relationship
     user = relationship("UserDB", backref="portfolios")
+
+
+class AnalysisJobDB(Base):
+    """AI 분석 작업 DB 모델 (비동기 작업 큐)"""
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    ticker = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, completed, failed
+    stock_data = Column(Text, nullable=False)  # 분석 입력 StockData (JSON)
+    structured_mode = Column(Boolean, nullable=False, default=False)  # JSON 스키마 응답 모드
+    report = Column(Text, nullable=True)  # 분석 결과 보고서
+    structured_report = Column(Text, nullable=True)  # 구조화 결과 (StructuredReport JSON)
+    error = Column(Text, nullable=True)  # 실패 사유
+    attempts = Column(Integer, nullable=False, default=0)  # 실행 시작 횟수 (재시작 복구 포함)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    @property
+    def structured(self) -> Optional[dict]:
+        """구조화 분석 결과 (없으면 None)"""
+        return json.loads(self.structured_report) if self.structured_report else None
+
+
+class GeminiUsageDB(Base):
+    """Gemini 호출별 토큰/지연시간 기록"""
+    __tablename__ = "gemini_usage"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    ticker = Column(String(10), nullable=True)
+    kind = Column(String(20), nullable=False)  # base, personal, health ...
+    model = Column(String(50), nullable=False)
+    prompt_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=False)  # API 호출 시간
+    wait_ms = Column(Integer, nullable=False, default=0)  # 스케줄러 대기 시간
+    outcome = Column(String(20), nullable=False)  # ok, error, timeout, cancelled
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_gemini_usage_created_user', 'created_at', 'user_id'),
+    )
+
+
+class IndicatorStateDB(Base):
+    """티커별 기술적 지표 증분 계산 상태 (EMA/RSI/MACD 최종값, SMA/볼린저 창 버퍼)"""
+    __tablename__ = "indicator_state"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(10), nullable=False)
+    spec_key = Column(String(200), nullable=False)  # IndicatorSpec.key
+    last_date = Column(Date, nullable=False)  # 상태에 반영된 마지막 확정 봉 날짜
+    bars = Column(Integer, nullable=False)  # 반영된 봉 수
+    state = Column(Text, nullable=False)  # JSON
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('ticker', 'spec_key', name='uq_indicator_state_ticker_spec'),
+    )
+
+
+class PriceHistoryDB(Base):
+    """티커별 일봉 이력 (조회 시 저장, 스크리너가 업스트림 없이 사용)"""
+    __tablename__ = "price_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(10), nullable=False)
+    date = Column(Date, nullable=False)
+    open = Column(Float, nullable=True)
+    high = Column(Float, nullable=True)
+    low = Column(Float, nullable=True)
+    close = Column(Float, nullable=True)
+    volume = Column(Float, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('ticker', 'date', name='uq_price_history_ticker_date'),
+        Index('ix_price_history_date', 'date'),
+    )
+
+
+class FundamentalsDB(Base):
+    """티커별 최신 재무 지표 스냅샷 (종목 조회 시 갱신)"""
+    __tablename__ = "fundamentals"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(10), nullable=False, unique=True, index=True)
+    name = Column(String(200), nullable=True)
+    sector = Column(String(100), nullable=True)
+    industry = Column(String(100), nullable=True)
+    current_price = Column(Float, nullable=True)
+    market_cap = Column(Float, nullable=True)
+    trailing_pe = Column(Float, nullable=True)
+    forward_pe = Column(Float, nullable=True)
+    pbr = Column(Float, nullable=True)
+    roe = Column(Float, nullable=True)
+    opm = Column(Float, nullable=True)
+    peg = Column(Float, nullable=True)
+    debt_to_equity = Column(Float, nullable=True)
+    current_ratio = Column(Float, nullable=True)
+    quick_ratio = Column(Float, nullable=True)
+    dividend_yield = Column(Float, nullable=True)
+    payout_ratio = Column(Float, nullable=True)
+    revenue_growth = Column(Float, nullable=True)
+    earnings_growth = Column(Float, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
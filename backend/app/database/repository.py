@@ -1,9 +1,10 @@
 """
 포트폴리오 Repository (CRUD)
 """
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from app.database.models import PortfolioDB
 from app.models.portfolio import PortfolioCreate, PortfolioUpdate
 
@@ -60,6 +61,15 @@ class PortfolioRepository:
         db.refresh(db_portfolio)
         return db_portfolio
 
+    @staticmethod
+    def bulk_update_valuation(db: Session, rows: Sequence[dict]) -> int:
+        """평가 결과 일괄 저장 ({'id', 'last_price', 'profit_percent', 'last_updated'} 목록, UPDATE 한 번)"""
+        if not rows:
+            return 0
+        db.execute(update(PortfolioDB), list(rows))
+        db.commit()
+        return len(rows)
+
     @staticmethod
     def delete(db: Session, user_id: int, ticker: str) -> bool:
         """삭제 (유저별)"""
@@ -6,10 +6,14 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.config import settings
-from app.api.routes import health, stock, portfolio, auth, admin
+from app.api.routes import health, stock, portfolio, auth, admin, screener, backtest, sweep
 from app.database.connection import init_db, get_db
 from app.database.user_repository import UserRepository
 from app.services.auth_service import AuthService
+from app.services.analysis_job_service import analysis_job_manager
+from app.services.analysis_scheduler import analysis_scheduler
+from app.services.sweep import sweep_runner
+from app.services.universe_snapshot import universe_snapshot_job
 import time
 
 # 로거 설정
@@ -91,6 +95,23 @@ async def startup_event():
 
     db.close()
 
+    # AI 분석 작업 워커 시작 (미완료 작업 복구 포함)
+    await analysis_job_manager.start()
+
+    # 유니버스 스냅샷 야간 작업 시작 (오늘 스냅샷이 없으면 바로 생성)
+    universe_snapshot_job.start()
+
+
+# 앱 종료 시 백그라운드 작업 정리
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 실행 중이던 분석 작업은 DB에 남아 다음 시작 시 다시 처리됨
+    await analysis_job_manager.stop()
+    await universe_snapshot_job.stop()
+    analysis_scheduler.shutdown()
+    sweep_runner.shutdown()
+    logger.info("🛑 분석 작업 워커 종료")
+
 # 404 에러 핸들러
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
@@ -123,6 +144,12 @@ app.include_router(stock.router, prefix="/api", tags=["Stock"])
 logger.debug("   ✅ Stock 라우터 등록 완료")
 app.include_router(portfolio.router, prefix="/api", tags=["Portfolio"])
 logger.debug("   ✅ Portfolio 라우터 등록 완료")
+app.include_router(screener.router, prefix="/api", tags=["Screener"])
+logger.debug("   ✅ Screener 라우터 등록 완료")
+app.include_router(backtest.router, prefix="/api", tags=["Backtest"])
+logger.debug("   ✅ Backtest 라우터 등록 완료")
+app.include_router(sweep.router, prefix="/api", tags=["Sweep"])
+logger.debug("   ✅ Sweep 라우터 등록 완료")
 
 # 등록된 라우트 출력 (DEBUG 레벨)
 logger.debug("📋 등록된 전체 라우트:")
@@ -0,0 +1,87 @@
+"""
+백테스트 Pydantic 스키마 (API 요청/응답)
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional, Union
+from datetime import date
+
+
+class BacktestRequest(BaseModel):
+    """
+    백테스트 요청
+
+    예: {"ticker": "AAPL", "strategy": "rsi", "params": {"period": 14, "lower": 30, "upper": 70}, "period": "10y"}
+    """
+    ticker: str = Field(..., max_length=10)
+    strategy: Literal["rsi", "ma_cross", "macd", "bollinger"]
+    params: Dict[str, Union[int, float, str]] = {}  # 전략 파라미터 (생략 시 기본값)
+    period: Literal["1y", "2y", "5y", "10y", "20y", "max"] = "5y"
+    initial_capital: float = Field(10_000.0, gt=0)
+    fee_bps: float = Field(0.0, ge=0, le=500)  # 편도 수수료 (bp)
+    max_hold: Optional[int] = Field(None, ge=1, le=2520)  # 최대 보유 봉 수
+    include_curve: bool = True  # 자산곡선 포함 여부
+
+
+class BacktestTrade(BaseModel):
+    """거래 하나 (청산 전이면 exit 값 없음)"""
+    entry_date: date
+    entry_price: float
+    exit_date: Optional[date] = None
+    exit_price: Optional[float] = None
+    return_pct: float  # 수수료 반영 수익률 (보유 중이면 마지막 종가 기준)
+    bars_held: int
+
+
+class EquityCurve(BaseModel):
+    """자산곡선 (열 단위, 같은 인덱스끼리 한 봉)"""
+    dates: list[date]
+    equity: list[float]
+    benchmark: list[float]  # 매수 후 보유
+
+
+class BacktestMetrics(BaseModel):
+    """성과 지표"""
+    start_date: date
+    end_date: date
+    bars: int
+    final_equity: float
+    total_return_pct: float
+    cagr_pct: float
+    max_drawdown_pct: float
+    sharpe: Optional[float] = None  # 연환산 (무위험 수익률 0)
+    volatility_pct: float  # 연환산 변동성
+    exposure_pct: float  # 보유 기간 비율
+    trades: int
+    win_rate_pct: Optional[float] = None
+    benchmark_return_pct: float
+    benchmark_cagr_pct: float
+
+
+class BacktestResult(BaseModel):
+    """백테스트 결과"""
+    ticker: str
+    strategy: str
+    params: Dict[str, Union[int, float, str]]
+    period: str
+    metrics: BacktestMetrics
+    trades: list[BacktestTrade] = []
+    equity_curve: Optional[EquityCurve] = None
+
+
+class BacktestResponse(BaseModel):
+    """백테스트 API 응답"""
+    success: bool
+    data: Optional[BacktestResult] = None
+    error: Optional[str] = None
+
+
+class StrategyInfo(BaseModel):
+    """사용 가능한 전략과 기본 파라미터"""
+    name: str
+    params: Dict[str, Union[int, float, str]]
+
+
+class StrategyListResponse(BaseModel):
+    """전략 목록 API 응답"""
+    success: bool
+    data: list[StrategyInfo] = []
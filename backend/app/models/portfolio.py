@@ -2,7 +2,7 @@
 Pydantic 스키마 (API 요청/응답)
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import date, datetime
 
 
@@ -48,3 +48,204 @@ class ApiResponse(BaseModel):
     success: bool
     data: Optional[list[PortfolioResponse] | PortfolioResponse] = None
     error: Optional[str] = None
+
+
+class ValuationItem(BaseModel):
+    """종목별 평가 (현재가를 받지 못했거나 수량/평단가가 없으면 해당 값 없음)"""
+    ticker: str
+    quantity: Optional[int] = None
+    purchase_price: Optional[float] = None
+    current_price: Optional[float] = None
+    previous_close: Optional[float] = None
+    market_value: Optional[float] = None  # 평가금액
+    cost_basis: Optional[float] = None  # 매입금액
+    profit_loss: Optional[float] = None  # 평가손익
+    profit_percent: Optional[float] = None  # 평단가 대비 수익률 (%)
+    day_change_percent: Optional[float] = None  # 전일 대비 (%)
+    weight: Optional[float] = None  # 평가금액 기준 비중 (%)
+
+
+class PortfolioValuation(BaseModel):
+    """포트폴리오 평가 결과"""
+    as_of: datetime
+    total_value: float  # 평가금액 합계
+    total_cost: float  # 매입금액 합계 (평단가/수량이 있는 종목)
+    total_profit_loss: float
+    total_profit_percent: Optional[float] = None
+    items: list[ValuationItem] = []
+    missing: list[str] = []  # 현재가를 받지 못한 티커
+
+
+class PortfolioValuationResponse(BaseModel):
+    """포트폴리오 평가 API 응답"""
+    success: bool
+    data: Optional[PortfolioValuation] = None
+    error: Optional[str] = None
+
+
+class RiskHolding(BaseModel):
+    """종목별 리스크 지표"""
+    ticker: str
+    weight_pct: Optional[float] = None
+    beta: Optional[float] = None  # 벤치마크 대비
+    volatility_pct: Optional[float] = None  # 연환산 변동성
+    marginal_risk_pct: Optional[float] = None  # 비중 1 증가 시 포트폴리오 변동성 변화 (연환산)
+    risk_contribution_pct: Optional[float] = None  # 포트폴리오 변동성 기여분 (합 = 포트폴리오 변동성)
+    risk_share_pct: Optional[float] = None  # 변동성 기여 비율 (합 100)
+
+
+class PortfolioRisk(BaseModel):
+    """포트폴리오 리스크 분석 결과 (VaR/CVaR는 1일 손실 기준, 양수)"""
+    as_of: date
+    start_date: date
+    observations: int  # 사용한 일간 수익률 수
+    benchmark: str
+    confidence: float
+    weighting: Literal["market_value", "equal"]  # 수량이 없으면 동일 비중
+    total_value: float
+    portfolio_volatility_pct: Optional[float] = None
+    portfolio_beta: Optional[float] = None
+    benchmark_volatility_pct: Optional[float] = None
+    var_historical_pct: Optional[float] = None
+    cvar_historical_pct: Optional[float] = None
+    var_parametric_pct: Optional[float] = None
+    cvar_parametric_pct: Optional[float] = None
+    var_historical_amount: Optional[float] = None
+    var_parametric_amount: Optional[float] = None
+    holdings: list[RiskHolding] = []
+    tickers: list[str] = []  # 행렬 행/열 순서
+    covariance: list[list[Optional[float]]] = []  # 연환산
+    correlation: list[list[Optional[float]]] = []
+    excluded: list[str] = []  # 기간 중 이력이 부족해 제외된 티커
+    missing: list[str] = []  # 과거 데이터를 받을 수 없는 티커
+    cached: bool = False
+
+
+class PortfolioRiskResponse(BaseModel):
+    """포트폴리오 리스크 API 응답"""
+    success: bool
+    data: Optional[PortfolioRisk] = None
+    error: Optional[str] = None
+
+
+class EquityContribution(BaseModel):
+    """종목별 손익 기여"""
+    ticker: str
+    start_date: date  # 자산곡선에 반영되기 시작한 날짜 (매수일, 없으면 등록일)
+    quantity: int
+    cost_basis: Optional[float] = None  # 매수 금액 (평단가 없으면 매수일 종가 기준)
+    market_value: float
+    profit_loss: Optional[float] = None
+    contribution_pct: Optional[float] = None  # 전체 투입금액 대비 기여율 (%)
+
+
+class PortfolioEquityCurve(BaseModel):
+    """포트폴리오 자산곡선 (열 단위, 같은 인덱스끼리 하루)"""
+    start_date: date
+    as_of: date
+    dates: list[date]
+    equity: list[float]  # 평가금액
+    invested: list[float]  # 누적 투입금액
+    index: list[float]  # 시간가중 수익률 지수 (기준 100)
+    drawdown_pct: list[float]  # 수익률 지수 고점 대비 (%)
+    market_value: float
+    total_invested: float
+    profit_loss: float
+    time_weighted_return_pct: float
+    max_drawdown_pct: float
+    contributions: list[EquityContribution] = []
+    excluded: list[str] = []  # 수량이 없어 제외된 티커
+    missing: list[str] = []  # 과거 데이터를 찾을 수 없는 티커
+    recomputed_bars: int = 0  # 이번 조회에서 새로 계산한 봉 수
+
+
+class PortfolioEquityResponse(BaseModel):
+    """포트폴리오 자산곡선 API 응답"""
+    success: bool
+    data: Optional[PortfolioEquityCurve] = None
+    error: Optional[str] = None
+
+
+class SimulationRequest(BaseModel):
+    """포트폴리오 몬테카를로 시뮬레이션 요청"""
+    method: Literal["gbm", "bootstrap"] = "gbm"  # 상관 GBM / 과거 수익률 블록 부트스트랩
+    paths: int = Field(10_000, ge=1)  # 상한은 SIMULATION_MAX_PATHS
+    horizon_days: int = Field(252, ge=1, le=2520)  # 시뮬레이션 거래일 수
+    period: Literal["1y", "2y", "5y", "10y", "20y"] = "2y"  # 추정에 사용할 과거 기간
+    block_size: int = Field(5, ge=1, le=60)  # 부트스트랩 블록 길이 (거래일)
+    seed: Optional[int] = Field(None, ge=0)  # 같은 seed면 같은 결과
+    parallel: bool = False  # 묶음이 여러 개면 프로세스 풀 사용 (동시 묶음 수는 메모리 제한 안으로)
+
+
+class PortfolioSimulation(BaseModel):
+    """포트폴리오 몬테카를로 시뮬레이션 결과 (금액은 현재 평가금액 기준, 수량이 없으면 100 기준)"""
+    method: str
+    paths: int
+    horizon_days: int
+    observations: int  # 추정에 사용한 과거 일간 수익률 수
+    start_value: float
+    tickers: list[str]
+    weights_pct: list[float]
+    steps: list[int]  # 구간 시점 (경과 거래일)
+    bands: dict[str, list[float]]  # 백분위(p5/p25/p50/p75/p95) → 시점별 평가금액
+    final_percentiles: dict[str, float]  # 만기 평가금액 백분위
+    expected_value: float
+    expected_return_pct: float
+    probability_of_loss: float  # 만기 평가금액이 현재보다 낮을 확률 (0~1)
+    var_pct: float  # 만기 5% 분위 손실률 (%)
+    excluded: list[str] = []  # 이력이 짧아 제외된 티커
+    missing: list[str] = []  # 과거 데이터를 찾을 수 없는 티커
+    workers: int = 1
+    elapsed_ms: float
+
+
+class PortfolioSimulationResponse(BaseModel):
+    """포트폴리오 시뮬레이션 API 응답"""
+    success: bool
+    data: Optional[PortfolioSimulation] = None
+    error: Optional[str] = None
+
+
+class HoldingAnalysis(BaseModel):
+    """포트폴리오 일괄 분석의 종목별 섹션"""
+    ticker: str
+    opinion: str  # 매수, 보유, 비중축소
+    summary: str
+    action: Optional[str] = None  # 평단가/비중 기준 대응 전략
+
+
+class AllocationItem(BaseModel):
+    """종목별 평가금액/비중 (서버에서 계산)"""
+    ticker: str
+    current_price: Optional[float] = None
+    market_value: Optional[float] = None
+    weight: Optional[float] = None  # 평가금액 기준 비중 (%)
+    profit_percent: Optional[float] = None  # 평단가 대비 수익률 (%)
+
+
+class AllocationView(BaseModel):
+    """포트폴리오 전체 자산 배분 관점"""
+    total_value: float = 0.0
+    items: list[AllocationItem] = []
+    assessment: str = ""
+    concentration_risks: list[str] = []
+    suggestions: list[str] = []
+
+
+class PortfolioAnalysis(BaseModel):
+    """포트폴리오 일괄 AI 분석 결과"""
+    fingerprint: str  # 보유 종목 구성 지문 (캐시 키)
+    overview: str
+    holdings: list[HoldingAnalysis] = []
+    allocation: AllocationView
+    report: str  # 마크다운 보고서
+    skipped: list[str] = []  # 데이터 조회에 실패해 제외된 티커
+    generated_at: datetime
+    cached: bool = False
+
+
+class PortfolioAnalysisResponse(BaseModel):
+    """포트폴리오 일괄 분석 응답"""
+    success: bool
+    data: Optional[PortfolioAnalysis] = None
+    error: Optional[str] = None
@@ -0,0 +1,55 @@
+"""
+스크리너 Pydantic 스키마 (API 요청/응답)
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional
+
+
+class ScreenerCondition(BaseModel):
+    """
+    스크리너 조건 하나
+
+    예: {"field": "rsi14", "op": "<", "value": 30}
+        {"field": "sma50", "op": "crosses_above", "ref": "sma200", "within": 5}
+    """
+    field: str = Field(..., max_length=30)  # 비교할 필드 (예: rsi14, sma50, close, trailing_pe)
+    op: Literal["<", "<=", ">", ">=", "==", "!=", "crosses_above", "crosses_below"]
+    value: Optional[float] = None  # 비교 값 (ref와 둘 중 하나)
+    ref: Optional[str] = Field(None, max_length=30)  # 비교할 다른 필드 (value와 둘 중 하나)
+    within: int = Field(1, ge=1, le=60)  # 교차 조건: 최근 몇 개 봉 안의 교차까지 인정할지
+
+
+class ScreenerRequest(BaseModel):
+    """스크리너 요청"""
+    conditions: list[ScreenerCondition] = Field(..., min_length=1, max_length=20)
+    match: Literal["all", "any"] = "all"  # all: 모든 조건 충족, any: 하나 이상 충족
+    universe: Literal["all", "portfolio"] = "all"  # all: 기본 유니버스, portfolio: 내 보유 종목
+    tickers: Optional[list[str]] = Field(None, max_length=2000)  # 지정 시 universe 대신 사용
+    sort_by: Optional[str] = Field(None, max_length=30)  # 정렬 필드 (충족 조건 수 다음 기준)
+    descending: bool = True
+    limit: int = Field(50, ge=1, le=500)
+
+
+class ScreenerMatch(BaseModel):
+    """조건을 충족한 종목"""
+    ticker: str
+    matched: int  # 충족한 조건 수
+    values: Dict[str, Optional[float]] = {}  # 조건/정렬에 사용한 필드의 최신 값
+
+
+class ScreenerResult(BaseModel):
+    """스크리너 결과"""
+    as_of: Optional[str] = None  # 평가에 사용한 마지막 봉 날짜
+    universe_size: int
+    evaluated: int  # 저장된 이력이 있어 평가한 티커 수
+    missing: list[str] = []  # 저장된 이력이 없는 티커
+    total_matches: int = 0  # limit 적용 전 일치 종목 수
+    matches: list[ScreenerMatch] = []
+    elapsed_ms: float
+
+
+class ScreenerResponse(BaseModel):
+    """스크리너 API 응답"""
+    success: bool
+    data: Optional[ScreenerResult] = None
+    error: Optional[str] = None
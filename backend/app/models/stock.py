@@ -56,17 +56,26 @@ class SMAInfo(BaseModel):
     sma50: Optional[float] = None
     sma200: Optional[float] = None
 
+    class Config:
+        extra = "allow"  # 사용자 지정 기간 (예: sma10)
+
 
 class EMAInfo(BaseModel):
     """지수이동평균 (EMA)"""
     ema12: Optional[float] = None
     ema26: Optional[float] = None
 
+    class Config:
+        extra = "allow"  # 사용자 지정 기간 (예: ema50)
+
 
 class RSIInfo(BaseModel):
     """상대강도지수 (RSI)"""
     rsi14: Optional[float] = None
 
+    class Config:
+        extra = "allow"  # 사용자 지정 기간 (예: rsi7)
+
 
 class MACDInfo(BaseModel):
     """MACD 지표"""
@@ -82,6 +91,33 @@ class BollingerBandsInfo(BaseModel):
     lower: Optional[float] = None
 
 
+class ATRInfo(BaseModel):
+    """평균 실제 범위 (ATR)"""
+    atr14: Optional[float] = None
+
+    class Config:
+        extra = "allow"  # 사용자 지정 기간 (예: atr10)
+
+
+class StochasticInfo(BaseModel):
+    """스토캐스틱 오실레이터"""
+    k: Optional[float] = None  # %K
+    d: Optional[float] = None  # %D (%K의 이동평균)
+
+
+class DMIInfo(BaseModel):
+    """방향성 지수 (DMI/ADX)"""
+    plus_di: Optional[float] = None
+    minus_di: Optional[float] = None
+    adx: Optional[float] = None
+
+
+class VolumeIndicatorsInfo(BaseModel):
+    """거래량 지표"""
+    obv: Optional[float] = None  # 누적 거래량 (OBV)
+    vwap: Optional[float] = None  # 앵커드 VWAP (연초 기준)
+
+
 class TechnicalIndicators(BaseModel):
     """기술적 지표 통합"""
     sma: Optional[SMAInfo] = None
@@ -89,6 +125,10 @@ class TechnicalIndicators(BaseModel):
     rsi: Optional[RSIInfo] = None
     macd: Optional[MACDInfo] = None
     bollinger_bands: Optional[BollingerBandsInfo] = None
+    atr: Optional[ATRInfo] = None
+    stochastic: Optional[StochasticInfo] = None
+    dmi: Optional[DMIInfo] = None
+    volume: Optional[VolumeIndicatorsInfo] = None
 
 
 class NewsItem(BaseModel):
@@ -97,11 +137,56 @@ class NewsItem(BaseModel):
     link: str
     published_at: Optional[datetime] = None
     source: Optional[str] = None
+    sentiment_score: Optional[float] = None  # 사전 기반 사전 채점 (-1.0 ~ 1.0)
+    sentiment_label: Optional[str] = None  # positive, neutral, negative
+
+
+class ArticleSentiment(BaseModel):
+    """뉴스 기사별 감성 점수"""
+    title: str
+    link: str
+    published_at: Optional[datetime] = None
+    score: float  # -1.0(매우 부정) ~ 1.0(매우 긍정)
+    label: str  # positive, neutral, negative
+    scored_by: str = "lexicon"  # lexicon(오프라인 사전) 또는 gemini
+
+
+class TickerSentiment(BaseModel):
+    """티커별 뉴스 감성 집계 (기사별 점수 평균)"""
+    ticker: str
+    score: float  # -100 ~ 100
+    label: str  # positive, neutral, negative
+    article_count: int
+    positive_count: int = 0
+    neutral_count: int = 0
+    negative_count: int = 0
+    escalated_count: int = 0  # Gemini로 채점한 기사 수
+    articles: list[ArticleSentiment] = []
+
+
+class PriceLevel(BaseModel):
+    """지지선/저항선 가격대"""
+    price: float
+    reason: Optional[str] = None
+
+
+class StructuredReport(BaseModel):
+    """Gemini AI 구조화 분석 결과 (JSON 스키마 응답)"""
+    opinion: str  # 매수, 보유, 관찰
+    summary: str
+    valuation: Optional[str] = None
+    financial_health: Optional[str] = None
+    technical: Optional[str] = None
+    support_levels: list[PriceLevel] = []
+    resistance_levels: list[PriceLevel] = []
+    target_price: Optional[float] = None
+    risks: list[str] = []
 
 
 class AIAnalysis(BaseModel):
     """Gemini AI 종합 분석 결과"""
     report: str
+    structured: Optional[StructuredReport] = None  # 구조화 모드일 때만 포함
 
 
 class StockData(BaseModel):
@@ -154,6 +239,49 @@ class AnalysisResponse(BaseModel):
     error: Optional[str] = None
 
 
+class SentimentResponse(BaseModel):
+    """뉴스 감성 분석 API 응답 모델"""
+    success: bool
+    data: Optional[TickerSentiment] = None
+    error: Optional[str] = None
+
+
+class SentimentBatchRequest(BaseModel):
+    """여러 티커 뉴스 감성 일괄 분석 요청"""
+    tickers: list[str]
+
+
+class SentimentBatchResponse(BaseModel):
+    """여러 티커 뉴스 감성 일괄 분석 응답"""
+    success: bool
+    data: list[TickerSentiment] = []
+    error: Optional[str] = None
+
+
+class AnalysisJob(BaseModel):
+    """AI 분석 작업 상태"""
+    id: str
+    ticker: str
+    status: str  # pending, running, completed, failed
+    structured_mode: bool = False
+    report: Optional[str] = None
+    structured: Optional[StructuredReport] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class AnalysisJobResponse(BaseModel):
+    """AI 분석 작업 API 응답 모델"""
+    success: bool
+    data: Optional[AnalysisJob] = None
+    error: Optional[str] = None
+
+
 class ChartDataPoint(BaseModel):
     """차트의 단일 데이터 포인트"""
     date: str
@@ -162,6 +290,8 @@ class ChartDataPoint(BaseModel):
     sma20: Optional[float] = None
     sma50: Optional[float] = None
     sma200: Optional[float] = None
+    ema12: Optional[float] = None
+    ema26: Optional[float] = None
     rsi: Optional[float] = None
     macd: Optional[float] = None
     macd_signal: Optional[float] = None
@@ -169,6 +299,17 @@ class ChartDataPoint(BaseModel):
     bb_upper: Optional[float] = None
     bb_middle: Optional[float] = None
     bb_lower: Optional[float] = None
+    atr: Optional[float] = None
+    stoch_k: Optional[float] = None
+    stoch_d: Optional[float] = None
+    plus_di: Optional[float] = None
+    minus_di: Optional[float] = None
+    adx: Optional[float] = None
+    obv: Optional[float] = None
+    vwap: Optional[float] = None  # 앵커드 VWAP (연초 기준)
+
+    class Config:
+        extra = "allow"  # 사용자 지정 기간 (예: sma10, ema50)
 
 
 class ChartResponse(BaseModel):
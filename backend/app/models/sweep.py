@@ -0,0 +1,51 @@
+"""
+파라미터 스윕 Pydantic 스키마 (API 요청)
+
+응답은 NDJSON 스트림이므로 한 줄 단위 dict로 내보냅니다:
+{"type": "start" | "result" | "error" | "summary", ...}
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional, Union
+
+
+class BacktestSweepRequest(BaseModel):
+    """
+    백테스트 파라미터 스윕 요청
+
+    예: {"strategy": "rsi", "grid": {"period": [7, 14, 21], "lower": [20, 25, 30], "max_hold": [10, 20]},
+         "tickers": ["AAPL", "MSFT"], "period": "10y"}
+    """
+    strategy: Literal["rsi", "ma_cross", "macd", "bollinger"]
+    grid: Dict[str, List[Union[int, float, str]]]  # 파라미터별 후보 값 (max_hold 포함 가능)
+    universe: Literal["all", "portfolio"] = "all"
+    tickers: Optional[list[str]] = Field(None, max_length=2000)  # 지정 시 universe 대신 사용
+    period: Literal["1y", "2y", "5y", "10y", "20y", "max"] = "5y"
+    initial_capital: float = Field(10_000.0, gt=0)
+    fee_bps: float = Field(0.0, ge=0, le=500)
+    objective: Literal["sharpe", "cagr_pct", "total_return_pct", "max_drawdown_pct"] = "sharpe"
+    top: int = Field(10, ge=1, le=100)  # summary에 포함할 상위 결과 수
+
+
+class SweepCondition(BaseModel):
+    """
+    스윕용 스크리너 조건 (field / ref / value에 {이름} 자리 표시 사용 가능)
+
+    예: {"field": "rsi{period}", "op": "<", "value": "{threshold}"}
+    """
+    field: str = Field(..., max_length=40)
+    op: Literal["<", "<=", ">", ">=", "==", "!=", "crosses_above", "crosses_below"]
+    value: Optional[Union[float, str]] = None
+    ref: Optional[str] = Field(None, max_length=40)
+    within: int = Field(1, ge=1, le=60)
+
+
+class ScreenerSweepRequest(BaseModel):
+    """스크리너 파라미터 스윕 요청"""
+    conditions: list[SweepCondition] = Field(..., min_length=1, max_length=20)
+    grid: Dict[str, List[Union[int, float, str]]]
+    match: Literal["all", "any"] = "all"
+    universe: Literal["all", "portfolio"] = "all"
+    tickers: Optional[list[str]] = Field(None, max_length=2000)
+    sort_by: Optional[str] = Field(None, max_length=30)
+    descending: bool = True
+    limit: int = Field(20, ge=1, le=500)  # 조합별로 돌려줄 최대 티커 수
@@ -0,0 +1,280 @@
+"""
+AI 분석 작업 큐 서비스
+
+POST /stock/{ticker}/analysis 는 Gemini 호출이 끝날 때까지 HTTP 연결을 점유하고,
+서버가 재시작되면 진행 중이던 분석이 사라집니다. 이 서비스는 분석 요청을
+SQLite에 작업(job)으로 저장하고 백그라운드 워커가 처리합니다.
+
+- 제출 즉시 job id 반환, 결과는 폴링 또는 SSE로 조회
+- 서버 재시작 시 미완료 작업(pending/running)을 다시 처리 (ANALYSIS_JOB_MAX_ATTEMPTS번까지)
+"""
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.database.analysis_job_repository import AnalysisJobRepository
+from app.database.models import AnalysisJobDB, UserDB
+from app.database.repository import PortfolioRepository
+from app.database.user_repository import UserRepository
+from app.models.stock import StockData
+from app.services.portfolio_valuation import stored_weights
+from app.services.stock_service import stock_service
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_gemini_key(db: Session, user: UserDB) -> Optional[str]:
+    """
+    분석에 사용할 Gemini API 키 조회
+
+    사용자 키가 없으면 Admin만 환경변수 키로 대체합니다.
+
+    Returns:
+        API 키 또는 None (사용할 수 있는 키가 없는 경우)
+    """
+    gemini_key = UserRepository(db).get_gemini_key(user.id)
+    if not gemini_key and user.role == "admin":
+        gemini_key = settings.gemini_api_key or None
+    return gemini_key
+
+
+def require_gemini_key(db: Session, current_user: UserDB) -> str:
+    """분석에 사용할 Gemini API 키 조회 (라우트용, 없으면 Admin은 500 / 일반 유저는 400 HTTPException)"""
+    gemini_key = resolve_gemini_key(db, current_user)
+    if gemini_key:
+        logger.info(f"   🔑 API 키 확인 완료")
+        return gemini_key
+
+    if current_user.role == "admin":
+        logger.error(f"   ❌ 환경변수에 Gemini API 키가 설정되지 않음")
+        raise HTTPException(
+            status_code=500,
+            detail="서버에 Gemini API 키가 설정되지 않았습니다. 관리자에게 문의하세요."
+        )
+
+    # 일반 유저는 반드시 자신의 키를 등록해야 함
+    logger.error(f"   ❌ Gemini API 키 없음 (사용자: {current_user.username})")
+    raise HTTPException(
+        status_code=400,
+        detail="Gemini API 키가 등록되지 않았습니다. 설정에서 API 키를 등록해주세요."
+    )
+
+
+def get_holding_context(
+    db: Session, user_id: int, ticker: str
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """
+    포트폴리오 보유 정보 조회 (평단가, 수익률, 비중)
+
+    비중은 마지막 포트폴리오 평가(GET /portfolio/valuation)에서 저장한 현재가 기준입니다.
+
+    Returns:
+        (user_avg_price, user_profit_loss_ratio, user_weight)
+    """
+    holdings = PortfolioRepository.get_all(db, user_id)
+    portfolio_item = next((h for h in holdings if h.ticker == ticker.upper()), None)
+
+    user_avg_price = None
+    user_profit_loss_ratio = None
+    user_weight = None
+
+    if portfolio_item and portfolio_item.purchase_price:
+        user_avg_price = float(portfolio_item.purchase_price)
+        if portfolio_item.profit_percent:
+            user_profit_loss_ratio = float(portfolio_item.profit_percent)
+    if portfolio_item:
+        user_weight = stored_weights(holdings).get(portfolio_item.ticker)
+
+    return user_avg_price, user_profit_loss_ratio, user_weight
+
+
+class AnalysisJobManager:
+    """AI 분석 작업 큐 (SQLite 영속화 + asyncio 워커)"""
+
+    def __init__(self, num_workers: int = 2):
+        self.num_workers = num_workers
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """워커 시작 및 미완료 작업 복구"""
+        removed, requeued, abandoned, pending_ids = await asyncio.to_thread(self._recover)
+
+        for job_id in pending_ids:
+            self._queue.put_nowait(job_id)
+
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"analysis-job-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        logger.info(
+            f"🧵 분석 작업 워커 {self.num_workers}개 시작 "
+            f"(복구된 작업: {len(pending_ids)}개, 재시작 중단 작업: {requeued}개, "
+            f"시도 횟수 초과 실패: {abandoned}개, 정리된 작업: {removed}개)"
+        )
+
+    @staticmethod
+    def _recover() -> Tuple[int, int, int, List[str]]:
+        """
+        오래된 작업 정리 및 재시작으로 중단된 작업 복구
+
+        실행 중에 프로세스가 죽는 작업이 무한히 재시도되지 않도록
+        ANALYSIS_JOB_MAX_ATTEMPTS번 시작된 작업은 실패 처리합니다.
+
+        Returns:
+            (정리된 작업 수, 되돌린 작업 수, 실패 처리한 작업 수, 대기 중인 작업 ID 목록)
+        """
+        db = SessionLocal()
+        try:
+            repo = AnalysisJobRepository(db)
+            removed = repo.delete_finished_before(settings.analysis_job_retention_days)
+            abandoned = repo.fail_exhausted(
+                settings.analysis_job_max_attempts,
+                "분석 중 서버가 반복해서 중단되어 작업을 실패 처리했습니다."
+            )
+            requeued = repo.requeue_running()
+            return removed, requeued, abandoned, repo.get_pending_ids()
+        finally:
+            db.close()
+
+    async def stop(self) -> None:
+        """
+        워커 종료
+
+        실행 중이던 작업은 running 상태로 남고 다음 시작 시 다시 처리됩니다.
+        """
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, db: Session, user_id: int, stock_data: StockData, structured: bool = False) -> AnalysisJobDB:
+        """
+        분석 작업 제출
+
+        Args:
+            db: 데이터베이스 세션
+            user_id: 요청 사용자 ID
+            stock_data: 분석할 주식 데이터
+            structured: 구조화(JSON) 응답 모드 사용 여부
+
+        Returns:
+            생성된 작업 (pending 상태)
+        """
+        job = await asyncio.to_thread(
+            AnalysisJobRepository(db).create,
+            user_id, stock_data.ticker, stock_data.model_dump_json(), structured_mode=structured
+        )
+        self._queue.put_nowait(job.id)
+        logger.info(f"📝 분석 작업 등록: {job.id} ({job.ticker}, 대기열: {self._queue.qsize()})")
+        return job
+
+    async def _worker(self, index: int) -> None:
+        """대기열에서 작업을 꺼내 처리"""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Job] 워커 {index} 처리 중 예외: {type(e).__name__}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str) -> None:
+        """단일 작업 실행 및 결과 저장 (SQLite 접근은 이벤트 루프를 막지 않도록 스레드에서 실행)"""
+        prepared = await asyncio.to_thread(self._prepare, job_id)
+        if prepared is None:
+            return
+        user_id, stock_data, structured, gemini_key, holding = prepared
+        user_avg_price, user_profit_loss_ratio, user_weight = holding
+
+        try:
+            analysis = await stock_service.get_comprehensive_analysis(
+                stock_data,
+                user_api_key=gemini_key,
+                user_avg_price=user_avg_price,
+                user_profit_loss_ratio=user_profit_loss_ratio,
+                user_weight=user_weight,
+                user_id=user_id,
+                structured=structured
+            )
+        except asyncio.CancelledError:
+            raise  # 종료 시 running 상태로 남겨 재시작 후 다시 처리
+        except Exception as e:
+            await asyncio.to_thread(self._finish, job_id, error=str(e))
+            logger.error(f"[Job] 분석 실패: {job_id}: {str(e)}")
+            return
+
+        await asyncio.to_thread(
+            self._finish,
+            job_id,
+            report=analysis.report,
+            structured_json=analysis.structured.model_dump_json() if analysis.structured else None
+        )
+        logger.info(f"[Job] 분석 완료: {job_id}")
+
+    @staticmethod
+    def _prepare(
+        job_id: str,
+    ) -> Optional[Tuple[int, StockData, bool, str, Tuple[Optional[float], Optional[float], Optional[float]]]]:
+        """
+        작업 시작 처리 및 분석 입력 준비
+
+        Returns:
+            (user_id, stock_data, structured, gemini_key, 보유 정보) -
+            이미 처리된 작업이거나 준비에 실패(실패 처리됨)하면 None
+        """
+        db = SessionLocal()
+        try:
+            repo = AnalysisJobRepository(db)
+            job = repo.mark_running(job_id)
+            if job is None:
+                return None  # 이미 다른 워커가 처리했거나 삭제된 작업
+
+            logger.info(f"[Job] 분석 시작: {job_id} ({job.ticker}, 시도 {job.attempts}회)")
+            try:
+                user = UserRepository(db).get_by_id(job.user_id)
+                if user is None:
+                    raise ValueError("사용자를 찾을 수 없습니다.")
+
+                gemini_key = resolve_gemini_key(db, user)
+                if not gemini_key:
+                    raise ValueError("Gemini API 키가 등록되지 않았습니다. 설정에서 API 키를 등록해주세요.")
+
+                stock_data = StockData.model_validate_json(job.stock_data)
+                holding = get_holding_context(db, user.id, job.ticker)
+                return user.id, stock_data, bool(job.structured_mode), gemini_key, holding
+            except Exception as e:
+                repo.mark_failed(job_id, str(e))
+                logger.error(f"[Job] 분석 준비 실패: {job_id}: {str(e)}")
+                return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _finish(
+        job_id: str,
+        report: Optional[str] = None,
+        structured_json: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """작업 결과 저장 (error가 있으면 실패 처리)"""
+        db = SessionLocal()
+        try:
+            repo = AnalysisJobRepository(db)
+            if error is not None:
+                repo.mark_failed(job_id, error)
+            else:
+                repo.mark_completed(job_id, report, structured_json)
+        finally:
+            db.close()
+
+
+# 전역 작업 관리자 인스턴스
+analysis_job_manager = AnalysisJobManager(num_workers=settings.analysis_job_workers)
@@ -0,0 +1,102 @@
+"""
+Gemini 구조화 분석 보고서 (JSON 스키마 응답)
+
+자유 형식 마크다운 대신 스키마로 제한된 JSON을 요청하면 출력 토큰이 줄고,
+응답을 정규식으로 파싱할 필요 없이 StructuredReport로 바로 검증할 수 있습니다.
+기존 클라이언트 호환을 위해 마크다운 보고서도 구조화 결과에서 렌더링합니다.
+"""
+from app.models.stock import StructuredReport
+
+# 투자 의견 선택지
+OPINIONS = ["매수", "보유", "관찰"]
+
+_PRICE_LEVEL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "price": {"type": "number"},
+        "reason": {"type": "string"},
+    },
+    "required": ["price"],
+}
+
+# Gemini response_schema (OpenAPI 부분집합: type/properties/required/items/enum/nullable)
+STRUCTURED_REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "opinion": {"type": "string", "enum": OPINIONS},
+        "summary": {"type": "string"},
+        "valuation": {"type": "string"},
+        "financial_health": {"type": "string"},
+        "technical": {"type": "string"},
+        "support_levels": {"type": "array", "items": _PRICE_LEVEL_SCHEMA},
+        "resistance_levels": {"type": "array", "items": _PRICE_LEVEL_SCHEMA},
+        "target_price": {"type": "number", "nullable": True},
+        "risks": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["opinion", "summary", "valuation", "financial_health", "technical",
+                 "support_levels", "resistance_levels", "risks"],
+}
+
+# 구조화 모드 생성 설정
+STRUCTURED_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": STRUCTURED_REPORT_SCHEMA,
+}
+
+
+def parse_structured_report(text: str) -> StructuredReport:
+    """
+    Gemini JSON 응답을 StructuredReport로 변환
+
+    Raises:
+        ValueError: 응답이 스키마에 맞지 않는 경우
+    """
+    try:
+        return StructuredReport.model_validate_json(text)
+    except Exception as e:
+        raise ValueError(f"Gemini 구조화 응답 파싱 실패: {str(e)}")
+
+
+def _format_levels(levels) -> str:
+    return "\n".join(
+        f"- **{level.price:,.2f}**" + (f": {level.reason}" if level.reason else "")
+        for level in levels
+    ) or "- N/A"
+
+
+def render_markdown(report: StructuredReport) -> str:
+    """구조화 결과를 기존 형식의 마크다운 보고서로 렌더링"""
+    sections = [
+        f"## 📌 종합 투자의견: {report.opinion}",
+        report.summary,
+        "## 1. 내재 가치 및 밸류에이션",
+        report.valuation or "N/A",
+        "## 2. 재무 건전성 및 수익성",
+        report.financial_health or "N/A",
+        "## 3. 기술적 차트 분석",
+        report.technical or "N/A",
+        "**지지선**",
+        _format_levels(report.support_levels),
+        "**저항선**",
+        _format_levels(report.resistance_levels),
+    ]
+    if report.target_price is not None:
+        sections.append(f"**목표가**: {report.target_price:,.2f}")
+    sections += [
+        "## 4. 핵심 리스크",
+        "\n".join(f"- {risk}" for risk in report.risks) or "- N/A",
+    ]
+    return "\n\n".join(sections)
+
+
+def render_compact(report: StructuredReport) -> str:
+    """개인 맞춤 프롬프트 입력용 요약 (마크다운 전문보다 짧음)"""
+    supports = ", ".join(f"{level.price:g}" for level in report.support_levels) or "N/A"
+    resistances = ", ".join(f"{level.price:g}" for level in report.resistance_levels) or "N/A"
+    target = f"{report.target_price:g}" if report.target_price is not None else "N/A"
+    return (
+        f"- 투자의견: {report.opinion}\n"
+        f"- 요약: {report.summary}\n"
+        f"- 지지선: {supports} / 저항선: {resistances} / 목표가: {target}\n"
+        f"- 리스크: {'; '.join(report.risks) or 'N/A'}"
+    )
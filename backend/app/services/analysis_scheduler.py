@@ -0,0 +1,249 @@
+"""
+Gemini 분석 작업 스케줄러
+
+Gemini 호출은 수십 초가 걸릴 수 있어 기본 executor(asyncio.to_thread)를 그대로
+사용하면 시세/차트 조회 등 다른 요청까지 지연됩니다. 이 스케줄러는 전용
+스레드 풀에서 분석 작업을 실행하며 다음을 보장합니다.
+
+- 전역 동시 실행 수 제한 및 사용자별 동시 실행 수 제한
+- 사용자 간 라운드로빈 공정성 (한 사용자가 대기열을 독점하지 못함)
+- 대기 + 실행 전체에 대한 타임아웃
+- 클라이언트 연결 종료 시 작업 취소
+- 대기 시간 및 실행 중 작업 수 통계
+
+스케줄러 상태는 이벤트 루프 스레드에서만 변경되므로 별도 lock이 필요 없습니다.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisTimeoutError(ValueError):
+    """분석 작업이 제한 시간을 초과한 경우"""
+
+
+class AnalysisCancelledError(ValueError):
+    """클라이언트 연결 종료 등으로 분석 작업이 취소된 경우"""
+
+
+@dataclass(eq=False)
+class _Job:
+    """대기열에 들어간 단일 작업"""
+    user_key: Hashable
+    func: Callable[[], Any]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancelled: bool = False
+
+
+class AnalysisScheduler:
+    """전역/사용자별 동시성 제한과 라운드로빈 공정성을 갖춘 작업 스케줄러"""
+
+    # 연결 종료 확인 주기 (초)
+    DISCONNECT_POLL_INTERVAL = 1.0
+
+    def __init__(self, max_concurrency: int = 4, per_user_limit: int = 1, default_timeout: float = 120.0):
+        """
+        Args:
+            max_concurrency: 전역 최대 동시 실행 수 (전용 스레드 풀 크기)
+            per_user_limit: 사용자별 최대 동시 실행 수
+            default_timeout: 기본 타임아웃 (초, 대기 시간 포함)
+        """
+        self.max_concurrency = max_concurrency
+        self.per_user_limit = per_user_limit
+        self.default_timeout = default_timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="gemini")
+        self._queues: Dict[Hashable, Deque[_Job]] = {}
+        self._rotation: Deque[Hashable] = deque()  # 대기 작업이 있는 사용자 순서
+        self._in_flight: Dict[Hashable, int] = {}
+        self._in_flight_total = 0
+
+        # 통계
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._cancelled = 0
+        self._wait_total = 0.0
+        self._wait_count = 0
+        self._wait_max = 0.0
+        self._recent_waits: Deque[float] = deque(maxlen=100)
+
+    async def run(
+        self,
+        user_key: Hashable,
+        func: Callable[[], Any],
+        timeout: Optional[float] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Any:
+        """
+        작업을 대기열에 넣고 완료될 때까지 대기
+
+        Args:
+            user_key: 공정성/사용자별 제한 기준 키 (예: user_id)
+            func: 전용 스레드에서 실행할 블로킹 함수
+            timeout: 타임아웃 (초, 기본값: default_timeout, 0 이하면 무제한)
+            is_disconnected: 클라이언트 연결 종료 여부를 반환하는 코루틴 함수
+                (예: FastAPI Request.is_disconnected)
+
+        Returns:
+            func의 반환값
+
+        Raises:
+            AnalysisTimeoutError: 제한 시간 초과
+            AnalysisCancelledError: 클라이언트 연결 종료로 취소
+        """
+        loop = asyncio.get_running_loop()
+        job = _Job(user_key=user_key, func=func, future=loop.create_future())
+        self._enqueue(job)
+
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = loop.time() + timeout if timeout and timeout > 0 else None
+
+        try:
+            while True:
+                wait_for = None if is_disconnected is None else self.DISCONNECT_POLL_INTERVAL
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        self._timed_out += 1
+                        raise AnalysisTimeoutError(f"Gemini 분석 시간 초과 ({timeout:g}초)")
+                    wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+                done, _ = await asyncio.wait({job.future}, timeout=wait_for)
+                if done:
+                    return job.future.result()
+
+                if is_disconnected is not None and await is_disconnected():
+                    self._cancelled += 1
+                    raise AnalysisCancelledError("클라이언트 연결이 종료되어 분석을 취소했습니다.")
+        except BaseException:
+            # 타임아웃/취소/요청 태스크 취소 시 대기 중인 작업은 제거,
+            # 이미 실행 중인 작업은 결과만 버림 (스레드는 중단할 수 없음)
+            self._abandon(job)
+            raise
+
+    def _enqueue(self, job: _Job) -> None:
+        """작업을 사용자 대기열에 추가하고 디스패치"""
+        queue = self._queues.get(job.user_key)
+        if queue is None:
+            queue = self._queues[job.user_key] = deque()
+            self._rotation.append(job.user_key)
+        queue.append(job)
+        self._dispatch()
+
+    def _abandon(self, job: _Job) -> None:
+        """대기 중인 작업 제거 (실행 중이면 결과를 받지 않도록 표시만 함)"""
+        job.cancelled = True
+        if not job.future.done():
+            job.future.cancel()
+        queue = self._queues.get(job.user_key)
+        if queue is not None and job in queue:
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.user_key]
+                self._rotation.remove(job.user_key)
+
+    def _dispatch(self) -> None:
+        """전역/사용자별 여유가 있는 동안 라운드로빈으로 작업 시작"""
+        while self._in_flight_total < self.max_concurrency:
+            job = self._next_job()
+            if job is None:
+                return
+            self._start(job)
+
+    def _next_job(self) -> Optional[_Job]:
+        """회전 순서상 실행 가능한 다음 사용자의 작업 선택"""
+        for _ in range(len(self._rotation)):
+            user_key = self._rotation[0]
+            self._rotation.rotate(-1)  # 선택 여부와 관계없이 다음 사용자에게 순서를 넘김
+            if self._in_flight.get(user_key, 0) >= self.per_user_limit:
+                continue
+
+            queue = self._queues[user_key]
+            job = queue.popleft()
+            if not queue:
+                del self._queues[user_key]
+                self._rotation.remove(user_key)
+            return job
+        return None
+
+    def _start(self, job: _Job) -> None:
+        """전용 스레드 풀에서 작업 실행"""
+        waited = time.monotonic() - job.enqueued_at
+        self._wait_total += waited
+        self._wait_count += 1
+        self._wait_max = max(self._wait_max, waited)
+        self._recent_waits.append(waited)
+
+        self._in_flight[job.user_key] = self._in_flight.get(job.user_key, 0) + 1
+        self._in_flight_total += 1
+
+        loop = job.future.get_loop()
+        task = loop.run_in_executor(self._executor, job.func)
+        task.add_done_callback(lambda done: self._finish(job, done))
+
+    def _finish(self, job: _Job, done: asyncio.Future) -> None:
+        """작업 완료 처리 후 다음 작업 디스패치"""
+        self._in_flight_total -= 1
+        remaining = self._in_flight[job.user_key] - 1
+        if remaining:
+            self._in_flight[job.user_key] = remaining
+        else:
+            del self._in_flight[job.user_key]
+
+        error = asyncio.CancelledError() if done.cancelled() else done.exception()
+        if error is None:
+            self._completed += 1
+        else:
+            self._failed += 1
+
+        if not job.future.done():
+            if error is None:
+                job.future.set_result(done.result())
+            else:
+                job.future.set_exception(error)
+        elif error is not None:
+            logger.debug(f"[Scheduler] 버려진 작업 실패: {type(error).__name__}: {error}")
+
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """대기/실행 통계"""
+        recent = sorted(self._recent_waits)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_user_limit": self.per_user_limit,
+            "default_timeout_seconds": self.default_timeout,
+            "in_flight": self._in_flight_total,
+            "in_flight_users": len(self._in_flight),
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "queued_users": len(self._queues),
+            "completed": self._completed,
+            "failed": self._failed,
+            "timed_out": self._timed_out,
+            "cancelled": self._cancelled,
+            "queue_wait_avg_seconds": round(self._wait_total / self._wait_count, 3) if self._wait_count else 0.0,
+            "queue_wait_max_seconds": round(self._wait_max, 3),
+            "queue_wait_p95_seconds": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3) if recent else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """전용 스레드 풀 종료 (실행 중인 작업은 완료될 때까지 기다리지 않음)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 전역 분석 스케줄러 인스턴스
+analysis_scheduler = AnalysisScheduler(
+    max_concurrency=settings.gemini_max_concurrency,
+    per_user_limit=settings.gemini_per_user_concurrency,
+    default_timeout=settings.gemini_timeout_seconds,
+)
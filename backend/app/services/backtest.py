@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+backtest.py
+벡터화 전략 백테스트
+
+technical_indicators의 지표 함수로 진입/청산 신호를 만들고, 보유 여부를 봉 단위
+배열로 바꿔 반복문 없이 수익률·자산곡선·거래 목록을 계산합니다 (롱 온리, 전액 투자).
+
+- 신호는 해당 봉 종가로 판단하고 다음 봉부터 보유합니다 (종가 체결, 미래 참조 없음)
+- 진입/청산 신호가 같은 봉에 함께 나오면 청산이 우선합니다
+- 수수료는 포지션이 바뀔 때마다 거래 금액 × fee_bps / 10000 을 차감합니다
+- max_hold를 지정하면 마지막 진입 신호 후 max_hold봉이 지나면 청산합니다
+
+전략:
+- rsi: RSI가 lower 미만이면 진입, upper 초과면 청산
+- ma_cross: 단기 이동평균(fast)이 장기(slow) 위에 있는 동안 보유 (kind: sma / ema)
+- macd: MACD선이 시그널선 위에 있는 동안 보유
+- bollinger: 종가가 하단 밴드 아래면 진입, 중간 밴드 이상으로 돌아오면 청산 (평균 회귀)
+"""
+import logging
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.services.market_store import market_store
+from app.services.technical_indicators import (
+    calculate_bollinger_bands, calculate_ema, calculate_macd, calculate_rsi, calculate_sma
+)
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+# 조회 기간 → 최근 봉 수 (max는 저장된 전체)
+PERIOD_BARS = {"1y": 252, "2y": 504, "5y": 1260, "10y": 2520, "20y": 5040, "max": None}
+# 저장된 봉이 기간 예상치의 이 비율보다 적으면 업스트림에서 다시 받음
+MIN_COVERAGE = 0.95
+
+Signals = Tuple[np.ndarray, np.ndarray]  # (진입, 청산) bool 배열
+
+
+def _rsi_signals(prices: pd.Series, params: dict) -> Signals:
+    rsi = calculate_rsi(prices, int(params['period'])).to_numpy()
+    return rsi < params['lower'], rsi > params['upper']
+
+
+def _ma_cross_signals(prices: pd.Series, params: dict) -> Signals:
+    average = calculate_ema if params['kind'] == 'ema' else calculate_sma
+    fast = average(prices, int(params['fast'])).to_numpy()
+    slow = average(prices, int(params['slow'])).to_numpy()
+    return fast > slow, fast <= slow
+
+
+def _macd_signals(prices: pd.Series, params: dict) -> Signals:
+    macd = calculate_macd(prices, int(params['fast']), int(params['slow']), int(params['signal']))
+    line, signal = macd['macd'].to_numpy(), macd['signal'].to_numpy()
+    return line > signal, line <= signal
+
+
+def _bollinger_signals(prices: pd.Series, params: dict) -> Signals:
+    bands = calculate_bollinger_bands(prices, int(params['period']), params['std'])
+    close = prices.to_numpy()
+    return close < bands['lower'].to_numpy(), close >= bands['middle'].to_numpy()
+
+
+def _validate_rsi(params: dict) -> None:
+    if not 0 <= params['lower'] < params['upper'] <= 100:
+        raise ValueError("RSI 전략은 0 <= lower < upper <= 100 이어야 합니다.")
+
+
+def _validate_fast_slow(params: dict) -> None:
+    if params['fast'] >= params['slow']:
+        raise ValueError("fast 기간은 slow 기간보다 짧아야 합니다.")
+    if params.get('kind', 'sma') not in ('sma', 'ema'):
+        raise ValueError("kind는 sma 또는 ema 여야 합니다.")
+
+
+def _validate_bollinger(params: dict) -> None:
+    if not 0 < params['std'] <= 5:
+        raise ValueError("볼린저밴드 표준편차 배수는 0 ~ 5 사이여야 합니다.")
+
+
+# 전략 이름 → (기본 파라미터, 신호 함수, 추가 검증)
+STRATEGIES: Dict[str, Tuple[dict, Callable[[pd.Series, dict], Signals], Optional[Callable[[dict], None]]]] = {
+    "rsi": ({"period": 14, "lower": 30, "upper": 70}, _rsi_signals, _validate_rsi),
+    "ma_cross": ({"fast": 50, "slow": 200, "kind": "sma"}, _ma_cross_signals, _validate_fast_slow),
+    "macd": ({"fast": 12, "slow": 26, "signal": 9}, _macd_signals, _validate_fast_slow),
+    "bollinger": ({"period": 20, "std": 2.0}, _bollinger_signals, _validate_bollinger),
+}
+# 기간 파라미터 (정수, 2 ~ 400)
+_PERIOD_PARAMS = ("period", "fast", "slow", "signal")
+
+
+def resolve_params(strategy: str, params: Optional[dict] = None) -> dict:
+    """
+    전략 기본 파라미터에 사용자 파라미터를 덮어써 검증
+
+    Raises:
+        ValueError: 알 수 없는 전략/파라미터이거나 범위를 벗어난 경우
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"지원하지 않는 전략입니다: {strategy} (사용 가능: {', '.join(STRATEGIES)})")
+    defaults, _, validate = STRATEGIES[strategy]
+    params = params or {}
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"'{strategy}' 전략에 없는 파라미터입니다: {', '.join(sorted(unknown))}")
+
+    resolved = dict(defaults)
+    for name, value in params.items():
+        if name == "kind":
+            resolved[name] = str(value).lower()
+            continue
+        try:
+            resolved[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{name}' 파라미터는 숫자여야 합니다: {value}")
+        if name in _PERIOD_PARAMS:
+            if resolved[name] != int(resolved[name]) or not 2 <= resolved[name] <= 400:
+                raise ValueError(f"'{name}' 기간은 2 ~ 400 사이 정수여야 합니다: {value}")
+            resolved[name] = int(resolved[name])
+    if validate:
+        validate(resolved)
+    return resolved
+
+
+def positions_from_signals(entry: np.ndarray, exit_signal: np.ndarray, max_hold: Optional[int] = None) -> np.ndarray:
+    """
+    진입/청산 신호를 봉별 목표 포지션(0/1)으로 변환
+
+    마지막 신호를 앞으로 채우는 방식으로 상태 기계를 벡터화합니다 (청산 우선).
+    """
+    entry = np.asarray(entry, dtype=bool)
+    exit_signal = np.asarray(exit_signal, dtype=bool)
+    index = np.arange(len(entry))
+    state = np.where(exit_signal, 0.0, np.where(entry, 1.0, np.nan))
+    last_signal = np.maximum.accumulate(np.where(np.isnan(state), -1, index))
+    target = np.where(last_signal >= 0, state[np.maximum(last_signal, 0)], 0.0)
+
+    if max_hold:
+        last_entry = np.maximum.accumulate(np.where(entry & ~exit_signal, index, -1))
+        target = np.where((last_entry >= 0) & (index - last_entry >= max_hold), 0.0, target)
+    return target
+
+
+def simulate(
+    closes: np.ndarray,
+    dates: np.ndarray,
+    target: np.ndarray,
+    initial_capital: float = 10_000.0,
+    fee_bps: float = 0.0,
+    include_curve: bool = True,
+) -> dict:
+    """
+    목표 포지션으로 자산곡선, 성과 지표, 거래 목록 계산
+
+    Args:
+        closes: (T,) 종가
+        dates: (T,) datetime64[D] 날짜
+        target: (T,) 봉 종가 기준 목표 포지션 (다음 봉부터 보유)
+        initial_capital: 초기 자본
+        fee_bps: 편도 수수료 (bp)
+        include_curve: 자산곡선 포함 여부 (제외하면 None)
+
+    Returns:
+        {'metrics', 'equity_curve', 'trades'} - equity_curve는 날짜/자산/매수 후 보유 열 목록
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    fee = fee_bps / 10_000.0
+    returns = np.zeros(len(closes))
+    returns[1:] = closes[1:] / closes[:-1] - 1.0
+
+    held = np.zeros(len(closes))
+    held[1:] = target[:-1]
+    turnover = np.abs(np.diff(held, prepend=0.0))
+    strategy_returns = held * returns - turnover * fee
+
+    equity = initial_capital * np.cumprod(1.0 + strategy_returns)
+    benchmark = initial_capital * closes / closes[0]
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    # 거래: held가 0→1로 바뀐 봉의 직전 종가에 매수, 1→0으로 바뀐 봉의 직전 종가에 매도
+    change = np.diff(held, prepend=0.0)
+    entries = np.flatnonzero(change > 0)
+    exits = np.flatnonzero(change < 0)
+    open_trade = len(exits) < len(entries)
+    exit_rows = np.append(exits, len(closes)) if open_trade else exits
+    buy = closes[entries - 1]
+    sell = closes[exit_rows - 1]  # 보유 중인 거래는 마지막 종가로 평가
+    trade_returns = sell / buy * (1.0 - fee) ** np.where(np.arange(len(entries)) < len(exits), 2, 1) - 1.0
+
+    days = dates.astype(object)  # datetime.date (문자열 변환보다 훨씬 빠름)
+    trades = [
+        {
+            'entry_date': days[entries[i] - 1],
+            'entry_price': float(buy[i]),
+            'exit_date': days[exit_rows[i] - 1] if i < len(exits) else None,
+            'exit_price': float(sell[i]) if i < len(exits) else None,
+            'return_pct': float(trade_returns[i] * 100.0),
+            'bars_held': int(exit_rows[i] - entries[i]),
+        }
+        for i in range(len(entries))
+    ]
+
+    years = max((dates[-1] - dates[0]).astype(np.int64) / 365.25, 1e-9)
+    volatility = strategy_returns[1:].std(ddof=1) if len(closes) > 2 else 0.0
+
+    def cagr(final: float) -> float:
+        return (final / initial_capital) ** (1.0 / years) - 1.0 if final > 0 else -1.0
+
+    metrics = {
+        'start_date': days[0],
+        'end_date': days[-1],
+        'bars': int(len(closes)),
+        'final_equity': float(equity[-1]),
+        'total_return_pct': float((equity[-1] / initial_capital - 1.0) * 100.0),
+        'cagr_pct': float(cagr(equity[-1]) * 100.0),
+        'max_drawdown_pct': float(drawdown.min() * 100.0),
+        'sharpe': float(strategy_returns[1:].mean() / volatility * np.sqrt(TRADING_DAYS)) if volatility > 0 else None,
+        'volatility_pct': float(volatility * np.sqrt(TRADING_DAYS) * 100.0),
+        'exposure_pct': float(held.mean() * 100.0),
+        'trades': len(trades),
+        'win_rate_pct': float((trade_returns > 0).mean() * 100.0) if len(trades) else None,
+        'benchmark_return_pct': float((closes[-1] / closes[0] - 1.0) * 100.0),
+        'benchmark_cagr_pct': float(cagr(benchmark[-1]) * 100.0),
+    }
+    equity_curve = {
+        'dates': days.tolist(), 'equity': equity.tolist(), 'benchmark': benchmark.tolist(),
+    } if include_curve else None
+    return {'metrics': metrics, 'equity_curve': equity_curve, 'trades': trades}
+
+
+def run_backtest(
+    closes: np.ndarray,
+    dates: np.ndarray,
+    strategy: str,
+    params: Optional[dict] = None,
+    initial_capital: float = 10_000.0,
+    fee_bps: float = 0.0,
+    max_hold: Optional[int] = None,
+    include_curve: bool = True,
+) -> dict:
+    """
+    종가 배열로 전략 백테스트
+
+    Raises:
+        ValueError: 전략/파라미터가 잘못되었거나 데이터가 부족한 경우
+    """
+    resolved = resolve_params(strategy, params)
+    valid = ~np.isnan(closes)
+    closes, dates = np.asarray(closes, dtype=np.float64)[valid], np.asarray(dates, dtype='datetime64[D]')[valid]
+    if len(closes) < 2:
+        raise ValueError("백테스트에 필요한 가격 데이터가 부족합니다.")
+
+    entry, exit_signal = STRATEGIES[strategy][1](pd.Series(closes), resolved)
+    target = positions_from_signals(entry, exit_signal, max_hold)
+    result = simulate(closes, dates, target, initial_capital, fee_bps, include_curve)
+    result.update(strategy=strategy, params=resolved)
+    return result
+
+
+class BacktestService:
+    """저장된 일봉 기반 백테스트 (부족하면 업스트림에서 한 번 받아 저장)"""
+
+    def __init__(self):
+        # (티커, 기간) → 마지막으로 업스트림에서 받은 날짜 (하루 한 번만 다시 받음)
+        self._refreshed: Dict[Tuple[str, str], date] = {}
+
+    def load_closes(self, ticker: str, period: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        기간 종가/날짜 배열 (저장된 이력이 부족하거나 오래되었으면 업스트림 조회 후 저장)
+
+        Raises:
+            ValueError: 알 수 없는 기간이거나 데이터를 찾을 수 없는 경우
+        """
+        if period not in PERIOD_BARS:
+            raise ValueError(f"지원하지 않는 기간입니다: {period} (사용 가능: {', '.join(PERIOD_BARS)})")
+        ticker = ticker.upper()
+        bars = PERIOD_BARS[period]
+        dates, closes = self._stored(ticker, bars)
+
+        today = date.today()
+        stale = not len(dates) or (today - dates[-1].astype(object)).days > 4
+        short = bars is None or len(dates) < bars * MIN_COVERAGE
+        if (stale or short) and self._refreshed.get((ticker, period)) != today:
+            from app.services.stock_service import stock_service
+            stock_service.refresh_history(ticker, period)
+            self._refreshed[(ticker, period)] = today
+            dates, closes = self._stored(ticker, bars)
+
+        if not len(dates):
+            raise ValueError(f"'{ticker}'에 대한 과거 데이터를 찾을 수 없습니다.")
+        return closes, dates
+
+    @staticmethod
+    def _stored(ticker: str, bars: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        _, dates, arrays = market_store.load_panel([ticker], bars)
+        closes = arrays['close'][:, 0]
+        valid = ~np.isnan(closes)
+        return dates[valid], closes[valid]
+
+    def run(
+        self,
+        ticker: str,
+        strategy: str,
+        params: Optional[dict] = None,
+        period: str = "5y",
+        initial_capital: float = 10_000.0,
+        fee_bps: float = 0.0,
+        max_hold: Optional[int] = None,
+        include_curve: bool = True,
+    ) -> dict:
+        """티커 백테스트 (BacktestResult 형식 dict)"""
+        resolve_params(strategy, params)  # 데이터 조회 전에 파라미터 오류 확인
+        closes, dates = self.load_closes(ticker, period)
+        result = run_backtest(closes, dates, strategy, params, initial_capital, fee_bps, max_hold, include_curve)
+        result.update(ticker=ticker.upper(), period=period)
+        return result
+
+
+# 전역 백테스트 서비스 인스턴스
+backtest_service = BacktestService()
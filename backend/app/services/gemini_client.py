@@ -0,0 +1,240 @@
+"""
+Gemini 클라이언트 풀 (API 키별 재사용) 및 공통 호출 경로
+
+genai.configure()는 프로세스 전역 상태를 바꾸므로 여러 사용자의 요청이 동시에
+들어오면 다른 사용자의 키로 호출이 나갈 수 있습니다. 이 모듈은 API 키마다
+독립된 GenerativeServiceClient를 만들어 재사용하고, 오래 사용되지 않은
+클라이언트는 정리합니다.
+
+get_model()이 돌려준 모델이 살아 있는 동안은 해당 클라이언트를 사용 중(lease)으로
+보고 정리 대상에서 제외합니다. 타임아웃/취소 후에도 executor 스레드가 아직 호출 중일
+수 있으므로, 모델 객체가 해제될 때 lease를 반납합니다.
+"""
+import asyncio
+import logging
+import threading
+import time
+import traceback
+import weakref
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+
+from app.config import settings
+from app.services.analysis_scheduler import analysis_scheduler
+from app.services.gemini_usage import record_gemini_usage, token_counts, outcome_for
+from app.services.prompt_builder import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PoolEntry:
+    """API 키 하나에 대한 클라이언트, 마지막 사용 시각, 사용 중인 모델 수"""
+    client: glm.GenerativeServiceClient
+    last_used: float = field(default_factory=time.monotonic)
+    leases: int = 0
+    evicted: bool = False  # 사용 중에 풀에서 빠짐 → 마지막 lease 반납 시 종료
+
+
+class GeminiClientPool:
+    """API 키별 Gemini 클라이언트 풀"""
+
+    def __init__(self, idle_ttl_seconds: float = 1800, max_size: int = 100):
+        """
+        Args:
+            idle_ttl_seconds: 이 시간 동안 사용되지 않은 클라이언트는 정리
+            max_size: 풀에 유지할 최대 클라이언트 수 (초과 시 사용 중이 아닌 가장 오래된 것부터 정리)
+        """
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._idle_ttl = idle_ttl_seconds
+        self._max_size = max_size
+
+    def get_model(
+        self,
+        api_key: str,
+        model_name: Optional[str] = None,
+        generation_config: Optional[dict] = None,
+        system_instruction: Optional[str] = None,
+    ) -> genai.GenerativeModel:
+        """
+        API 키에 바인딩된 GenerativeModel 반환
+
+        GenerativeModel 자체는 가벼운 설정 객체이므로 매번 생성하고,
+        비용이 큰 서비스 클라이언트(전송 채널)만 키별로 재사용합니다.
+
+        Args:
+            api_key: Gemini API 키
+            model_name: 모델 이름 (기본값: settings.gemini_model)
+            generation_config: 생성 설정 (선택)
+            system_instruction: 시스템 지시문 (선택)
+
+        Returns:
+            해당 키의 클라이언트를 사용하는 GenerativeModel
+        """
+        if not api_key:
+            raise ValueError("Gemini API 키가 필요합니다.")
+
+        model = genai.GenerativeModel(
+            model_name or settings.gemini_model,
+            generation_config=generation_config,
+            system_instruction=system_instruction,
+        )
+        # 전역 기본 클라이언트 대신 키 전용 클라이언트 사용
+        # NOTE: GenerativeModel._client는 공개 API가 아님 (google-generativeai==0.8.3 기준,
+        #       generate_content가 self._client를 그대로 사용). 버전을 올리면 동작을 다시 확인할 것
+        entry = self._acquire(api_key)
+        model._client = entry.client
+        weakref.finalize(model, self._release, entry)
+        return model
+
+    def _acquire(self, api_key: str) -> _PoolEntry:
+        """키별 클라이언트 lease (없으면 생성)"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+
+            entry = self._entries.get(api_key)
+            if entry is None:
+                if len(self._entries) >= self._max_size:
+                    self._evict_oldest()
+                entry = _PoolEntry(
+                    client=glm.GenerativeServiceClient(client_options={"api_key": api_key})
+                )
+                self._entries[api_key] = entry
+                logger.debug(f"[GeminiPool] 클라이언트 생성 (풀 크기: {len(self._entries)})")
+
+            entry.last_used = now
+            entry.leases += 1
+            return entry
+
+    def _release(self, entry: _PoolEntry) -> None:
+        """모델 해제 시 lease 반납 (풀에서 이미 빠진 클라이언트면 마지막 반납 때 종료)"""
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            close = entry.evicted and entry.leases == 0
+        if close:
+            self._close(entry)
+
+    def _evict_idle(self, now: float) -> None:
+        """사용 중이 아니고 유휴 시간이 TTL을 넘은 클라이언트 정리 (lock 보유 상태에서 호출)"""
+        expired = [
+            key for key, entry in self._entries.items()
+            if entry.leases == 0 and now - entry.last_used > self._idle_ttl
+        ]
+        for key in expired:
+            self._close(self._entries.pop(key))
+        if expired:
+            logger.debug(f"[GeminiPool] 유휴 클라이언트 {len(expired)}개 정리")
+
+    def _evict_oldest(self) -> None:
+        """사용 중이 아닌 클라이언트 중 가장 오래된 것 정리 (모두 사용 중이면 잠시 max_size 초과 허용)"""
+        idle = [key for key, entry in self._entries.items() if entry.leases == 0]
+        if idle:
+            oldest_key = min(idle, key=lambda key: self._entries[key].last_used)
+            self._close(self._entries.pop(oldest_key))
+
+    @staticmethod
+    def _close(entry: _PoolEntry) -> None:
+        """클라이언트 전송 채널 종료 (실패해도 무시)"""
+        try:
+            entry.client.transport.close()
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        """풀의 모든 클라이언트 정리 (사용 중인 클라이언트는 마지막 lease 반납 시 종료)"""
+        with self._lock:
+            idle = [entry for entry in self._entries.values() if entry.leases == 0]
+            for entry in self._entries.values():
+                entry.evicted = True
+            self._entries.clear()
+        for entry in idle:
+            self._close(entry)
+
+    @property
+    def size(self) -> int:
+        """현재 풀에 있는 클라이언트 수"""
+        return len(self._entries)
+
+
+# 전역 클라이언트 풀 인스턴스
+gemini_client_pool = GeminiClientPool(
+    idle_ttl_seconds=settings.gemini_client_idle_ttl_minutes * 60,
+    max_size=settings.gemini_client_pool_max_size,
+)
+
+
+async def generate_content(
+    model: genai.GenerativeModel,
+    prompt: str,
+    user_key: Hashable,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    kind: str = "analysis",
+    ticker: Optional[str] = None
+):
+    """
+    전용 스케줄러에서 Gemini 호출 (동시성 제한 + 타임아웃 + 연결 종료 시 취소)
+
+    종목 분석, 포트폴리오 분석, 뉴스 감성 분석이 모두 이 경로로 호출되며,
+    호출마다 토큰 수/지연시간/결과를 gemini_usage 테이블에 기록합니다.
+
+    Args:
+        model: gemini_client_pool.get_model()로 만든 모델
+        prompt: 프롬프트
+        user_key: 스케줄러 공정성 기준 키 (user_id 또는 API 키)
+        is_disconnected: 클라이언트 연결 종료 확인 콜백
+        kind: 사용량 기록용 호출 종류 (base, personal, portfolio, sentiment 등)
+        ticker: 사용량 기록용 티커 (선택)
+    """
+    logger.info(f"[Gemini] {kind} 프롬프트: {len(prompt)} 문자, 예상 토큰 {estimate_tokens(prompt)}")
+    timing: Dict[str, float] = {"enqueued": time.monotonic()}
+
+    def _call():
+        logger.info("[Gemini] API 호출 시작")
+        timing["started"] = time.monotonic()
+        try:
+            result = model.generate_content(
+                prompt,
+                request_options={"timeout": settings.gemini_timeout_seconds}
+            )
+            logger.info("[Gemini] API 호출 성공")
+            return result
+        except Exception as e:
+            logger.error(f"[Gemini] API 호출 실패: {type(e).__name__}: {str(e)}")
+            logger.error(f"[Gemini] Traceback: {traceback.format_exc()}")
+            raise
+        finally:
+            timing["finished"] = time.monotonic()
+
+    logger.info(f"[Gemini] 스케줄러 대기열 등록 (타임아웃: {settings.gemini_timeout_seconds:.0f}초)")
+    response = None
+    error: Optional[BaseException] = None
+    try:
+        response = await analysis_scheduler.run(user_key, _call, is_disconnected=is_disconnected)
+        logger.info(f"[Gemini] 응답 받음, 길이: {len(response.text) if response.text else 0}")
+        return response
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        now = time.monotonic()
+        started = timing.get("started", now)
+        prompt_tokens, output_tokens = token_counts(response)
+        # 동기 DB 쓰기이므로 이벤트 루프를 막지 않도록 스레드에서 기록
+        await asyncio.to_thread(
+            record_gemini_usage,
+            kind=kind,
+            model=model.model_name,
+            latency_ms=int((timing.get("finished", now) - started) * 1000),
+            wait_ms=int((started - timing["enqueued"]) * 1000),
+            outcome=outcome_for(error),
+            user_id=user_key if isinstance(user_key, int) else None,
+            ticker=ticker,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+        )
@@ -0,0 +1,78 @@
+"""
+Gemini 호출 사용량 기록
+
+호출마다 프롬프트/출력 토큰 수, 지연시간, 모델, 결과를 gemini_usage 테이블에
+남겨 사용자별/티커별 비용과 지연을 집계할 수 있게 합니다.
+기록 실패가 분석 자체를 실패시키지 않도록 예외는 로그만 남깁니다.
+"""
+import logging
+from typing import Any, Optional, Tuple
+
+from app.database.connection import SessionLocal
+from app.database.gemini_usage_repository import GeminiUsageRepository
+from app.services.analysis_scheduler import AnalysisCancelledError, AnalysisTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 호출 결과 구분
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_CANCELLED = "cancelled"
+
+
+def token_counts(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """응답의 usage_metadata에서 (프롬프트 토큰, 출력 토큰) 추출"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None, None
+    return (
+        getattr(usage, "prompt_token_count", None),
+        getattr(usage, "candidates_token_count", None),
+    )
+
+
+def outcome_for(error: Optional[BaseException]) -> str:
+    """예외 종류로 호출 결과 구분"""
+    if error is None:
+        return OUTCOME_OK
+    if isinstance(error, AnalysisTimeoutError):
+        return OUTCOME_TIMEOUT
+    if isinstance(error, AnalysisCancelledError):
+        return OUTCOME_CANCELLED
+    return OUTCOME_ERROR
+
+
+def record_gemini_usage(
+    kind: str,
+    model: str,
+    latency_ms: int,
+    outcome: str,
+    user_id: Optional[int] = None,
+    ticker: Optional[str] = None,
+    prompt_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+    wait_ms: int = 0,
+) -> None:
+    """호출 기록 저장 (실패해도 예외를 전파하지 않음)"""
+    db = SessionLocal()
+    try:
+        GeminiUsageRepository(db).create(
+            kind=kind,
+            model=model,
+            latency_ms=latency_ms,
+            outcome=outcome,
+            user_id=user_id,
+            ticker=ticker,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            wait_ms=wait_ms,
+        )
+        logger.debug(
+            f"[Usage] {kind} {ticker or '-'}: 입력 {prompt_tokens} / 출력 {output_tokens} 토큰, "
+            f"{latency_ms}ms (대기 {wait_ms}ms), {outcome}"
+        )
+    except Exception as e:
+        logger.warning(f"[Usage] 사용량 기록 실패: {type(e).__name__}: {str(e)}")
+    finally:
+        db.close()
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+"""
+indicator_engine.py
+다중 티커 기술적 지표 엔진 (NumPy 2차원 배열)
+
+technical_indicators.py의 함수들은 pandas Series 하나씩 지표마다 중간 Series를
+만들고, calculate_all_indicators는 SMA20을 두 번(SMA, 볼린저밴드) 계산합니다.
+이 엔진은 날짜 × 티커로 정렬된 종가 배열(T, N)을 받아 모든 지표를 한 번에 계산합니다.
+
+- SMA/볼린저밴드: 누적합·제곱누적합을 한 번만 만들고 모든 기간이 공유
+- EMA/RSI/MACD: 시간 방향으로만 반복하고 티커 방향은 벡터 연산
+  (여러 EMA를 열 방향으로 쌓아 한 번의 반복으로 계산)
+
+계산 규칙은 기존 pandas 구현과 같습니다.
+- SMA: rolling(window).mean() (창 안에 결측이 있으면 NaN)
+- EMA/RSI/MACD: ewm(span, adjust=False), 티커별 첫 유효 종가부터 시작
+- 볼린저밴드 표준편차: 표본 표준편차 (ddof=1)
+중간에 빠진 종가는 EMA 계열에서 직전 종가로 채워 계산합니다.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    """지표 파라미터 집합 (기본값은 기존 calculate_all_indicators와 동일)"""
+    sma_periods: Tuple[int, ...] = (20, 50, 200)
+    ema_periods: Tuple[int, ...] = (12, 26)
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    bb_period: int = 20
+    bb_std: float = 2.0
+    # OHLCV 지표 (고가/저가/거래량이 있을 때만 계산)
+    atr_period: int = 14
+    stoch_period: int = 14
+    stoch_smooth: int = 3
+    adx_period: int = 14
+
+    @property
+    def key(self) -> str:
+        """캐시 키용 문자열 표현"""
+        return (
+            f"sma{'-'.join(map(str, self.sma_periods))}|ema{'-'.join(map(str, self.ema_periods))}"
+            f"|rsi{self.rsi_period}|macd{self.macd_fast}-{self.macd_slow}-{self.macd_signal}"
+            f"|bb{self.bb_period}-{self.bb_std:g}"
+            f"|atr{self.atr_period}|stoch{self.stoch_period}-{self.stoch_smooth}|adx{self.adx_period}"
+        )
+
+
+DEFAULT_SPEC = IndicatorSpec()
+
+# 사용자 지정 파라미터 제한 (요청 하나의 계산량 상한)
+MAX_PERIOD = 400
+MAX_PERIODS_PER_KIND = 8
+
+
+def _parse_ints(name: str, text: str, count: Optional[int] = None) -> Tuple[int, ...]:
+    """쉼표로 구분된 기간 목록 파싱 (중복 제거, 입력 순서 유지)"""
+    try:
+        values = tuple(dict.fromkeys(int(part) for part in text.split(",") if part.strip()))
+    except ValueError:
+        raise ValueError(f"'{name}' 파라미터는 쉼표로 구분된 정수여야 합니다: {text}")
+    if not values:
+        raise ValueError(f"'{name}' 파라미터가 비어 있습니다.")
+    if count is not None and len(values) != count:
+        raise ValueError(f"'{name}' 파라미터는 정수 {count}개가 필요합니다: {text}")
+    if len(values) > MAX_PERIODS_PER_KIND:
+        raise ValueError(f"'{name}' 파라미터는 최대 {MAX_PERIODS_PER_KIND}개까지 지정할 수 있습니다.")
+    if any(v < 2 or v > MAX_PERIOD for v in values):
+        raise ValueError(f"'{name}' 기간은 2 ~ {MAX_PERIOD} 사이여야 합니다: {text}")
+    return values
+
+
+def parse_indicator_spec(
+    sma: Optional[str] = None,
+    ema: Optional[str] = None,
+    rsi: Optional[str] = None,
+    macd: Optional[str] = None,
+    bb: Optional[str] = None,
+    atr: Optional[str] = None,
+    stoch: Optional[str] = None,
+    adx: Optional[str] = None,
+) -> IndicatorSpec:
+    """
+    쿼리 문자열 파라미터로 지표 파라미터 집합 생성 (지정하지 않은 항목은 기본값)
+
+    Args:
+        sma: SMA 기간 목록 (예: "10,30,100")
+        ema: EMA 기간 목록 (예: "12,26")
+        rsi: RSI 기간 (예: "7")
+        macd: MACD fast,slow,signal (예: "12,26,9")
+        bb: 볼린저밴드 기간,표준편차 배수 (예: "20,2" 또는 "20,2.5")
+        atr: ATR 기간 (예: "14")
+        stoch: 스토캐스틱 %K 기간,%D 평활 기간 (예: "14,3")
+        adx: ADX/DMI 기간 (예: "14")
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 허용 범위를 벗어난 경우
+    """
+    options = {}
+    if sma:
+        options["sma_periods"] = _parse_ints("sma", sma)
+    if ema:
+        options["ema_periods"] = _parse_ints("ema", ema)
+    if rsi:
+        options["rsi_period"] = _parse_ints("rsi", rsi, count=1)[0]
+    if macd:
+        parts = [part.strip() for part in macd.split(",")]
+        if len(parts) != 3:
+            raise ValueError(f"'macd' 파라미터는 fast,slow,signal 정수 3개가 필요합니다: {macd}")
+        fast, slow = _parse_ints("macd", ",".join(parts[:2]), count=2)
+        signal = _parse_ints("macd", parts[2], count=1)[0]
+        if fast >= slow:
+            raise ValueError(f"MACD fast 기간은 slow 기간보다 짧아야 합니다: {macd}")
+        options.update(macd_fast=fast, macd_slow=slow, macd_signal=signal)
+    if bb:
+        parts = [part.strip() for part in bb.split(",")]
+        if len(parts) not in (1, 2):
+            raise ValueError(f"'bb' 파라미터는 기간 또는 기간,표준편차 배수 형식이어야 합니다: {bb}")
+        options["bb_period"] = _parse_ints("bb", parts[0], count=1)[0]
+        if len(parts) == 2:
+            try:
+                options["bb_std"] = float(parts[1])
+            except ValueError:
+                raise ValueError(f"볼린저밴드 표준편차 배수는 숫자여야 합니다: {bb}")
+            if not 0 < options["bb_std"] <= 5:
+                raise ValueError(f"볼린저밴드 표준편차 배수는 0 ~ 5 사이여야 합니다: {bb}")
+    if atr:
+        options["atr_period"] = _parse_ints("atr", atr, count=1)[0]
+    if stoch:
+        parts = [part.strip() for part in stoch.split(",")]
+        if len(parts) not in (1, 2):
+            raise ValueError(f"'stoch' 파라미터는 기간 또는 기간,평활 기간 형식이어야 합니다: {stoch}")
+        options["stoch_period"] = _parse_ints("stoch", parts[0], count=1)[0]
+        if len(parts) == 2:
+            options["stoch_smooth"] = _parse_ints("stoch", parts[1], count=1)[0]
+    if adx:
+        options["adx_period"] = _parse_ints("adx", adx, count=1)[0]
+    return IndicatorSpec(**options) if options else DEFAULT_SPEC
+
+
+@dataclass
+class IndicatorResult:
+    """
+    지표 계산 결과
+
+    series의 각 배열은 입력 종가와 같은 (T, N) 모양입니다.
+    키: sma{p}, ema{p}, rsi{p}, macd, macd_signal, macd_hist, bb_upper, bb_middle, bb_lower
+    OHLCV 입력 시 추가: atr{p}, stoch_k, stoch_d, plus_di, minus_di, adx, obv, vwap
+    """
+    spec: IndicatorSpec
+    series: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def latest(self) -> Dict[str, np.ndarray]:
+        """지표별 티커마다 마지막 유효값 (N,) (유효값이 없으면 NaN)"""
+        return {name: last_valid(values) for name, values in self.series.items()}
+
+    def to_indicator_dicts(self) -> List[dict]:
+        """티커별로 calculate_all_indicators와 같은 중첩 dict 형태로 변환"""
+        latest = self.latest()
+        columns = next(iter(latest.values())).shape[0] if latest else 0
+        spec = self.spec
+
+        def value(name: str, column: int) -> Optional[float]:
+            v = latest[name][column]
+            return None if np.isnan(v) else float(v)
+
+        results = []
+        for i in range(columns):
+            results.append({
+                'sma': {f'sma{p}': value(f'sma{p}', i) for p in spec.sma_periods},
+                'ema': {f'ema{p}': value(f'ema{p}', i) for p in spec.ema_periods},
+                'rsi': {f'rsi{spec.rsi_period}': value(f'rsi{spec.rsi_period}', i)},
+                'macd': {
+                    'macd': value('macd', i),
+                    'signal': value('macd_signal', i),
+                    'histogram': value('macd_hist', i),
+                },
+                'bollinger_bands': {
+                    'upper': value('bb_upper', i),
+                    'middle': value('bb_middle', i),
+                    'lower': value('bb_lower', i),
+                },
+            })
+            if 'adx' in latest:
+                results[-1].update({
+                    'atr': {f'atr{spec.atr_period}': value(f'atr{spec.atr_period}', i)},
+                    'stochastic': {'k': value('stoch_k', i), 'd': value('stoch_d', i)},
+                    'dmi': {'plus_di': value('plus_di', i), 'minus_di': value('minus_di', i), 'adx': value('adx', i)},
+                    'volume': {'obv': value('obv', i), 'vwap': value('vwap', i)},
+                })
+        return results
+
+
+def last_valid(values: np.ndarray) -> np.ndarray:
+    """(T, N) 배열에서 열마다 마지막 유효값 (N,)"""
+    valid = ~np.isnan(values)
+    rows = values.shape[0]
+    # 뒤에서부터 첫 유효 위치
+    last_index = rows - 1 - np.argmax(valid[::-1], axis=0)
+    result = values[last_index, np.arange(values.shape[1])]
+    return np.where(valid.any(axis=0), result, np.nan)
+
+
+def _first_valid_index(closes: np.ndarray) -> np.ndarray:
+    """열마다 첫 유효 종가 위치 (유효값이 없으면 T)"""
+    valid = ~np.isnan(closes)
+    return np.where(valid.any(axis=0), np.argmax(valid, axis=0), closes.shape[0])
+
+
+def _fill_for_ema(closes: np.ndarray) -> np.ndarray:
+    """EMA 계산용 종가: 중간 결측은 직전 값, 시작 전 구간은 첫 유효값으로 채움"""
+    if not np.isnan(closes).any():
+        return closes
+    filled = pd.DataFrame(closes).ffill().bfill().to_numpy()
+    return np.nan_to_num(filled)  # 전부 결측인 열
+
+
+def _rolling_sums(values: np.ndarray, period: int, prefix: np.ndarray, prefix_count: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """누적합으로 창 합계와 창 안 유효값 수 계산"""
+    rows = values.shape[0]
+    window_sum = np.full(values.shape, np.nan)
+    window_count = np.zeros(values.shape)
+    if period <= rows:
+        window_sum[period - 1:] = prefix[period:] - prefix[:-period]
+        window_count[period - 1:] = prefix_count[period:] - prefix_count[:-period]
+    return window_sum, window_count
+
+
+# 열 수가 이보다 적으면 시간 방향 반복 대신 구간별 누적합(닫힌 형태)으로 계산
+EMA_CLOSED_FORM_MAX_COLUMNS = 256
+# 닫힌 형태 계산에서 (1-a)^-k 배율의 상한 (float64 overflow 방지, 구간 길이를 정함)
+_EMA_MAX_LOG_SCALE = 345.0  # ≈ ln(1e150)
+
+
+def ema_many(values: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    열마다 다른 평활계수로 EMA 계산 (adjust=False)
+
+    y[0] = x[0], y[t] = a·x[t] + (1-a)·y[t-1]
+
+    열이 적으면(단일 티커 요청) 닫힌 형태로 구간마다 한 번에 계산하고,
+    열이 많으면(유니버스 전체) 시간 방향 반복 한 번으로 모든 열을 동시에 계산합니다.
+
+    Args:
+        values: 결측이 없는 (T, M) 배열
+        alphas: (M,) 평활계수
+    """
+    if values.shape[0] == 0:
+        return np.empty_like(values)
+    if values.shape[1] <= EMA_CLOSED_FORM_MAX_COLUMNS:
+        return _ema_closed_form(values, alphas)
+    out = np.empty_like(values)
+    decay = 1.0 - alphas
+    out[0] = values[0]
+    weighted = values * alphas
+    for t in range(1, values.shape[0]):
+        np.multiply(out[t - 1], decay, out=out[t])
+        out[t] += weighted[t]
+    return out
+
+
+def _ema_closed_form(values: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    구간별 닫힌 형태 EMA
+
+    구간 시작 직전 값을 y0라 하면 구간 안 k번째 값은
+    y[k] = d^k · (y0 + Σ_{j≤k} a·x[j]·d^-j)  (d = 1-a)
+    이므로 누적합 한 번으로 구합니다. d^-k가 넘치지 않도록 구간 길이를 나눕니다.
+    """
+    rows = values.shape[0]
+    out = np.empty_like(values)
+    out[0] = values[0]
+    log_decay = np.log(np.maximum(1.0 - alphas, 1e-300))
+    block = int(min(rows, max(1, np.floor(_EMA_MAX_LOG_SCALE / -log_decay.min())))) if log_decay.min() < 0 else rows
+
+    previous = values[0]
+    for start in range(1, rows, block):
+        stop = min(rows, start + block)
+        power = np.exp(np.arange(1, stop - start + 1)[:, None] * log_decay)  # d^k
+        segment = values[start:stop] * alphas / power
+        np.cumsum(segment, axis=0, out=segment)
+        segment += previous
+        segment *= power
+        out[start:stop] = segment
+        previous = segment[-1]
+    return out
+
+
+def compute_indicators(
+    closes: np.ndarray,
+    spec: IndicatorSpec = DEFAULT_SPEC,
+    high: Optional[np.ndarray] = None,
+    low: Optional[np.ndarray] = None,
+    volume: Optional[np.ndarray] = None,
+    segments: Optional[np.ndarray] = None,
+) -> IndicatorResult:
+    """
+    모든 지표 계산
+
+    고가/저가/거래량을 함께 주면 ATR, 스토캐스틱, OBV, ADX/DMI, 앵커드 VWAP도
+    계산합니다. 재귀 지표(EMA/RSI/ATR/DMI)는 하나의 배열로 쌓아 시간 방향 반복
+    한 번으로, 2차 평활(MACD 시그널/ADX)도 한 번의 반복으로 함께 계산합니다.
+
+    Args:
+        closes: 날짜 × 티커 (T, N) 종가 배열 (1차원이면 티커 1개로 처리, 결측은 NaN)
+        spec: 지표 파라미터
+        high, low, volume: closes와 같은 모양의 고가/저가/거래량 (선택)
+        segments: (T,) VWAP 앵커 구간 번호 (값이 바뀌는 봉에서 누적을 다시 시작, 기본값: 전체 한 구간)
+
+    Returns:
+        IndicatorResult (각 지표의 전체 시계열)
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim == 1:
+        closes = closes[:, None]
+    rows, columns = closes.shape
+    first_valid = _first_valid_index(closes)
+    before_start = np.arange(rows)[:, None] < first_valid[None, :]
+    series: Dict[str, np.ndarray] = {}
+
+    ohlcv = high is not None and low is not None and volume is not None
+    if ohlcv:
+        high, low, volume = (np.asarray(a, dtype=np.float64).reshape(rows, columns) for a in (high, low, volume))
+
+    # --- SMA / 볼린저밴드: 누적합·제곱누적합 공유 ---
+    # 큰 가격에서의 자릿수 손실을 줄이기 위해 티커별 첫 유효 종가를 빼고 누적
+    reference = np.nan_to_num(closes[np.minimum(first_valid, rows - 1), np.arange(columns)]) if rows else np.zeros(columns)
+    valid = ~np.isnan(closes)
+    centered = np.where(valid, closes - reference, 0.0)
+    zeros = np.zeros((1, columns))
+    prefix = np.concatenate([zeros, np.cumsum(centered, axis=0)])
+    prefix_sq = np.concatenate([zeros, np.cumsum(centered * centered, axis=0)])
+    prefix_count = np.concatenate([zeros, np.cumsum(valid, axis=0, dtype=np.float64)])
+
+    window_cache: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def window_mean(period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(중심화된 창 합계, 평균) - 창이 모두 유효할 때만 값"""
+        if period not in window_cache:
+            window_sum, window_count = _rolling_sums(closes, period, prefix, prefix_count)
+            full = window_count == period
+            window_sum = np.where(full, window_sum, np.nan)
+            window_cache[period] = (window_sum, window_sum / period + reference)
+        return window_cache[period]
+
+    for period in spec.sma_periods:
+        series[f'sma{period}'] = window_mean(period)[1]
+
+    bb_sum, bb_middle = window_mean(spec.bb_period)
+    bb_sq, _ = _rolling_sums(closes, spec.bb_period, prefix_sq, prefix_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (bb_sq - bb_sum * bb_sum / spec.bb_period) / (spec.bb_period - 1)
+    std = np.sqrt(np.clip(variance, 0.0, None))
+    series['bb_upper'] = bb_middle + spec.bb_std * std
+    series['bb_middle'] = bb_middle
+    series['bb_lower'] = bb_middle - spec.bb_std * std
+
+    # --- EMA / RSI (+ ATR / DMI): 한 번의 시간 반복으로 함께 계산 ---
+    filled = _fill_for_ema(closes)
+    delta = np.diff(filled, axis=0, prepend=filled[:1])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    ema_periods = list(dict.fromkeys([*spec.ema_periods, spec.macd_fast, spec.macd_slow]))
+    blocks = [filled] * len(ema_periods) + [gain, loss]
+    alpha_blocks = [np.full(columns, 2.0 / (p + 1)) for p in ema_periods] + [np.full(columns * 2, 2.0 / (spec.rsi_period + 1))]
+    if ohlcv:
+        high_f, low_f = _fill_for_ema(high), _fill_for_ema(low)
+        true_range, plus_dm, minus_dm = _directional_movement(high_f, low_f, filled)
+        blocks += [true_range, true_range, plus_dm, minus_dm]
+        alpha_blocks += [np.full(columns, 1.0 / spec.atr_period), np.full(columns * 3, 1.0 / spec.adx_period)]
+
+    smoothed = ema_many(np.concatenate(blocks, axis=1), np.concatenate(alpha_blocks))
+    smoothed[np.tile(before_start, len(blocks))] = np.nan
+
+    def block(index: int) -> np.ndarray:
+        return smoothed[:, index * columns:(index + 1) * columns]
+
+    emas = {p: block(i) for i, p in enumerate(ema_periods)}
+    for period in spec.ema_periods:
+        series[f'ema{period}'] = emas[period]
+
+    offset = len(ema_periods)
+    avg_gain, avg_loss = block(offset), block(offset + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        series[f'rsi{spec.rsi_period}'] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    # --- 2차 평활: MACD 시그널 (+ ADX) ---
+    macd = emas[spec.macd_fast] - emas[spec.macd_slow]
+    second = [np.nan_to_num(macd)]
+    second_alphas = [np.full(columns, 2.0 / (spec.macd_signal + 1))]
+    if ohlcv:
+        adx_tr, plus_sm, minus_sm = block(offset + 3), block(offset + 4), block(offset + 5)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            plus_di = 100.0 * plus_sm / adx_tr
+            minus_di = 100.0 * minus_sm / adx_tr
+            dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+        second.append(np.nan_to_num(dx))
+        second_alphas.append(np.full(columns, 1.0 / spec.adx_period))
+
+    second_smoothed = ema_many(np.concatenate(second, axis=1), np.concatenate(second_alphas))
+    second_smoothed[np.tile(before_start, len(second))] = np.nan
+    signal = second_smoothed[:, :columns]
+    series['macd'] = macd
+    series['macd_signal'] = signal
+    series['macd_hist'] = macd - signal
+
+    if ohlcv:
+        series[f'atr{spec.atr_period}'] = block(offset + 2)
+        series['plus_di'] = plus_di
+        series['minus_di'] = minus_di
+        series['adx'] = second_smoothed[:, columns:]
+        series.update(_stochastic(high, low, closes, spec.stoch_period, spec.stoch_smooth))
+        series.update(_volume_indicators(high_f, low_f, filled, volume, segments, before_start))
+
+    return IndicatorResult(spec=spec, series=series)
+
+
+def _directional_movement(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """True Range, +DM, -DM (첫 봉의 TR은 고가-저가, DM은 0)"""
+    prev_close = np.concatenate([close[:1], close[:-1]])
+    true_range = np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    true_range[:1] = high[:1] - low[:1]
+    up = np.diff(high, axis=0, prepend=high[:1])
+    down = -np.diff(low, axis=0, prepend=low[:1])
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    return true_range, plus_dm, minus_dm
+
+
+def _rolling_extreme(values: np.ndarray, period: int, reducer) -> np.ndarray:
+    """창 최댓값/최솟값 (창이 다 차지 않았거나 결측이 있으면 NaN)"""
+    out = np.full(values.shape, np.nan)
+    if period <= values.shape[0]:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period, axis=0)
+        out[period - 1:] = reducer(windows, axis=-1)
+    return out
+
+
+def _stochastic(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int, smooth: int) -> Dict[str, np.ndarray]:
+    """스토캐스틱 %K(기간 내 고가/저가 대비 종가 위치)와 %D(%K의 단순이동평균)"""
+    highest = _rolling_extreme(high, period, np.max)
+    lowest = _rolling_extreme(low, period, np.min)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        k = 100.0 * (close - lowest) / (highest - lowest)
+    k[~np.isfinite(k)] = np.nan
+    d = np.full(k.shape, np.nan)
+    if smooth <= k.shape[0]:
+        d[smooth - 1:] = np.lib.stride_tricks.sliding_window_view(k, smooth, axis=0).mean(axis=-1)
+    return {'stoch_k': k, 'stoch_d': d}
+
+
+def _volume_indicators(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+    segments: Optional[np.ndarray], before_start: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """OBV (종가 방향 × 거래량 누적)와 구간별로 누적을 다시 시작하는 앵커드 VWAP"""
+    volume = np.nan_to_num(volume)
+    direction = np.sign(np.diff(close, axis=0, prepend=close[:1]))
+    obv = np.cumsum(direction * volume, axis=0)
+
+    typical = (high + low + close) / 3.0
+    price_volume = np.cumsum(typical * volume, axis=0)
+    cumulative_volume = np.cumsum(volume, axis=0)
+    if segments is not None and len(segments):
+        # 구간 시작 직전까지의 누적값을 빼서 구간마다 다시 누적
+        segments = np.asarray(segments)
+        starts = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+        owner = np.repeat(starts, np.diff(np.r_[starts, len(segments)]))
+        base_pv = np.concatenate([np.zeros((1, close.shape[1])), price_volume])[owner]
+        base_v = np.concatenate([np.zeros((1, close.shape[1])), cumulative_volume])[owner]
+        price_volume, cumulative_volume = price_volume - base_pv, cumulative_volume - base_v
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(cumulative_volume > 0, price_volume / cumulative_volume, np.nan)
+
+    obv[before_start] = np.nan
+    vwap[before_start] = np.nan
+    return {'obv': obv, 'vwap': vwap}
+
+
+def closes_from_history(history_df: pd.DataFrame, column: str = 'close') -> Tuple[List[str], pd.DatetimeIndex, np.ndarray]:
+    """
+    yahooquery 다중 티커 history DataFrame을 (티커 목록, 날짜, 종가 배열)로 정렬
+
+    Args:
+        history_df: (symbol, date) 멀티인덱스 DataFrame (단일 티커면 date 인덱스도 가능)
+        column: 사용할 가격 컬럼
+
+    Returns:
+        (tickers, dates, closes) - closes는 날짜 × 티커 (T, N), 거래일이 다른 티커는 NaN
+    """
+    if isinstance(history_df.index, pd.MultiIndex):
+        frame = history_df[column].unstack(level=0)
+    else:
+        frame = history_df[[column]]
+    frame.index = pd.to_datetime(frame.index, utc=True).tz_localize(None).normalize()
+    frame = frame.groupby(level=0).last().sort_index()
+    return [str(c) for c in frame.columns], frame.index, frame.to_numpy(dtype=np.float64)
+
+
+def ohlcv_from_history(history_df: pd.DataFrame) -> Tuple[List[str], pd.DatetimeIndex, Dict[str, np.ndarray]]:
+    """
+    history DataFrame의 고가/저가/종가/거래량을 (T, N) 배열로 정렬 (closes_from_history와 같은 정렬)
+
+    Returns:
+        (tickers, dates, {'high', 'low', 'close', 'volume'}) - 없는 컬럼은 dict에서 빠짐
+    """
+    tickers, dates, closes = closes_from_history(history_df)
+    arrays = {'close': closes}
+    for column in ('high', 'low', 'volume'):
+        if column in history_df.columns:
+            arrays[column] = closes_from_history(history_df, column)[2]
+    return tickers, dates, arrays
+
+
+def compute_latest(
+    tickers: Sequence[str], closes: np.ndarray, spec: IndicatorSpec = DEFAULT_SPEC
+) -> Dict[str, dict]:
+    """여러 티커의 최신 지표를 {ticker: calculate_all_indicators 형식 dict}로 반환"""
+    result = compute_indicators(closes, spec)
+    return dict(zip(tickers, result.to_indicator_dicts()))
@@ -0,0 +1,98 @@
+"""
+기술적 지표 메모 캐시
+
+지표 값은 가격 이력이 같으면 바뀌지 않습니다. 시세 캐시(5분 TTL)가 만료되어
+데이터를 다시 조회하더라도 마지막 봉이 그대로면(장 마감 후 등) 지표를 다시
+계산하지 않도록, 계산 결과를 (티커, 결과 종류, 지표 파라미터, 마지막 봉) 기준으로
+보관합니다. 시세 캐시와 독립적이며 요청 종류(종목 조회/차트)와 관계없이 공유됩니다.
+
+마지막 봉은 날짜뿐 아니라 종가와 봉 수까지 포함하므로, 장중에 진행 중인 봉의
+종가가 바뀌거나 조회 기간(1y/2y)이 다르면 다른 항목으로 취급됩니다.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 결과 종류
+KIND_LATEST = "latest"  # calculate_all_indicators 형식의 최신 지표
+KIND_CHART = "chart"  # calculate_chart_data 형식의 시계열
+KIND_CHART_JSON = "chart_json"  # 차트 API 응답 본문 (직렬화된 JSON bytes)
+
+
+def last_bar_marker(history_df: pd.DataFrame, column: str = "close") -> Optional[Tuple[str, float, int]]:
+    """
+    history DataFrame의 마지막 봉 식별값 (마지막 봉 시각, 종가, 봉 수)
+
+    Returns:
+        식별값 (데이터가 없으면 None)
+    """
+    if history_df is None or history_df.empty or column not in history_df.columns:
+        return None
+    index = history_df.index
+    last = index[-1]
+    if isinstance(index, pd.MultiIndex):
+        last = last[-1]
+    close = history_df[column].iloc[-1]
+    return str(last), None if pd.isna(close) else float(close), len(history_df)
+
+
+class IndicatorMemo:
+    """지표 계산 결과 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = 512):
+        """
+        Args:
+            max_size: 최대 항목 수 (초과 시 오래 사용되지 않은 것부터 정리)
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(ticker: str, kind: str, spec_key: str, history_df: pd.DataFrame) -> Optional[Hashable]:
+        """메모 키 (마지막 봉을 알 수 없으면 None → 메모하지 않음)"""
+        marker = last_bar_marker(history_df)
+        return None if marker is None else (ticker.upper(), kind, spec_key, marker)
+
+    def get_or_compute(self, key: Optional[Hashable], compute: Callable[[], Any]) -> Any:
+        """
+        메모된 결과 반환 (없으면 compute 실행 후 저장)
+
+        None 결과(데이터 부족 등)는 저장하지 않으며, 같은 키를 여러 스레드가 동시에
+        계산하는 경우에는 마지막 결과가 남습니다 (결과가 같으므로 문제없음).
+        """
+        if key is None:
+            return compute()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute()
+        if result is not None:
+            with self._lock:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# 전역 지표 메모 캐시 인스턴스
+indicator_memo = IndicatorMemo(max_size=settings.indicator_memo_max_size)
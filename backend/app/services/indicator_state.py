@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+indicator_state.py
+기술적 지표 증분 계산 상태 (봉 하나당 O(1) 갱신)
+
+EMA, RSI(ewm 평활), MACD, ATR, DMI/ADX, OBV, 앵커드 VWAP은 재귀식(누적)이므로
+마지막 값만 있으면 새 봉을 반영할 수 있습니다. SMA/볼린저밴드는 최근 창 버퍼와
+창 합계를, 스토캐스틱은 최근 고가/저가 창을 유지합니다. 상태는
+indicator_state 테이블에 티커/파라미터별로 저장되어, 다음 조회 때는 1년치
+이력 전체가 아니라 마지막 상태 이후의 봉만 반영합니다.
+
+- advance(bar): 확정된 봉 반영 (상태 변경)
+- peek(bar): 진행 중인 봉(장중 현재가)을 반영한 값 계산 (상태 변경 없음)
+
+앵커드 VWAP은 매년 첫 거래일에 다시 시작합니다 (연초 앵커).
+
+계산 규칙은 indicator_engine / technical_indicators 와 같습니다.
+"""
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.database.connection import SessionLocal
+from app.database.indicator_state_repository import IndicatorStateRepository
+from app.services.indicator_engine import DEFAULT_SPEC, IndicatorSpec, ohlcv_from_history
+from app.services.indicator_memo import KIND_LATEST, indicator_memo
+
+logger = logging.getLogger(__name__)
+
+# 지표 값을 제공하기 위한 최소 봉 수 (calculate_all_indicators와 동일)
+MIN_BARS = 50
+# 저장된 상태를 짧은 이력(1개월)으로 이어서 계산할 수 있는 최대 경과일
+RECENT_STATE_DAYS = 20
+# 저장된 마지막 종가와 새로 받은 같은 날짜 종가의 허용 상대 오차 (넘으면 분할/배당 수정주가로 보고 다시 계산)
+READJUST_TOLERANCE = 1e-6
+
+
+class Bar(NamedTuple):
+    """일봉 하나 (고가/저가가 없으면 종가, 거래량이 없으면 0)"""
+    date: date
+    close: float
+    high: float
+    low: float
+    volume: float
+
+
+def bars_from_history(history_df: pd.DataFrame) -> List[Bar]:
+    """yahooquery history DataFrame을 날짜순 일봉 목록으로 변환 (결측 종가 제외)"""
+    if history_df is None or history_df.empty:
+        return []
+    _, dates, arrays = ohlcv_from_history(history_df)
+    closes = arrays['close'][:, 0]
+    highs = arrays.get('high', arrays['close'])[:, 0]
+    lows = arrays.get('low', arrays['close'])[:, 0]
+    volumes = arrays['volume'][:, 0] if 'volume' in arrays else np.zeros(len(closes))
+    bars = []
+    for d, c, h, l, v in zip(dates, closes, highs, lows, volumes):
+        if np.isnan(c):
+            continue
+        bars.append(Bar(
+            d.date(), float(c),
+            float(c if np.isnan(h) else h), float(c if np.isnan(l) else l),
+            0.0 if np.isnan(v) else float(v),
+        ))
+    return bars
+
+
+# 봉마다 갱신되는 스칼라 상태 (JSON 저장 대상)
+_SCALAR_FIELDS = (
+    "bars", "last_close", "last_high", "last_low", "avg_gain", "avg_loss", "macd_signal",
+    "atr", "dmi_tr", "plus_dm", "minus_dm", "adx", "obv", "vwap_year", "vwap_pv", "vwap_volume",
+)
+
+
+@dataclass
+class IndicatorState:
+    """단일 티커의 지표 증분 상태"""
+    spec: IndicatorSpec = DEFAULT_SPEC
+    last_date: Optional[date] = None
+    bars: int = 0
+    last_close: Optional[float] = None
+    last_high: Optional[float] = None
+    last_low: Optional[float] = None
+    ema: Dict[int, float] = field(default_factory=dict)  # 기간 → EMA (MACD fast/slow 포함)
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    macd_signal: float = 0.0
+    atr: float = 0.0
+    dmi_tr: float = 0.0  # DMI용 평활 True Range (ADX 기간)
+    plus_dm: float = 0.0
+    minus_dm: float = 0.0
+    adx: float = 0.0
+    obv: float = 0.0
+    vwap_year: Optional[int] = None  # 앵커드 VWAP 구간 (연초부터 누적)
+    vwap_pv: float = 0.0
+    vwap_volume: float = 0.0
+    window: List[float] = field(default_factory=list)  # 최근 종가 (최대 창 길이)
+    highs: List[float] = field(default_factory=list)  # 최근 고가 (스토캐스틱 기간)
+    lows: List[float] = field(default_factory=list)  # 최근 저가 (스토캐스틱 기간)
+    stoch_k: List[Optional[float]] = field(default_factory=list)  # 최근 %K (%D 평활 기간)
+
+    # 창 합계 (저장하지 않고 로드 시 버퍼에서 다시 계산해 누적 오차 제거)
+    _reference: float = 0.0
+    _sums: Dict[int, float] = field(default_factory=dict)
+    _bb_sumsq: float = 0.0
+
+    def __post_init__(self):
+        self._resync()
+
+    @property
+    def window_size(self) -> int:
+        return max(*self.spec.sma_periods, self.spec.bb_period)
+
+    @property
+    def _ema_periods(self) -> List[int]:
+        spec = self.spec
+        return list(dict.fromkeys([*spec.ema_periods, spec.macd_fast, spec.macd_slow]))
+
+    @property
+    def _window_periods(self) -> List[int]:
+        return list(dict.fromkeys([*self.spec.sma_periods, self.spec.bb_period]))
+
+    def _resync(self) -> None:
+        """창 버퍼에서 창 합계 재계산 (첫 값 기준으로 중심화)"""
+        self._reference = self.window[0] if self.window else 0.0
+        centered = np.asarray(self.window, dtype=np.float64) - self._reference
+        self._sums = {p: float(centered[-p:].sum()) for p in self._window_periods}
+        bb = centered[-self.spec.bb_period:]
+        self._bb_sumsq = float((bb * bb).sum())
+
+    def _current(self) -> dict:
+        """현재 상태 (_step 결과와 같은 형식)"""
+        current = {name: getattr(self, name) for name in _SCALAR_FIELDS}
+        current.update(
+            ema=self.ema, _sums=self._sums, _bb_sumsq=self._bb_sumsq, _reference=self._reference,
+            stoch_k=self.stoch_k[-1] if self.stoch_k else None, stoch_d=self._stoch_d(self.stoch_k),
+        )
+        return current
+
+    def _stoch_d(self, k_window: Sequence[Optional[float]]) -> Optional[float]:
+        smooth = self.spec.stoch_smooth
+        if len(k_window) < smooth or any(k is None for k in k_window[-smooth:]):
+            return None
+        return sum(k_window[-smooth:]) / smooth
+
+    def _step(self, bar: Bar) -> dict:
+        """bar를 새 봉으로 반영한 다음 상태 계산 (상태는 바꾸지 않음)"""
+        spec = self.spec
+        close, high, low = bar.close, bar.high, bar.low
+        atr_alpha, adx_alpha = 1.0 / spec.atr_period, 1.0 / spec.adx_period
+        step = {"bars": self.bars + 1, "last_close": close, "last_high": high, "last_low": low}
+
+        if self.bars == 0:
+            true_range = high - low
+            step.update(
+                ema={p: close for p in self._ema_periods},
+                avg_gain=0.0, avg_loss=0.0, macd_signal=0.0,
+                atr=true_range, dmi_tr=true_range, plus_dm=0.0, minus_dm=0.0, obv=0.0,
+            )
+        else:
+            delta = close - self.last_close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            ema = {p: self.ema[p] + 2.0 / (p + 1) * (close - self.ema[p]) for p in self._ema_periods}
+            rsi_alpha = 2.0 / (spec.rsi_period + 1)
+            macd = ema[spec.macd_fast] - ema[spec.macd_slow]
+
+            true_range = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+            up, down = high - self.last_high, self.last_low - low
+            plus = up if up > down and up > 0 else 0.0
+            minus = down if down > up and down > 0 else 0.0
+            step.update(
+                ema=ema,
+                avg_gain=self.avg_gain + rsi_alpha * (gain - self.avg_gain),
+                avg_loss=self.avg_loss + rsi_alpha * (loss - self.avg_loss),
+                macd_signal=self.macd_signal + 2.0 / (spec.macd_signal + 1) * (macd - self.macd_signal),
+                atr=self.atr + atr_alpha * (true_range - self.atr),
+                dmi_tr=self.dmi_tr + adx_alpha * (true_range - self.dmi_tr),
+                plus_dm=self.plus_dm + adx_alpha * (plus - self.plus_dm),
+                minus_dm=self.minus_dm + adx_alpha * (minus - self.minus_dm),
+                obv=self.obv + (bar.volume if delta > 0 else -bar.volume if delta < 0 else 0.0),
+            )
+
+        # ADX: DX(정의되지 않으면 0)의 Wilder 평활, 첫 봉은 DX 그대로
+        plus_di, minus_di = _directional_index(step["plus_dm"], step["minus_dm"], step["dmi_tr"])
+        dx = 0.0
+        if plus_di is not None and plus_di + minus_di > 0:
+            dx = 100.0 * abs(plus_di - minus_di) / (plus_di + minus_di)
+        step["adx"] = dx if self.bars == 0 else self.adx + adx_alpha * (dx - self.adx)
+
+        # 앵커드 VWAP: 해가 바뀌면 누적을 다시 시작
+        year = bar.date.year if bar.date else self.vwap_year
+        same_segment = self.bars > 0 and year == self.vwap_year
+        typical = (high + low + close) / 3.0
+        step.update(
+            vwap_year=year,
+            vwap_pv=(self.vwap_pv if same_segment else 0.0) + typical * bar.volume,
+            vwap_volume=(self.vwap_volume if same_segment else 0.0) + bar.volume,
+        )
+
+        # 스토캐스틱: 최근 고가/저가 창
+        period = spec.stoch_period
+        highs, lows = self.highs[-(period - 1):] + [high], self.lows[-(period - 1):] + [low]
+        k = None
+        if len(highs) == period:
+            highest, lowest = max(highs), min(lows)
+            if highest > lowest:
+                k = 100.0 * (close - lowest) / (highest - lowest)
+        k_window = self.stoch_k[-(spec.stoch_smooth - 1):] + [k] if spec.stoch_smooth > 1 else [k]
+        step.update(stoch_k=k, stoch_d=self._stoch_d(k_window))
+
+        # 창 합계: 새 값 추가, 창을 벗어나는 값 제거 (버퍼가 비어 있으면 기준값은 새 종가)
+        reference = self._reference if self.window else close
+        x = close - reference
+        sums = {}
+        for p in self._window_periods:
+            outgoing = self.window[-p] - reference if len(self.window) >= p else 0.0
+            sums[p] = self._sums.get(p, 0.0) + x - outgoing
+        bb = spec.bb_period
+        outgoing = self.window[-bb] - reference if len(self.window) >= bb else 0.0
+        step.update(_sums=sums, _bb_sumsq=self._bb_sumsq + x * x - outgoing * outgoing, _reference=reference)
+        return step
+
+    def advance(self, bar: Bar) -> None:
+        """확정된 봉 하나 반영"""
+        step = self._step(bar)
+        for name in (*_SCALAR_FIELDS, "ema", "_sums", "_bb_sumsq", "_reference"):
+            setattr(self, name, step[name])
+        self.last_date = bar.date or self.last_date
+
+        spec = self.spec
+        for buffer, value, size in (
+            (self.window, bar.close, self.window_size),
+            (self.highs, bar.high, spec.stoch_period),
+            (self.lows, bar.low, spec.stoch_period),
+            (self.stoch_k, step["stoch_k"], spec.stoch_smooth),
+        ):
+            buffer.append(value)
+            if len(buffer) > size:
+                del buffer[0]
+
+    def advance_many(self, bars: Sequence[Bar]) -> None:
+        """확정된 봉 여러 개 반영"""
+        for bar in bars:
+            self.advance(bar)
+
+    def values(self) -> Optional[dict]:
+        """현재 상태의 지표 값 (calculate_all_indicators 형식, 봉이 부족하면 None)"""
+        if self.bars == 0:
+            return None
+        return self._format(self._current())
+
+    def peek(self, bar: Bar) -> Optional[dict]:
+        """진행 중인 봉을 반영했을 때의 지표 값 (상태 변경 없음)"""
+        return self._format(self._step(bar))
+
+    def _format(self, step: dict) -> Optional[dict]:
+        bars = step["bars"]
+        if bars < MIN_BARS:
+            return None
+        spec = self.spec
+        sums, reference, ema = step["_sums"], step["_reference"], step["ema"]
+
+        def sma(period: int) -> Optional[float]:
+            return sums[period] / period + reference if bars >= period else None
+
+        avg_gain, avg_loss = step["avg_gain"], step["avg_loss"]
+        if avg_loss > 0:
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        else:
+            rsi = 100.0 if avg_gain > 0 else None
+
+        macd = ema[spec.macd_fast] - ema[spec.macd_slow]
+        signal = step["macd_signal"]
+        middle = sma(spec.bb_period)
+        upper = lower = None
+        if middle is not None:
+            s = sums[spec.bb_period]
+            variance = max((step["_bb_sumsq"] - s * s / spec.bb_period) / (spec.bb_period - 1), 0.0)
+            std = variance ** 0.5
+            upper, lower = middle + spec.bb_std * std, middle - spec.bb_std * std
+
+        plus_di, minus_di = _directional_index(step["plus_dm"], step["minus_dm"], step["dmi_tr"])
+        vwap = step["vwap_pv"] / step["vwap_volume"] if step["vwap_volume"] > 0 else None
+
+        return {
+            'sma': {f'sma{p}': sma(p) for p in spec.sma_periods},
+            'ema': {f'ema{p}': ema[p] for p in spec.ema_periods},
+            'rsi': {f'rsi{spec.rsi_period}': rsi},
+            'macd': {'macd': macd, 'signal': signal, 'histogram': macd - signal},
+            'bollinger_bands': {'upper': upper, 'middle': middle, 'lower': lower},
+            'atr': {f'atr{spec.atr_period}': step["atr"]},
+            'stochastic': {'k': step["stoch_k"], 'd': step["stoch_d"]},
+            'dmi': {'plus_di': plus_di, 'minus_di': minus_di, 'adx': step["adx"]},
+            'volume': {'obv': step["obv"], 'vwap': vwap},
+        }
+
+    def to_json(self) -> str:
+        data = {name: getattr(self, name) for name in _SCALAR_FIELDS}
+        data.update(
+            ema={str(p): v for p, v in self.ema.items()},
+            window=self.window, highs=self.highs, lows=self.lows, stoch_k=self.stoch_k,
+        )
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, text: str, last_date: date, spec: IndicatorSpec = DEFAULT_SPEC) -> "IndicatorState":
+        data = json.loads(text)
+        return cls(
+            spec=spec,
+            last_date=last_date,
+            ema={int(p): v for p, v in data["ema"].items()},
+            window=list(data["window"]),
+            highs=list(data["highs"]),
+            lows=list(data["lows"]),
+            stoch_k=list(data["stoch_k"]),
+            **{name: data[name] for name in _SCALAR_FIELDS},
+        )
+
+
+def _directional_index(plus_dm: float, minus_dm: float, true_range: float) -> Tuple[Optional[float], Optional[float]]:
+    """평활 +DM/-DM/TR로 +DI, -DI 계산 (TR이 0이면 None)"""
+    if true_range <= 0:
+        return None, None
+    return 100.0 * plus_dm / true_range, 100.0 * minus_dm / true_range
+
+
+class IndicatorStateStore:
+    """지표 상태 영속화 + 일봉 동기화"""
+
+    def load(self, ticker: str, spec: IndicatorSpec = DEFAULT_SPEC) -> Optional[IndicatorState]:
+        """저장된 상태 조회 (없거나 읽기 실패 시 None, 기본 파라미터만 저장됨)"""
+        if spec != DEFAULT_SPEC:
+            return None
+        db = SessionLocal()
+        try:
+            row = IndicatorStateRepository(db).get(ticker, spec.key)
+            return IndicatorState.from_json(row.state, row.last_date, spec) if row else None
+        except Exception as e:
+            logger.warning(f"[IndicatorState] 상태 조회 실패 ({ticker}): {e}")
+            return None
+        finally:
+            db.close()
+
+    def save(self, ticker: str, state: IndicatorState) -> None:
+        """
+        상태 저장 (실패해도 조회 자체는 계속 진행)
+
+        사용자 지정 파라미터는 인증 없이 요청할 수 있어 조합마다 행이 늘어나므로
+        저장하지 않고, 1년 이력으로 계산한 결과를 메모 캐시(크기 제한)에만 둡니다.
+        """
+        if state.last_date is None or state.spec != DEFAULT_SPEC:
+            return
+        db = SessionLocal()
+        try:
+            IndicatorStateRepository(db).upsert(ticker, state.spec.key, state.last_date, state.bars, state.to_json())
+        except Exception as e:
+            logger.warning(f"[IndicatorState] 상태 저장 실패 ({ticker}): {e}")
+        finally:
+            db.close()
+
+    def sync(
+        self,
+        ticker: str,
+        state: Optional[IndicatorState],
+        bars: Sequence[Bar],
+        today: Optional[date] = None,
+        spec: IndicatorSpec = DEFAULT_SPEC,
+    ) -> Tuple[Optional[IndicatorState], Optional[dict]]:
+        """
+        일봉으로 상태를 갱신하고 최신 지표 값 반환
+
+        today 이전 날짜의 봉은 확정 봉으로 상태에 반영(저장)하고, today 날짜의 봉은
+        진행 중인 봉으로 보고 peek으로만 반영합니다.
+
+        Args:
+            state: 저장된 상태 (None이면 bars 전체로 새로 만듦)
+            bars: 날짜순 일봉 목록
+            today: 진행 중인 봉 기준 날짜 (기본값: 오늘)
+
+        Returns:
+            (갱신된 상태, 지표 값) - state의 마지막 날짜가 bars 범위 밖이거나 그 날짜의
+            종가가 저장된 종가와 다르면 (분할/배당으로 수정주가가 다시 계산된 경우)
+            이어서 계산할 수 없으므로 (None, None) (호출 측에서 긴 이력으로 다시 호출)
+        """
+        today = today or date.today()
+        final = [bar for bar in bars if bar.date < today]
+        in_progress = [bar for bar in bars if bar.date >= today]
+
+        if state is None:
+            state = IndicatorState(spec=spec)
+            new_bars = final
+        else:
+            if final and final[0].date > state.last_date:
+                return None, None  # 상태 이후 봉이 누락되어 이어서 계산 불가
+            anchor = next((bar for bar in final if bar.date == state.last_date), None)
+            if anchor is not None and state.last_close is not None and not math.isclose(
+                anchor.close, state.last_close, rel_tol=READJUST_TOLERANCE
+            ):
+                return None, None  # 저장된 상태와 가격 기준이 달라 이어서 계산 불가
+            new_bars = [bar for bar in final if bar.date > state.last_date]
+
+        if new_bars:
+            state.advance_many(new_bars)
+            self.save(ticker, state)
+            logger.debug(f"[IndicatorState] {ticker}: 봉 {len(new_bars)}개 반영 (누적 {state.bars})")
+
+        values = state.peek(in_progress[-1]) if in_progress else state.values()
+        return state, values
+
+    def latest_indicators(
+        self,
+        ticker: str,
+        fetch_history: Callable[[str], pd.DataFrame],
+        spec: IndicatorSpec = DEFAULT_SPEC,
+    ) -> Optional[dict]:
+        """
+        최신 기술적 지표 (calculate_all_indicators 형식)
+
+        1개월 이력을 받아 마지막 봉이 이전 계산과 같으면 메모된 결과를 그대로 반환합니다.
+        그렇지 않으면 저장된 상태에 새 봉을 반영하고, 상태가 없거나 오래되었거나
+        이어서 계산할 수 없으면 1년 이력으로 다시 만듭니다.
+
+        Args:
+            fetch_history: 기간 문자열('1mo', '1y')을 받아 history DataFrame을 반환하는 함수
+
+        Returns:
+            지표 dict (이력이 MIN_BARS보다 짧으면 None)
+        """
+        recent = fetch_history('1mo')
+        memo_key = indicator_memo.make_key(ticker, KIND_LATEST, spec.key, recent)
+        return indicator_memo.get_or_compute(memo_key, lambda: self._latest(ticker, recent, fetch_history, spec))
+
+    def _latest(
+        self,
+        ticker: str,
+        recent: pd.DataFrame,
+        fetch_history: Callable[[str], pd.DataFrame],
+        spec: IndicatorSpec,
+    ) -> Optional[dict]:
+        state = self.load(ticker, spec)
+        values = None
+        if state is not None and state.last_date >= date.today() - timedelta(days=RECENT_STATE_DAYS):
+            state, values = self.sync(ticker, state, bars_from_history(recent), spec=spec)
+        else:
+            state = None
+
+        if state is None:
+            logger.info(f"[IndicatorState] {ticker}: 1년 이력으로 상태 생성")
+            _, values = self.sync(ticker, None, bars_from_history(fetch_history('1y')), spec=spec)
+        return values
+
+
+# 전역 지표 상태 저장소 인스턴스
+indicator_state_store = IndicatorStateStore()
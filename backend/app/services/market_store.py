@@ -0,0 +1,201 @@
+"""
+로컬 시세 저장소 (일봉 이력 / 재무 스냅샷)
+
+종목 조회와 차트 조회에서 받은 history와 재무 지표를 price_history / fundamentals
+테이블에 저장해 두고, 스크리너가 업스트림(Yahoo Finance) 호출 없이 여러 티커를
+날짜 × 티커 (T, N) 배열로 읽어 쓸 수 있게 합니다.
+
+저장은 조회 흐름의 부수 효과이므로 실패해도 예외를 올리지 않고 경고만 남깁니다.
+"""
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.database.connection import SessionLocal
+from app.database.market_data_repository import MarketDataRepository
+from app.models.stock import StockData
+
+logger = logging.getLogger(__name__)
+
+# 재무 스냅샷으로 저장하는 FinancialsInfo 필드
+FUNDAMENTAL_FIELDS = (
+    "trailing_pe", "forward_pe", "pbr", "roe", "opm", "peg",
+    "debt_to_equity", "current_ratio", "quick_ratio",
+    "dividend_yield", "payout_ratio", "revenue_growth", "earnings_growth",
+)
+
+
+def _optional(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else float(value)
+
+
+class MarketDataStore:
+    """일봉 이력 / 재무 스냅샷 저장 및 배열 로드"""
+
+    def __init__(self):
+        # 저장된 값이 실제로 바뀔 때마다 증가 (스크리너 캐시 무효화 기준)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _bump(self) -> None:
+        with self._lock:
+            self.version += 1
+
+    def record_history(self, ticker: str, history_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        history DataFrame의 일봉 저장 (받은 DataFrame을 그대로 반환)
+
+        받은 봉을 모두 upsert하며 값이 바뀐 행만 실제로 씁니다. 분할/배당으로 수정주가가
+        다시 계산되면 과거 봉도 새 기준으로 덮어써서 저장된 이력의 가격 기준이 섞이지 않습니다.
+        """
+        if history_df is None or history_df.empty or 'close' not in history_df.columns:
+            return history_df
+        try:
+            frame = history_df
+            if isinstance(frame.index, pd.MultiIndex):
+                frame = frame.xs(frame.index.get_level_values(0)[0], level=0)
+            dates = pd.to_datetime(frame.index, utc=True).tz_localize(None).normalize().date
+            columns = [
+                frame[name].to_numpy(dtype=np.float64) if name in frame.columns else np.full(len(frame), np.nan)
+                for name in ('open', 'high', 'low', 'close', 'volume')
+            ]
+
+            db = SessionLocal()
+            try:
+                rows = [
+                    (d, *(_optional(column[i]) for column in columns))
+                    for i, d in enumerate(dates)
+                    if not np.isnan(columns[3][i])
+                ]
+                written = MarketDataRepository(db).upsert_history(ticker, rows)
+            finally:
+                db.close()
+
+            if written:
+                self._bump()
+                logger.debug(f"[MarketStore] {ticker.upper()}: 일봉 {written}개 저장")
+        except Exception as e:
+            logger.warning(f"[MarketStore] 일봉 저장 실패 ({ticker}): {e}")
+        return history_df
+
+    def record_fundamentals(self, stock_data: StockData) -> None:
+        """종목 조회 결과의 재무 지표 스냅샷 저장"""
+        financials = stock_data.financials
+        values = {name: _optional(getattr(financials, name, None)) for name in FUNDAMENTAL_FIELDS}
+        values.update(
+            name=stock_data.company.name if stock_data.company else None,
+            sector=stock_data.company.sector if stock_data.company else None,
+            industry=stock_data.company.industry if stock_data.company else None,
+            current_price=_optional(stock_data.price.current if stock_data.price else None),
+            market_cap=_optional(stock_data.market_cap),
+        )
+        db = SessionLocal()
+        try:
+            if MarketDataRepository(db).upsert_fundamentals(stock_data.ticker, values):
+                self._bump()
+        except Exception as e:
+            logger.warning(f"[MarketStore] 재무 스냅샷 저장 실패 ({stock_data.ticker}): {e}")
+        finally:
+            db.close()
+
+    def stored_tickers(self) -> List[str]:
+        """이력이 저장된 티커 목록"""
+        db = SessionLocal()
+        try:
+            return MarketDataRepository(db).history_tickers()
+        finally:
+            db.close()
+
+    def latest_date(self, tickers: Sequence[str]) -> Optional[np.datetime64]:
+        """티커들의 저장된 마지막 봉 날짜 (없으면 None)"""
+        db = SessionLocal()
+        try:
+            recent = MarketDataRepository(db).recent_dates([t.upper() for t in tickers], 1) if tickers else []
+        finally:
+            db.close()
+        return np.datetime64(recent[0], "D") if recent else None
+
+    def load_panel(
+        self, tickers: Sequence[str], bars: Optional[int]
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        저장된 일봉을 날짜 × 티커 배열로 로드
+
+        Args:
+            tickers: 대상 티커
+            bars: 최근 날짜 수 (None이면 저장된 전체)
+
+        Returns:
+            (tickers, dates, {'high', 'low', 'close', 'volume'})
+            - dates는 datetime64[D] (T,), 배열은 (T, N) (해당 날짜 봉이 없으면 NaN)
+            - tickers는 요청 순서를 유지하며 이력이 없는 티커는 열이 전부 NaN
+        """
+        tickers = [t.upper() for t in tickers]
+        db = SessionLocal()
+        try:
+            repository = MarketDataRepository(db)
+            recent = repository.recent_dates(tickers, bars) if tickers else []
+            rows = repository.load_history(tickers, min(recent)) if recent else []
+        finally:
+            db.close()
+        return self._to_panel(tickers, rows)
+
+    def load_panel_after(
+        self, tickers: Sequence[str], after: np.datetime64
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """after 다음 날부터 저장된 일봉만 load_panel과 같은 형식으로 로드 (스냅샷 이후 봉)"""
+        tickers = [t.upper() for t in tickers]
+        db = SessionLocal()
+        try:
+            since = (after + np.timedelta64(1, "D")).astype(object)
+            rows = MarketDataRepository(db).load_history(tickers, since) if tickers else []
+        finally:
+            db.close()
+        return self._to_panel(tickers, rows)
+
+    @staticmethod
+    def _to_panel(tickers: List[str], rows: Sequence[tuple]) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """(ticker, date, high, low, close, volume) 행 → 날짜 × 티커 배열"""
+        empty = {name: np.empty((0, len(tickers))) for name in ('high', 'low', 'close', 'volume')}
+        if not rows:
+            return tickers, np.empty(0, dtype='datetime64[D]'), empty
+
+        column_of = {ticker: i for i, ticker in enumerate(tickers)}
+        row_dates = np.array([row[1] for row in rows], dtype='datetime64[D]')  # 'YYYY-MM-DD'
+        dates, row_index = np.unique(row_dates, return_inverse=True)
+        column_index = np.fromiter((column_of[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+        values = np.array([row[2:] for row in rows], dtype=np.float64)  # None → NaN
+
+        arrays = {}
+        for i, name in enumerate(('high', 'low', 'close', 'volume')):
+            array = np.full((len(dates), len(tickers)), np.nan)
+            array[row_index, column_index] = values[:, i]
+            arrays[name] = array
+        return tickers, dates, arrays
+
+    def load_fundamentals(self, tickers: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        재무 스냅샷을 필드별 (N,) 배열로 로드 (스냅샷이 없거나 값이 없으면 NaN)
+        """
+        tickers = [t.upper() for t in tickers]
+        db = SessionLocal()
+        try:
+            rows = MarketDataRepository(db).load_fundamentals(tickers)
+        finally:
+            db.close()
+
+        column_of = {ticker: i for i, ticker in enumerate(tickers)}
+        arrays = {name: np.full(len(tickers), np.nan) for name in ("market_cap", *FUNDAMENTAL_FIELDS)}
+        for row in rows:
+            for name, array in arrays.items():
+                value = getattr(row, name)
+                if value is not None:
+                    array[column_of[row.ticker]] = value
+        return arrays
+
+
+# 전역 시세 저장소 인스턴스
+market_store = MarketDataStore()
@@ -0,0 +1,231 @@
+"""
+포트폴리오 일괄 AI 분석 (단일 Gemini 호출)
+
+보유 종목마다 분석을 따로 실행하면 같은 시스템 역할 지시문이 종목 수만큼
+반복되고 호출도 종목 수만큼 발생합니다. 여기서는 모든 보유 종목을 한 장의
+압축 표로 만들어 한 번의 JSON 스키마 호출로 종목별 섹션과 자산 배분 관점을 받습니다.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from app.models.portfolio import AllocationItem, AllocationView, HoldingAnalysis
+from app.models.stock import StockData
+from app.services.prompt_builder import KIND_BIG, KIND_NUMBER, KIND_PERCENT, format_value, render_table
+
+# 종목별 투자 의견 선택지
+HOLDING_OPINIONS = ["매수", "보유", "비중축소"]
+
+# Gemini response_schema (OpenAPI 부분집합: type/properties/required/items/enum/nullable)
+PORTFOLIO_REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overview": {"type": "string"},
+        "holdings": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "ticker": {"type": "string"},
+                    "opinion": {"type": "string", "enum": HOLDING_OPINIONS},
+                    "summary": {"type": "string"},
+                    "action": {"type": "string"},
+                },
+                "required": ["ticker", "opinion", "summary"],
+            },
+        },
+        "allocation": {
+            "type": "object",
+            "properties": {
+                "assessment": {"type": "string"},
+                "concentration_risks": {"type": "array", "items": {"type": "string"}},
+                "suggestions": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["assessment"],
+        },
+    },
+    "required": ["overview", "holdings", "allocation"],
+}
+
+PORTFOLIO_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": PORTFOLIO_REPORT_SCHEMA,
+}
+
+# 프롬프트 표 컬럼: (라벨, 표기 방식)
+_TABLE_COLUMNS = [
+    ("Ticker", KIND_NUMBER),
+    ("Last", KIND_NUMBER),
+    ("Avg", KIND_NUMBER),
+    ("P/L%", KIND_NUMBER),
+    ("Wt%", KIND_NUMBER),
+    ("MktCap", KIND_BIG),
+    ("PER", KIND_NUMBER),
+    ("PBR", KIND_NUMBER),
+    ("ROE", KIND_PERCENT),
+    ("OPM", KIND_PERCENT),
+    ("D/E%", KIND_NUMBER),
+    ("RevG", KIND_PERCENT),
+    ("RSI14", KIND_NUMBER),
+    ("SMA50", KIND_NUMBER),
+    ("SMA200", KIND_NUMBER),
+]
+
+
+@dataclass(frozen=True)
+class PortfolioHolding:
+    """분석 대상 보유 종목 (PortfolioDB 행에서 필요한 값만 추출)"""
+    ticker: str
+    purchase_price: Optional[float] = None
+    quantity: Optional[int] = None
+
+
+def portfolio_fingerprint(holdings: Sequence[PortfolioHolding]) -> str:
+    """
+    보유 종목 구성 지문 (티커/평단가/수량 기준)
+
+    순서와 무관하며, 구성이 바뀌면 지문이 바뀌어 캐시가 자동으로 무효화됩니다.
+    """
+    payload = sorted(
+        (h.ticker.upper(), None if h.purchase_price is None else round(float(h.purchase_price), 4), h.quantity)
+        for h in holdings
+    )
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16]
+
+
+def compute_allocation(
+    holdings: Sequence[PortfolioHolding], stock_data: Dict[str, StockData]
+) -> AllocationView:
+    """현재가 기준 평가금액/비중/수익률 계산 (수량이 없는 종목은 비중 제외)"""
+    items: List[AllocationItem] = []
+    for holding in holdings:
+        data = stock_data.get(holding.ticker)
+        current = data.price.current if data else None
+        market_value = current * holding.quantity if current is not None and holding.quantity else None
+        profit = (
+            (current - holding.purchase_price) / holding.purchase_price * 100
+            if current is not None and holding.purchase_price else None
+        )
+        items.append(AllocationItem(
+            ticker=holding.ticker,
+            current_price=current,
+            market_value=None if market_value is None else round(market_value, 2),
+            profit_percent=None if profit is None else round(profit, 2),
+        ))
+
+    total = sum(item.market_value for item in items if item.market_value is not None)
+    if total > 0:
+        for item in items:
+            if item.market_value is not None:
+                item.weight = round(item.market_value / total * 100, 2)
+
+    items.sort(key=lambda item: item.market_value or 0.0, reverse=True)
+    return AllocationView(total_value=round(total, 2), items=items)
+
+
+def build_portfolio_prompt(
+    holdings: Sequence[PortfolioHolding], stock_data: Dict[str, StockData], allocation: AllocationView
+) -> str:
+    """보유 종목 전체를 한 장의 표로 압축한 일괄 분석 프롬프트"""
+    alloc_by_ticker = {item.ticker: item for item in allocation.items}
+    rows = []
+    for holding in holdings:
+        data = stock_data.get(holding.ticker)
+        if data is None:
+            continue
+        alloc = alloc_by_ticker[holding.ticker]
+        tech = data.technical_indicators
+        rows.append({
+            "Ticker": holding.ticker,
+            "Last": data.price.current,
+            "Avg": holding.purchase_price,
+            "P/L%": alloc.profit_percent,
+            "Wt%": alloc.weight,
+            "MktCap": data.market_cap,
+            "PER": data.financials.trailing_pe,
+            "PBR": data.financials.pbr,
+            "ROE": data.financials.roe,
+            "OPM": data.financials.opm,
+            "D/E%": data.financials.debt_to_equity,
+            "RevG": data.financials.revenue_growth,
+            "RSI14": tech.rsi.rsi14 if tech and tech.rsi else None,
+            "SMA50": tech.sma.sma50 if tech and tech.sma else None,
+            "SMA200": tech.sma.sma200 if tech and tech.sma else None,
+        })
+
+    return f"""
+### [System Role]
+너는 20년 경력의 베테랑 주식 분석가이자 포트폴리오 매니저야. 아래 표는 한 투자자의 전체 보유 종목이야.
+각 종목을 간결하게 평가하고, 포트폴리오 전체의 자산 배분 관점에서 조언해줘.
+
+### [Holdings] (총 평가금액: {format_value(allocation.total_value, KIND_BIG)}, 표시 없음: -)
+{render_table(_TABLE_COLUMNS, rows)}
+
+### [Task Guidelines]
+1. **overview**: 포트폴리오 전체의 성격(성장/가치/배당 등), 수익 현황, 시장 위험 노출을 2~4문장으로 요약해줘.
+2. **holdings**: 표의 모든 종목마다 하나씩 작성해줘. opinion은 '매수/보유/비중축소' 중 하나,
+   summary는 밸류에이션·재무·기술적 관점의 핵심 1~2문장, action은 평단가와 비중을 고려한 구체적 대응 1문장.
+3. **allocation**: assessment에 종목/섹터 집중도와 분산 수준을 평가하고,
+   concentration_risks에 집중 리스크, suggestions에 비중 조절 제안을 각각 2~3개 작성해줘.
+
+### [Output Format]
+지정된 JSON 스키마로만, 모든 문장은 한국어로 간결하게 작성해줘.
+"""
+
+
+def parse_portfolio_report(text: str, tickers: Sequence[str]) -> dict:
+    """
+    Gemini JSON 응답 파싱
+
+    표에 없는 티커의 섹션은 버리고, 누락된 종목은 응답에 없는 그대로 둡니다.
+
+    Returns:
+        {"overview": str, "holdings": List[HoldingAnalysis], "allocation": dict}
+
+    Raises:
+        ValueError: 응답이 스키마에 맞지 않는 경우
+    """
+    try:
+        payload = json.loads(text)
+        known = {ticker.upper() for ticker in tickers}
+        holdings = [
+            HoldingAnalysis.model_validate({**item, "ticker": item["ticker"].upper()})
+            for item in payload["holdings"]
+            if item.get("ticker", "").upper() in known
+        ]
+        allocation = payload.get("allocation") or {}
+        return {
+            "overview": str(payload["overview"]),
+            "holdings": holdings,
+            "allocation": {
+                "assessment": str(allocation.get("assessment", "")),
+                "concentration_risks": [str(risk) for risk in allocation.get("concentration_risks", [])],
+                "suggestions": [str(tip) for tip in allocation.get("suggestions", [])],
+            },
+        }
+    except Exception as e:
+        raise ValueError(f"Gemini 포트폴리오 분석 응답 파싱 실패: {str(e)}")
+
+
+def render_portfolio_markdown(overview: str, holdings: Sequence[HoldingAnalysis], allocation: AllocationView) -> str:
+    """일괄 분석 결과를 마크다운 보고서로 렌더링"""
+    sections = ["## 📊 포트폴리오 종합 평가", overview, "## 📌 종목별 분석"]
+    for holding in holdings:
+        sections.append(f"### {holding.ticker} — {holding.opinion}\n\n{holding.summary}")
+        if holding.action:
+            sections.append(f"**대응 전략**: {holding.action}")
+
+    weights = "\n".join(
+        f"- {item.ticker}: {item.weight:.1f}%" for item in allocation.items if item.weight is not None
+    )
+    sections += [
+        "## ⚖️ 자산 배분",
+        weights or "- 수량 정보가 없어 비중을 계산할 수 없습니다.",
+        allocation.assessment or "N/A",
+    ]
+    if allocation.concentration_risks:
+        sections.append("**집중 리스크**\n\n" + "\n".join(f"- {risk}" for risk in allocation.concentration_risks))
+    if allocation.suggestions:
+        sections.append("**비중 조절 제안**\n\n" + "\n".join(f"- {tip}" for tip in allocation.suggestions))
+    return "\n\n".join(sections)
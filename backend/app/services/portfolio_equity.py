@@ -0,0 +1,321 @@
+"""
+포트폴리오 자산곡선 (매수일 이후 일별 평가금액)
+
+보유 종목의 수량과 매수일(purchase_date, 없으면 등록일)로 날짜 × 티커 보유 여부를 만들고,
+로컬 시세 저장소의 종가와 곱해 일별 평가금액을 계산합니다 (NumPy 벡터 연산).
+
+- 평가금액 / 투입금액: 매수일부터 수량 × 종가, 매수 시점 금액(평단가 × 수량, 없으면 매수일 종가)
+- 수익률 지수: 새로 매수한 금액을 현금 유입으로 빼고 계산한 시간가중 수익률 (기준 100)
+- 낙폭: 수익률 지수의 고점 대비 하락률
+- 종목별 기여: 종목별 평가손익과 전체 투입금액 대비 기여율
+
+계산한 곡선은 사용자별로 메모리에 보관하고, 다음 조회에서는 마지막 봉(장중에 바뀔 수 있음)
+부터만 다시 계산해 이어 붙입니다. 보유 구성(티커/수량/매수일/평단가)이 바뀌면 처음부터 계산합니다.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.database.repository import PortfolioRepository
+from app.services.backtest import PERIOD_BARS, backtest_service
+from app.services.market_store import market_store
+from app.services.portfolio_risk import load_aligned_closes
+
+logger = logging.getLogger(__name__)
+
+# 보관할 사용자별 곡선 수
+MAX_CACHED_CURVES = 256
+# 저장된 마지막 봉이 이보다 오래되면 업스트림에서 다시 받음 (일)
+STALE_DAYS = 4
+
+
+@dataclass(frozen=True)
+class EquityHolding:
+    """자산곡선 계산 대상 보유 종목"""
+    ticker: str
+    quantity: int
+    start: np.datetime64  # 매수일 (datetime64[D])
+    purchase_price: Optional[float] = None
+
+
+@dataclass
+class EquityCurveState:
+    """계산된 자산곡선 (다음 조회에서 이어 붙이기 위한 상태 포함)"""
+    fingerprint: str
+    holdings: Tuple[EquityHolding, ...]  # 과거 데이터가 있는 보유 종목
+    missing: List[str]  # 과거 데이터를 찾을 수 없는 티커
+    dates: np.ndarray  # (T,) datetime64[D]
+    equity: np.ndarray  # (T,) 평가금액
+    invested: np.ndarray  # (T,) 누적 투입금액
+    index: np.ndarray  # (T,) 시간가중 수익률 지수 (기준 1)
+    closes: np.ndarray  # (2, N) 마지막 두 봉의 종가 (빈 값은 직전 종가로 채움)
+    costs: np.ndarray  # (N,) 종목별 매수 금액 (매수일 전이면 NaN)
+
+
+def holdings_fingerprint(holdings: Sequence[EquityHolding]) -> str:
+    """보유 구성 지문 (티커/수량/매수일/평단가, 순서 무관)"""
+    payload = sorted(
+        (h.ticker, h.quantity, str(h.start), None if h.purchase_price is None else round(h.purchase_price, 4))
+        for h in holdings
+    )
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16]
+
+
+def _forward_fill(closes: np.ndarray, seed: Optional[np.ndarray] = None) -> np.ndarray:
+    """티커별 빈 종가를 직전 값으로 채움 (seed: 첫 행 이전 종가)"""
+    if seed is not None:
+        closes = np.vstack([seed, closes])
+    index = np.where(~np.isnan(closes), np.arange(len(closes))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    filled = closes[index, np.arange(closes.shape[1])]
+    return filled[1:] if seed is not None else filled
+
+
+def compute_curve(
+    dates: np.ndarray,
+    closes: np.ndarray,
+    holdings: Sequence[EquityHolding],
+    previous: Optional[Tuple[np.datetime64, float, float, float]] = None,
+    costs: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    자산곡선 계산 (closes는 빈 값이 채워진 (T, N) 종가)
+
+    Args:
+        previous: 이어 붙일 때 직전 봉의 (날짜, 평가금액, 투입금액, 수익률 지수)
+        costs: 이어 붙일 때 이미 확정된 종목별 매수 금액 (NaN이면 아직 매수 전)
+
+    Returns:
+        equity, invested, index (각 (T,)), costs (N,)
+    """
+    quantities = np.array([h.quantity for h in holdings], dtype=np.float64)
+    starts = np.array([h.start for h in holdings], dtype="datetime64[D]")
+    purchase_prices = np.array(
+        [np.nan if h.purchase_price is None else h.purchase_price for h in holdings], dtype=np.float64
+    )
+    prev_date, prev_value, prev_invested, prev_index = previous or (None, 0.0, 0.0, 1.0)
+
+    held = dates[:, None] >= starts[None, :]
+    was_held = np.vstack([
+        starts[None, :] <= prev_date if prev_date is not None else np.zeros((1, len(holdings)), bool),
+        held[:-1],
+    ])
+    bought = held & ~was_held  # 매수일 이후 첫 봉
+    positions = np.where(held, quantities, 0.0)
+    values = np.nan_to_num(positions * closes)
+    equity = values.sum(axis=1)
+
+    # 매수 금액: 평단가 × 수량 (없으면 매수일 종가)
+    costs = np.full(len(holdings), np.nan) if costs is None else costs.copy()
+    rows, columns = np.nonzero(bought)
+    entry_close = closes[rows, columns]
+    entry_price = np.where(np.isnan(purchase_prices[columns]), entry_close, purchase_prices[columns])
+    costs[columns] = entry_price * quantities[columns]
+    invested = prev_invested + np.cumsum(np.bincount(rows, np.nan_to_num(entry_price * quantities[columns]), len(dates)))
+
+    # 새로 매수한 종목의 당일 평가금액은 현금 유입으로 보고 수익률에서 제외
+    flows = np.nan_to_num(np.where(bought, positions * closes, 0.0)).sum(axis=1)
+    before = np.concatenate([[prev_value], equity[:-1]])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(before > 0, (equity - flows) / before - 1.0, 0.0)
+    index = prev_index * np.cumprod(1.0 + returns)
+    return {"equity": equity, "invested": invested, "index": index, "costs": costs}
+
+
+def _period_for(start: np.datetime64) -> str:
+    """start부터 오늘까지 담는 가장 짧은 기간"""
+    needed = int(np.busday_count(start, np.datetime64(date.today(), "D"))) + 5
+    for period, bars in PERIOD_BARS.items():
+        if bars is None or bars >= needed:
+            return period
+    return "max"
+
+
+def _round_list(values: np.ndarray, digits: int = 2) -> List[float]:
+    return np.round(values, digits).tolist()
+
+
+class PortfolioEquityService:
+    """사용자 포트폴리오 자산곡선 (사용자별 곡선 보관 후 새 봉만 이어서 계산)"""
+
+    def __init__(self):
+        self._curves: "OrderedDict[int, EquityCurveState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def curve(self, db: Session, user_id: int) -> dict:
+        """
+        매수일 이후 일별 자산곡선
+
+        Returns:
+            PortfolioEquityCurve 형식 dict
+
+        Raises:
+            ValueError: 수량이 있는 보유 종목이 없거나 과거 데이터를 찾을 수 없는 경우
+        """
+        holdings, excluded = [], []
+        for p in PortfolioRepository.get_all(db, user_id):
+            if not p.quantity:
+                excluded.append(p.ticker)
+                continue
+            start = p.purchase_date or (p.created_at.date() if p.created_at else date.today())
+            holdings.append(EquityHolding(
+                ticker=p.ticker.upper(),
+                quantity=p.quantity,
+                start=np.datetime64(start, "D"),
+                purchase_price=float(p.purchase_price) if p.purchase_price is not None else None,
+            ))
+        if not holdings:
+            raise ValueError("수량이 입력된 보유 종목이 없습니다.")
+        holdings.sort(key=lambda h: h.ticker)
+        fingerprint = holdings_fingerprint(holdings)
+
+        with self._lock:
+            state = self._curves.get(user_id)
+        if state is None or state.fingerprint != fingerprint:
+            state = self._build(holdings, fingerprint)
+            recomputed = len(state.dates)
+        else:
+            state, recomputed = self._extend(state)
+        with self._lock:
+            self._curves[user_id] = state
+            self._curves.move_to_end(user_id)
+            while len(self._curves) > MAX_CACHED_CURVES:
+                self._curves.popitem(last=False)
+
+        return self._render(state, excluded, recomputed)
+
+    def _build(self, holdings: Sequence[EquityHolding], fingerprint: str) -> EquityCurveState:
+        """처음부터 계산 (기간 이력이 부족하면 하루 한 번 업스트림에서 받아 저장)"""
+        start = min(h.start for h in holdings)
+        names, dates, closes, missing = load_aligned_closes([h.ticker for h in holdings], _period_for(start))
+        holdings = [h for h in holdings if h.ticker in names]
+        if not len(dates) or not holdings:
+            raise ValueError("보유 종목의 과거 데이터를 찾을 수 없습니다.")
+        start = min(h.start for h in holdings)
+        aligned = closes[:, [names.index(h.ticker) for h in holdings]]
+        rows = dates >= start
+        if not rows.any():
+            raise ValueError("매수일 이후 저장된 가격 이력이 없습니다.")
+        dates = dates[rows]
+        filled = _forward_fill(aligned)[rows]
+
+        curve = compute_curve(dates, filled, holdings)
+        state = EquityCurveState(
+            fingerprint=fingerprint,
+            holdings=tuple(holdings),
+            missing=missing,
+            dates=dates,
+            equity=curve["equity"],
+            invested=curve["invested"],
+            index=curve["index"],
+            closes=filled[-2:] if len(filled) > 1 else np.vstack([filled[-1:], filled[-1:]]),
+            costs=curve["costs"],
+        )
+        return state
+
+    def _extend(self, state: EquityCurveState) -> Tuple[EquityCurveState, int]:
+        """
+        마지막 봉부터 다시 계산해 이어 붙임
+
+        마지막 봉은 장중에 종가가 바뀔 수 있으므로 항상 새로 읽습니다.
+        """
+        tickers = [h.ticker for h in state.holdings]
+        last = state.dates[-1]
+        if (np.datetime64(date.today(), "D") - last).astype(int) > STALE_DAYS:
+            for ticker in tickers:
+                try:
+                    backtest_service.load_closes(ticker, "1y")  # 오래되었으면 업스트림에서 받아 저장
+                except ValueError as e:
+                    if "요청 제한 초과" in str(e):
+                        raise
+
+        latest = market_store.latest_date(tickers)
+        if latest is None or latest < last:
+            return state, 0
+        bars = int(np.busday_count(last, latest)) + 5
+        _, dates, arrays = market_store.load_panel(tickers, bars)
+        rows = dates >= last
+        dates = dates[rows]
+        if not len(dates):
+            return state, 0
+        tail = _forward_fill(arrays["close"][rows], seed=state.closes[0])
+
+        # 마지막 봉 이전 상태에서 다시 시작
+        keep = len(state.dates) - 1
+        previous = (
+            (state.dates[keep - 1], state.equity[keep - 1], state.invested[keep - 1], state.index[keep - 1])
+            if keep > 0 else None
+        )
+        curve = compute_curve(dates, tail, state.holdings, previous, state.costs)
+
+        closes = np.vstack([state.closes[0], tail])[-2:]
+        state = EquityCurveState(
+            fingerprint=state.fingerprint,
+            holdings=state.holdings,
+            missing=state.missing,
+            dates=np.concatenate([state.dates[:keep], dates]),
+            equity=np.concatenate([state.equity[:keep], curve["equity"]]),
+            invested=np.concatenate([state.invested[:keep], curve["invested"]]),
+            index=np.concatenate([state.index[:keep], curve["index"]]),
+            closes=closes,
+            costs=curve["costs"],
+        )
+        return state, len(dates)
+
+    @staticmethod
+    def _render(state: EquityCurveState, excluded: List[str], recomputed: int) -> dict:
+        holdings = state.holdings
+        drawdown = state.index / np.maximum.accumulate(state.index) - 1.0
+        quantities = np.array([h.quantity for h in holdings], dtype=np.float64)
+        held = state.dates[-1] >= np.array([h.start for h in holdings], dtype="datetime64[D]")
+        market_values = np.where(held, np.nan_to_num(quantities * state.closes[-1]), 0.0)
+        profit = np.where(held & ~np.isnan(state.costs), market_values - state.costs, np.nan)
+        invested = float(state.invested[-1])
+        total_profit = float(np.nansum(profit))
+
+        contributions = [
+            {
+                "ticker": h.ticker,
+                "start_date": h.start.astype(object),
+                "quantity": h.quantity,
+                "cost_basis": None if np.isnan(state.costs[i]) else round(float(state.costs[i]), 2),
+                "market_value": round(float(market_values[i]), 2),
+                "profit_loss": None if np.isnan(profit[i]) else round(float(profit[i]), 2),
+                "contribution_pct": (
+                    round(float(profit[i] / invested * 100), 2) if invested > 0 and not np.isnan(profit[i]) else None
+                ),
+            }
+            for i, h in enumerate(holdings)
+        ]
+        contributions.sort(key=lambda c: c["profit_loss"] if c["profit_loss"] is not None else 0.0, reverse=True)
+
+        return {
+            "start_date": state.dates[0].astype(object),
+            "as_of": state.dates[-1].astype(object),
+            "dates": state.dates.astype(object).tolist(),
+            "equity": _round_list(state.equity),
+            "invested": _round_list(state.invested),
+            "index": _round_list(state.index * 100, 4),
+            "drawdown_pct": _round_list(drawdown * 100, 4),
+            "market_value": round(float(state.equity[-1]), 2),
+            "total_invested": round(invested, 2),
+            "profit_loss": round(total_profit, 2),
+            "time_weighted_return_pct": round(float(state.index[-1] - 1.0) * 100, 2),
+            "max_drawdown_pct": round(float(drawdown.min()) * 100, 2),
+            "contributions": contributions,
+            "excluded": excluded,
+            "missing": state.missing,
+            "recomputed_bars": recomputed,
+        }
+
+
+# 전역 포트폴리오 자산곡선 서비스 인스턴스
+portfolio_equity_service = PortfolioEquityService()
@@ -0,0 +1,284 @@
+"""
+포트폴리오 리스크 분석
+
+보유 종목과 벤치마크 지수의 일봉을 로컬 시세 저장소에서 날짜 × 티커 배열로 맞춘 뒤
+일간 수익률로 다음을 계산합니다 (모두 NumPy 벡터 연산).
+
+- 공분산 / 상관계수 행렬 (연환산)
+- 종목별 / 포트폴리오 베타 (벤치마크 대비)
+- 포트폴리오 변동성
+- 1일 VaR / CVaR (과거 수익률 분위수, 정규분포 가정)
+- 종목별 한계 / 기여 리스크 (변동성 기여분)
+
+비중은 마지막 종가 × 수량 기준이며, 수량이 하나도 없으면 동일 비중으로 계산합니다.
+결과는 (보유 구성 지문, 날짜, 파라미터) 단위로 캐시하므로 같은 날 다시 조회하면 계산하지 않습니다.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.repository import PortfolioRepository
+from app.services.backtest import PERIOD_BARS, backtest_service
+from app.services.market_store import market_store
+from app.services.portfolio_analysis import PortfolioHolding, portfolio_fingerprint
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+# 수익률 계산에 필요한 최소 공통 봉 수
+MIN_OBSERVATIONS = 60
+# 기간 중 봉이 이 비율보다 적은 종목은 제외 (상장 직후 등)
+MIN_TICKER_COVERAGE = 0.8
+# 리스크 결과 캐시 최대 항목 수 (오래 쓰지 않은 항목부터 제거)
+RISK_CACHE_MAX_SIZE = 256
+
+
+def load_aligned_closes(
+    tickers: Sequence[str], period: str
+) -> Tuple[List[str], np.ndarray, np.ndarray, List[str]]:
+    """
+    기간 종가를 날짜 × 티커 배열로 정렬 (저장된 이력이 부족하면 하루 한 번 업스트림에서 받아 저장)
+
+    Returns:
+        (tickers, dates, closes (T, N), missing) - 데이터를 받을 수 없는 티커는 missing으로 분리
+    """
+    available, missing = [], []
+    for ticker in tickers:
+        try:
+            backtest_service.load_closes(ticker, period)
+            available.append(ticker.upper())
+        except ValueError as e:
+            if "요청 제한 초과" in str(e):
+                raise
+            missing.append(ticker.upper())
+    names, dates, arrays = market_store.load_panel(available, PERIOD_BARS[period])
+    return names, dates, arrays["close"], missing
+
+
+def _fill_gaps(closes: np.ndarray) -> np.ndarray:
+    """티커별로 중간에 빠진 봉을 직전 종가로 채움 (거래소 휴장일 차이 등)"""
+    index = np.where(~np.isnan(closes), np.arange(len(closes))[:, None], 0)
+    np.maximum.accumulate(index, axis=0, out=index)
+    return closes[index, np.arange(closes.shape[1])]  # 첫 봉 이전은 NaN 그대로
+
+
+def compute_risk(
+    returns: np.ndarray,
+    benchmark_returns: np.ndarray,
+    weights: np.ndarray,
+    confidence: float = 0.95,
+) -> dict:
+    """
+    일간 수익률 행렬로 리스크 지표 계산
+
+    Args:
+        returns: (T, N) 종목 일간 수익률
+        benchmark_returns: (T,) 벤치마크 일간 수익률
+        weights: (N,) 비중 (합 1)
+        confidence: VaR 신뢰수준 (예: 0.95)
+
+    Returns:
+        covariance / correlation (연환산 N×N), betas, volatilities, portfolio_* 지표,
+        var/cvar (1일 손실률, 양수), marginal / component 리스크
+    """
+    observations = len(returns)
+    demeaned = returns - returns.mean(axis=0)
+    covariance = demeaned.T @ demeaned / (observations - 1)  # 일간
+    volatilities = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.outer(volatilities, volatilities)
+    np.fill_diagonal(correlation, 1.0)
+
+    bench_demeaned = benchmark_returns - benchmark_returns.mean()
+    bench_variance = bench_demeaned @ bench_demeaned / (observations - 1)
+    betas = demeaned.T @ bench_demeaned / (observations - 1) / bench_variance
+
+    portfolio_returns = returns @ weights
+    portfolio_variance = weights @ covariance @ weights
+    portfolio_volatility = float(np.sqrt(portfolio_variance))
+
+    # 과거 수익률 VaR / CVaR (분위수 이하 평균)
+    tail = 1.0 - confidence
+    threshold = float(np.quantile(portfolio_returns, tail))
+    var_historical = -threshold
+    cvar_historical = -float(portfolio_returns[portfolio_returns <= threshold].mean())
+
+    # 정규분포 가정 VaR / CVaR
+    mean = float(portfolio_returns.mean())
+    normal = NormalDist()
+    z = normal.inv_cdf(tail)
+    var_parametric = -(mean + z * portfolio_volatility)
+    cvar_parametric = -(mean - portfolio_volatility * normal.pdf(z) / tail)
+
+    # 한계 리스크 (∂σ/∂w) 와 기여 리스크 (w × 한계, 합 = σ)
+    marginal = covariance @ weights / portfolio_volatility if portfolio_volatility > 0 else np.zeros_like(weights)
+    component = weights * marginal
+
+    annual = np.sqrt(TRADING_DAYS)
+    return {
+        "covariance": covariance * TRADING_DAYS,
+        "correlation": correlation,
+        "betas": betas,
+        "volatilities": volatilities * annual,
+        "portfolio_volatility": portfolio_volatility * annual,
+        "portfolio_beta": float(weights @ betas),
+        "benchmark_volatility": float(np.sqrt(bench_variance) * annual),
+        "var_historical": var_historical,
+        "cvar_historical": cvar_historical,
+        "var_parametric": var_parametric,
+        "cvar_parametric": cvar_parametric,
+        "marginal": marginal * annual,
+        "component": component * annual,
+        "component_share": component / portfolio_volatility if portfolio_volatility > 0 else component,
+    }
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits) + 0.0  # -0.0 → 0.0
+
+
+class PortfolioRiskService:
+    """보유 종목 리스크 분석 (보유 구성 지문 × 날짜 단위 캐시)"""
+
+    def __init__(self):
+        # (지문, 날짜, 기간, 신뢰수준, 벤치마크) → 결과 (LRU)
+        self._cache: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(
+        self,
+        db: Session,
+        user_id: int,
+        period: str = "1y",
+        confidence: float = 0.95,
+        benchmark: Optional[str] = None,
+    ) -> dict:
+        """
+        사용자 포트폴리오 리스크 분석
+
+        Returns:
+            PortfolioRisk 형식 dict
+
+        Raises:
+            ValueError: 보유 종목이 없거나, 공통 이력이 부족하거나, 벤치마크 데이터를 받을 수 없는 경우
+        """
+        if period not in PERIOD_BARS or PERIOD_BARS[period] is None:
+            raise ValueError(f"지원하지 않는 기간입니다: {period}")
+        if not 0 < confidence < 1:
+            raise ValueError("신뢰수준은 0과 1 사이여야 합니다.")
+        # 거의 같은 신뢰수준이 캐시 항목을 따로 만들지 않도록 소수 셋째 자리로 맞춤
+        confidence = round(confidence, 3)
+        benchmark = (benchmark or "").strip().upper() or settings.risk_benchmark.upper()
+        holdings = [
+            PortfolioHolding(
+                ticker=p.ticker,
+                purchase_price=float(p.purchase_price) if p.purchase_price is not None else None,
+                quantity=p.quantity,
+            )
+            for p in PortfolioRepository.get_all(db, user_id)
+        ]
+        if not holdings:
+            raise ValueError("포트폴리오에 보유 종목이 없습니다.")
+
+        today = date.today()
+        key = (portfolio_fingerprint(holdings), today, period, confidence, benchmark)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        result = self._compute(holdings, period, confidence, benchmark)
+        with self._lock:
+            # 지난 날짜 결과 정리
+            for stale in [k for k in self._cache if k[1] != today]:
+                del self._cache[stale]
+            self._cache[key] = result
+            while len(self._cache) > RISK_CACHE_MAX_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def _compute(self, holdings: Sequence[PortfolioHolding], period: str, confidence: float, benchmark: str) -> dict:
+        quantities = {h.ticker.upper(): h.quantity for h in holdings}
+        names, dates, closes, missing = load_aligned_closes(list(dict.fromkeys([*quantities, benchmark])), period)
+        if benchmark not in names:
+            raise ValueError(f"벤치마크 '{benchmark}'의 과거 데이터를 찾을 수 없습니다.")
+
+        closes = _fill_gaps(closes)
+        bench = closes[:, names.index(benchmark)]
+        tickers = [name for name in names if name != benchmark or name in quantities]
+        columns = [names.index(t) for t in tickers]
+        closes = closes[:, columns]
+
+        # 기간 대비 이력이 너무 짧은 종목 제외 후, 모두 값이 있는 날짜만 사용
+        coverage = (~np.isnan(closes)).mean(axis=0)
+        keep = coverage >= MIN_TICKER_COVERAGE
+        excluded = [t for t, k in zip(tickers, keep) if not k]
+        tickers = [t for t, k in zip(tickers, keep) if k]
+        closes = closes[:, keep]
+        rows = ~np.isnan(closes).any(axis=1) & ~np.isnan(bench)
+        closes, bench, dates = closes[rows], bench[rows], dates[rows]
+        if not tickers or len(dates) < MIN_OBSERVATIONS + 1:
+            raise ValueError(f"리스크 계산에 필요한 공통 이력이 부족합니다 (최소 {MIN_OBSERVATIONS}거래일).")
+
+        returns = closes[1:] / closes[:-1] - 1.0
+        benchmark_returns = bench[1:] / bench[:-1] - 1.0
+
+        last = closes[-1]
+        held = np.array([quantities[t] or 0 for t in tickers], dtype=np.float64)
+        market_values = held * last
+        total_value = float(market_values.sum())
+        weighting = "market_value" if total_value > 0 else "equal"
+        weights = market_values / total_value if total_value > 0 else np.full(len(tickers), 1.0 / len(tickers))
+
+        risk = compute_risk(returns, benchmark_returns, weights, confidence)
+        logger.debug(f"[Risk] {len(tickers)}종목 × {len(returns)}일, 벤치마크 {benchmark}")
+
+        return {
+            "as_of": dates[-1].astype(object),
+            "start_date": dates[0].astype(object),
+            "observations": int(len(returns)),
+            "benchmark": benchmark,
+            "confidence": confidence,
+            "weighting": weighting,
+            "total_value": round(total_value, 2),
+            "portfolio_volatility_pct": _round(risk["portfolio_volatility"] * 100),
+            "portfolio_beta": _round(risk["portfolio_beta"]),
+            "benchmark_volatility_pct": _round(risk["benchmark_volatility"] * 100),
+            "var_historical_pct": _round(risk["var_historical"] * 100),
+            "cvar_historical_pct": _round(risk["cvar_historical"] * 100),
+            "var_parametric_pct": _round(risk["var_parametric"] * 100),
+            "cvar_parametric_pct": _round(risk["cvar_parametric"] * 100),
+            "var_historical_amount": _round(risk["var_historical"] * total_value, 2),
+            "var_parametric_amount": _round(risk["var_parametric"] * total_value, 2),
+            "holdings": [
+                {
+                    "ticker": ticker,
+                    "weight_pct": _round(weights[i] * 100),
+                    "beta": _round(risk["betas"][i]),
+                    "volatility_pct": _round(risk["volatilities"][i] * 100),
+                    "marginal_risk_pct": _round(risk["marginal"][i] * 100),
+                    "risk_contribution_pct": _round(risk["component"][i] * 100),
+                    "risk_share_pct": _round(risk["component_share"][i] * 100),
+                }
+                for i, ticker in enumerate(tickers)
+            ],
+            "tickers": tickers,
+            "covariance": [[_round(v, 6) for v in row] for row in risk["covariance"]],
+            "correlation": [[_round(v) for v in row] for row in risk["correlation"]],
+            "excluded": excluded,
+            "missing": [t for t in missing if t != benchmark],
+            "cached": False,
+        }
+
+
+# 전역 포트폴리오 리스크 서비스 인스턴스
+portfolio_risk_service = PortfolioRiskService()
@@ -0,0 +1,241 @@
+"""
+포트폴리오 몬테카를로 시뮬레이션
+
+보유 종목의 저장된 일봉으로 미래 가치 분포를 시뮬레이션합니다.
+
+- gbm: 일간 로그수익률의 평균/공분산으로 상관된 기하 브라운 운동 (Cholesky 분해)
+- bootstrap: 과거 일간 수익률 행(전 종목 같은 날)을 블록 단위로 다시 뽑음 (상관관계/꼬리 보존)
+
+경로는 (경로, 일, 종목) 배열로 한꺼번에 만들되, 한 묶음의 크기가 SIMULATION_CHUNK_MB를
+넘지 않도록 나눠 계산합니다. parallel을 켜고 묶음이 여러 개면 파라미터 스윕과 같은
+프로세스 풀에 나눠 보내며, 동시에 계산 중인 묶음 수는 워커 수와 컨테이너 메모리 제한
+안으로 제한합니다. 묶음별 난수 시드는 SeedSequence로 나누므로 풀 사용 여부와 관계없이
+같은 seed면 같은 결과가 나옵니다.
+
+보유 수량이 고정된 매수 후 보유를 가정하며 (리밸런싱 없음), 결과는 시작 가치 대비
+백분위 구간과 손실 확률입니다.
+"""
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.repository import PortfolioRepository
+from app.services.backtest import PERIOD_BARS
+from app.services.portfolio_risk import MIN_OBSERVATIONS, MIN_TICKER_COVERAGE, _fill_gaps, load_aligned_closes
+from app.services.sweep import WORKER_MEMORY_SHARE, _memory_limit, sweep_runner
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("gbm", "bootstrap")
+PERCENTILES = (5, 25, 50, 75, 95)
+# 구간 백분위를 기록할 최대 시점 수 (전체 일수 대신 고르게 뽑음)
+MAX_BAND_POINTS = 64
+MAX_HORIZON_DAYS = 2520
+
+
+def simulate_chunk(
+    method: str,
+    paths: int,
+    horizon: int,
+    steps: np.ndarray,
+    weights: np.ndarray,
+    seed: np.random.SeedSequence,
+    mean: Optional[np.ndarray] = None,
+    cholesky: Optional[np.ndarray] = None,
+    history: Optional[np.ndarray] = None,
+    block_size: int = 5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    경로 한 묶음 시뮬레이션 (프로세스 풀에서도 실행되므로 모듈 최상위 함수)
+
+    Args:
+        steps: 기록할 시점 (1 ~ horizon 일, 오름차순, 마지막은 horizon)
+        weights: 시작 시점 종목별 가치 비중 (합 1)
+        mean / cholesky: gbm 일간 로그수익률 평균 (N,)과 공분산의 Cholesky 인수 (N, N)
+        history: bootstrap 과거 일간 로그수익률 (T, N)
+
+    Returns:
+        (시작 가치 대비 마지막 가치 (paths,), 시점별 가치 (paths, len(steps)) float32)
+    """
+    rng = np.random.default_rng(seed)
+    tickers = len(weights)
+    if method == "gbm":
+        # 독립 정규 증분의 합도 정규분포이므로 기록 시점 사이 구간을 한 번에 뽑음 (분포는 일 단위와 동일)
+        gaps = np.diff(steps, prepend=0).astype(np.float64)[:, None]
+        log_returns = rng.standard_normal((paths * len(steps), tickers)) @ cholesky.T
+        log_returns = log_returns.reshape(paths, len(steps), tickers)
+        log_returns *= np.sqrt(gaps)
+        log_returns += mean * gaps
+    else:
+        blocks = math.ceil(horizon / block_size)
+        starts = rng.integers(0, len(history) - block_size + 1, size=(paths, blocks))
+        rows = (starts[:, :, None] + np.arange(block_size)).reshape(paths, -1)[:, :horizon]
+        log_returns = history[rows]
+
+    np.cumsum(log_returns, axis=1, out=log_returns)
+    if method != "gbm":
+        log_returns = log_returns[:, steps - 1]
+    np.exp(log_returns, out=log_returns)
+    values = log_returns @ weights  # (paths, len(steps)) 시작 가치 1 기준
+    return values[:, -1].copy(), values.astype(np.float32)
+
+
+class PortfolioSimulationService:
+    """보유 종목 몬테카를로 시뮬레이션"""
+
+    def simulate(
+        self,
+        db: Session,
+        user_id: int,
+        method: str = "gbm",
+        paths: int = 10_000,
+        horizon_days: int = 252,
+        period: str = "2y",
+        block_size: int = 5,
+        seed: Optional[int] = None,
+        parallel: bool = False,
+    ) -> dict:
+        """
+        사용자 포트폴리오 미래 가치 분포
+
+        Args:
+            parallel: 묶음이 여러 개일 때 프로세스 풀 사용 (기본은 현재 프로세스에서 순서대로 계산)
+
+        Returns:
+            PortfolioSimulation 형식 dict
+
+        Raises:
+            ValueError: 파라미터가 잘못되었거나 보유 종목/과거 데이터가 부족한 경우
+        """
+        if method not in METHODS:
+            raise ValueError(f"지원하지 않는 시뮬레이션 방식입니다: {method} (사용 가능: {', '.join(METHODS)})")
+        if not 1 <= paths <= settings.simulation_max_paths:
+            raise ValueError(f"경로 수는 1 ~ {settings.simulation_max_paths} 사이여야 합니다.")
+        if not 1 <= horizon_days <= MAX_HORIZON_DAYS:
+            raise ValueError(f"기간은 1 ~ {MAX_HORIZON_DAYS}거래일 사이여야 합니다.")
+        if period not in PERIOD_BARS or PERIOD_BARS[period] is None:
+            raise ValueError(f"지원하지 않는 기간입니다: {period}")
+        if block_size < 1:
+            raise ValueError("블록 크기는 1 이상이어야 합니다.")
+        started = time.perf_counter()
+
+        quantities = {p.ticker.upper(): p.quantity for p in PortfolioRepository.get_all(db, user_id)}
+        if not quantities:
+            raise ValueError("포트폴리오에 보유 종목이 없습니다.")
+        names, dates, closes, missing = load_aligned_closes(list(quantities), period)
+        closes = _fill_gaps(closes) if names else closes
+        keep = (~np.isnan(closes)).mean(axis=0) >= MIN_TICKER_COVERAGE if names else np.zeros(0, bool)
+        excluded = [t for t, k in zip(names, keep) if not k]
+        tickers = [t for t, k in zip(names, keep) if k]
+        closes = closes[:, keep]
+        closes = closes[~np.isnan(closes).any(axis=1)]
+        if not tickers or len(closes) < MIN_OBSERVATIONS + 1:
+            raise ValueError(f"시뮬레이션에 필요한 공통 이력이 부족합니다 (최소 {MIN_OBSERVATIONS}거래일).")
+        if method == "bootstrap" and len(closes) <= block_size:
+            raise ValueError("블록 크기가 과거 이력보다 깁니다.")
+
+        log_returns = np.diff(np.log(closes), axis=0)
+        market_values = np.array([quantities[t] or 0 for t in tickers], dtype=np.float64) * closes[-1]
+        start_value = float(market_values.sum())
+        weights = market_values / start_value if start_value > 0 else np.full(len(tickers), 1.0 / len(tickers))
+
+        task = {"weights": weights, "block_size": block_size}
+        if method == "gbm":
+            covariance = np.cov(log_returns, rowvar=False).reshape(len(tickers), len(tickers))
+            # 수치 오차로 양의 정부호가 아니면 대각에 아주 작은 값을 더함
+            jitter = 1e-12 * np.trace(covariance) / len(tickers)
+            task.update(mean=log_returns.mean(axis=0), cholesky=np.linalg.cholesky(covariance + np.eye(len(tickers)) * jitter))
+        else:
+            task.update(history=log_returns)
+
+        steps = np.unique(np.linspace(1, horizon_days, min(horizon_days, MAX_BAND_POINTS)).round().astype(int))
+        finals, sampled, workers = self._run(method, paths, horizon_days, steps, seed, task, parallel)
+
+        relative_bands = np.percentile(sampled, PERCENTILES, axis=0)
+        scale = start_value if start_value > 0 else 100.0  # 수량이 없으면 100 기준 지수
+        final_percentiles = np.percentile(finals, PERCENTILES)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug(
+            f"[Simulation] {method} {paths}경로 × {horizon_days}일 × {len(tickers)}종목, 워커 {workers} ({elapsed_ms:.0f}ms)"
+        )
+
+        return {
+            "method": method,
+            "paths": paths,
+            "horizon_days": horizon_days,
+            "observations": int(len(log_returns)),
+            "start_value": round(scale, 2),
+            "tickers": tickers,
+            "weights_pct": np.round(weights * 100, 4).tolist(),
+            "steps": [0, *steps.tolist()],
+            "bands": {
+                f"p{p}": [round(scale, 2), *np.round(band.astype(np.float64) * scale, 2).tolist()]
+                for p, band in zip(PERCENTILES, relative_bands)
+            },
+            "final_percentiles": {f"p{p}": round(float(v * scale), 2) for p, v in zip(PERCENTILES, final_percentiles)},
+            "expected_value": round(float(finals.mean() * scale), 2),
+            "expected_return_pct": round(float(finals.mean() - 1.0) * 100, 2),
+            "probability_of_loss": round(float((finals < 1.0).mean()), 4),
+            "var_pct": round(float(1.0 - final_percentiles[0]) * 100, 2),  # 5% 분위 손실
+            "excluded": excluded,
+            "missing": missing,
+            "workers": workers,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+
+    @staticmethod
+    def _run(
+        method: str, paths: int, horizon: int, steps: np.ndarray, seed: Optional[int], task: dict, parallel: bool
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """메모리 한도에 맞춰 묶음으로 나눠 실행 (묶음이 여러 개면 프로세스 풀 사용 가능)"""
+        tickers = len(task["weights"])
+        # 한 묶음의 (경로, 일, 종목) float64 배열 크기 제한 (gbm은 기록 시점만 생성)
+        days = len(steps) if method == "gbm" else horizon
+        chunk_bytes = settings.simulation_chunk_mb * 1024 * 1024
+        chunk = max(1, chunk_bytes // (8 * days * tickers))
+        sizes = [min(chunk, paths - start) for start in range(0, paths, chunk)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        use_pool = parallel and len(sizes) > 1 and sweep_runner.max_workers > 1
+        results = None
+        if use_pool:
+            # 동시에 계산 중인 묶음 수 제한 (워커 수, 메모리 제한이 있으면 그 안에서)
+            window = sweep_runner.max_workers
+            limit = _memory_limit()
+            if limit is not None:
+                window = max(1, min(window, int(limit * WORKER_MEMORY_SHARE // chunk_bytes)))
+            executor = sweep_runner.executor
+            try:
+                running: Deque[Future] = deque()
+                completed = []
+                for size, child in zip(sizes, seeds):
+                    running.append(
+                        executor.submit(simulate_chunk, method, size, horizon, steps, seed=child, **task)
+                    )
+                    if len(running) >= window:
+                        completed.append(running.popleft().result())
+                results = completed + [future.result() for future in running]
+            except BrokenProcessPool:
+                # 깨진 풀은 버리고 (다음 요청에서 새로 생성) 이번 요청은 현재 프로세스에서 계산
+                sweep_runner.discard(executor)
+                logger.warning("[Simulation] 프로세스 풀을 사용할 수 없어 현재 프로세스에서 계산")
+                use_pool = False
+        if results is None:
+            results = [
+                simulate_chunk(method, size, horizon, steps, seed=child, **task) for size, child in zip(sizes, seeds)
+            ]
+        finals = np.concatenate([final for final, _ in results])
+        sampled = np.concatenate([values for _, values in results])
+        return finals, sampled, sweep_runner.max_workers if use_pool else 1
+
+
+# 전역 포트폴리오 시뮬레이션 서비스 인스턴스
+portfolio_simulation_service = PortfolioSimulationService()
@@ -0,0 +1,146 @@
+"""
+포트폴리오 평가 (서버 측 현재가 기준 평가금액 / 손익 / 비중)
+
+보유 종목 현재가를 한 번에 받아 평가금액, 손익, 수익률, 비중을 보유 종목 방향
+벡터 연산으로 계산하고, 결과(last_price / profit_percent / last_updated)를
+UPDATE 한 번으로 저장합니다. 저장된 값은 종목 AI 분석의 보유 비중(user_weight)에도
+사용됩니다.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.database.models import PortfolioDB
+from app.database.repository import PortfolioRepository
+from app.services.stock_service import stock_service
+
+logger = logging.getLogger(__name__)
+
+
+def _column(values: Sequence[Optional[float]]) -> np.ndarray:
+    """None → NaN float64 배열"""
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _optional(value: float, digits: int = 2) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def value_holdings(
+    quantities: np.ndarray,
+    purchase_prices: np.ndarray,
+    prices: np.ndarray,
+    previous_closes: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    보유 종목별 평가 지표 (모두 (N,) 배열, 계산할 수 없는 값은 NaN)
+
+    Returns:
+        market_value, cost_basis, profit_loss, profit_percent, day_change_percent, weight (%)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        market_value = quantities * prices
+        cost_basis = quantities * purchase_prices
+        profit_loss = market_value - cost_basis
+        profit_percent = np.where(purchase_prices > 0, (prices - purchase_prices) / purchase_prices * 100, np.nan)
+        day_change_percent = np.where(
+            previous_closes > 0, (prices - previous_closes) / previous_closes * 100, np.nan
+        )
+        total = np.nansum(market_value)
+        weight = market_value / total * 100 if total > 0 else np.full_like(market_value, np.nan)
+    return {
+        "market_value": market_value,
+        "cost_basis": cost_basis,
+        "profit_loss": profit_loss,
+        "profit_percent": profit_percent,
+        "day_change_percent": day_change_percent,
+        "weight": weight,
+    }
+
+
+def stored_weights(holdings: Sequence[PortfolioDB]) -> Dict[str, float]:
+    """
+    마지막 평가 결과(last_price × quantity) 기준 티커별 비중 (%)
+
+    현재가를 다시 조회하지 않으므로 종목 분석 요청마다 호출해도 비용이 없습니다.
+    """
+    values = value_holdings(
+        _column([h.quantity for h in holdings]),
+        _column([h.purchase_price for h in holdings]),
+        _column([h.last_price for h in holdings]),
+        np.full(len(holdings), np.nan),
+    )["weight"]
+    return {h.ticker: round(float(w), 2) for h, w in zip(holdings, values) if not np.isnan(w)}
+
+
+class PortfolioValuationService:
+    """보유 종목 평가 및 평가 결과 저장"""
+
+    def valuate(self, db: Session, user_id: int) -> dict:
+        """
+        사용자 보유 종목 전체 평가 후 저장
+
+        Returns:
+            PortfolioValuation 형식 dict
+
+        Raises:
+            ValueError: 현재가 조회가 제한되었거나 실패한 경우
+        """
+        holdings = PortfolioRepository.get_all(db, user_id)
+        tickers = [h.ticker for h in holdings]
+        quotes = stock_service.get_quotes(tickers) if holdings else {}
+
+        prices = _column([quotes[t][0] if t in quotes else None for t in tickers])
+        previous_closes = _column([quotes[t][1] if t in quotes else None for t in tickers])
+        quantities = _column([h.quantity for h in holdings])
+        purchase_prices = _column([h.purchase_price for h in holdings])
+        values = value_holdings(quantities, purchase_prices, prices, previous_closes)
+
+        now = datetime.now()
+        updates = [
+            {
+                "id": holding.id,
+                "last_price": round(float(prices[i]), 2),
+                "profit_percent": _optional(values["profit_percent"][i]),
+                "last_updated": now,
+            }
+            for i, holding in enumerate(holdings) if not np.isnan(prices[i])
+        ]
+        PortfolioRepository.bulk_update_valuation(db, updates)
+
+        items: List[dict] = [
+            {
+                "ticker": holding.ticker,
+                "quantity": holding.quantity,
+                "purchase_price": _optional(purchase_prices[i]),
+                "current_price": _optional(prices[i], 4),
+                "previous_close": _optional(previous_closes[i], 4),
+                **{name: _optional(array[i]) for name, array in values.items()},
+            }
+            for i, holding in enumerate(holdings)
+        ]
+        items.sort(key=lambda item: item["market_value"] or 0.0, reverse=True)
+
+        priced = ~np.isnan(values["market_value"])
+        total_value = float(np.nansum(values["market_value"]))
+        # 손익 합계는 평가금액과 매입금액이 모두 있는 종목만
+        with_cost = priced & ~np.isnan(values["cost_basis"])
+        total_cost = float(values["cost_basis"][with_cost].sum())
+        total_profit_loss = float(values["profit_loss"][with_cost].sum())
+        logger.debug(f"[Valuation] 사용자 {user_id}: {len(holdings)}종목, 현재가 {len(quotes)}개, 저장 {len(updates)}건")
+        return {
+            "as_of": now,
+            "total_value": round(total_value, 2),
+            "total_cost": round(total_cost, 2),
+            "total_profit_loss": round(total_profit_loss, 2),
+            "total_profit_percent": round(total_profit_loss / total_cost * 100, 2) if total_cost > 0 else None,
+            "items": items,
+            "missing": [t for t in tickers if t not in quotes],
+        }
+
+
+# 전역 포트폴리오 평가 인스턴스
+portfolio_valuation_service = PortfolioValuationService()
@@ -0,0 +1,215 @@
+"""
+Gemini 프롬프트 데이터 블록 빌더
+
+financials.dict() / technical_indicators.dict()를 그대로 문자열로 이어 붙이면
+중첩 dict repr과 전체 float 정밀도 때문에 프롬프트가 불필요하게 길어집니다.
+이 빌더는 값을 반올림하고 짧은 라벨을 붙인 표 형태로 렌더링하며,
+토큰 예산을 넘으면 우선순위가 낮은 필드부터 제외합니다.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.models.stock import StockData
+
+# 필드 우선순위 (숫자가 클수록 먼저 제외)
+PRIORITY_REQUIRED = 1
+PRIORITY_NORMAL = 2
+PRIORITY_OPTIONAL = 3
+
+# 값 표기 방식
+KIND_NUMBER = "num"  # 소수점 2자리 (1 미만은 유효숫자 3자리)
+KIND_PERCENT = "pct"  # 비율(0.15) → 15%
+KIND_BIG = "big"  # 큰 수 → 2.8T, 150B, 30M
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    프롬프트 토큰 수 추정 (네트워크 호출 없음)
+
+    영문/숫자는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 약 1토큰으로
+    보수적으로 계산합니다. 실제 토큰 수는 gemini_usage 테이블에 기록됩니다.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def format_value(value: Any, kind: str = KIND_NUMBER) -> str:
+    """값을 짧은 문자열로 변환 (None → N/A)"""
+    if value is None:
+        return "N/A"
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return "N/A"
+    if kind == KIND_PERCENT:
+        return f"{value * 100:.1f}%"
+    if kind == KIND_BIG:
+        for unit, scale in (("T", 1e12), ("B", 1e9), ("M", 1e6)):
+            if abs(value) >= scale:
+                return f"{value / scale:.2f}{unit}"
+    if abs(value) >= 1e6:
+        return f"{value:,.0f}"
+    if abs(value) < 1:
+        return f"{value:.3g}"
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def render_table(columns: Sequence[Tuple[str, str]], rows: Sequence[Dict[str, Any]]) -> str:
+    """
+    여러 행을 파이프 구분 표로 렌더링 (헤더 1줄 + 행마다 1줄)
+
+    Args:
+        columns: (키, 표기 방식) 목록 - 키가 곧 헤더 라벨
+        rows: 키 → 값 dict 목록 (없는 값은 '-')
+    """
+    lines = ["|".join(key for key, _ in columns)]
+    for row in rows:
+        lines.append("|".join(
+            "-" if row.get(key) is None else format_value(row[key], kind)
+            for key, kind in columns
+        ))
+    return "\n".join(lines)
+
+
+@dataclass
+class PromptField:
+    """데이터 블록의 단일 필드"""
+    section: str
+    label: str
+    value: Any
+    priority: int = PRIORITY_NORMAL
+    kind: str = KIND_NUMBER
+
+    def render(self) -> str:
+        return f"{self.label} {format_value(self.value, self.kind)}"
+
+
+@dataclass
+class BuiltPrompt:
+    """완성된 프롬프트와 토큰 정보"""
+    text: str
+    token_estimate: int
+    dropped: List[str] = field(default_factory=list)  # 예산 초과로 제외된 필드 라벨
+
+
+class CompactPromptBuilder:
+    """토큰 예산을 지키는 압축 데이터 블록 빌더"""
+
+    def __init__(self, token_budget: Optional[int] = None):
+        """
+        Args:
+            token_budget: 전체 프롬프트 토큰 예산 (None 또는 0 이하면 제한 없음)
+        """
+        self.token_budget = token_budget
+        self._fields: List[PromptField] = []
+
+    def add(
+        self,
+        section: str,
+        label: str,
+        value: Any,
+        priority: int = PRIORITY_NORMAL,
+        kind: str = KIND_NUMBER,
+    ) -> "CompactPromptBuilder":
+        """필드 추가 (값이 None이면 무시)"""
+        if value is not None:
+            self._fields.append(PromptField(section, label, value, priority, kind))
+        return self
+
+    def render_data(self, fields: Optional[List[PromptField]] = None) -> str:
+        """섹션별로 한 줄씩 `[섹션] 라벨 값 | 라벨 값` 형태로 렌더링"""
+        fields = self._fields if fields is None else fields
+        sections: Dict[str, List[str]] = {}
+        for item in fields:
+            sections.setdefault(item.section, []).append(item.render())
+        return "\n".join(f"[{section}] {' | '.join(values)}" for section, values in sections.items()) or "N/A"
+
+    def build(self, template: Callable[[str], str]) -> BuiltPrompt:
+        """
+        템플릿에 데이터 블록을 넣어 프롬프트 생성
+
+        예산을 넘으면 우선순위가 낮은 필드부터(같은 우선순위는 나중에 추가된 것부터)
+        제외합니다. 필수(PRIORITY_REQUIRED) 필드는 제외하지 않습니다.
+
+        Args:
+            template: 데이터 블록 문자열을 받아 전체 프롬프트를 반환하는 함수
+        """
+        kept = list(self._fields)
+        dropped: List[str] = []
+        text = template(self.render_data(kept))
+        tokens = estimate_tokens(text)
+
+        if self.token_budget and self.token_budget > 0:
+            # 제외 순서: 우선순위 높은 숫자 → 나중에 추가된 필드
+            candidates = sorted(
+                (item for item in kept if item.priority > PRIORITY_REQUIRED),
+                key=lambda item: (item.priority, kept.index(item)),
+                reverse=True,
+            )
+            for item in candidates:
+                if tokens <= self.token_budget:
+                    break
+                kept.remove(item)
+                dropped.append(item.label)
+                text = template(self.render_data(kept))
+                tokens = estimate_tokens(text)
+
+        return BuiltPrompt(text=text, token_estimate=tokens, dropped=dropped)
+
+
+# 재무 지표: (필드, 라벨, 우선순위, 표기 방식)
+# 라벨은 토큰을 아끼기 위해 짧은 영문 약어 사용 (D/E%: 부채비율, CR/QR: 유동/당좌비율)
+_FINANCIAL_FIELDS = [
+    ("trailing_pe", "PER", PRIORITY_REQUIRED, KIND_NUMBER),
+    ("forward_pe", "fPER", PRIORITY_NORMAL, KIND_NUMBER),
+    ("pbr", "PBR", PRIORITY_REQUIRED, KIND_NUMBER),
+    ("roe", "ROE", PRIORITY_REQUIRED, KIND_PERCENT),
+    ("opm", "OPM", PRIORITY_REQUIRED, KIND_PERCENT),
+    ("peg", "PEG", PRIORITY_NORMAL, KIND_NUMBER),
+    ("debt_to_equity", "D/E%", PRIORITY_REQUIRED, KIND_NUMBER),
+    ("current_ratio", "CR", PRIORITY_NORMAL, KIND_NUMBER),
+    ("quick_ratio", "QR", PRIORITY_NORMAL, KIND_NUMBER),
+    ("dividend_yield", "DivY", PRIORITY_OPTIONAL, KIND_PERCENT),
+    ("payout_ratio", "Payout", PRIORITY_OPTIONAL, KIND_PERCENT),
+    ("revenue_growth", "RevG", PRIORITY_NORMAL, KIND_PERCENT),
+    ("earnings_growth", "EPSG", PRIORITY_NORMAL, KIND_PERCENT),
+]
+
+# 기술적 지표: {그룹: {필드: 우선순위}} (목록에 없는 필드는 PRIORITY_OPTIONAL)
+_TECHNICAL_PRIORITIES = {
+    "sma": {"sma20": PRIORITY_REQUIRED, "sma50": PRIORITY_REQUIRED, "sma200": PRIORITY_NORMAL},
+    "ema": {},
+    "rsi": {"rsi14": PRIORITY_REQUIRED},
+    "macd": {"macd": PRIORITY_REQUIRED, "signal": PRIORITY_REQUIRED, "histogram": PRIORITY_OPTIONAL},
+    "bollinger_bands": {"upper": PRIORITY_NORMAL, "lower": PRIORITY_NORMAL},
+}
+
+_TECHNICAL_LABELS = {
+    "macd": {"macd": "MACD", "signal": "MACDsig", "histogram": "MACDhist"},
+    "bollinger_bands": {"upper": "BBup", "middle": "BBmid", "lower": "BBlow"},
+}
+
+
+def add_stock_data(builder: CompactPromptBuilder, stock_data: StockData) -> CompactPromptBuilder:
+    """StockData의 가격/재무/기술적 지표를 빌더에 추가"""
+    builder.add("Price", "Last", stock_data.price.current, PRIORITY_REQUIRED)
+    builder.add("Price", "MktCap", stock_data.market_cap, PRIORITY_REQUIRED, KIND_BIG)
+
+    financials = stock_data.financials
+    for name, label, priority, kind in _FINANCIAL_FIELDS:
+        builder.add("Fin", label, getattr(financials, name, None), priority, kind)
+
+    if stock_data.technical_indicators:
+        for group, values in stock_data.technical_indicators.model_dump(exclude_none=True).items():
+            priorities = _TECHNICAL_PRIORITIES.get(group, {})
+            labels = _TECHNICAL_LABELS.get(group, {})
+            for name, value in values.items():
+                builder.add(
+                    "Tech",
+                    labels.get(name, name.upper()),
+                    value,
+                    priorities.get(name, PRIORITY_OPTIONAL),
+                )
+
+    return builder
@@ -0,0 +1,416 @@
+"""
+다중 티커 스크리너
+
+로컬 시세 저장소(price_history / fundamentals)의 일봉과 재무 스냅샷을 날짜 × 티커
+(T, N) 배열로 읽어, 선언형 조건을 티커 방향 벡터 연산으로 한 번에 평가합니다.
+업스트림(Yahoo Finance)은 호출하지 않으므로 종목 조회/차트 조회로 이력이 저장된
+티커만 평가 대상이 됩니다.
+
+필드:
+- 가격: close, high, low, volume, change_pct (전일 대비 등락률 %)
+- 지표: sma{n}, ema{n}, rsi{n}, atr{n}, macd, macd_signal, macd_hist,
+  bb_upper, bb_middle, bb_lower, stoch_k, stoch_d, plus_di, minus_di, adx, obv, vwap
+  (rsi / atr 은 기본 기간 14)
+- 재무: market_cap, trailing_pe, forward_pe, pbr, roe, opm, peg, debt_to_equity,
+  current_ratio, quick_ratio, dividend_yield, payout_ratio, revenue_growth, earnings_growth
+
+조건:
+- 비교: <, <=, >, >=, ==, != (티커별 마지막 봉 값 기준)
+- 교차: crosses_above, crosses_below (최근 within개 봉 안에서 교차가 있었는지)
+비교 대상은 숫자(value) 또는 다른 필드(ref)입니다.
+"""
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.repository import PortfolioRepository
+from app.services.indicator_engine import (
+    DEFAULT_SPEC, MAX_PERIOD, MAX_PERIODS_PER_KIND, IndicatorResult, IndicatorSpec, compute_indicators
+)
+from app.services.indicator_memo import IndicatorMemo
+from app.services.market_store import FUNDAMENTAL_FIELDS, market_store
+from app.services.snapshot_store import UniverseSnapshot
+from app.services.universe_snapshot import universe_snapshots
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ("close", "high", "low", "volume", "change_pct")
+CLOSE_INDICATOR_FIELDS = ("macd", "macd_signal", "macd_hist", "bb_upper", "bb_middle", "bb_lower")
+OHLCV_INDICATOR_FIELDS = ("stoch_k", "stoch_d", "plus_di", "minus_di", "adx", "obv", "vwap")
+FUNDAMENTAL_SCREEN_FIELDS = ("market_cap", *FUNDAMENTAL_FIELDS)
+# 기간을 붙이는 지표 (기간 생략 시 기본값)
+_PERIOD_FIELD = re.compile(r"^(sma|ema|rsi|atr)(\d*)$")
+_DEFAULT_PERIODS = {"rsi": DEFAULT_SPEC.rsi_period, "atr": DEFAULT_SPEC.atr_period}
+
+COMPARISON_OPS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "!=": np.not_equal,
+}
+CROSS_OPS = ("crosses_above", "crosses_below")
+
+
+def normalize_field(name: str) -> str:
+    """
+    필드 이름 정규화 (소문자, rsi/atr 기본 기간 보완)
+
+    Raises:
+        ValueError: 지원하지 않는 필드이거나 기간이 범위를 벗어난 경우
+    """
+    field = name.strip().lower()
+    if field in PRICE_FIELDS or field in CLOSE_INDICATOR_FIELDS or field in OHLCV_INDICATOR_FIELDS:
+        return field
+    if field in FUNDAMENTAL_SCREEN_FIELDS:
+        return field
+    match = _PERIOD_FIELD.match(field)
+    if match:
+        kind, digits = match.groups()
+        if not digits:
+            if kind not in _DEFAULT_PERIODS:
+                raise ValueError(f"'{name}' 필드에는 기간이 필요합니다 (예: {kind}20).")
+            return f"{kind}{_DEFAULT_PERIODS[kind]}"
+        period = int(digits)
+        if not 2 <= period <= MAX_PERIOD:
+            raise ValueError(f"'{name}' 기간은 2 ~ {MAX_PERIOD} 사이여야 합니다.")
+        return f"{kind}{period}"
+    raise ValueError(f"지원하지 않는 필드입니다: {name}")
+
+
+def is_fundamental(field: str) -> bool:
+    return field in FUNDAMENTAL_SCREEN_FIELDS
+
+
+def spec_for_fields(fields: Sequence[str]) -> Tuple[IndicatorSpec, bool]:
+    """
+    조건에 쓰인 필드만 계산하는 지표 파라미터 집합
+
+    Returns:
+        (spec, OHLCV 지표 필요 여부)
+
+    Raises:
+        ValueError: RSI/ATR 기간을 두 개 이상 쓰거나 기간 수가 제한을 넘는 경우
+    """
+    periods: Dict[str, List[int]] = {"sma": [], "ema": [], "rsi": [], "atr": []}
+    ohlcv = False
+    for field in fields:
+        match = _PERIOD_FIELD.match(field)
+        if match:
+            kind, digits = match.groups()
+            if int(digits) not in periods[kind]:
+                periods[kind].append(int(digits))
+            ohlcv = ohlcv or kind == "atr"
+        elif field in OHLCV_INDICATOR_FIELDS:
+            ohlcv = True
+
+    for kind in ("rsi", "atr"):
+        if len(periods[kind]) > 1:
+            raise ValueError(f"{kind.upper()}는 한 번에 하나의 기간만 사용할 수 있습니다: {periods[kind]}")
+    for kind in ("sma", "ema"):
+        if len(periods[kind]) > MAX_PERIODS_PER_KIND:
+            raise ValueError(f"{kind.upper()} 기간은 최대 {MAX_PERIODS_PER_KIND}개까지 사용할 수 있습니다.")
+
+    spec = IndicatorSpec(
+        sma_periods=tuple(sorted(periods["sma"])),
+        ema_periods=tuple(sorted(periods["ema"])),
+        rsi_period=periods["rsi"][0] if periods["rsi"] else DEFAULT_SPEC.rsi_period,
+        atr_period=periods["atr"][0] if periods["atr"] else DEFAULT_SPEC.atr_period,
+    )
+    return spec, ohlcv
+
+
+def _longest_period(spec: IndicatorSpec) -> int:
+    return max((*spec.sma_periods, *spec.ema_periods, spec.rsi_period, spec.macd_slow + spec.macd_signal, spec.bb_period))
+
+
+def parse_condition(condition: dict) -> dict:
+    """조건 검증 및 필드 정규화"""
+    op = condition.get('op')
+    value, ref = condition.get('value'), condition.get('ref')
+    if op not in COMPARISON_OPS and op not in CROSS_OPS:
+        raise ValueError(f"지원하지 않는 연산자입니다: {op}")
+    if (value is None) == (ref is None):
+        raise ValueError("조건에는 value 또는 ref 중 하나만 지정해야 합니다.")
+
+    field = normalize_field(condition.get('field') or "")
+    ref = normalize_field(ref) if ref is not None else None
+    if op in CROSS_OPS and is_fundamental(field):
+        raise ValueError(f"재무 필드는 교차 조건에 사용할 수 없습니다: {field}")
+    return {'field': field, 'op': op, 'value': value, 'ref': ref, 'within': int(condition.get('within') or 1)}
+
+
+@dataclass(frozen=True)
+class ScreenQuery:
+    """검증된 스크리너 조건 (필드/지표 파라미터/필요 봉 수 포함)"""
+    conditions: Tuple[dict, ...]
+    fields: Tuple[str, ...]  # 조건/정렬에 쓰인 필드 (응답 values 순서)
+    sort_field: Optional[str]
+    spec: IndicatorSpec
+    ohlcv: bool
+    bars: int  # 지표 계산에 필요한 최소 봉 수
+
+    @property
+    def uses_fundamentals(self) -> bool:
+        return any(is_fundamental(f) for f in self.fields)
+
+
+def prepare_query(conditions: Sequence[dict], sort_by: Optional[str] = None) -> ScreenQuery:
+    """
+    조건 검증 후 평가에 필요한 지표 파라미터 결정
+
+    Raises:
+        ValueError: 조건 형식이 잘못된 경우
+    """
+    parsed = tuple(parse_condition(condition) for condition in conditions)
+    sort_field = normalize_field(sort_by) if sort_by else None
+    fields = tuple(dict.fromkeys(
+        [c['field'] for c in parsed] + [c['ref'] for c in parsed if c['ref']] + ([sort_field] if sort_field else [])
+    ))
+    spec, ohlcv = spec_for_fields(fields)
+    max_within = max((c['within'] for c in parsed), default=1)
+    return ScreenQuery(parsed, fields, sort_field, spec, ohlcv, _longest_period(spec) + max_within + 1)
+
+
+def compute_panel_indicators(
+    dates: np.ndarray, arrays: Dict[str, np.ndarray], spec: IndicatorSpec, ohlcv: bool
+) -> IndicatorResult:
+    """load_panel 배열로 지표 계산 (OHLCV 지표가 필요 없으면 종가만 사용)"""
+    if not len(dates):
+        return IndicatorResult(spec=spec)
+    if not ohlcv:
+        return compute_indicators(arrays['close'], spec)
+    # 앵커드 VWAP은 연초 기준 (indicator_state와 동일)
+    years = dates.astype('datetime64[Y]').astype(np.int64)
+    return compute_indicators(
+        arrays['close'], spec, high=arrays['high'], low=arrays['low'], volume=arrays['volume'], segments=years
+    )
+
+
+def evaluate_panel(
+    names: Sequence[str],
+    dates: np.ndarray,
+    arrays: Dict[str, np.ndarray],
+    result: IndicatorResult,
+    fundamentals: Dict[str, np.ndarray],
+    query: ScreenQuery,
+    match: str = "all",
+    descending: bool = True,
+    limit: int = 50,
+) -> dict:
+    """
+    날짜 × 티커 배열에서 조건 평가 (DB 접근 없음, 파라미터 스윕 워커도 사용)
+
+    Returns:
+        ScreenerResult 형식 dict (elapsed_ms 제외)
+    """
+    closes = arrays['close']
+    has_data = ~np.isnan(closes).all(axis=0) if len(closes) else np.zeros(len(names), dtype=bool)
+    # 티커별 마지막 유효 봉 (거래일이 다르거나 이력이 오래된 티커도 자기 마지막 봉 기준)
+    rows = closes.shape[0]
+    last_row = rows - 1 - np.argmax(~np.isnan(closes[::-1]), axis=0) if rows else np.zeros(len(names), dtype=np.intp)
+
+    def series(field: str) -> Optional[np.ndarray]:
+        if field in arrays:
+            return arrays[field]
+        if field == "change_pct":
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.vstack([np.full((1, closes.shape[1]), np.nan), closes[1:] / closes[:-1] - 1.0]) * 100.0
+        if field in result.series:
+            return result.series[field]
+        raise ValueError(f"'{field}' 값을 계산할 수 없습니다.")
+
+    def at(field: str, offset: int = 0) -> np.ndarray:
+        """티커별 마지막 봉에서 offset개 전 값 (N,)"""
+        if is_fundamental(field):
+            return fundamentals[field]
+        values = series(field)
+        index = last_row - offset
+        out = values[np.clip(index, 0, None), np.arange(len(names))] if rows else np.full(len(names), np.nan)
+        return np.where((index >= 0) & has_data, out, np.nan)
+
+    satisfied = np.zeros((len(query.conditions), len(names)), dtype=bool)
+    for i, condition in enumerate(query.conditions):
+        satisfied[i] = _evaluate_condition(condition, at)
+
+    matched = satisfied.sum(axis=0)
+    selected = (matched == len(query.conditions)) if match == "all" else (matched > 0)
+    selected &= has_data
+
+    sort_values = at(query.sort_field) if query.sort_field else np.zeros(len(names))
+    sort_key = np.where(np.isnan(sort_values), np.inf, -sort_values if descending else sort_values)
+    order = np.lexsort((np.arange(len(names)), sort_key, -matched))
+    order = order[selected[order]][:limit]
+
+    latest = {field: at(field) for field in query.fields}
+    matches = [
+        {
+            'ticker': names[i],
+            'matched': int(matched[i]),
+            'values': {field: None if np.isnan(latest[field][i]) else float(latest[field][i]) for field in query.fields},
+        }
+        for i in order
+    ]
+    return {
+        'as_of': str(dates[-1]) if len(dates) else None,
+        'universe_size': len(names),
+        'evaluated': int(has_data.sum()),
+        'missing': [names[i] for i in np.flatnonzero(~has_data)],
+        'matches': matches,
+        'total_matches': int(selected.sum()),
+    }
+
+
+def _evaluate_condition(condition: dict, at) -> np.ndarray:
+    """조건 하나를 모든 티커에 대해 평가 (N,) (값이 없으면 False)"""
+    field, op, ref = condition['field'], condition['op'], condition['ref']
+
+    def right(offset: int) -> np.ndarray:
+        return at(ref, offset) if ref else np.asarray(float(condition['value']))
+
+    if op in COMPARISON_OPS:
+        left, other = at(field), right(0)
+        valid = ~np.isnan(left) & ~np.isnan(other)
+        return valid & COMPARISON_OPS[op](left, other)
+
+    # 교차: 직전 봉에서는 같거나 반대편, 해당 봉에서는 넘어선 경우
+    sign = 1.0 if op == "crosses_above" else -1.0
+    crossed = np.zeros(at(field).shape, dtype=bool)
+    for offset in range(condition['within']):
+        current = sign * (at(field, offset) - right(offset))
+        previous = sign * (at(field, offset + 1) - right(offset + 1))
+        crossed |= (previous <= 0) & (current > 0)
+    return crossed
+
+
+class ScreenerService:
+    """저장된 이력/재무 스냅샷 기반 스크리너"""
+
+    def __init__(self):
+        # 배열/지표 계산 결과 캐시 (시세 저장소 버전이 바뀌면 새 키)
+        self._memo = IndicatorMemo(max_size=32)
+
+    def resolve_universe(
+        self, db: Session, user_id: int, universe: str, tickers: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """
+        평가 대상 티커 목록
+
+        Args:
+            universe: "portfolio" (사용자 보유 종목) 또는 "all" (SCREENER_UNIVERSE 설정, 없으면 저장된 전체)
+            tickers: 지정하면 universe 대신 사용
+        """
+        if tickers:
+            selected = tickers
+        elif universe == "portfolio":
+            selected = [p.ticker for p in PortfolioRepository.get_all(db, user_id)]
+        elif settings.screener_tickers:
+            selected = settings.screener_tickers
+        else:
+            selected = market_store.stored_tickers()
+        return list(dict.fromkeys(t.strip().upper() for t in selected if t.strip()))
+
+    def screen(
+        self,
+        tickers: Sequence[str],
+        conditions: Sequence[dict],
+        match: str = "all",
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 50,
+    ) -> dict:
+        """
+        조건 평가 후 순위가 매겨진 결과 반환
+
+        Args:
+            tickers: 평가 대상 티커
+            conditions: {'field', 'op', 'value' | 'ref', 'within'} 목록
+            match: "all" (모든 조건 충족) 또는 "any" (하나 이상 충족)
+            sort_by: 정렬 필드 (충족 조건 수 다음 기준, 값이 없으면 뒤로)
+            descending: 정렬 방향
+            limit: 최대 결과 수
+
+        Returns:
+            ScreenerResult 형식 dict
+
+        Raises:
+            ValueError: 조건 형식이 잘못된 경우
+        """
+        started = time.perf_counter()
+        query = prepare_query(conditions, sort_by)
+        bars = self.history_bars(query)
+        names, dates, arrays = self.panel(tickers, bars)
+
+        result = self._memo.get_or_compute(
+            ("indicators", tuple(tickers), bars, query.spec.key, query.ohlcv, self._data_key()),
+            lambda: compute_panel_indicators(dates, arrays, query.spec, query.ohlcv)
+        )
+        fundamentals = self.fundamentals(tickers) if query.uses_fundamentals else {}
+
+        screened = evaluate_panel(names, dates, arrays, result, fundamentals, query, match, descending, limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug(
+            f"[Screener] 티커 {len(names)}개, 조건 {len(query.conditions)}개 → {screened['total_matches']}건 ({elapsed_ms:.1f}ms)"
+        )
+        screened['elapsed_ms'] = round(elapsed_ms, 2)
+        return screened
+
+    @staticmethod
+    def history_bars(query: ScreenQuery) -> int:
+        """조건 평가에 읽어올 최근 봉 수"""
+        return max(settings.screener_history_bars, query.bars)
+
+    @staticmethod
+    def _data_key() -> tuple:
+        """메모 키에 넣는 데이터 식별값 (시세 저장소 버전, 현재 스냅샷)"""
+        snapshot = universe_snapshots.current()
+        return market_store.version, snapshot.name if snapshot else None
+
+    @staticmethod
+    def _covering_snapshot(tickers: Sequence[str], bars: Optional[int]) -> Optional[UniverseSnapshot]:
+        """요청 티커와 봉 수를 모두 담고 있는 현재 스냅샷 (없으면 None)"""
+        snapshot = universe_snapshots.current()
+        if snapshot is None or snapshot.as_of is None or not snapshot.covers(tickers, bars):
+            return None
+        return snapshot
+
+    def panel(self, tickers: Sequence[str], bars: int) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        저장된 일봉 배열 (데이터 식별값 단위 메모)
+
+        스냅샷이 요청을 담고 있으면 기준일까지는 메모리 맵에서 읽고, 기준일 이후
+        저장된 봉(장중 조회 등)만 DB에서 읽어 이어 붙입니다. 스냅샷이 없으면 DB에서 읽습니다.
+        """
+        def load():
+            snapshot = self._covering_snapshot(tickers, bars)
+            if snapshot is None:
+                return market_store.load_panel(tickers, bars)
+            names, dates, arrays = snapshot.panel(tickers, bars)
+            _, new_dates, new_arrays = market_store.load_panel_after(tickers, snapshot.as_of)
+            if not len(new_dates):
+                return names, dates, arrays
+            dates = np.concatenate([dates, new_dates])[-bars:]
+            arrays = {field: np.concatenate([arrays[field], new_arrays[field]])[-bars:] for field in arrays}
+            return names, dates, arrays
+
+        return self._memo.get_or_compute(("panel", tuple(tickers), bars, self._data_key()), load)
+
+    def fundamentals(self, tickers: Sequence[str]) -> Dict[str, np.ndarray]:
+        """재무 스냅샷 배열 (최신 스냅샷이 있으면 메모리 맵, 없으면 DB / 데이터 식별값 단위 메모)"""
+        def load():
+            # 기준일 이후 봉이 저장되었으면 재무 스냅샷도 그 조회에서 갱신되었으므로 DB에서 읽음
+            snapshot = self._covering_snapshot(tickers, None)
+            if snapshot is not None:
+                latest = market_store.latest_date(tickers)
+                if latest is not None and latest <= snapshot.as_of:
+                    return snapshot.fundamentals(tickers)
+            return market_store.load_fundamentals(tickers)
+
+        return self._memo.get_or_compute(("fundamentals", tuple(tickers), self._data_key()), load)
+
+
+# 전역 스크리너 인스턴스
+screener_service = ScreenerService()
@@ -0,0 +1,176 @@
+"""
+오프라인 뉴스 감성 사전 채점기 (금융 용어 사전 + 부정어 처리)
+
+모든 헤드라인을 Gemini로 채점하면 느리고 할당량을 소모합니다. 이 채점기는
+네트워크 없이 헤드라인 묶음을 NumPy로 한 번에 채점하며, 판단이 애매하거나
+(긍정/부정 단어 혼재) 주가 영향이 큰 사건(인수합병, 소송, 파산 등)이 포함된
+헤드라인만 Gemini로 넘기도록 표시합니다.
+
+점수 정규화는 VADER 방식(raw / sqrt(raw² + alpha))을 사용해 -1.0 ~ 1.0 범위로 맞춥니다.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Sequence
+
+import numpy as np
+
+# 감성 라벨 기준 (점수 -1.0 ~ 1.0)
+POSITIVE_THRESHOLD = 0.15
+NEGATIVE_THRESHOLD = -0.15
+
+# 금융 뉴스 감성 사전 (단어: 가중치 -3 ~ 3)
+FINANCE_LEXICON: Dict[str, float] = {
+    # 긍정
+    "beat": 2.0, "beats": 2.0, "tops": 1.5, "topped": 1.5, "exceeds": 1.5, "exceeded": 1.5,
+    "surge": 2.5, "surges": 2.5, "surged": 2.5, "soar": 2.5, "soars": 2.5, "soared": 2.5,
+    "jump": 2.0, "jumps": 2.0, "jumped": 2.0, "rally": 2.0, "rallies": 2.0, "rallied": 2.0,
+    "gain": 1.5, "gains": 1.5, "gained": 1.5, "rise": 1.0, "rises": 1.0, "rose": 1.0,
+    "climb": 1.5, "climbs": 1.5, "climbed": 1.5, "rebound": 1.5, "rebounds": 1.5,
+    "record": 1.5, "high": 0.5, "highs": 1.0, "strong": 1.5, "stronger": 1.5, "robust": 1.5,
+    "growth": 1.0, "grows": 1.0, "profit": 1.0, "profits": 1.0, "profitable": 1.5,
+    "upgrade": 2.0, "upgrades": 2.0, "upgraded": 2.0, "outperform": 2.0, "outperforms": 2.0,
+    "bullish": 2.0, "buy": 1.0, "buyback": 1.5, "raises": 1.0, "raised": 1.0, "boost": 1.5,
+    "boosts": 1.5, "boosted": 1.5, "expands": 1.0, "expansion": 1.0, "win": 1.5, "wins": 1.5,
+    "approval": 2.0, "approved": 2.0, "approves": 2.0, "breakthrough": 2.5, "optimistic": 1.5,
+    "recovery": 1.5, "recovers": 1.5, "upbeat": 1.5, "dividend": 0.5, "partnership": 1.0,
+    # 부정
+    "miss": -2.0, "misses": -2.0, "missed": -2.0, "plunge": -2.5, "plunges": -2.5, "plunged": -2.5,
+    "tumble": -2.5, "tumbles": -2.5, "tumbled": -2.5, "slump": -2.0, "slumps": -2.0,
+    "sink": -2.0, "sinks": -2.0, "sank": -2.0, "drop": -1.5, "drops": -1.5, "dropped": -1.5,
+    "fall": -1.5, "falls": -1.5, "fell": -1.5, "decline": -1.5, "declines": -1.5, "declined": -1.5,
+    "slide": -1.5, "slides": -1.5, "crash": -3.0, "crashes": -3.0, "selloff": -2.0,
+    "loss": -1.5, "losses": -1.5, "lose": -1.5, "loses": -1.5, "weak": -1.5, "weaker": -1.5,
+    "downgrade": -2.0, "downgrades": -2.0, "downgraded": -2.0, "underperform": -2.0,
+    "bearish": -2.0, "sell": -1.0, "cut": -1.5, "cuts": -1.5, "slashes": -2.0, "slashed": -2.0,
+    "layoffs": -2.0, "layoff": -2.0, "lawsuit": -2.0, "sues": -1.5, "sued": -1.5, "probe": -2.0,
+    "investigation": -2.0, "fraud": -3.0, "scandal": -2.5, "recall": -2.0, "recalls": -2.0,
+    "bankruptcy": -3.0, "bankrupt": -3.0, "default": -2.5, "warning": -1.5, "warns": -1.5,
+    "delay": -1.5, "delays": -1.5, "delayed": -1.5, "concern": -1.0, "concerns": -1.0,
+    "fears": -1.5, "risk": -0.5, "risks": -0.5, "volatile": -1.0, "pressure": -1.0,
+    "fined": -1.5, "penalty": -1.5, "halt": -2.0, "halted": -2.0, "resigns": -1.5,
+    "ousted": -2.0, "shortfall": -2.0, "disappointing": -2.0, "disappoints": -2.0, "pessimistic": -1.5,
+}
+
+# 부정어 (뒤따르는 감성 단어의 방향을 뒤집음)
+NEGATORS = frozenset({
+    "not", "no", "never", "without", "neither", "nor", "hardly", "barely", "fails", "failed", "fail",
+    "isnt", "arent", "wasnt", "werent", "dont", "doesnt", "didnt", "wont", "cant", "cannot",
+})
+
+# 주가 영향이 큰 사건 키워드 (포함되면 Gemini로 넘김)
+HIGH_IMPACT_TERMS = frozenset({
+    "acquire", "acquires", "acquisition", "merger", "merge", "buyout", "takeover",
+    "bankruptcy", "bankrupt", "fraud", "investigation", "probe", "lawsuit", "antitrust",
+    "subpoena", "sec", "fda", "recall", "recalls", "resigns", "ousted", "delist", "delisting",
+    "halt", "halted", "default", "restatement", "guidance", "downgrade", "downgraded",
+    "upgrade", "upgraded", "layoffs", "spinoff",
+})
+
+# 부정어 영향 범위 (뒤 단어 수) 및 반전 계수 (VADER와 같은 -0.74)
+NEGATION_WINDOW = 3
+NEGATION_SCALE = -0.74
+# 점수 정규화 상수 (VADER 기본값)
+NORMALIZATION_ALPHA = 15.0
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def sentiment_label(score: float) -> str:
+    """점수(-1.0 ~ 1.0)를 라벨로 변환"""
+    if score >= POSITIVE_THRESHOLD:
+        return "positive"
+    if score <= NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+@dataclass
+class LexiconScores:
+    """헤드라인 묶음 채점 결과 (헤드라인 순서와 같은 길이의 배열)"""
+    score: np.ndarray  # -1.0 ~ 1.0
+    hits: np.ndarray  # 감성 단어 수
+    mixed: np.ndarray  # 긍정/부정 단어 혼재 (애매함)
+    high_impact: np.ndarray  # 영향이 큰 사건 키워드 포함
+    escalate: np.ndarray  # Gemini로 넘길 헤드라인
+
+    def labels(self) -> list:
+        """헤드라인별 라벨"""
+        return [sentiment_label(score) for score in self.score.tolist()]
+
+
+class LexiconSentimentScorer:
+    """사전 기반 헤드라인 일괄 채점기"""
+
+    def __init__(
+        self,
+        lexicon: Dict[str, float] = FINANCE_LEXICON,
+        negators: Iterable[str] = NEGATORS,
+        high_impact_terms: Iterable[str] = HIGH_IMPACT_TERMS,
+    ):
+        negators = set(negators)
+        high_impact_terms = set(high_impact_terms)
+        vocabulary = sorted(set(lexicon) | negators | high_impact_terms)
+
+        # 토큰 id 0은 사전에 없는 단어
+        self._index = {word: i + 1 for i, word in enumerate(vocabulary)}
+        size = len(vocabulary) + 1
+        self._weights = np.zeros(size)
+        self._is_negator = np.zeros(size, dtype=bool)
+        self._is_high_impact = np.zeros(size, dtype=bool)
+        for word, i in self._index.items():
+            self._weights[i] = lexicon.get(word, 0.0)
+            self._is_negator[i] = word in negators
+            self._is_high_impact[i] = word in high_impact_terms
+
+    @staticmethod
+    def _tokenize(text: str) -> list:
+        # "doesn't" → "doesnt" 처럼 아포스트로피를 제거해 부정어 사전과 맞춤
+        return [token.replace("'", "") for token in _TOKEN_RE.findall(text.lower().replace("’", "'"))]
+
+    def score(self, titles: Sequence[str]) -> LexiconScores:
+        """
+        헤드라인 묶음 채점
+
+        토큰화 후 모든 헤드라인의 토큰을 하나의 배열로 이어 붙여 부정어 범위,
+        가중치 합, 혼재 여부를 헤드라인 반복 없이 벡터 연산으로 계산합니다.
+        """
+        count = len(titles)
+        tokenized = [self._tokenize(title) for title in titles]
+        lengths = np.fromiter((len(tokens) for tokens in tokenized), dtype=np.int64, count=count)
+        total = int(lengths.sum())
+
+        index = self._index
+        ids = np.fromiter((index.get(token, 0) for tokens in tokenized for token in tokens), dtype=np.int64, count=total)
+        owner = np.repeat(np.arange(count), lengths)  # 토큰이 속한 헤드라인
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)  # 소속 헤드라인의 첫 토큰 위치
+        positions = np.arange(total)
+
+        # 같은 헤드라인 안에서 NEGATION_WINDOW 이내 앞쪽에 부정어가 있으면 반전
+        is_negator = self._is_negator[ids]
+        last_negator = np.maximum.accumulate(np.where(is_negator, positions, -1)) if total else positions
+        negated = (
+            (last_negator >= starts)
+            & (positions > last_negator)
+            & (positions - last_negator <= NEGATION_WINDOW)
+        )
+        weights = self._weights[ids]
+        weights = np.where(negated, weights * NEGATION_SCALE, weights)
+
+        raw = np.bincount(owner, weights=weights, minlength=count)
+        positive = np.bincount(owner, weights=weights > 0, minlength=count)
+        negative = np.bincount(owner, weights=weights < 0, minlength=count)
+        high_impact = np.bincount(owner, weights=self._is_high_impact[ids], minlength=count) > 0
+
+        score = raw / np.sqrt(raw * raw + NORMALIZATION_ALPHA)
+        mixed = (positive > 0) & (negative > 0)
+        return LexiconScores(
+            score=np.round(score, 3),
+            hits=(positive + negative).astype(np.int64),
+            mixed=mixed,
+            high_impact=high_impact,
+            escalate=mixed | high_impact,
+        )
+
+
+# 전역 사전 채점기 인스턴스
+lexicon_scorer = LexiconSentimentScorer()
@@ -0,0 +1,276 @@
+"""
+뉴스 감성 분석 서비스
+
+뉴스 캐시(StockService.get_news)의 헤드라인을 먼저 오프라인 사전 채점기
+(sentiment_lexicon)로 채점하고, 애매하거나 영향이 큰 헤드라인만 Gemini로 다시 채점합니다.
+
+- 여러 티커의 헤드라인을 모아 한 번의 JSON 스키마 호출로 일괄 채점
+- 기사(정규화한 제목) 단위로 점수를 캐시하여 여러 티커에 같은 기사가 나와도 한 번만 채점
+- 동시에 들어온 요청이 같은 기사를 채점 중이면 그 결과를 기다림
+- 티커별 감성은 기사별 점수의 평균으로 계산
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.models.stock import ArticleSentiment, NewsItem, TickerSentiment
+from app.services.analysis_scheduler import AnalysisCancelledError
+from app.services.gemini_client import gemini_client_pool, generate_content
+from app.services.sentiment_lexicon import lexicon_scorer, sentiment_label
+from app.services.stock_service import stock_service
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "score": {"type": "number"},
+                },
+                "required": ["id", "score"],
+            },
+        },
+    },
+    "required": ["items"],
+}
+
+SENTIMENT_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": SENTIMENT_SCHEMA,
+}
+
+
+def article_key(title: str) -> str:
+    """기사 캐시 키 (대소문자/공백을 정규화한 제목의 해시)"""
+    normalized = " ".join(title.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:20]
+
+
+def aggregate_sentiment(ticker: str, articles: Sequence[ArticleSentiment]) -> TickerSentiment:
+    """기사별 점수 평균으로 티커 감성 계산 (-100 ~ 100)"""
+    mean = sum(article.score for article in articles) / len(articles) if articles else 0.0
+    return TickerSentiment(
+        ticker=ticker,
+        score=round(mean * 100, 1),
+        label=sentiment_label(mean),
+        article_count=len(articles),
+        positive_count=sum(1 for article in articles if article.label == "positive"),
+        neutral_count=sum(1 for article in articles if article.label == "neutral"),
+        negative_count=sum(1 for article in articles if article.label == "negative"),
+        escalated_count=sum(1 for article in articles if article.scored_by == "gemini"),
+        articles=list(articles),
+    )
+
+
+def _build_sentiment_prompt(titles: Sequence[str]) -> str:
+    """번호가 붙은 헤드라인 목록을 채점하는 프롬프트"""
+    lines = "\n".join(f"{index}|{title}" for index, title in enumerate(titles))
+    return f"""
+너는 금융 뉴스 감성 분석가야. 아래 각 헤드라인이 해당 기업 주가에 주는 영향을
+-1.0(매우 부정) ~ 1.0(매우 긍정) 점수로 채점해줘. 영향이 불분명하면 0에 가깝게 줘.
+모든 id에 대해 하나씩, 지정된 JSON 스키마로만 응답해줘.
+
+id|headline
+{lines}
+"""
+
+
+class SentimentService:
+    """헤드라인 일괄 채점 + 기사별 점수 캐시"""
+
+    def __init__(self, batch_size: int = 40, cache_max_size: int = 5000):
+        """
+        Args:
+            batch_size: 한 번의 Gemini 호출에 넣을 최대 헤드라인 수
+            cache_max_size: 기사별 점수 캐시 최대 크기 (초과 시 오래 사용되지 않은 것부터 정리)
+        """
+        self.batch_size = batch_size
+        self.cache_max_size = cache_max_size
+        # 기사별 점수 캐시: {article_key: score} (LRU 순서)
+        self._scores: "OrderedDict[str, float]" = OrderedDict()
+        # 채점 중인 기사: {article_key: Future} (결과가 None이면 응답에서 누락)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def cached_score(self, title: str) -> Optional[float]:
+        """캐시된 기사 점수 (없으면 None)"""
+        key = article_key(title)
+        score = self._scores.get(key)
+        if score is not None:
+            self._scores.move_to_end(key)
+        return score
+
+    def _store(self, key: str, score: float) -> None:
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.cache_max_size:
+            self._scores.popitem(last=False)
+
+    async def score_headlines(
+        self,
+        titles: Sequence[str],
+        api_key: str,
+        user_key: Hashable,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Dict[str, float]:
+        """
+        헤드라인 채점 (캐시 → 채점 중인 결과 대기 → 새로 일괄 채점)
+
+        Returns:
+            {article_key: score} - Gemini 응답에서 누락된 기사는 제외 (호출 측에서 사전 점수 사용)
+        """
+        loop = asyncio.get_running_loop()
+        scores: Dict[str, float] = {}
+        owned: Dict[str, str] = {}
+        waiting: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+        for title in dict.fromkeys(titles):
+            key = article_key(title)
+            if key in scores or key in owned or key in waiting:
+                continue
+            cached = self._scores.get(key)
+            if cached is not None:
+                self._scores.move_to_end(key)
+                scores[key] = cached
+            elif key in self._pending:
+                waiting[key] = (title, self._pending[key])
+            else:
+                owned[key] = title
+                self._pending[key] = loop.create_future()
+
+        if scores:
+            logger.info(f"[Sentiment] 캐시된 기사 {len(scores)}건 재사용")
+
+        try:
+            items = list(owned.items())
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                batch_scores = await self._score_batch(
+                    [title for _, title in batch], api_key, user_key, is_disconnected
+                )
+                for index, (key, _) in enumerate(batch):
+                    score = batch_scores.get(index)
+                    if score is not None:  # 응답에서 누락된 기사는 결과/캐시에서 제외
+                        self._store(key, score)
+                        scores[key] = score
+                    self._pending[key].set_result(score)
+        except BaseException as e:
+            for key in owned:
+                future = self._pending[key]
+                if not future.done():
+                    # CancelledError는 Exception이 아니므로 대기자가 재시도하도록 Exception으로 바꿔 전달
+                    error = e if isinstance(e, Exception) else AnalysisCancelledError("헤드라인 채점 요청이 취소되었습니다.")
+                    future.set_exception(error)
+                    future.exception()  # 대기자가 없어도 'exception was never retrieved' 경고 방지
+            raise
+        finally:
+            for key in owned:
+                self._pending.pop(key, None)
+
+        # 다른 요청이 채점 중이던 기사 (실패했으면 직접 다시 채점)
+        retry: List[str] = []
+        for key, (title, future) in waiting.items():
+            try:
+                score = await asyncio.shield(future)
+            except Exception:
+                retry.append(title)
+                continue
+            if score is not None:
+                scores[key] = score
+        if retry:
+            scores.update(await self.score_headlines(retry, api_key, user_key, is_disconnected))
+
+        return scores
+
+    async def _score_batch(
+        self,
+        titles: Sequence[str],
+        api_key: str,
+        user_key: Hashable,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Dict[int, float]:
+        """헤드라인 묶음을 한 번의 Gemini 호출로 채점 ({목록 인덱스: score})"""
+        logger.info(f"[Sentiment] 헤드라인 {len(titles)}건 일괄 채점")
+        model = gemini_client_pool.get_model(api_key, generation_config=SENTIMENT_GENERATION_CONFIG)
+        response = await generate_content(
+            model, _build_sentiment_prompt(titles), user_key, is_disconnected, kind="sentiment"
+        )
+        try:
+            payload = json.loads(response.text or "")
+            return {
+                int(item["id"]): max(-1.0, min(1.0, float(item["score"])))
+                for item in payload["items"]
+                if 0 <= int(item["id"]) < len(titles)
+            }
+        except Exception as e:
+            raise ValueError(f"Gemini 감성 분석 응답 파싱 실패: {str(e)}")
+
+    async def get_ticker_sentiments(
+        self,
+        tickers: Sequence[str],
+        api_key: Optional[str],
+        user_key: Hashable,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> List[TickerSentiment]:
+        """
+        여러 티커의 뉴스 감성 분석
+
+        모든 헤드라인을 사전 채점기로 한 번에 채점한 뒤, 애매하거나(긍정/부정 혼재)
+        영향이 큰 사건이 포함된 헤드라인만 모아 Gemini로 일괄 채점합니다.
+        Gemini 호출은 티커 수와 관계없이 (새로 넘길 헤드라인 수 / batch_size)회만 발생합니다.
+
+        Args:
+            api_key: Gemini API 키 (None이면 사전 채점 결과만 사용)
+
+        Raises:
+            ValueError: Gemini 호출 또는 응답 파싱 실패
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        news_lists: List[List[NewsItem]] = await asyncio.gather(
+            *(asyncio.to_thread(stock_service.get_news, ticker) for ticker in tickers)
+        )
+
+        titles = [item.title for news in news_lists for item in news]
+        lexicon = lexicon_scorer.score(titles)
+        lexicon_scores = dict(zip(titles, lexicon.score.tolist()))
+
+        escalated = [title for title, flag in zip(titles, lexicon.escalate.tolist()) if flag]
+        gemini_scores: Dict[str, float] = {}
+        if api_key and escalated:
+            logger.info(f"[Sentiment] 헤드라인 {len(titles)}건 중 {len(set(escalated))}건 Gemini로 채점")
+            gemini_scores = await self.score_headlines(escalated, api_key, user_key, is_disconnected)
+
+        results = []
+        for ticker, news in zip(tickers, news_lists):
+            articles = []
+            for item in news:
+                score = gemini_scores.get(article_key(item.title))
+                scored_by = "gemini"
+                if score is None:
+                    score = lexicon_scores[item.title]
+                    scored_by = "lexicon"
+                articles.append(ArticleSentiment(
+                    title=item.title,
+                    link=item.link,
+                    published_at=item.published_at,
+                    score=round(score, 3),
+                    label=sentiment_label(score),
+                    scored_by=scored_by,
+                ))
+            results.append(aggregate_sentiment(ticker, articles))
+        return results
+
+
+# 전역 감성 분석 서비스 인스턴스
+sentiment_service = SentimentService(
+    batch_size=settings.sentiment_batch_size,
+    cache_max_size=settings.sentiment_cache_max_size,
+)
@@ -0,0 +1,221 @@
+"""
+유니버스 스냅샷 파일 형식 (메모리 맵 .npy)
+
+유니버스 전체의 날짜 × 티커 일봉 배열과 재무 스냅샷을 필드별 .npy 파일로 저장하고,
+읽을 때는 np.load(mmap_mode='r')로 엽니다. 여러 워커 프로세스가 같은 파일을 열면
+운영체제 페이지 캐시를 공유하므로 워커를 늘려도 프로세스마다 복사본이 생기지 않습니다.
+
+이 모듈은 NumPy와 표준 라이브러리만 사용합니다 (DB/설정 import 없음). 프로세스 풀
+워커나 별도 스크립트에서도 그대로 읽을 수 있습니다.
+
+디렉토리 구조:
+    <root>/CURRENT                 현재 스냅샷 디렉토리 이름
+    <root>/<name>/manifest.json    티커, 필드, 기준일, 생성 시각
+    <root>/<name>/dates.npy        (T,) datetime64[D]
+    <root>/<name>/<field>.npy      (T, N) float64 (close, high, low, volume)
+    <root>/<name>/fundamentals.npy (F, N) float64 (manifest의 fundamental_fields 순서)
+
+새 스냅샷은 임시 디렉토리에 모두 쓴 뒤 이름을 바꾸고 CURRENT를 교체하므로,
+읽는 쪽은 항상 완성된 스냅샷만 봅니다.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+PANEL_FIELDS = ("high", "low", "close", "volume")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+
+def write_snapshot(
+    root: Path,
+    tickers: Sequence[str],
+    dates: np.ndarray,
+    arrays: Dict[str, np.ndarray],
+    fundamentals: Dict[str, np.ndarray],
+    keep: int = 2,
+) -> Path:
+    """
+    스냅샷 저장 후 CURRENT 교체
+
+    Args:
+        root: 스냅샷 루트 디렉토리
+        tickers: 열 순서의 티커
+        dates: (T,) datetime64[D]
+        arrays: PANEL_FIELDS → (T, N) 배열
+        fundamentals: 재무 필드 → (N,) 배열
+        keep: 남겨 둘 이전 스냅샷 수 (이미 열어 둔 메모리 맵은 삭제 후에도 유효)
+
+    Returns:
+        새 스냅샷 디렉토리
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.now(timezone.utc)
+    name = created_at.strftime("%Y%m%dT%H%M%S%fZ")
+    staging = root / f".tmp-{name}"
+    staging.mkdir()
+
+    try:
+        np.save(staging / "dates.npy", np.asarray(dates, dtype="datetime64[D]"))
+        for field in PANEL_FIELDS:
+            np.save(staging / f"{field}.npy", np.ascontiguousarray(arrays[field], dtype=np.float64))
+        fundamental_fields = list(fundamentals)
+        matrix = (
+            np.vstack([np.asarray(fundamentals[f], dtype=np.float64) for f in fundamental_fields])
+            if fundamental_fields else np.empty((0, len(tickers)))
+        )
+        np.save(staging / "fundamentals.npy", matrix)
+        manifest = {
+            "format": FORMAT_VERSION,
+            "created_at": created_at.isoformat(),
+            "as_of": str(dates[-1]) if len(dates) else None,
+            "tickers": list(tickers),
+            "bars": int(len(dates)),
+            "fields": list(PANEL_FIELDS),
+            "fundamental_fields": fundamental_fields,
+        }
+        (staging / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+        target = root / name
+        staging.rename(target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = root / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(name, encoding="utf-8")
+    os.replace(pointer, root / CURRENT_FILE)
+
+    # 오래된 스냅샷 정리 (현재 + keep개만 유지)
+    previous = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith(".") and p.name != name)
+    for stale in previous[:max(len(previous) - keep, 0)]:
+        shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+
+class UniverseSnapshot:
+    """읽기 전용 메모리 맵으로 연 스냅샷 하나"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.name = self.directory.name
+        self.manifest = json.loads((self.directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+        self.tickers: List[str] = self.manifest["tickers"]
+        self.as_of: Optional[np.datetime64] = (
+            np.datetime64(self.manifest["as_of"], "D") if self.manifest["as_of"] else None
+        )
+        self.dates = np.load(self.directory / "dates.npy")
+        self.arrays: Dict[str, np.ndarray] = {
+            field: np.load(self.directory / f"{field}.npy", mmap_mode="r") for field in self.manifest["fields"]
+        }
+        self._fundamentals = np.load(self.directory / "fundamentals.npy", mmap_mode="r")
+        self._column_of = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def columns(self, tickers: Sequence[str]) -> Optional[np.ndarray]:
+        """티커들의 열 인덱스 (하나라도 없으면 None)"""
+        try:
+            return np.fromiter((self._column_of[t.upper()] for t in tickers), dtype=np.intp, count=len(tickers))
+        except KeyError:
+            return None
+
+    def covers(self, tickers: Sequence[str], bars: Optional[int]) -> bool:
+        """모든 티커와 요청 봉 수를 담고 있는지"""
+        if bars is not None and bars > len(self.dates):
+            return False
+        return self.columns(tickers) is not None
+
+    def panel(
+        self, tickers: Sequence[str], bars: Optional[int]
+    ) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        MarketDataStore.load_panel과 같은 형식의 (tickers, dates, arrays)
+
+        유니버스 전체를 같은 순서로 요청하면 복사 없이 메모리 맵 뷰를 반환하고,
+        일부 티커만 요청하면 해당 열만 복사합니다 (모든 티커에 봉이 없는 날짜는 제외).
+        """
+        names = [t.upper() for t in tickers]
+        columns = self.columns(names)
+        if columns is None:
+            raise KeyError("스냅샷에 없는 티커가 있습니다.")
+
+        if names == self.tickers:
+            rows = slice(-bars, None) if bars else slice(None)
+            return names, self.dates[rows], {field: array[rows] for field, array in self.arrays.items()}
+
+        present = np.flatnonzero(~np.isnan(self.arrays["close"][:, columns]).all(axis=1))
+        if bars:
+            present = present[-bars:]
+        rows = np.ix_(present, columns)
+        return names, self.dates[present], {field: array[rows] for field, array in self.arrays.items()}
+
+    def fundamentals(self, tickers: Sequence[str]) -> Dict[str, np.ndarray]:
+        """MarketDataStore.load_fundamentals와 같은 형식의 필드 → (N,) 배열"""
+        columns = self.columns(tickers)
+        if columns is None:
+            raise KeyError("스냅샷에 없는 티커가 있습니다.")
+        return {
+            field: np.array(self._fundamentals[i, columns])
+            for i, field in enumerate(self.manifest["fundamental_fields"])
+        }
+
+    def info(self) -> dict:
+        """스냅샷 요약 (티커 목록 제외)"""
+        return {
+            "name": self.name,
+            "created_at": self.manifest["created_at"],
+            "as_of": self.manifest["as_of"],
+            "tickers": len(self.tickers),
+            "bars": self.manifest["bars"],
+            "size_bytes": sum(p.stat().st_size for p in self.directory.iterdir()),
+        }
+
+
+class SnapshotReader:
+    """
+    현재 스냅샷 reader (CURRENT가 바뀌면 새 스냅샷을 다시 엶)
+
+    CURRENT 확인은 check_interval초에 한 번만 하므로 요청마다 파일 시스템을 읽지 않습니다.
+    """
+
+    def __init__(self, root: Path, check_interval: float = 30.0):
+        self.root = Path(root)
+        self.check_interval = check_interval
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[UniverseSnapshot]:
+        """현재 스냅샷 (없거나 읽을 수 없으면 None)"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                name = (self.root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+            except FileNotFoundError:
+                self._snapshot = None
+                return None
+            if self._snapshot is None or self._snapshot.name != name:
+                try:
+                    self._snapshot = UniverseSnapshot(self.root / name)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"[Snapshot] 스냅샷을 열 수 없습니다 ({name}): {e}")
+                    self._snapshot = None
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """다음 current() 호출에서 CURRENT를 다시 확인"""
+        with self._lock:
+            self._checked_at = 0.0
@@ -4,18 +4,44 @@
 from yahooquery import Ticker
 from datetime import datetime, timedelta
 from deep_translator import GoogleTranslator
-from typing import Dict, Tuple, List, Optional
-import pandas as pd
+from typing import Awaitable, Callable, Dict, Tuple, List, Optional, Sequence
 import asyncio
+import hashlib
+import json
+import logging
+import traceback
+from collections import OrderedDict
+import pandas as pd
 from app.models.stock import (
     StockData, PriceInfo, FinancialsInfo, CompanyInfo, TechnicalIndicators,
     SMAInfo, EMAInfo, RSIInfo, MACDInfo, BollingerBandsInfo,
+    ATRInfo, StochasticInfo, DMIInfo, VolumeIndicatorsInfo, ChartDataPoint,
     NewsItem, AIAnalysis
 )
-import google.generativeai as genai
+from app.models.portfolio import PortfolioAnalysis
 from app.config import settings
+from app.services.gemini_client import gemini_client_pool, generate_content
+from app.services.analysis_scheduler import AnalysisCancelledError
 from app.services.mock_data import get_mock_stock_data
-from app.services.technical_indicators import calculate_all_indicators, calculate_chart_data
+from app.services.technical_indicators import calculate_chart_data
+from app.services.indicator_state import indicator_state_store
+from app.services.indicator_memo import KIND_CHART, KIND_CHART_JSON, indicator_memo
+from app.services.indicator_engine import DEFAULT_SPEC, IndicatorSpec
+from app.services.market_store import market_store
+from app.services.sentiment_lexicon import lexicon_scorer
+from app.services.prompt_builder import CompactPromptBuilder, add_stock_data, format_value
+from app.services.portfolio_analysis import (
+    PORTFOLIO_GENERATION_CONFIG, PortfolioHolding, portfolio_fingerprint, compute_allocation,
+    build_portfolio_prompt, parse_portfolio_report, render_portfolio_markdown
+)
+from app.services.analysis_report import (
+    STRUCTURED_GENERATION_CONFIG, parse_structured_report, render_markdown, render_compact
+)
+
+logger = logging.getLogger(__name__)
+
+# 사용자 지정 지표 파라미터 조회 결과 캐시 최대 항목 수 (인증 없이 요청 가능하므로 크기 제한)
+CUSTOM_SPEC_CACHE_MAX_SIZE = 200
 
 
 class StockService:
@@ -26,8 +52,53 @@ class StockService:
         # 캐시 저장소: {ticker: (data, timestamp)}
         self._cache: Dict[str, Tuple[StockData, datetime]] = {}
         self._cache_ttl = timedelta(minutes=5)  # 5분 캐시
-
-    def get_stock_data(self, ticker_symbol: str, include_technical: bool = False, include_chart: bool = False) -> StockData:
+        # 사용자 지정 지표 파라미터 캐시: {ticker|spec: (data, timestamp)} (LRU 순서)
+        self._spec_cache: "OrderedDict[str, Tuple[StockData, datetime]]" = OrderedDict()
+
+        # 현재가 캐시: {ticker: ((현재가, 전일 종가), timestamp)} (포트폴리오 평가 일괄 조회)
+        self._quote_cache: Dict[str, Tuple[Tuple[float, Optional[float]], datetime]] = {}
+
+        # 뉴스 캐시: {ticker: (news, timestamp)} (감성 분석이 같은 헤드라인을 재사용)
+        self._news_cache: Dict[str, Tuple[List[NewsItem], datetime]] = {}
+        self._news_cache_ttl = timedelta(minutes=settings.news_cache_ttl_minutes)
+
+        # AI 기본 보고서 캐시 (티커 단위, 사용자 간 공유): {key: (analysis, timestamp)} (LRU 순서)
+        self._base_report_cache: "OrderedDict[str, Tuple[AIAnalysis, datetime]]" = OrderedDict()
+        self._base_report_ttl = timedelta(minutes=settings.analysis_base_cache_ttl_minutes)
+        # 생성 중인 기본 보고서: {key: Future} (동시 요청 중복 생성 방지)
+        self._base_report_pending: Dict[str, asyncio.Future] = {}
+
+        # 포트폴리오 일괄 분석 캐시: {보유 구성 지문: (analysis, timestamp)} (LRU 순서)
+        self._portfolio_analysis_cache: "OrderedDict[str, Tuple[PortfolioAnalysis, datetime]]" = OrderedDict()
+        self._portfolio_analysis_ttl = timedelta(minutes=settings.portfolio_analysis_cache_ttl_minutes)
+        self._analysis_cache_max_size = settings.analysis_cache_max_size
+
+    def _lru_get(self, cache: OrderedDict, key: str, ttl: timedelta):
+        """TTL 내 캐시 값 조회 (만료되었으면 삭제 후 None)"""
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        value, cached_time = cached
+        if datetime.now() - cached_time >= ttl:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return value
+
+    def _lru_put(self, cache: OrderedDict, key: str, value, max_size: Optional[int] = None) -> None:
+        """캐시 저장 (최대 크기를 넘으면 오래 사용되지 않은 것부터 정리, 기본값: 분석 캐시 크기)"""
+        cache[key] = (value, datetime.now())
+        cache.move_to_end(key)
+        while len(cache) > (max_size or self._analysis_cache_max_size):
+            cache.popitem(last=False)
+
+    def get_stock_data(
+        self,
+        ticker_symbol: str,
+        include_technical: bool = False,
+        include_chart: bool = False,
+        spec: IndicatorSpec = DEFAULT_SPEC,
+    ) -> StockData:
         """
         주식 실시간 데이터 조회 (캐싱 적용)
 
@@ -35,6 +106,7 @@ class StockService:
             ticker_symbol: 주식 티커 심볼 (예: AAPL, TSLA)
             include_technical: 기술적 지표 포함 여부 (기본값: False)
             include_chart: 차트 데이터 포함 여부 (기본값: False)
+            spec: 기술적 지표 파라미터 (기본값: SMA 20/50/200, EMA 12/26, RSI 14 등)
 
         Returns:
             StockData 객체
@@ -48,14 +120,19 @@ class StockService:
         if settings.use_mock_data:
             return get_mock_stock_data(ticker_upper)
 
-        # 캐시 확인
-        if ticker_upper in self._cache:
-            cached_data, cached_time = self._cache[ticker_upper]
+        # 캐시 확인 (사용자 지정 지표 파라미터는 크기가 제한된 별도 캐시)
+        cache_key = ticker_upper if spec == DEFAULT_SPEC else f"{ticker_upper}|{spec.key}"
+        if spec != DEFAULT_SPEC:
+            cached_data = self._lru_get(self._spec_cache, cache_key, self._cache_ttl)
+            if cached_data is not None:
+                return cached_data
+        elif cache_key in self._cache:
+            cached_data, cached_time = self._cache[cache_key]
             if datetime.now() - cached_time < self._cache_ttl:
                 return cached_data
             else:
                 # 캐시 만료
-                del self._cache[ticker_upper]
+                del self._cache[cache_key]
 
         # 새로운 데이터 조회
         try:
@@ -146,21 +223,26 @@ class StockService:
             technical_indicators = None
             if include_technical:
                 try:
-                    # 과거 1년 데이터 조회
-                    history_df = ticker.history(period='1y')
-
-                    if history_df is not None and not history_df.empty:
-                        # calculate_all_indicators 호출
-                        indicators_result = calculate_all_indicators(history_df, ticker_upper)
-
-                        if 'error' not in indicators_result:
+                    # 저장된 지표 상태에 최근 봉만 반영 (상태가 없으면 1년 이력으로 생성)
+                    # 받은 일봉은 스크리너용 로컬 이력으로도 저장
+                    indicators_result = indicator_state_store.latest_indicators(
+                        ticker_upper,
+                        lambda period: market_store.record_history(ticker_upper, ticker.history(period=period)),
+                        spec
+                    )
+
+                    if indicators_result is not None:
                             # Pydantic 모델로 변환
                             technical_indicators = TechnicalIndicators(
                                 sma=SMAInfo(**indicators_result['sma']),
                                 ema=EMAInfo(**indicators_result['ema']),
                                 rsi=RSIInfo(**indicators_result['rsi']),
                                 macd=MACDInfo(**indicators_result['macd']),
-                                bollinger_bands=BollingerBandsInfo(**indicators_result['bollinger_bands'])
+                                bollinger_bands=BollingerBandsInfo(**indicators_result['bollinger_bands']),
+                                atr=ATRInfo(**indicators_result['atr']),
+                                stochastic=StochasticInfo(**indicators_result['stochastic']),
+                                dmi=DMIInfo(**indicators_result['dmi']),
+                                volume=VolumeIndicatorsInfo(**indicators_result['volume'])
                             )
                 except Exception as e:
                     pass
@@ -169,7 +251,11 @@ class StockService:
             chart_data_list = None
             if include_chart:
                 try:
-                    chart_data_list = self.get_chart_data(ticker_upper, period="1y")
+                    # 내부에서 만든 포인트이므로 검증 없이 모델 생성
+                    chart_data_list = [
+                        ChartDataPoint.model_construct(**point)
+                        for point in self.get_chart_data(ticker_upper, period="1y", spec=spec)
+                    ]
                 except Exception as e:
                     pass
 
@@ -185,8 +271,12 @@ class StockService:
                 chart_data=chart_data_list,
             )
 
-            # 캐시 저장
-            self._cache[ticker_upper] = (stock_data, datetime.now())
+            # 캐시 저장 (재무 지표는 스크리너용 스냅샷으로도 저장)
+            if spec == DEFAULT_SPEC:
+                self._cache[cache_key] = (stock_data, datetime.now())
+            else:
+                self._lru_put(self._spec_cache, cache_key, stock_data, CUSTOM_SPEC_CACHE_MAX_SIZE)
+            market_store.record_fundamentals(stock_data)
 
             return stock_data
 
@@ -202,17 +292,92 @@ class StockService:
 
             raise ValueError(f"주식 데이터 조회 실패: {error_msg}")
 
-    def get_chart_data(self, ticker_symbol: str, period: str = "2y") -> List[Dict]:
+    def get_quotes(self, ticker_symbols: Sequence[str]) -> Dict[str, Tuple[float, Optional[float]]]:
+        """
+        여러 티커 현재가 일괄 조회
+
+        시세 캐시(종목 조회/현재가 캐시)에 있는 티커는 재사용하고, 나머지는 yahooquery
+        price 모듈 한 번 호출로 함께 받습니다.
+
+        Args:
+            ticker_symbols: 주식 티커 심볼 목록
+
+        Returns:
+            {ticker: (현재가, 전일 종가)} (현재가를 받지 못한 티커는 제외)
+
+        Raises:
+            ValueError: API 요청이 제한되었거나 조회에 실패한 경우
+        """
+        tickers = list(dict.fromkeys(t.upper() for t in ticker_symbols))
+        now = datetime.now()
+        quotes: Dict[str, Tuple[float, Optional[float]]] = {}
+        missing: List[str] = []
+        for ticker in tickers:
+            cached_quote = self._quote_cache.get(ticker)
+            cached_stock = self._cache.get(ticker)
+            if cached_quote and now - cached_quote[1] < self._cache_ttl:
+                quotes[ticker] = cached_quote[0]
+            elif cached_stock and now - cached_stock[1] < self._cache_ttl and cached_stock[0].price.current is not None:
+                quotes[ticker] = (cached_stock[0].price.current, cached_stock[0].price.close)
+            else:
+                missing.append(ticker)
+        if not missing:
+            return quotes
+
+        # Mock 데이터 모드 (429 에러 회피)
+        if settings.use_mock_data:
+            for ticker in missing:
+                try:
+                    price = get_mock_stock_data(ticker).price
+                except ValueError:
+                    continue
+                quotes[ticker] = (price.current, price.close)
+            return quotes
+
+        try:
+            price_modules = Ticker(missing).price
+        except Exception as e:
+            error_msg = str(e)
+            if "429" in error_msg or "Too Many Requests" in error_msg:
+                raise ValueError(
+                    f"Yahoo Finance API 요청 제한 초과. "
+                    f"잠시 후 다시 시도하거나 다른 티커를 조회해주세요."
+                )
+            raise ValueError(f"현재가 조회 실패: {error_msg}")
+
+        # 데이터를 못 찾은 티커는 dict 대신 문자열 메시지가 옴
+        for ticker in missing:
+            module = price_modules.get(ticker) if isinstance(price_modules, dict) else None
+            if not isinstance(module, dict) or module.get('regularMarketPrice') is None:
+                continue
+            quote = (float(module['regularMarketPrice']), module.get('regularMarketPreviousClose'))
+            quotes[ticker] = quote
+            self._quote_cache[ticker] = (quote, now)
+        return quotes
+
+    def get_chart_data(self, ticker_symbol: str, period: str = "2y", spec: IndicatorSpec = DEFAULT_SPEC) -> List[Dict]:
         """
         차트용 시계열 데이터 조회 (기술적 지표 포함)
 
         Args:
             ticker_symbol: 주식 티커 심볼
             period: 조회 기간 (예: "1y", "2y", "max")
+            spec: 기술적 지표 파라미터
 
         Returns:
             차트 데이터 리스트
         """
+        return self._chart_result(ticker_symbol, period, spec, as_json=False)
+
+    def get_chart_json(self, ticker_symbol: str, period: str = "2y", spec: IndicatorSpec = DEFAULT_SPEC) -> bytes:
+        """
+        차트 API 응답 본문 (ChartResponse 형식 JSON)
+
+        마지막 봉이 같으면 직렬화한 본문까지 메모되어 JSON 인코딩도 다시 하지 않습니다.
+        """
+        return self._chart_result(ticker_symbol, period, spec, as_json=True)
+
+    def _chart_result(self, ticker_symbol: str, period: str, spec: IndicatorSpec, as_json: bool):
         ticker_upper = ticker_symbol.upper()
         try:
             ticker = Ticker(ticker_upper)
@@ -224,10 +389,19 @@ class StockService:
             # 멀티인덱스 DataFrame인 경우 인덱스 리셋
             if isinstance(history_df.index, pd.MultiIndex):
                 history_df = history_df.reset_index(level='symbol', drop=True)
+            market_store.record_history(ticker_upper, history_df)
 
-            chart_data = calculate_chart_data(history_df)
+            # 마지막 봉이 같으면 메모된 결과 재사용 (종목 조회의 차트 데이터와 공유)
+            memo_key = indicator_memo.make_key(ticker_upper, KIND_CHART, spec.key, history_df)
+            chart_data = indicator_memo.get_or_compute(memo_key, lambda: calculate_chart_data(history_df, spec))
+            if not as_json:
+                return chart_data
 
-            return chart_data
+            json_key = indicator_memo.make_key(ticker_upper, KIND_CHART_JSON, spec.key, history_df)
+            return indicator_memo.get_or_compute(json_key, lambda: json.dumps(
+                {"success": True, "data": chart_data, "error": None},
+                ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+            ).encode("utf-8"))
 
         except Exception as e:
             error_msg = str(e)
@@ -239,9 +413,31 @@ class StockService:
                 )
             raise ValueError(f"차트 데이터 조회 실패: {error_msg}")
 
+    def refresh_history(self, ticker_symbol: str, period: str = "5y") -> None:
+        """
+        기간 일봉을 조회해 로컬 이력 저장소에 저장 (백테스트 등 저장된 이력이 부족할 때)
+
+        Raises:
+            ValueError: 데이터를 찾을 수 없거나 API 요청이 제한된 경우
+        """
+        ticker_upper = ticker_symbol.upper()
+        try:
+            history_df = Ticker(ticker_upper).history(period=period)
+        except Exception as e:
+            if "429" in str(e) or "Too Many Requests" in str(e):
+                raise ValueError(
+                    f"Yahoo Finance API 요청 제한 초과. "
+                    f"잠시 후 다시 시도하거나 다른 티커를 조회해주세요."
+                )
+            raise ValueError(f"과거 데이터 조회 실패: {str(e)}")
+
+        if not isinstance(history_df, pd.DataFrame) or history_df.empty:
+            raise ValueError(f"'{ticker_upper}'에 대한 과거 데이터를 찾을 수 없습니다.")
+        market_store.record_history(ticker_upper, history_df)
+
     def get_news(self, ticker_symbol: str) -> List[NewsItem]:
         """
-        주식 뉴스 데이터 조회
+        주식 뉴스 데이터 조회 (캐싱 적용)
 
         Args:
             ticker_symbol: 주식 티커 심볼 (예: AAPL, TSLA)
@@ -255,6 +451,13 @@ class StockService:
             # TODO: Add mock news data
             return []
 
+        cached = self._news_cache.get(ticker_upper)
+        if cached is not None:
+            cached_news, cached_time = cached
+            if datetime.now() - cached_time < self._news_cache_ttl:
+                return cached_news
+            del self._news_cache[ticker_upper]
+
         try:
             ticker = Ticker(ticker_upper)
             news_items_raw = ticker.news(count=10)
@@ -280,6 +483,13 @@ class StockService:
                     published_at=published_at,
                     source=item.get('publisher', '알 수 없음')
                 ))
+            # 오프라인 사전 채점 (뉴스 목록 감성 배지용, 뉴스와 함께 캐시)
+            if news_list:
+                lexicon = lexicon_scorer.score([news.title for news in news_list])
+                for news, score, label in zip(news_list, lexicon.score.tolist(), lexicon.labels()):
+                    news.sentiment_score = score
+                    news.sentiment_label = label
+            self._news_cache[ticker_upper] = (news_list, datetime.now())
             return news_list
 
         except Exception as e:
@@ -312,21 +522,37 @@ class StockService:
         user_api_key: Optional[str] = None,  # 유저 API 키 추가
         user_avg_price: Optional[float] = None,  # 평균 매수 단가
         user_profit_loss_ratio: Optional[float] = None,  # 수익률
-        user_weight: Optional[float] = None  # 포트폴리오 비중
+        user_weight: Optional[float] = None,  # 포트폴리오 비중
+        user_id: Optional[int] = None,  # 스케줄러 공정성 기준
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,  # 클라이언트 연결 종료 확인
+        structured: bool = False  # JSON 스키마 응답 모드
     ) -> AIAnalysis:
         """
         Gemini AI를 사용하여 종합 주식 분석 보고서 생성
+
+        2단계로 생성합니다.
+        1. 티커 단위 기본 보고서: 사용자 정보가 없어 모든 사용자가 공유 (캐시)
+        2. 개인 맞춤 대응 전략: 보유 정보가 있을 때만 기본 보고서를 요약 입력으로
+           짧게 생성
+
+        같은 종목을 보유한 여러 사용자가 분석해도 비용이 큰 기본 보고서는
+        캐시 TTL 동안 한 번만 생성됩니다.
+
+        structured=True이면 기본 보고서를 JSON 스키마로 요청하여
+        StructuredReport(투자의견, 지지/저항선, 리스크 등)로 함께 반환합니다.
         
-        타임아웃: 없음 (완료될 때까지 대기)
+        타임아웃: settings.gemini_timeout_seconds (대기열 대기 시간 포함)
         
         Args:
             stock_data: 주식 데이터
             user_api_key: 유저의 Gemini API 키 (필수)
+            user_avg_price: 평균 매수 단가 (있으면 개인 맞춤 전략 추가)
+            user_profit_loss_ratio: 현재 수익률 (%)
+            user_weight: 포트폴리오 내 비중 (%)
+            user_id: 요청 사용자 ID (사용자별 동시성 제한/공정성 기준)
+            is_disconnected: 클라이언트 연결 종료 시 분석을 취소하기 위한 콜백
+            structured: 구조화(JSON) 응답 모드 사용 여부
         """
-        import logging
-        import traceback
-        logger = logging.getLogger(__name__)
-        
         logger.info(f"[Gemini] 분석 시작: {stock_data.ticker}")
         
         # 유저 API 키 필수 확인
@@ -334,123 +560,276 @@ class StockService:
             logger.error("[Gemini] 유저 API 키 없음")
             raise ValueError("Gemini API 키가 필요합니다. 설정에서 API 키를 등록해주세요.")
 
+        user_key = user_id if user_id is not None else user_api_key
+
         try:
-            # 유저의 API 키로 Gemini 초기화
-            logger.info("[Gemini] 유저 API 키로 초기화 시도...")
-            genai.configure(api_key=user_api_key)
-            logger.info("[Gemini] 초기화 완료")
-            
-            logger.info("[Gemini] 모델 생성 중...")
-            model = genai.GenerativeModel('models/gemini-flash-latest')
-            logger.info("[Gemini] 모델 생성 완료")
-
-            # 프롬프트에 필요한 데이터 포맷팅
-            logger.info("[Gemini] 프롬프트 생성 중...")
-            price_data_str = f"현재가: {stock_data.price.current}, 시가총액: {stock_data.market_cap}"
-            financial_data_str = ", ".join([f"{k}: {v}" for k, v in stock_data.financials.dict().items() if v is not None])
-            tech_data_str = "N/A"
-            if stock_data.technical_indicators:
-                tech_data_str = ", ".join([f"{k}: {v}" for k, v in stock_data.technical_indicators.dict(exclude_none=True).items()])
-
-            # 평단가 정보가 있으면 맞춤형 프롬프트 사용
-            if user_avg_price is not None:
-                prompt = f"""
-### [System Role]
-너는 20년 경력의 베테랑 주식 분석가이자 퀀트 투자 전문가야. 단순한 종목 분석을 넘어, **사용자의 현재 매수 단가와 비중을 고려한 '개인 맞춤형 대응 전략'**을 수립하는 데 특화되어 있어.
+            # 1단계: 티커 단위 기본 보고서 (사용자 간 공유)
+            base = await self._get_base_report(user_api_key, stock_data, user_key, structured, is_disconnected)
 
-### [Input Data]
-- Ticker: {stock_data.ticker}
+            if user_avg_price is None:
+                return base
 
-**나의 보유 현황:**
-- 평균 매수 단가: {user_avg_price}
-- 현재 수익률: {user_profit_loss_ratio}%
-- 포트폴리오 내 비중: {user_weight}%
+            # 2단계: 보유 현황 기반 개인 맞춤 대응 전략 (짧은 추가 생성)
+            # 구조화 모드면 마크다운 전문 대신 요약만 입력하여 토큰 절약
+            base_summary = render_compact(base.structured) if base.structured else base.report
+            prompt = self._build_personal_prompt(
+                stock_data, base_summary, user_avg_price, user_profit_loss_ratio, user_weight
+            )
+            # 유저 API 키 전용 클라이언트로 모델 생성 (전역 genai.configure 사용 안 함)
+            model = gemini_client_pool.get_model(user_api_key)
+            response = await generate_content(
+                model, prompt, user_key, is_disconnected, kind="personal", ticker=stock_data.ticker
+            )
+            personal_report = response.text or ""
 
-- 가격 및 시장 데이터: {price_data_str}
-- 주요 재무 지표: {financial_data_str}
-- 기술적 지표: {tech_data_str}
+            return AIAnalysis(
+                report=f"{base.report}\n\n---\n\n## 🎯 나의 보유 현황 기반 대응 전략\n\n{personal_report}",
+                structured=base.structured
+            )
 
-### [Task Guidelines]
-제공된 데이터를 바탕으로 다음 5가지 영역을 분석해줘:
+        except ValueError as e:
+            # ValueError는 그대로 전파
+            logger.error(f"[Gemini] ValueError: {str(e)}")
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"[Gemini] 예상치 못한 에러: {type(e).__name__}: {error_msg}")
+            logger.error(f"[Gemini] Full traceback: {traceback.format_exc()}")
+            
+            if "429" in error_msg or "quota" in error_msg.lower():
+                raise ValueError(f"Gemini API 요청 제한 초과: {error_msg}")
+            if "403" in error_msg or "permission" in error_msg.lower():
+                raise ValueError(f"Gemini API 권한 오류: API 키를 확인해주세요. {error_msg}")
+            if "401" in error_msg or "unauthorized" in error_msg.lower():
+                raise ValueError(f"Gemini API 인증 오류: API 키가 유효하지 않습니다. {error_msg}")
+            
+            raise ValueError(f"Gemini AI 분석 중 오류 발생: {error_msg}")
 
-1. **내재 가치 및 밸류에이션**: 현재 PER, PBR 등을 업종 평균과 비교하고, 현재 가격이 내재 가치 대비 싼지 비싼지 분석해줘.
+    async def _get_base_report(
+        self,
+        user_api_key: str,
+        stock_data: StockData,
+        user_key,
+        structured: bool = False,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> AIAnalysis:
+        """
+        티커 단위 기본 보고서 조회 (캐시 → 진행 중인 생성 공유 → 새로 생성)
 
-2. **재무 건전성 및 수익성**: 영업이익률의 질과 부채비율을 통해 회사가 돈을 잘 벌고 있는지, 망할 위험은 없는지 평가해줘.
+        같은 키의 생성이 이미 진행 중이면 그 결과를 기다려 중복 호출을 막습니다.
+        먼저 요청한 사용자의 생성이 실패하거나(연결 종료, 본인 키 오류/한도 초과 등)
+        취소되면 대기하던 요청이 자신의 키로 이어서 생성합니다.
 
-3. **기술적 차트 및 지지선**: 현재 가격대에서의 지지선과 저항선을 짚어주고, 추세가 살아있는지 분석해줘.
+        stock_data는 클라이언트가 보낸 값이므로 캐시 키에 프롬프트 해시를 포함합니다.
+        같은 시세 캐시에서 받은 데이터면 사용자 간에 공유되고, 값이 다른 요청은
+        다른 사용자에게 제공되지 않습니다.
+        """
+        prompt = self._build_base_prompt(stock_data, structured)
+        cache_key = (
+            f"{stock_data.ticker.upper()}:{'tech' if stock_data.technical_indicators else 'basic'}"
+            f":{'json' if structured else 'md'}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:16]}"
+        )
+
+        while True:
+            cached = self._lru_get(self._base_report_cache, cache_key, self._base_report_ttl)
+            if cached is not None:
+                logger.info(f"[Gemini] 기본 보고서 캐시 사용: {cache_key}")
+                return cached
+
+            pending = self._base_report_pending.get(cache_key)
+            if pending is None:
+                break
+            try:
+                logger.info(f"[Gemini] 진행 중인 기본 보고서 생성 대기: {cache_key}")
+                return await asyncio.shield(pending)
+            except Exception:
+                continue  # 생성하던 요청이 실패/취소됨 → 다시 시도 (다른 사용자의 키 오류를 전파하지 않음)
 
-4. **포트폴리오 대응 전략 (핵심)**:
-   - **평단가 대비 분석**: 현재 사용자의 평단가가 매력적인 구간인지, 혹은 고점에서 물린 상황인지 냉정하게 판단해줘.
-   - **추가 매수/비중 축소 제안**: 현재 비중을 고려할 때, '물타기(추가 매수)'가 필요한 시점인지 아니면 '리스크 관리(손절/익절)'가 필요한 시점인지 구체적인 가격 가이드를 줘.
+        future = asyncio.get_running_loop().create_future()
+        self._base_report_pending[cache_key] = future
+        try:
+            model = gemini_client_pool.get_model(
+                user_api_key,
+                generation_config=STRUCTURED_GENERATION_CONFIG if structured else None
+            )
+            response = await generate_content(
+                model, prompt, user_key, is_disconnected, kind="base", ticker=stock_data.ticker
+            )
+            if structured:
+                structured_report = parse_structured_report(response.text or "")
+                report = AIAnalysis(report=render_markdown(structured_report), structured=structured_report)
+            else:
+                report = AIAnalysis(report=response.text or "")
+            self._lru_put(self._base_report_cache, cache_key, report)
+            future.set_result(report)
+            return report
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else AnalysisCancelledError(str(e)))
+            future.exception()  # 대기자가 없어도 'exception was never retrieved' 경고 방지
+            raise
+        finally:
+            del self._base_report_pending[cache_key]
+
+    async def get_portfolio_analysis(
+        self,
+        holdings: List[PortfolioHolding],
+        user_api_key: str,
+        user_id: Optional[int] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        refresh: bool = False
+    ) -> PortfolioAnalysis:
+        """
+        전체 보유 종목을 한 번의 Gemini 호출로 분석
 
-5. **종합 투자의견 및 리스크**: '강력매수/보유/비중축소' 중 의견을 내고, 예상치 못한 변수(리스크)를 딱 2가지만 꼽아줘.
+        보유 종목 데이터는 시세 캐시(get_stock_data)에서 가져오고, 결과는 보유 구성
+        지문(티커/평단가/수량) 단위로 캐시합니다.
 
-### [Output Format]
-반드시 한국어로 작성하고, 가독성을 위해 마크다운(Markdown) 형식을 사용해줘. 전문 용어를 사용하되 초보자도 이해할 수 있게 비유를 곁들여줘.
-"""
+        Args:
+            holdings: 보유 종목 목록
+            user_api_key: 유저의 Gemini API 키
+            user_id: 요청 사용자 ID (스케줄러 공정성 기준)
+            is_disconnected: 클라이언트 연결 종료 시 분석을 취소하기 위한 콜백
+            refresh: True이면 캐시를 무시하고 다시 분석
+
+        Raises:
+            ValueError: 보유 종목이 없거나 모든 종목의 데이터 조회에 실패한 경우, Gemini 호출 실패
+        """
+        if not holdings:
+            raise ValueError("포트폴리오에 보유 종목이 없습니다.")
+        if not user_api_key:
+            raise ValueError("Gemini API 키가 필요합니다. 설정에서 API 키를 등록해주세요.")
+
+        fingerprint = portfolio_fingerprint(holdings)
+        cached = None if refresh else self._lru_get(
+            self._portfolio_analysis_cache, fingerprint, self._portfolio_analysis_ttl
+        )
+        if cached is not None:
+            logger.info(f"[Gemini] 포트폴리오 분석 캐시 사용: {fingerprint}")
+            return cached.model_copy(update={"cached": True})
+
+        # 보유 종목 데이터 병렬 조회 (캐시 우선, 실패한 종목은 제외)
+        tickers = [holding.ticker for holding in holdings]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.get_stock_data, ticker, True) for ticker in tickers),
+            return_exceptions=True
+        )
+        stock_data: Dict[str, StockData] = {}
+        skipped: List[str] = []
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, Exception):
+                logger.warning(f"[Gemini] 포트폴리오 분석에서 제외: {ticker} ({result})")
+                skipped.append(ticker)
             else:
-                # 평단가 정보가 없으면 기존 프롬프트 사용
-                prompt = f"""
+                stock_data[ticker] = result
+        if not stock_data:
+            raise ValueError("보유 종목의 주식 데이터를 조회할 수 없습니다.")
+
+        allocation = compute_allocation(holdings, stock_data)
+        prompt = build_portfolio_prompt(holdings, stock_data, allocation)
+        user_key = user_id if user_id is not None else user_api_key
+
+        try:
+            model = gemini_client_pool.get_model(user_api_key, generation_config=PORTFOLIO_GENERATION_CONFIG)
+            response = await generate_content(model, prompt, user_key, is_disconnected, kind="portfolio")
+        except ValueError:
+            raise
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"[Gemini] 포트폴리오 분석 에러: {type(e).__name__}: {error_msg}")
+            if "429" in error_msg or "quota" in error_msg.lower():
+                raise ValueError(f"Gemini API 요청 제한 초과: {error_msg}")
+            raise ValueError(f"Gemini AI 분석 중 오류 발생: {error_msg}")
+
+        parsed = parse_portfolio_report(response.text or "", list(stock_data))
+        allocation = allocation.model_copy(update=parsed["allocation"])
+        analysis = PortfolioAnalysis(
+            fingerprint=fingerprint,
+            overview=parsed["overview"],
+            holdings=parsed["holdings"],
+            allocation=allocation,
+            report=render_portfolio_markdown(parsed["overview"], parsed["holdings"], allocation),
+            skipped=skipped,
+            generated_at=datetime.now(),
+        )
+        self._lru_put(self._portfolio_analysis_cache, fingerprint, analysis)
+        return analysis
+
+    @staticmethod
+    def _build_base_prompt(stock_data: StockData, structured: bool = False) -> str:
+        """
+        티커 단위 기본 분석 프롬프트 (사용자 정보 없음 → 사용자 간 공유 가능)
+
+        입력 데이터는 반올림된 라벨 표로 압축하며, settings.gemini_prompt_token_budget을
+        넘으면 우선순위가 낮은 지표부터 제외합니다.
+        """
+        if structured:
+            output_format = """### [Output Format]
+지정된 JSON 스키마로만 응답해줘. 모든 문장 필드는 한국어로 2~4문장 이내로 간결하게 작성하고,
+opinion은 '매수/보유/관찰' 중 하나, support_levels/resistance_levels는 가격 숫자와 짧은 근거,
+risks는 핵심 리스크 2~3개로 작성해줘."""
+        else:
+            output_format = """### [Output Format]
+반드시 한국어로 작성하고, 가독성을 위해 마크다운(Markdown) 형식을 사용해줘. 전문 용어를 사용하되 초보자도 이해할 수 있게 쉬운 비유를 곁들여줘."""
+
+        def template(data_block: str) -> str:
+            return f"""
 ### [System Role]
 너는 20년 경력의 베테랑 주식 분석가이자 퀀트 투자 전문가야. 
 제공된 데이터를 바탕으로 해당 종목에 대해 다각도의 심층 분석을 수행하고, 투자자가 의사결정을 내릴 수 있도록 객관적이고 통찰력 있는 보고서를 작성해줘.
 
-### [Input Data]
-- Ticker: {stock_data.ticker}
-- 가격 및 시가총액: {price_data_str}
-- 주요 재무 지표: {financial_data_str}
-- 기술적 지표: {tech_data_str}
+### [Input Data] (Ticker: {stock_data.ticker})
+{data_block}
 
 ### [Task Guidelines]
 다음 4가지 핵심 영역을 분석해줘:
 
 1. **내재 가치 및 밸류에이션**: 현재 PER, PBR, PEG를 업종 평균과 비교했을 때 저평가/고평가 여부를 판단해줘. 특히 ROE와 이익 성장성 대비 현재 가격이 합리적인지 분석해.
 2. **재무 건전성 및 수익성**: OPM(영업이익률)의 질과 부채비율, 당좌비율을 통해 위기 상황에서의 방어력을 평가해줘.
-3. **기술적 차트 분석**: 제공된 기술적 지표를 바탕으로 현재가 매수 적기인지, 과매수 상태인지, 혹은 하락 추세인지 기술적 관점에서 조언해줘.
+3. **기술적 차트 분석**: 제공된 기술적 지표를 바탕으로 현재 가격대의 지지선과 저항선을 짚어주고, 매수 적기인지, 과매수 상태인지, 혹은 하락 추세인지 기술적 관점에서 조언해줘.
 4. **종합 투자의견 및 리스크**: 위 데이터들을 종합하여 '매수/보유/관찰' 의견을 제시하고, 투자 시 반드시 주의해야 할 핵심 리스크 요인을 꼽아줘.
 
+{output_format}
+"""
+
+        builder = add_stock_data(CompactPromptBuilder(settings.gemini_prompt_token_budget), stock_data)
+        built = builder.build(template)
+        if built.dropped:
+            logger.info(
+                f"[Gemini] 토큰 예산({settings.gemini_prompt_token_budget}) 초과로 제외한 지표: "
+                f"{', '.join(built.dropped)}"
+            )
+        return built.text
+
+    @staticmethod
+    def _build_personal_prompt(
+        stock_data: StockData,
+        base_summary: str,
+        user_avg_price: float,
+        user_profit_loss_ratio: Optional[float],
+        user_weight: Optional[float]
+    ) -> str:
+        """기본 보고서 + 보유 현황으로 개인 맞춤 대응 전략만 생성하는 짧은 프롬프트"""
+        return f"""
+### [System Role]
+너는 20년 경력의 베테랑 주식 분석가야. 아래 종목 분석 보고서는 이미 작성되어 있으니 다시 분석하지 말고, **사용자의 매수 단가와 비중을 고려한 '개인 맞춤형 대응 전략'**만 작성해줘.
+
+### [종목 분석 보고서 ({stock_data.ticker}, 현재가: {format_value(stock_data.price.current)})]
+{base_summary}
+
+### [나의 보유 현황]
+- 평균 매수 단가: {format_value(user_avg_price)}
+- 현재 수익률: {format_value(user_profit_loss_ratio)}{'%' if user_profit_loss_ratio is not None else ''}
+- 포트폴리오 내 비중: {format_value(user_weight)}{'%' if user_weight is not None else ''}
+
+### [Task Guidelines]
+1. **평단가 대비 분석**: 현재 평단가가 매력적인 구간인지, 혹은 고점에서 물린 상황인지 냉정하게 판단해줘.
+2. **추가 매수/비중 축소 제안**: 현재 비중을 고려할 때 '물타기(추가 매수)'가 필요한 시점인지 '리스크 관리(손절/익절)'가 필요한 시점인지, 보고서의 지지선/저항선을 활용해 구체적인 가격 가이드를 줘.
+3. **개인 투자의견**: '강력매수/보유/비중축소' 중 하나를 고르고 이유를 한두 문장으로 설명해줘.
+
 ### [Output Format]
-반드시 한국어로 작성하고, 가독성을 위해 마크다운(Markdown) 형식을 사용해줘. 전문 용어를 사용하되 초보자도 이해할 수 있게 쉬운 비유를 곁들여줘.
+반드시 한국어로, 마크다운 형식으로 짧고 명확하게 작성해줘. 제목(#)은 쓰지 말고 위 3개 항목만 작성해줘.
 """
-            logger.info(f"[Gemini] 프롬프트 길이: {len(prompt)} 문자")
-            
-            # 블로킹 호출을 비동기로 감싸기
-            def _generate():
-                logger.info("[Gemini] API 호출 시작")
-                try:
-                    result = model.generate_content(prompt)
-                    logger.info("[Gemini] API 호출 성공")
-                    return result
-                except Exception as e:
-                    logger.error(f"[Gemini] API 호출 실패: {type(e).__name__}: {str(e)}")
-                    logger.error(f"[Gemini] Traceback: {traceback.format_exc()}")
-                    raise
-            
-            # 타임아웃 없이 완료될 때까지 대기
-            logger.info("[Gemini] asyncio.to_thread 시작 (타임아웃: 없음)")
-            try:
-                response = await asyncio.to_thread(_generate)
-                logger.info(f"[Gemini] 응답 받음, 길이: {len(response.text) if response.text else 0}")
-                return AIAnalysis(report=response.text)
-            except Exception as e:
-                logger.error(f"[Gemini] asyncio 에러: {type(e).__name__}: {str(e)}")
-                logger.error(f"[Gemini] Traceback: {traceback.format_exc()}")
-                raise
 
-        except ValueError as e:
-            # ValueError는 그대로 전파
-            logger.error(f"[Gemini] ValueError: {str(e)}")
-            raise
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"[Gemini] 예상치 못한 에러: {type(e).__name__}: {error_msg}")
-            logger.error(f"[Gemini] Full traceback: {traceback.format_exc()}")
-            
-            if "429" in error_msg or "quota" in error_msg.lower():
-                raise ValueError(f"Gemini API 요청 제한 초과: {error_msg}")
-            if "403" in error_msg or "permission" in error_msg.lower():
-                raise ValueError(f"Gemini API 권한 오류: API 키를 확인해주세요. {error_msg}")
-            if "401" in error_msg or "unauthorized" in error_msg.lower():
-                raise ValueError(f"Gemini API 인증 오류: API 키가 유효하지 않습니다. {error_msg}")
-            
-            raise ValueError(f"Gemini AI 분석 중 오류 발생: {error_msg}")
\ No newline at end of file
+
+# 전역 서비스 인스턴스 (라우터/백그라운드 작업에서 캐시 공유)
+stock_service = StockService()
@@ -0,0 +1,505 @@
+"""
+파라미터 스윕 (프로세스 풀)
+
+전략 파라미터 격자(예: RSI 기간 × 임계값 × 최대 보유 기간)를 여러 티커에 대해
+평가하는 작업은 CPU를 오래 쓰므로, 격자를 작업 단위로 나눠 프로세스 풀에서
+병렬로 실행합니다.
+
+- 가격 배열은 작업마다 pickle로 보내지 않고 임시 디렉토리의 .npy 파일로 한 번만
+  저장한 뒤, 워커가 np.load(mmap_mode='r')로 열어 같은 페이지 캐시를 공유합니다
+- 작업이 끝나는 순서대로 결과를 스트리밍합니다 (클라이언트 연결이 끊기면 남은 작업 취소)
+- 워커 수는 SWEEP_WORKERS (0이면 CPU 코어 수와 컨테이너 메모리 제한 중 작은 쪽 기준)
+- summary의 상위 결과는 크기가 제한된 힙으로만 유지합니다 (전체 결과를 모아두지 않음)
+
+워커는 spawn 방식으로 시작하므로 웹 서버 프로세스의 스레드/DB 연결 상태를 물려받지 않습니다.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import string
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.backtest import PERIOD_BARS, resolve_params, run_backtest
+from app.services.market_store import market_store
+from app.services.screener import (
+    ScreenQuery, compute_panel_indicators, evaluate_panel, prepare_query, screener_service
+)
+
+logger = logging.getLogger(__name__)
+
+# 최적 조합 정렬 기준 (백테스트 스윕)
+OBJECTIVES = ("sharpe", "cagr_pct", "total_return_pct", "max_drawdown_pct")
+# 워커당 작업 수 (작업이 고르게 끝나도록 워커 수보다 잘게 나눔)
+TASKS_PER_WORKER = 4
+# 워커 프로세스 하나의 대략적인 메모리 사용량 (spawn 시 앱 전체를 import, 실측 약 100MB)
+WORKER_RSS_BYTES = 150 * 1024 * 1024
+# 컨테이너 메모리 제한 중 스윕 워커에 쓸 비율
+WORKER_MEMORY_SHARE = 0.4
+# 스크리너 스윕 summary의 조합 수
+SCREENER_SUMMARY_TOP = 10
+
+
+def _memory_limit() -> Optional[int]:
+    """cgroup 메모리 제한 (바이트, 제한이 없거나 알 수 없으면 None)"""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                text = f.read().strip()
+        except OSError:
+            continue
+        if text.isdigit() and int(text) < 1 << 60:  # cgroup v1은 제한이 없으면 매우 큰 값
+            return int(text)
+        return None
+    return None
+
+
+def default_workers() -> int:
+    """SWEEP_WORKERS=0일 때 워커 수 (CPU 코어 수, 메모리 제한이 있으면 그 안에서)"""
+    workers = os.cpu_count() or 1
+    limit = _memory_limit()
+    if limit is not None:
+        workers = min(workers, int(limit * WORKER_MEMORY_SHARE // WORKER_RSS_BYTES))
+    return max(1, workers)
+
+
+@dataclass(frozen=True)
+class PanelHandle:
+    """워커에 전달하는 메모리 맵 배열 위치 (배열 자체는 전달하지 않음)"""
+    directory: str
+    tickers: Tuple[str, ...]
+    fields: Tuple[str, ...]
+
+
+def publish_panel(tickers: Sequence[str], dates: np.ndarray, arrays: Dict[str, np.ndarray]) -> PanelHandle:
+    """날짜/배열을 임시 디렉토리에 .npy로 저장"""
+    directory = tempfile.mkdtemp(prefix="sweep-")
+    np.save(os.path.join(directory, "dates.npy"), dates)
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array, dtype=np.float64))
+    return PanelHandle(directory, tuple(tickers), tuple(arrays))
+
+
+def release_panel(handle: PanelHandle) -> None:
+    """임시 파일 삭제 (이미 열린 메모리 맵은 닫힐 때까지 유효)"""
+    shutil.rmtree(handle.directory, ignore_errors=True)
+
+
+# 워커 프로세스 안에서 재사용하는 메모리 맵 / 지표 계산 결과
+_attached: "OrderedDict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]]" = OrderedDict()
+_indicator_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_WORKER_CACHE_SIZE = 4
+
+
+def attach_panel(handle: PanelHandle) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """메모리 맵으로 배열 열기 (같은 스윕의 다음 작업은 캐시 사용)"""
+    if handle.directory not in _attached:
+        dates = np.load(os.path.join(handle.directory, "dates.npy"))
+        arrays = {
+            name: np.load(os.path.join(handle.directory, f"{name}.npy"), mmap_mode="r") for name in handle.fields
+        }
+        _attached[handle.directory] = (dates, arrays)
+        while len(_attached) > _WORKER_CACHE_SIZE:
+            _attached.popitem(last=False)
+    _attached.move_to_end(handle.directory)
+    return _attached[handle.directory]
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[dict]:
+    """
+    파라미터 격자를 조합 목록으로 펼침
+
+    Raises:
+        ValueError: 값 목록이 비었거나 조합 수가 SWEEP_MAX_COMBINATIONS를 넘는 경우
+    """
+    if not grid:
+        return [{}]
+    for name, values in grid.items():
+        if not values:
+            raise ValueError(f"'{name}' 파라미터 값 목록이 비어 있습니다.")
+    total = math.prod(len(values) for values in grid.values())
+    if total > settings.sweep_max_combinations:
+        raise ValueError(f"파라미터 조합이 {total}개로 최대 {settings.sweep_max_combinations}개를 초과합니다.")
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _chunks(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), max(size, 1))]
+
+
+def _split_params(combo: dict) -> Tuple[dict, Optional[int]]:
+    """조합에서 전략 파라미터와 max_hold 분리"""
+    params = {k: v for k, v in combo.items() if k != "max_hold"}
+    max_hold = combo.get("max_hold")
+    return params, int(max_hold) if max_hold else None
+
+
+# --- 워커 작업 (프로세스 풀에서 실행, 모듈 최상위 함수여야 pickle 가능) ---
+
+def backtest_task(
+    handle: PanelHandle,
+    columns: Sequence[int],
+    strategy: str,
+    combos: Sequence[dict],
+    initial_capital: float,
+    fee_bps: float,
+) -> List[dict]:
+    """조합 묶음 × 티커 묶음 백테스트 (성과 지표만 반환)"""
+    dates, arrays = attach_panel(handle)
+    closes = arrays["close"]
+    rows = []
+    for combo in combos:
+        params, max_hold = _split_params(combo)
+        for column in columns:
+            try:
+                result = run_backtest(
+                    closes[:, column], dates, strategy, params, initial_capital, fee_bps, max_hold,
+                    include_curve=False,
+                )
+            except ValueError:
+                continue  # 가격 데이터 부족
+            metrics = result["metrics"]
+            rows.append({
+                "ticker": handle.tickers[column],
+                "params": combo,
+                **{name: metrics[name] for name in (
+                    "total_return_pct", "cagr_pct", "max_drawdown_pct", "sharpe",
+                    "trades", "win_rate_pct", "exposure_pct",
+                )},
+            })
+    return rows
+
+
+def screener_task(
+    handle: PanelHandle,
+    fundamentals: Dict[str, np.ndarray],
+    queries: Sequence[Tuple[dict, ScreenQuery]],
+    match: str,
+    descending: bool,
+    limit: int,
+) -> List[dict]:
+    """조합별 스크리너 평가 (같은 지표 파라미터는 워커 안에서 한 번만 계산)"""
+    dates, arrays = attach_panel(handle)
+    rows = []
+    for combo, query in queries:
+        key = (handle.directory, query.spec.key, query.ohlcv)
+        if key not in _indicator_cache:
+            _indicator_cache[key] = compute_panel_indicators(dates, arrays, query.spec, query.ohlcv)
+            while len(_indicator_cache) > _WORKER_CACHE_SIZE:
+                _indicator_cache.popitem(last=False)
+        screened = evaluate_panel(
+            handle.tickers, dates, arrays, _indicator_cache[key], fundamentals, query, match, descending, limit
+        )
+        rows.append({
+            "params": combo,
+            "total_matches": screened["total_matches"],
+            "tickers": [m["ticker"] for m in screened["matches"]],
+        })
+    return rows
+
+
+def _render(template: str, combo: dict) -> str:
+    """
+    {이름} 자리에 조합 값 대입 (격자에 있는 이름만 허용)
+
+    str.format은 {0}, {name.attr}, {name[0]} 같은 인덱스/속성 접근도 해석하므로
+    필드를 직접 파싱해 단순 이름만 받습니다.
+
+    Raises:
+        ValueError: 중괄호 형식이 잘못되었거나 격자에 없는 이름을 사용한 경우
+    """
+    try:
+        fields = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"조건 템플릿 형식이 잘못되었습니다: {template} ({e})")
+
+    parts = []
+    for literal, name, format_spec, conversion in fields:
+        parts.append(literal)
+        if name is None:
+            continue
+        if not name.isidentifier() or name not in combo:
+            raise ValueError(f"격자에 없는 파라미터를 조건에서 사용했습니다: '{name}'")
+        if conversion or "{" in format_spec:
+            raise ValueError(f"조건 템플릿에는 {{이름}} 또는 {{이름:형식}}만 사용할 수 있습니다: {template}")
+        try:
+            parts.append(format(combo[name], format_spec))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"조건 템플릿 형식이 잘못되었습니다: {template} ({e})")
+    return "".join(parts)
+
+
+def render_conditions(templates: Sequence[dict], combo: dict) -> List[dict]:
+    """
+    조건 템플릿의 {이름} 자리에 조합 값 대입
+
+    예: {"field": "rsi{period}", "op": "<", "value": "{threshold}"}
+
+    Raises:
+        ValueError: 템플릿 형식이 잘못되었거나 value가 숫자가 아닌 경우
+    """
+    rendered = []
+    for template in templates:
+        condition = dict(template)
+        for key in ("field", "ref"):
+            if isinstance(condition.get(key), str):
+                condition[key] = _render(condition[key], combo)
+        if isinstance(condition.get("value"), str):
+            text = _render(condition["value"], combo)
+            try:
+                condition["value"] = float(text)
+            except ValueError:
+                raise ValueError(f"조건 value는 숫자여야 합니다: {text}")
+        rendered.append(condition)
+    return rendered
+
+
+def _check_evaluations(combinations: int, tickers: int) -> None:
+    """조합 수 × 티커 수 제한 확인"""
+    total = combinations * tickers
+    if total > settings.sweep_max_evaluations:
+        raise ValueError(
+            f"평가 횟수(조합 {combinations}개 × 티커 {tickers}개 = {total})가 "
+            f"최대 {settings.sweep_max_evaluations}회를 초과합니다. 격자나 티커를 줄여주세요."
+        )
+
+
+class Ranking:
+    """summary용 상위 결과 (크기 top의 최소 힙, 점수가 같으면 먼저 끝난 결과 우선)"""
+
+    def __init__(self, name: str, score: Callable[[dict], Optional[float]], top: int, extra: Optional[dict] = None):
+        self.name = name
+        self.score = score
+        self.top = top
+        self.extra = extra or {}
+        self._heap: List[Tuple[float, int, dict]] = []
+        self._seen = 0
+
+    def add(self, row: dict) -> None:
+        value = self.score(row)
+        if value is None:
+            return
+        self._seen += 1
+        item = (value, -self._seen, row)
+        if len(self._heap) < self.top:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def summary(self) -> dict:
+        ranked = sorted(self._heap, key=lambda item: item[:2], reverse=True)
+        return {**self.extra, self.name: [row for _, _, row in ranked]}
+
+
+class SweepRunner:
+    """프로세스 풀 파라미터 스윕 실행기"""
+
+    def __init__(self, max_workers: int = 0):
+        """
+        Args:
+            max_workers: 워커 프로세스 수 (0이면 default_workers())
+        """
+        self.max_workers = max_workers or default_workers()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """프로세스 풀 (첫 스윕에서 생성)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"[Sweep] 프로세스 풀 시작 (워커 {self.max_workers}개)")
+            return self._executor
+
+    def shutdown(self) -> None:
+        """프로세스 풀 종료 (대기 중인 작업 취소)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def discard(self, executor: ProcessPoolExecutor) -> None:
+        """워커가 비정상 종료된 풀 폐기 (다음 스윕에서 새로 생성)"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("[Sweep] 워커 비정상 종료로 프로세스 풀 재생성 예정")
+
+    def _submit(
+        self, handle: PanelHandle, tasks: List[Tuple[Callable[..., List[dict]], tuple]]
+    ) -> Tuple[ProcessPoolExecutor, list]:
+        """작업 제출 (이전 스윕에서 풀이 깨졌으면 새 풀로 한 번 재시도)"""
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                return executor, [asyncio.wrap_future(executor.submit(fn, handle, *args)) for fn, args in tasks]
+            except BrokenProcessPool:
+                self.discard(executor)
+                if attempt:
+                    raise
+        raise BrokenProcessPool("프로세스 풀을 시작할 수 없습니다.")
+
+    def backtest_sweep(
+        self,
+        tickers: Sequence[str],
+        strategy: str,
+        grid: Dict[str, Sequence[Any]],
+        period: str = "5y",
+        initial_capital: float = 10_000.0,
+        fee_bps: float = 0.0,
+        objective: str = "sharpe",
+        top: int = 10,
+    ) -> AsyncIterator[dict]:
+        """
+        백테스트 파라미터 스윕 (저장된 일봉 사용, 업스트림 호출 없음)
+
+        파라미터 검증과 가격 로드는 호출 시점에 끝내고, 실제 계산은 반환된
+        비동기 이터레이터를 소비할 때 시작합니다.
+
+        Yields:
+            {"type": "start" | "result" | "summary", ...}
+
+        Raises:
+            ValueError: 전략/파라미터/기간이 잘못되었거나 조합 수가 제한을 넘는 경우
+        """
+        if period not in PERIOD_BARS:
+            raise ValueError(f"지원하지 않는 기간입니다: {period} (사용 가능: {', '.join(PERIOD_BARS)})")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"지원하지 않는 정렬 기준입니다: {objective} (사용 가능: {', '.join(OBJECTIVES)})")
+        combos = expand_grid(grid)
+        for combo in combos:
+            params, max_hold = _split_params(combo)
+            resolve_params(strategy, params)
+            if max_hold is not None and max_hold < 1:
+                raise ValueError(f"max_hold는 1 이상이어야 합니다: {max_hold}")
+
+        names, dates, arrays = market_store.load_panel(tickers, PERIOD_BARS[period])
+        if not len(dates):
+            raise ValueError("저장된 가격 이력이 없습니다. 종목을 먼저 조회해주세요.")
+        columns = [i for i in range(len(names)) if not np.isnan(arrays["close"][:, i]).all()]
+        _check_evaluations(len(combos), len(columns))
+
+        # 조합 수가 적으면 티커 방향으로도 나눠 워커를 모두 사용
+        target = self.max_workers * TASKS_PER_WORKER
+        ticker_splits = max(1, min(len(columns), math.ceil(target / len(combos))))
+        ticker_chunks = _chunks(columns, math.ceil(len(columns) / ticker_splits))
+        combo_chunks = _chunks(combos, math.ceil(len(combos) * len(ticker_chunks) / target))
+        tasks = [
+            (backtest_task, (column_chunk, strategy, combo_chunk, initial_capital, fee_bps))
+            for combo_chunk in combo_chunks for column_chunk in ticker_chunks
+        ]
+
+        start = {
+            "strategy": strategy, "period": period, "combinations": len(combos),
+            "tickers": len(columns), "missing": [names[i] for i in range(len(names)) if i not in set(columns)],
+        }
+        arrays = {"close": arrays["close"]}
+        # max_drawdown_pct는 0에 가까울수록 좋음 (음수)
+        ranking = Ranking("best", lambda row: row[objective], top, {"objective": objective})
+        return self._stream(names, dates, arrays, tasks, start, ranking)
+
+    def screener_sweep(
+        self,
+        tickers: Sequence[str],
+        conditions: Sequence[dict],
+        grid: Dict[str, Sequence[Any]],
+        match: str = "all",
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        limit: int = 20,
+    ) -> AsyncIterator[dict]:
+        """
+        스크리너 조건 파라미터 스윕 (조건의 {이름} 자리에 격자 값을 대입)
+
+        Yields:
+            {"type": "start" | "result" | "summary", ...}
+
+        Raises:
+            ValueError: 조건/격자가 잘못되었거나 조합 수가 제한을 넘는 경우
+        """
+        combos = expand_grid(grid)
+        _check_evaluations(len(combos), len(tickers))
+        queries = [(combo, prepare_query(render_conditions(conditions, combo), sort_by)) for combo in combos]
+
+        bars = max(screener_service.history_bars(query) for _, query in queries)
+        names, dates, arrays = screener_service.panel(tickers, bars)
+        if not len(dates):
+            raise ValueError("저장된 가격 이력이 없습니다. 종목을 먼저 조회해주세요.")
+        fundamentals = (
+            screener_service.fundamentals(tickers) if any(q.uses_fundamentals for _, q in queries) else {}
+        )
+
+        # 같은 지표 파라미터 조합이 한 워커에 모이도록 정렬 후 분할
+        queries.sort(key=lambda item: (item[1].spec.key, item[1].ohlcv))
+        size = math.ceil(len(queries) / (self.max_workers * TASKS_PER_WORKER))
+        tasks = [
+            (screener_task, (fundamentals, chunk, match, descending, limit))
+            for chunk in _chunks(queries, size)
+        ]
+
+        start = {"combinations": len(combos), "tickers": len(names)}
+        ranking = Ranking("by_matches", lambda row: row["total_matches"], SCREENER_SUMMARY_TOP)
+        return self._stream(names, dates, arrays, tasks, start, ranking)
+
+    async def _stream(
+        self,
+        names: Sequence[str],
+        dates: np.ndarray,
+        arrays: Dict[str, np.ndarray],
+        tasks: List[Tuple[Callable[..., List[dict]], tuple]],
+        start: dict,
+        ranking: "Ranking",
+    ) -> AsyncIterator[dict]:
+        """배열을 메모리 맵 파일로 공유하고 작업 결과를 끝나는 순서대로 내보냄"""
+        started = time.perf_counter()
+        handle = publish_panel(names, dates, arrays)
+        futures = []
+        results = 0
+        try:
+            executor, futures = self._submit(handle, tasks)
+            yield {"type": "start", "tasks": len(tasks), "workers": self.max_workers, **start}
+            for completed in asyncio.as_completed(futures):
+                try:
+                    chunk = await completed
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        self.discard(executor)
+                    logger.warning(f"[Sweep] 작업 실패: {type(e).__name__}: {e}")
+                    yield {"type": "error", "detail": f"{type(e).__name__}: {e}"}
+                    continue
+                results += len(chunk)
+                for row in chunk:
+                    ranking.add(row)
+                    yield {"type": "result", **row}
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"[Sweep] 작업 {len(tasks)}개, 결과 {results}건 ({elapsed_ms:.0f}ms)")
+            yield {"type": "summary", "results": results, "elapsed_ms": round(elapsed_ms, 1), **ranking.summary()}
+        finally:
+            # 연결 종료 등으로 중단되면 시작하지 않은 작업 취소
+            for future in futures:
+                future.cancel()
+            release_panel(handle)
+
+
+# 전역 스윕 실행기 인스턴스
+sweep_runner = SweepRunner(max_workers=settings.sweep_workers)
@@ -9,11 +9,14 @@ technical_indicators.py
 - RSI (Relative Strength Index): 상대강도지수
 - MACD (Moving Average Convergence Divergence): 이동평균수렴확산
 - Bollinger Bands: 볼린저밴드
+- ATR, Stochastic, OBV, ADX/DMI, Anchored VWAP (고가/저가/거래량이 있을 때, indicator_engine)
 """
 
 import pandas as pd
 import numpy as np
 
+from app.services.indicator_engine import DEFAULT_SPEC, IndicatorSpec, compute_indicators
+
 
 def calculate_sma(prices, period=20):
     """
@@ -162,7 +165,7 @@ def calculate_bollinger_bands(prices, period=20, std_dev=2):
 
 def calculate_all_indicators(prices, ticker_symbol="STOCK"):
     """
-    모든 기술적 지표를 한 번에 계산
+    모든 기술적 지표를 한 번에 계산 (indicator_engine 사용)
 
     Args:
         prices (pd.Series or pd.DataFrame): 가격 데이터
@@ -188,56 +191,9 @@ def calculate_all_indicators(prices, ticker_symbol="STOCK"):
         if len(prices) < 50:
             return {'error': f"기술적 지표 계산을 위해서는 최소 50일의 데이터가 필요합니다. (현재: {len(prices)}일)"}
 
-        # 최신 값 추출 (NaN이 아닌 마지막 값)
-        def get_latest_value(series):
-            valid_values = series.dropna()
-            return valid_values.iloc[-1] if len(valid_values) > 0 else None
-
-        # SMA 계산
-        sma_20 = calculate_sma(prices, 20)
-        sma_50 = calculate_sma(prices, 50)
-        sma_200 = calculate_sma(prices, 200) if len(prices) >= 200 else None
-
-        # EMA 계산
-        ema_12 = calculate_ema(prices, 12)
-        ema_26 = calculate_ema(prices, 26)
-
-        # RSI 계산
-        rsi_14 = calculate_rsi(prices, 14)
-
-        # MACD 계산
-        macd_data = calculate_macd(prices)
-
-        # Bollinger Bands 계산
-        bb_data = calculate_bollinger_bands(prices)
-
-        # 최신 값들 정리
-        result = {
-            'sma': {
-                'sma20': get_latest_value(sma_20),
-                'sma50': get_latest_value(sma_50),
-                'sma200': get_latest_value(sma_200) if sma_200 is not None else None
-            },
-            'ema': {
-                'ema12': get_latest_value(ema_12),
-                'ema26': get_latest_value(ema_26)
-            },
-            'rsi': {
-                'rsi14': get_latest_value(rsi_14)
-            },
-            'macd': {
-                'macd': get_latest_value(macd_data['macd']),
-                'signal': get_latest_value(macd_data['signal']),
-                'histogram': get_latest_value(macd_data['histogram'])
-            },
-            'bollinger_bands': {
-                'upper': get_latest_value(bb_data['upper']),
-                'middle': get_latest_value(bb_data['middle']),
-                'lower': get_latest_value(bb_data['lower'])
-            }
-        }
-
-        return result
+        # 다중 티커 엔진으로 모든 지표를 한 번에 계산 (티커 1개)
+        # SMA200은 200일 미만이면 NaN → None
+        return compute_indicators(np.asarray(prices, dtype=np.float64)).to_indicator_dicts()[0]
 
     except Exception as e:
         return {'error': f"기술적 지표 계산 중 오류 발생: {str(e)}"}
@@ -267,80 +223,91 @@ if __name__ == "__main__":
     all_indicators = calculate_all_indicators(sample_prices)
 
 
-def calculate_chart_data(history_df: pd.DataFrame):
+# 차트 응답에 포함하는 최근 거래일 수 (약 1년, 차트 성능 최적화)
+CHART_TAIL_BARS = 252
+
+
+def chart_columns(history_df: pd.DataFrame, spec: IndicatorSpec = DEFAULT_SPEC):
+    """
+    차트용 컬럼 배열 계산 (DataFrame을 새로 만들지 않고 엔진 결과 배열을 그대로 사용)
+
+    Returns:
+        (dates, columns) - dates는 tz-naive DatetimeIndex, columns는 {키: (T,) 배열} (차트 키 순서)
+    """
+    if 'close' not in history_df.columns:
+        raise ValueError("DataFrame에 'close' 컬럼이 필요합니다.")
+
+    # UTC로 모든 datetime을 통일한 후 timezone 제거 (원본은 수정하지 않음)
+    dates = pd.to_datetime(history_df.index, utc=True).tz_localize(None)
+    prices = history_df['close'].to_numpy(dtype=np.float64)
+
+    # 모든 지표를 엔진으로 한 번에 계산 (SMA/볼린저밴드는 누적합 공유)
+    # 고가/저가/거래량이 있으면 ATR·스토캐스틱·OBV·ADX·VWAP(연초 앵커)도 같은 계산에서 함께 구함
+    ohlcv = {'high', 'low', 'volume'} <= set(history_df.columns)
+    series = compute_indicators(
+        prices,
+        spec,
+        high=history_df['high'].to_numpy(dtype=np.float64) if ohlcv else None,
+        low=history_df['low'].to_numpy(dtype=np.float64) if ohlcv else None,
+        volume=history_df['volume'].to_numpy(dtype=np.float64) if ohlcv else None,
+        segments=dates.year.to_numpy(),
+    ).series
+
+    volume = history_df['volume'].to_numpy(dtype=np.float64) if 'volume' in history_df.columns else np.zeros(len(prices))
+    columns = {'close': prices, 'volume': volume}
+    for period in spec.sma_periods:
+        columns[f'sma{period}'] = series[f'sma{period}'][:, 0]
+    for period in spec.ema_periods:
+        columns[f'ema{period}'] = series[f'ema{period}'][:, 0]
+    columns['rsi'] = series[f'rsi{spec.rsi_period}'][:, 0]
+    for name in ('macd', 'macd_signal', 'macd_hist', 'bb_upper', 'bb_middle', 'bb_lower'):
+        columns[name] = series[name][:, 0]
+    if ohlcv:
+        columns['atr'] = series[f'atr{spec.atr_period}'][:, 0]
+        for name in ('stoch_k', 'stoch_d', 'plus_di', 'minus_di', 'adx', 'obv', 'vwap'):
+            columns[name] = series[name][:, 0]
+    return dates, columns
+
+
+def build_chart_points(dates: pd.DatetimeIndex, columns: dict, tail: int = CHART_TAIL_BARS) -> list:
+    """
+    컬럼 배열을 차트 포인트 dict 리스트로 변환
+
+    최근 tail개만 잘라낸 뒤 날짜 문자열은 한 번에 변환하고, NaN은 컬럼 단위로
+    None으로 바꿔 행 단위 반복은 dict 생성 한 번만 남깁니다.
+    """
+    dates = dates[-tail:]
+    keys = ['date']
+    values = [np.datetime_as_string(dates.to_numpy(dtype='datetime64[D]'), unit='D').tolist()]
+    for key, array in columns.items():
+        array = array[-tail:]
+        missing = np.isnan(array)
+        if key == 'volume':
+            array = np.where(missing, 0, np.round(array)).astype(np.int64)
+        items = array.tolist()
+        if missing.any():
+            for index in np.flatnonzero(missing).tolist():
+                items[index] = None
+        keys.append(key)
+        values.append(items)
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+
+def calculate_chart_data(history_df: pd.DataFrame, spec: IndicatorSpec = DEFAULT_SPEC):
     """
     차트 표시에 필요한 모든 시계열 기술 지표를 계산합니다.
 
     Args:
         history_df (pd.DataFrame): yfinance로부터 받은 시계열 데이터.
                                    'close', 'volume' 컬럼과 인덱스(날짜)가 있어야 함.
+                                   'high', 'low'가 있으면 OHLCV 지표(ATR 등)도 포함.
+        spec (IndicatorSpec): 지표 파라미터 (기본값: SMA 20/50/200, EMA 12/26, RSI 14 등)
 
     Returns:
-        list[dict]: 각 날짜별로 차트에 필요한 모든 데이터 포인트 리스트.
+        list[dict]: 각 날짜별로 차트에 필요한 모든 데이터 포인트 리스트 (최근 CHART_TAIL_BARS개).
                      예: [{'date': '2023-01-01', 'close': 150.0, 'volume': 10000, ...}, ...]
+                     SMA/EMA 키는 spec의 기간을 따름 (예: sma10, ema50), RSI/ATR 키는 항상 'rsi'/'atr'
+                     결측 값은 None
     """
-    try:
-        if 'close' not in history_df.columns:
-            raise ValueError("DataFrame에 'close' 컬럼이 필요합니다.")
-
-        # 먼저 history_df의 인덱스를 tz-naive로 변환 (모든 Series가 같은 인덱스를 공유하도록)
-        history_df = history_df.copy()  # 원본 수정 방지
-
-        # UTC로 모든 datetime을 UTC로 통일한 후 timezone 제거
-        try:
-            # utc=True로 모든 값을 UTC DatetimeIndex로 변환
-            history_df.index = pd.to_datetime(history_df.index, utc=True)
-
-            # timezone 제거 (tz-naive로 변환)
-            history_df.index = history_df.index.tz_localize(None)
-        except Exception as e:
-            raise
-
-        prices = history_df['close']
-
-        # 모든 지표 계산 (이제 모든 Series가 tz-naive 인덱스를 가짐)
-        sma_20 = calculate_sma(prices, 20)
-        sma_50 = calculate_sma(prices, 50)
-        sma_200 = calculate_sma(prices, 200)
-
-        rsi_14 = calculate_rsi(prices, 14)
-
-        macd_data = calculate_macd(prices)
-
-        bb_data = calculate_bollinger_bands(prices)
-
-        # 결과를 하나의 DataFrame으로 병합
-        chart_df = pd.DataFrame(index=history_df.index)
-
-        # date 컬럼 생성
-        chart_df['date'] = chart_df.index.strftime('%Y-%m-%d')
-
-        chart_df['close'] = prices.values  # .values 사용하여 인덱스 무시
-
-        volume_series = history_df.get('volume', pd.Series(0, index=history_df.index))
-        chart_df['volume'] = volume_series.values
-
-        chart_df['sma20'] = sma_20.values
-        chart_df['sma50'] = sma_50.values
-        chart_df['sma200'] = sma_200.values
-
-        chart_df['rsi'] = rsi_14.values
-
-        chart_df['macd'] = macd_data['macd'].values
-        chart_df['macd_signal'] = macd_data['signal'].values
-        chart_df['macd_hist'] = macd_data['histogram'].values
-
-        chart_df['bb_upper'] = bb_data['upper'].values
-        chart_df['bb_middle'] = bb_data['middle'].values
-        chart_df['bb_lower'] = bb_data['lower'].values
-
-        # NaN 값을 None으로 변경하여 JSON 직렬화 문제를 방지
-        chart_df = chart_df.replace({np.nan: None})
-
-        # DataFrame을 dictionary 리스트로 변환
-        # 최근 1년치 데이터만 반환 (차트 성능 최적화)
-        result = chart_df.tail(252).to_dict('records')
-        return result
-
-    except Exception as e:
-        raise
+    dates, columns = chart_columns(history_df, spec)
+    return build_chart_points(dates, columns)
@@ -0,0 +1,127 @@
+"""
+유니버스 스냅샷 야간 작업
+
+매일 UNIVERSE_SNAPSHOT_HOUR_UTC 시각(미국 장 마감 후)에 유니버스 전체의 일봉 배열과
+재무 스냅샷을 시세 저장소에서 읽어 메모리 맵 파일(snapshot_store)로 저장합니다.
+스크리너 등 종목 횡단 조회는 스냅샷이 최신이면 DB 대신 스냅샷을 읽으므로,
+워커 프로세스가 늘어도 같은 페이지 캐시를 공유합니다.
+
+여러 워커 프로세스가 떠 있어도 파일 잠금으로 한 프로세스만 스냅샷을 만듭니다.
+"""
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Optional
+
+from app.config import settings
+from app.database.connection import DB_DIR
+from app.services.market_store import market_store
+from app.services.snapshot_store import SnapshotReader, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ROOT = Path(settings.universe_snapshot_dir) if settings.universe_snapshot_dir else DB_DIR / "snapshots"
+
+
+def _try_lock(handle: IO) -> bool:
+    """열린 잠금 파일에 배타 잠금 시도 (fcntl은 Unix 전용이므로 Windows에서는 msvcrt 사용, 파일을 닫으면 해제)"""
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class UniverseSnapshotJob:
+    """유니버스 스냅샷 생성 및 야간 스케줄"""
+
+    def __init__(self, root: Path, hour_utc: int = 22, bars: int = 600):
+        """
+        Args:
+            root: 스냅샷 루트 디렉토리
+            hour_utc: 매일 실행할 시각 (UTC, 음수면 자동 실행 안 함)
+            bars: 저장할 최근 봉 수
+        """
+        self.root = root
+        self.hour_utc = hour_utc
+        self.bars = bars
+        self._task: Optional[asyncio.Task] = None
+
+    def build(self) -> Optional[dict]:
+        """
+        스냅샷 생성 (다른 프로세스가 생성 중이면 건너뜀)
+
+        Returns:
+            생성한 스냅샷 요약 (건너뛰었거나 저장된 이력이 없으면 None)
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            if not _try_lock(lock):
+                logger.info("[Snapshot] 다른 프로세스가 스냅샷 생성 중이라 건너뜀")
+                return None
+
+            tickers = settings.screener_tickers or market_store.stored_tickers()
+            names, dates, arrays = market_store.load_panel(tickers, self.bars)
+            if not len(dates):
+                logger.info("[Snapshot] 저장된 일봉 이력이 없어 스냅샷을 만들지 않음")
+                return None
+            fundamentals = market_store.load_fundamentals(names)
+            directory = write_snapshot(self.root, names, dates, arrays, fundamentals)
+
+        universe_snapshots.invalidate()
+        snapshot = universe_snapshots.current()
+        info = snapshot.info() if snapshot else {"name": directory.name}
+        logger.info(f"📸 유니버스 스냅샷 생성: 티커 {len(names)}개 × {len(dates)}봉 (기준일 {info.get('as_of')})")
+        return info
+
+    def _last_scheduled(self, now: datetime) -> datetime:
+        """now 이전의 가장 최근 예정 시각"""
+        scheduled = now.replace(hour=self.hour_utc, minute=0, second=0, microsecond=0)
+        return scheduled if scheduled <= now else scheduled - timedelta(days=1)
+
+    async def _loop(self) -> None:
+        # 시작 시 마지막 예정 시각 이후 스냅샷이 없으면 바로 생성
+        snapshot = universe_snapshots.current()
+        now = datetime.now(timezone.utc)
+        if snapshot is None or datetime.fromisoformat(snapshot.manifest["created_at"]) < self._last_scheduled(now):
+            await self._build_safely()
+        while True:
+            now = datetime.now(timezone.utc)
+            wait = (self._last_scheduled(now) + timedelta(days=1) - now).total_seconds()
+            await asyncio.sleep(wait)
+            await self._build_safely()
+
+    async def _build_safely(self) -> None:
+        try:
+            await asyncio.to_thread(self.build)
+        except Exception as e:
+            logger.error(f"[Snapshot] 스냅샷 생성 실패: {type(e).__name__}: {e}")
+
+    def start(self) -> None:
+        """야간 작업 시작 (hour_utc가 음수면 시작하지 않음)"""
+        if self.hour_utc < 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop(), name="universe-snapshot")
+        logger.info(f"📸 유니버스 스냅샷 작업 시작 (매일 {self.hour_utc:02d}:00 UTC, {self.root})")
+
+    async def stop(self) -> None:
+        """야간 작업 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+# 전역 스냅샷 reader / 야간 작업 인스턴스
+universe_snapshots = SnapshotReader(SNAPSHOT_ROOT)
+universe_snapshot_job = UniverseSnapshotJob(
+    SNAPSHOT_ROOT, hour_utc=settings.universe_snapshot_hour_utc, bars=settings.universe_snapshot_bars
+)
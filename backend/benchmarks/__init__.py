@@ -0,0 +1 @@
+"""지표 계산, 차트 조립, StockData 직렬화 벤치마크"""
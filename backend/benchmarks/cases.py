@@ -0,0 +1,187 @@
+"""
+벤치마크 케이스 정의
+
+각 케이스는 (이름, 그룹, 파라미터, setup)으로 구성됩니다. setup은 입력 데이터를
+준비한 뒤 측정 대상 함수(인자 없음)를 반환하며, setup 시간은 측정에 포함되지 않습니다.
+
+그룹:
+- indicators: technical_indicators의 calculate_* 함수 (단일 티커, 봉 수별)
+- engine: indicator_engine 다중 티커 계산과 증분 상태 갱신
+- chart: calculate_chart_data / 차트 응답 직렬화
+- models: StockData Pydantic 생성/직렬화
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from benchmarks.data import history_frame, single_history, synthetic_ohlcv, trading_dates
+
+# 봉 수 (약 1년 / 10년 / 100년치 일봉)
+BAR_SIZES = (250, 2_500, 25_000)
+# 다중 티커 엔진: (봉 수, 티커 수) 조합 (25k봉 × 1000티커는 메모리 제외)
+ENGINE_GRID = ((250, 1), (250, 10), (250, 100), (250, 1_000), (2_500, 1), (2_500, 100), (25_000, 1))
+# 빠른 모드에서 사용하는 봉 수 / 엔진 조합
+QUICK_BAR_SIZES = (250, 2_500)
+QUICK_ENGINE_GRID = ((250, 1), (250, 100), (2_500, 1))
+
+
+@dataclass
+class Case:
+    """벤치마크 케이스"""
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], object]]
+    params: Dict[str, int] = field(default_factory=dict)
+
+
+def _indicator_cases(bar_sizes) -> List[Case]:
+    from app.services import technical_indicators as ti
+
+    functions = {
+        'calculate_sma': lambda prices: ti.calculate_sma(prices, 20),
+        'calculate_ema': lambda prices: ti.calculate_ema(prices, 12),
+        'calculate_rsi': lambda prices: ti.calculate_rsi(prices, 14),
+        'calculate_macd': lambda prices: ti.calculate_macd(prices),
+        'calculate_bollinger_bands': lambda prices: ti.calculate_bollinger_bands(prices),
+        'calculate_all_indicators': lambda prices: ti.calculate_all_indicators(prices),
+    }
+    cases = []
+    for bars in bar_sizes:
+        for name, function in functions.items():
+            def setup(bars=bars, function=function):
+                prices = pd.Series(synthetic_ohlcv(bars)['close'][:, 0])
+                return lambda: function(prices)
+            cases.append(Case(f"{name}[bars={bars}]", "indicators", setup, {'bars': bars}))
+    return cases
+
+
+def _engine_cases(grid) -> List[Case]:
+    from app.services.indicator_engine import compute_indicators, compute_latest
+    from app.services.indicator_state import Bar, IndicatorState
+
+    cases = []
+    for bars, tickers in grid:
+        def setup_close(bars=bars, tickers=tickers):
+            closes = synthetic_ohlcv(bars, tickers)['close']
+            return lambda: compute_indicators(closes)
+
+        def setup_ohlcv(bars=bars, tickers=tickers):
+            arrays = synthetic_ohlcv(bars, tickers)
+            segments = trading_dates(bars).year.to_numpy()
+            return lambda: compute_indicators(
+                arrays['close'], high=arrays['high'], low=arrays['low'],
+                volume=arrays['volume'], segments=segments,
+            )
+
+        def setup_latest(bars=bars, tickers=tickers):
+            closes = synthetic_ohlcv(bars, tickers)['close']
+            names = [f"T{i:04d}" for i in range(tickers)]
+            return lambda: compute_latest(names, closes)
+
+        params = {'bars': bars, 'tickers': tickers}
+        cases += [
+            Case(f"compute_indicators[bars={bars},tickers={tickers}]", "engine", setup_close, params),
+            Case(f"compute_indicators_ohlcv[bars={bars},tickers={tickers}]", "engine", setup_ohlcv, params),
+            Case(f"compute_latest[bars={bars},tickers={tickers}]", "engine", setup_latest, params),
+        ]
+
+    def setup_state():
+        arrays = synthetic_ohlcv(260)
+        dates = trading_dates(260)
+        bars = [
+            Bar(d.date(), arrays['close'][i, 0], arrays['high'][i, 0], arrays['low'][i, 0], arrays['volume'][i, 0])
+            for i, d in enumerate(dates)
+        ]
+        seeded = IndicatorState()
+        seeded.advance_many(bars[:250])
+        snapshot = seeded.to_json()
+        last_date = bars[249].date
+
+        def run():
+            # 저장된 상태 로드 → 확정 봉 9개 반영 → 장중 봉 peek (get_stock_data의 증분 경로)
+            state = IndicatorState.from_json(snapshot, last_date)
+            state.advance_many(bars[250:259])
+            return state.peek(bars[259])
+        return run
+
+    cases.append(Case("indicator_state_incremental[bars=10]", "engine", setup_state, {'bars': 10}))
+    return cases
+
+
+def _chart_cases(bar_sizes) -> List[Case]:
+    from app.services.technical_indicators import calculate_chart_data
+
+    cases = []
+    for bars in bar_sizes:
+        def setup_chart(bars=bars):
+            history = single_history(bars)
+            return lambda: calculate_chart_data(history)
+
+        def setup_json(bars=bars):
+            history = single_history(bars)
+            points = calculate_chart_data(history)
+            return lambda: json.dumps(
+                {"success": True, "data": points, "error": None},
+                ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+            )
+
+        cases += [
+            Case(f"calculate_chart_data[bars={bars}]", "chart", setup_chart, {'bars': bars}),
+            Case(f"chart_response_json[bars={bars}]", "chart", setup_json, {'bars': bars}),
+        ]
+
+    def setup_multi():
+        # 여러 티커 history를 한 번에 받아 종가 배열로 정렬하는 비용
+        from app.services.indicator_engine import ohlcv_from_history
+        frame = history_frame(250, 100)
+        return lambda: ohlcv_from_history(frame)
+
+    cases.append(Case("ohlcv_from_history[bars=250,tickers=100]", "chart", setup_multi, {'bars': 250, 'tickers': 100}))
+    return cases
+
+
+def _stock_data_payload(with_chart: bool) -> dict:
+    """get_stock_data 응답과 같은 구조의 dict (mock 데이터 + 합성 지표/차트)"""
+    from app.services.indicator_engine import compute_indicators
+    from app.services.mock_data import get_mock_stock_data
+    from app.services.technical_indicators import calculate_chart_data
+
+    payload = get_mock_stock_data("AAPL").model_dump()
+    arrays = synthetic_ohlcv(300)
+    payload['technical_indicators'] = compute_indicators(
+        arrays['close'], high=arrays['high'], low=arrays['low'], volume=arrays['volume'],
+    ).to_indicator_dicts()[0]
+    if with_chart:
+        payload['chart_data'] = calculate_chart_data(single_history(300))
+    return payload
+
+
+def _model_cases() -> List[Case]:
+    from app.models.stock import StockData, StockResponse
+
+    cases = []
+    for with_chart in (False, True):
+        label = "chart" if with_chart else "summary"
+
+        def setup_construct(with_chart=with_chart):
+            payload = _stock_data_payload(with_chart)
+            return lambda: StockData.model_validate(payload)
+
+        def setup_serialize(with_chart=with_chart):
+            data = StockData.model_validate(_stock_data_payload(with_chart))
+            return lambda: StockResponse(success=True, data=data, error=None).model_dump_json()
+
+        cases += [
+            Case(f"stock_data_construct[{label}]", "models", setup_construct, {'chart': int(with_chart)}),
+            Case(f"stock_data_serialize[{label}]", "models", setup_serialize, {'chart': int(with_chart)}),
+        ]
+    return cases
+
+
+def build_cases(quick: bool = False) -> List[Case]:
+    """전체 케이스 목록 (quick이면 큰 입력 제외)"""
+    bar_sizes = QUICK_BAR_SIZES if quick else BAR_SIZES
+    grid = QUICK_ENGINE_GRID if quick else ENGINE_GRID
+    return _indicator_cases(bar_sizes) + _engine_cases(grid) + _chart_cases(bar_sizes) + _model_cases()
@@ -0,0 +1,51 @@
+"""
+벤치마크용 합성 시계열 (고정 시드로 재현 가능)
+
+yahooquery history와 같은 형태(symbol, date 멀티인덱스, open/high/low/close/volume)의
+기하 브라운 운동 가격을 만듭니다.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+SEED = 20240101
+
+
+def synthetic_ohlcv(bars: int, tickers: int = 1, seed: int = SEED) -> dict:
+    """
+    (bars, tickers) 모양의 OHLCV 배열
+
+    Returns:
+        {'open', 'high', 'low', 'close', 'volume'} → (T, N) float64 배열
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, size=(bars, tickers))
+    close = 100.0 * np.exp(np.cumsum(returns, axis=0))
+    open_ = close * np.exp(rng.normal(0.0, 0.005, size=close.shape))
+    spread = np.abs(rng.normal(0.0, 0.01, size=close.shape))
+    high = np.maximum(open_, close) * (1.0 + spread)
+    low = np.minimum(open_, close) * (1.0 - spread)
+    volume = rng.integers(100_000, 10_000_000, size=close.shape).astype(np.float64)
+    return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}
+
+
+def trading_dates(bars: int) -> pd.DatetimeIndex:
+    """고정 종료일까지의 영업일 bars개 (뉴욕 시간대, yahooquery와 같은 tz-aware 인덱스)"""
+    end = pd.Timestamp('2026-01-02')
+    return pd.bdate_range(end=end, periods=bars, tz='America/New_York')
+
+
+def history_frame(bars: int, tickers: int = 1, seed: int = SEED) -> pd.DataFrame:
+    """yahooquery Ticker.history()와 같은 (symbol, date) 멀티인덱스 DataFrame"""
+    arrays = synthetic_ohlcv(bars, tickers, seed)
+    dates = trading_dates(bars)
+    symbols: List[str] = [f"T{i:04d}" for i in range(tickers)]
+    index = pd.MultiIndex.from_product([symbols, dates], names=['symbol', 'date'])
+    # 티커 우선 정렬 (yahooquery 순서) → 배열을 전치해서 펼침
+    return pd.DataFrame({name: values.T.reshape(-1) for name, values in arrays.items()}, index=index)
+
+
+def single_history(bars: int, seed: int = SEED) -> pd.DataFrame:
+    """단일 티커 history (get_chart_data처럼 symbol 인덱스를 제거한 형태)"""
+    return history_frame(bars, 1, seed).reset_index(level='symbol', drop=True)
@@ -0,0 +1,165 @@
+"""
+벤치마크 실행기
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.run                          # 전체 실행, benchmarks/results/<시각>.json 저장
+    python -m benchmarks.run --quick                  # 큰 입력(25k봉, 1000티커) 제외
+    python -m benchmarks.run -k chart                 # 이름에 'chart'가 들어간 케이스만
+    python -m benchmarks.run --output baseline.json   # 저장 경로 지정
+    python -m benchmarks.run --compare baseline.json  # 기준 결과와 비교 (회귀 시 종료 코드 1)
+    python -m benchmarks.run --compare base.json --against new.json  # 저장된 두 결과만 비교
+
+측정 방식: 케이스마다 한 번 실행해 반복 횟수를 정한 뒤(반복 1회가 --min-time 이상),
+--repeat번 측정한 호출당 시간의 중앙값을 대표값으로 사용합니다.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_THRESHOLD = 0.20  # 20% 이상 느려지면 회귀
+
+
+def measure(function, repeat: int, min_time: float) -> Dict[str, float]:
+    """호출당 시간 측정 (ms)"""
+    function()  # 워밍업 (지연 import, 캐시 등)
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        samples.append((time.perf_counter() - start) / loops * 1000)
+
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def environment() -> dict:
+    """결과 비교 시 참고할 실행 환경"""
+    import numpy
+    import pandas
+    import pydantic
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "pydantic": pydantic.__version__,
+    }
+
+
+def run(quick: bool, keyword: Optional[str], repeat: int, min_time: float) -> dict:
+    from benchmarks.cases import build_cases
+
+    results = {}
+    cases = [case for case in build_cases(quick) if not keyword or keyword in case.name]
+    for index, case in enumerate(cases, 1):
+        function = case.setup()
+        stats = measure(function, repeat, min_time)
+        results[case.name] = {"group": case.group, "params": case.params, **stats}
+        print(f"[{index:3d}/{len(cases)}] {case.name:<55} {stats['median_ms']:>12.4f} ms", flush=True)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "quick": quick,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """
+    두 결과 비교표 출력
+
+    Returns:
+        회귀한 케이스 이름 목록 (중앙값이 기준보다 threshold 이상 느려진 경우)
+    """
+    base_results, new_results = baseline["results"], current["results"]
+    regressions = []
+    print(f"\n{'case':<55} {'base ms':>12} {'new ms':>12} {'ratio':>8}")
+    for name, new in new_results.items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:<55} {'-':>12} {new['median_ms']:>12.4f} {'new':>8}")
+            continue
+        ratio = new["median_ms"] / base["median_ms"] if base["median_ms"] > 0 else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            mark = "  ❌"
+        elif ratio < 1 / (1 + threshold):
+            mark = "  ✅"
+        print(f"{name:<55} {base['median_ms']:>12.4f} {new['median_ms']:>12.4f} {ratio:>7.2f}x{mark}")
+
+    missing = sorted(set(base_results) - set(new_results))
+    if missing:
+        print(f"\n기준에만 있는 케이스 {len(missing)}개 (비교 제외): {', '.join(missing)}")
+    if baseline.get("environment") != current.get("environment"):
+        print("\n⚠️  실행 환경이 기준 결과와 다릅니다. 같은 환경에서 측정한 결과끼리 비교하세요.")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="지표/차트/StockData 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="큰 입력(25k봉, 1000티커) 제외")
+    parser.add_argument("-k", "--keyword", help="이름에 이 문자열이 포함된 케이스만 실행")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (기본값: 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="측정 1회의 최소 시간(초) (기본값: 0.2)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (기본값: benchmarks/results/<시각>.json)")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--against", help="새로 실행하지 않고 이 결과 JSON을 기준과 비교")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help=f"회귀 판정 비율 (기본값: {DEFAULT_THRESHOLD}, 0.2 = 20%% 느려짐)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.against:
+        if not args.compare:
+            parser.error("--against는 --compare와 함께 사용해야 합니다.")
+        current = json.loads(Path(args.against).read_text(encoding="utf-8"))
+    else:
+        current = run(args.quick, args.keyword, args.repeat, args.min_time)
+        output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(current, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\n💾 결과 저장: {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n❌ 회귀 {len(regressions)}건 (기준 대비 {args.threshold:.0%} 이상 느려짐)")
+            return 1
+        print("\n✅ 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
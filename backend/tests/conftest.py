@@ -0,0 +1,23 @@
+"""
+테스트 공통 설정
+
+앱 모듈은 import 시점에 DB 경로를 정하므로, 어떤 app 모듈보다 먼저
+임시 디렉토리를 DB_DIR로 지정해 실제 data/ 폴더를 건드리지 않게 합니다.
+"""
+import os
+import tempfile
+
+os.environ["DB_DIR"] = tempfile.mkdtemp(prefix="stock-tests-")
+os.environ.setdefault("GEMINI_API_KEY", "")
+
+import pytest  # noqa: E402
+
+from app.database.connection import engine  # noqa: E402
+from app.database.models import Base  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def database():
+    """테스트용 SQLite 테이블 생성"""
+    Base.metadata.create_all(bind=engine)
+    return engine
@@ -0,0 +1,96 @@
+"""analysis_scheduler: 사용자별 동시 실행 제한, 라운드로빈, 타임아웃, 연결 종료 취소"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.analysis_scheduler import AnalysisCancelledError, AnalysisScheduler, AnalysisTimeoutError
+
+
+class _Tracker:
+    """실행 중인 작업 수를 사용자별로 기록하는 블로킹 작업"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+        self.order = []
+
+    def job(self, user, seconds: float = 0.05):
+        def run():
+            with self.lock:
+                self.running[user] = self.running.get(user, 0) + 1
+                self.peak[user] = max(self.peak.get(user, 0), self.running[user])
+                self.order.append(user)
+            time.sleep(seconds)
+            with self.lock:
+                self.running[user] -= 1
+            return user
+        return run
+
+
+def test_per_user_limit_and_round_robin():
+    scheduler = AnalysisScheduler(max_concurrency=2, per_user_limit=1, default_timeout=10)
+    tracker = _Tracker()
+
+    async def main():
+        heavy = [scheduler.run("a", tracker.job("a")) for _ in range(4)]
+        light = [scheduler.run("b", tracker.job("b")) for _ in range(2)]
+        return await asyncio.gather(*heavy, *light)
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        scheduler.shutdown()
+
+    assert results == ["a"] * 4 + ["b"] * 2
+    assert tracker.peak == {"a": 1, "b": 1}
+    assert tracker.order.index("b") < 2  # 'a'가 먼저 4개를 넣어도 'b'가 기다리지 않음
+    stats = scheduler.stats()
+    assert stats["completed"] == 6 and stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_timeout_includes_queue_wait():
+    scheduler = AnalysisScheduler(max_concurrency=1, per_user_limit=1, default_timeout=10)
+    tracker = _Tracker()
+
+    async def main():
+        first = asyncio.ensure_future(scheduler.run("a", tracker.job("a", 0.3)))
+        await asyncio.sleep(0)
+        with pytest.raises(AnalysisTimeoutError):
+            await scheduler.run("b", tracker.job("b"), timeout=0.1)
+        assert scheduler.stats()["queued"] == 0  # 시간 초과된 대기 작업은 대기열에서 제거
+        return await first
+
+    try:
+        assert asyncio.run(main()) == "a"
+    finally:
+        scheduler.shutdown()
+
+    assert "b" not in tracker.order
+    assert scheduler.stats()["timed_out"] == 1
+
+
+def test_disconnect_cancels_waiting_job(monkeypatch):
+    monkeypatch.setattr(AnalysisScheduler, "DISCONNECT_POLL_INTERVAL", 0.02)
+    scheduler = AnalysisScheduler(max_concurrency=1, per_user_limit=1, default_timeout=10)
+    tracker = _Tracker()
+
+    async def disconnected() -> bool:
+        return True
+
+    async def main():
+        first = asyncio.ensure_future(scheduler.run("a", tracker.job("a", 0.2)))
+        await asyncio.sleep(0)
+        with pytest.raises(AnalysisCancelledError):
+            await scheduler.run("b", tracker.job("b"), is_disconnected=disconnected)
+        return await first
+
+    try:
+        assert asyncio.run(main()) == "a"
+    finally:
+        scheduler.shutdown()
+
+    assert "b" not in tracker.order
+    assert scheduler.stats()["cancelled"] == 1
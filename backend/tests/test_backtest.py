@@ -0,0 +1,44 @@
+"""backtest: 벡터화한 포지션 상태 기계와 봉 단위 반복 구현의 일치"""
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from app.services.backtest import positions_from_signals
+
+
+def _reference_positions(entry: np.ndarray, exit_signal: np.ndarray, max_hold: Optional[int]) -> np.ndarray:
+    """봉마다 상태를 갱신하는 기준 구현 (청산 우선, 진입 신호마다 보유 기간 다시 시작)"""
+    position, entered_at = 0.0, -1
+    target = np.zeros(len(entry))
+    for i in range(len(entry)):
+        if exit_signal[i]:
+            position = 0.0
+        elif entry[i]:
+            position, entered_at = 1.0, i
+        if max_hold and entered_at >= 0 and i - entered_at >= max_hold:
+            position = 0.0
+        target[i] = position
+    return target
+
+
+@pytest.mark.parametrize("max_hold", [None, 1, 5, 20])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_loop_reference(seed, max_hold):
+    rng = np.random.default_rng(seed)
+    entry = rng.random(500) < 0.08
+    exit_signal = rng.random(500) < 0.05
+    np.testing.assert_array_equal(
+        positions_from_signals(entry, exit_signal, max_hold), _reference_positions(entry, exit_signal, max_hold)
+    )
+
+
+def test_exit_wins_over_entry_on_same_bar():
+    entry = np.array([1, 1, 0, 0], dtype=bool)
+    exit_signal = np.array([0, 1, 0, 0], dtype=bool)
+    np.testing.assert_array_equal(positions_from_signals(entry, exit_signal), [1, 0, 0, 0])
+
+
+def test_no_signals_stays_flat():
+    flat = np.zeros(10, dtype=bool)
+    np.testing.assert_array_equal(positions_from_signals(flat, flat, max_hold=3), np.zeros(10))
@@ -0,0 +1,68 @@
+"""indicator_engine: pandas 기준 구현(technical_indicators)과의 일치"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import technical_indicators as ti
+from app.services.indicator_engine import (
+    EMA_CLOSED_FORM_MAX_COLUMNS, _ema_closed_form, compute_indicators, ema_many
+)
+
+
+def _assert_series_equal(actual: np.ndarray, expected: pd.Series, atol: float = 1e-8) -> None:
+    expected = expected.to_numpy(dtype=np.float64)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=atol, equal_nan=True)
+
+
+@pytest.mark.parametrize("bars", [60, 250, 2500])
+def test_matches_pandas_reference(bars):
+    rng = np.random.default_rng(bars)
+    prices = pd.Series(100 + rng.standard_normal(bars).cumsum())
+    series = compute_indicators(prices.to_numpy()).series
+    macd = ti.calculate_macd(prices)
+    bands = ti.calculate_bollinger_bands(prices)
+
+    _assert_series_equal(series["sma20"][:, 0], ti.calculate_sma(prices, 20))
+    _assert_series_equal(series["sma200"][:, 0], ti.calculate_sma(prices, 200))
+    _assert_series_equal(series["ema12"][:, 0], ti.calculate_ema(prices, 12))
+    _assert_series_equal(series["rsi14"][:, 0], ti.calculate_rsi(prices, 14))
+    _assert_series_equal(series["macd"][:, 0], macd["macd"])
+    _assert_series_equal(series["macd_signal"][:, 0], macd["signal"])
+    _assert_series_equal(series["bb_upper"][:, 0], bands["upper"], atol=1e-6)
+    _assert_series_equal(series["bb_lower"][:, 0], bands["lower"], atol=1e-6)
+
+
+def test_columns_with_leading_gaps_match_per_ticker_reference():
+    rng = np.random.default_rng(7)
+    closes = 100 + rng.standard_normal((300, 4)).cumsum(axis=0)
+    closes[:30, 2] = np.nan  # 상장 전
+    series = compute_indicators(closes).series
+
+    for column in range(closes.shape[1]):
+        prices = pd.Series(closes[:, column])
+        ema = ti.calculate_ema(prices.dropna(), 12).reindex(prices.index)
+        _assert_series_equal(series["ema12"][:, column], ema)
+        _assert_series_equal(series["sma20"][:, column], ti.calculate_sma(prices, 20))
+
+
+def test_ema_closed_form_matches_recursion():
+    rng = np.random.default_rng(3)
+    values = 100 + rng.standard_normal((2000, 6)).cumsum(axis=0)
+    alphas = np.array([2 / 13, 2 / 27, 2 / 10, 1 / 14, 2 / 201, 0.5])
+
+    expected = np.column_stack([
+        pd.Series(values[:, column]).ewm(alpha=alpha, adjust=False).mean() for column, alpha in enumerate(alphas)
+    ])
+
+    np.testing.assert_allclose(_ema_closed_form(values, alphas), expected, rtol=1e-10)
+    np.testing.assert_allclose(ema_many(values, alphas), expected, rtol=1e-10)
+
+
+def test_ema_many_wide_input_uses_recursion_path():
+    rng = np.random.default_rng(5)
+    columns = EMA_CLOSED_FORM_MAX_COLUMNS + 1
+    values = 50 + rng.standard_normal((40, columns)).cumsum(axis=0)
+    alphas = np.full(columns, 2 / 13)
+    expected = pd.DataFrame(values).ewm(alpha=2 / 13, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(ema_many(values, alphas), expected, rtol=1e-12)
@@ -0,0 +1,93 @@
+"""IndicatorState: 증분 갱신과 전체 계산의 일치, 수정주가 변경 시 재계산"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.indicator_engine import compute_indicators
+from app.services.indicator_state import IndicatorState, IndicatorStateStore, bars_from_history
+
+
+@pytest.fixture(scope="module")
+def history() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    bars = 300
+    dates = pd.bdate_range("2024-01-02", periods=bars)
+    closes = 100 + rng.standard_normal(bars).cumsum()
+    return pd.DataFrame(
+        {
+            "close": closes,
+            "high": closes + rng.random(bars),
+            "low": closes - rng.random(bars),
+            "volume": rng.integers(100_000, 1_000_000, bars).astype(float),
+        },
+        index=[d.date() for d in dates],
+    )
+
+
+def _assert_values_close(actual: dict, expected: dict) -> None:
+    assert actual.keys() == expected.keys()
+    for group in expected:
+        for name, value in expected[group].items():
+            if value is None:
+                assert actual[group][name] is None, (group, name)
+            else:
+                assert actual[group][name] == pytest.approx(value, rel=1e-9, abs=1e-9), (group, name)
+
+
+def test_incremental_matches_full(history):
+    bars = bars_from_history(history)
+    full = IndicatorState()
+    full.advance_many(bars)
+
+    partial = IndicatorState()
+    partial.advance_many(bars[:200])
+    resumed = IndicatorState.from_json(partial.to_json(), partial.last_date)
+    resumed.advance_many(bars[200:])
+
+    _assert_values_close(resumed.values(), full.values())
+
+
+def test_state_matches_vectorized_engine(history):
+    state = IndicatorState()
+    state.advance_many(bars_from_history(history))
+
+    dates = pd.DatetimeIndex(history.index)
+    result = compute_indicators(
+        history["close"].to_numpy(),
+        high=history["high"].to_numpy(),
+        low=history["low"].to_numpy(),
+        volume=history["volume"].to_numpy(),
+        segments=dates.year.to_numpy(),
+    )
+    _assert_values_close(state.values(), result.to_indicator_dicts()[0])
+
+
+def test_peek_does_not_change_state(history):
+    bars = bars_from_history(history)
+    state = IndicatorState()
+    state.advance_many(bars[:-1])
+    before = state.to_json()
+
+    peeked = state.peek(bars[-1])
+    assert state.to_json() == before
+
+    state.advance(bars[-1])
+    _assert_values_close(peeked, state.values())
+
+
+def test_sync_rejects_readjusted_history(database, history):
+    bars = bars_from_history(history)
+    store = IndicatorStateStore()
+    state, _ = store.sync("TEST", None, bars[:250], today=bars[250].date)
+
+    resumed, values = store.sync(
+        "TEST", IndicatorState.from_json(state.to_json(), state.last_date), bars[200:], today=date(2100, 1, 1)
+    )
+    assert resumed is not None and values is not None
+
+    halved = [bar._replace(close=bar.close / 2, high=bar.high / 2, low=bar.low / 2) for bar in bars]
+    assert store.sync(
+        "TEST", IndicatorState.from_json(state.to_json(), state.last_date), halved[200:], today=date(2100, 1, 1)
+    ) == (None, None)
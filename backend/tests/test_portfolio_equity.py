@@ -0,0 +1,85 @@
+"""portfolio_equity: 새 봉을 이어 붙인 자산곡선과 처음부터 계산한 자산곡선의 일치"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import stock_service as stock_service_module
+from app.services.market_store import market_store
+from app.services.portfolio_equity import EquityHolding, PortfolioEquityService, holdings_fingerprint
+
+TICKERS = ("EQA", "EQB", "EQC")
+BARS = 400
+
+
+def _frame(ticker: str, dates: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    """yahooquery Ticker.history()와 같은 (symbol, date) 멀티인덱스 DataFrame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+    index = pd.MultiIndex.from_product([[ticker], dates], names=["symbol", "date"])
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1e6}, index=index
+    )
+
+
+@pytest.fixture
+def upstream(database, monkeypatch):
+    """가짜 업스트림 (종료일 이후 두 봉은 나중에 추가)"""
+    end = pd.Timestamp(date.today()) - pd.offsets.BDay(3)
+    dates = pd.bdate_range(end=end + pd.offsets.BDay(2), periods=BARS + 2, tz="America/New_York")
+    frames = {ticker: _frame(ticker, dates, seed) for seed, ticker in enumerate(TICKERS)}
+    served = {ticker: frame.iloc[:BARS] for ticker, frame in frames.items()}
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def history(self, period):
+            return served.get(self.ticker, pd.DataFrame())
+
+    monkeypatch.setattr(stock_service_module, "Ticker", FakeTicker)
+    return dates, frames, served
+
+
+def test_extend_matches_full_build(upstream):
+    dates, frames, served = upstream
+
+    def day(offset: int) -> np.datetime64:
+        return np.datetime64(dates[offset].date(), "D")
+
+    holdings = [
+        EquityHolding("EQA", 10, day(BARS - 300), purchase_price=90.0),
+        EquityHolding("EQB", 5, day(BARS - 100)),
+        EquityHolding("EQC", 3, day(BARS + 1)),  # 추가되는 봉에서 매수
+    ]
+    fingerprint = holdings_fingerprint(holdings)
+    service = PortfolioEquityService()
+    state = service._build(holdings, fingerprint)
+    assert state.dates[-1] == day(BARS - 1)
+
+    # 마지막 봉의 종가가 바뀌고 새 봉 두 개가 저장됨 (장중 조회 후 다음 거래일들)
+    for ticker, frame in frames.items():
+        frame = frame.copy()
+        frame.iloc[BARS - 1, frame.columns.get_loc("close")] *= 1.02
+        served[ticker] = frame
+        market_store.record_history(ticker, frame)
+
+    extended, recomputed = service._extend(state)
+    rebuilt = PortfolioEquityService()._build(holdings, fingerprint)
+
+    assert recomputed == 3  # 바뀐 마지막 봉 + 새 봉 두 개
+    np.testing.assert_array_equal(extended.dates, rebuilt.dates)
+    for name in ("equity", "invested", "index", "closes", "costs"):
+        np.testing.assert_allclose(getattr(extended, name), getattr(rebuilt, name), rtol=1e-12, err_msg=name)
+
+
+def test_extend_without_new_bars_keeps_curve(upstream):
+    dates, _, _ = upstream
+    holdings = [EquityHolding("EQA", 10, np.datetime64(dates[100].date(), "D"))]
+    service = PortfolioEquityService()
+    state = service._build(holdings, holdings_fingerprint(holdings))
+
+    extended, recomputed = service._extend(state)
+    assert recomputed == 1  # 마지막 봉만 다시 읽음
+    np.testing.assert_allclose(extended.index, state.index, rtol=1e-12)
@@ -0,0 +1,41 @@
+"""portfolio_risk: 리스크 기여도 분해"""
+import numpy as np
+import pytest
+
+from app.services.portfolio_risk import TRADING_DAYS, compute_risk
+
+
+@pytest.fixture(scope="module")
+def returns():
+    rng = np.random.default_rng(11)
+    mixing = rng.standard_normal((4, 4)) * 0.01
+    assets = rng.standard_normal((500, 4)) @ mixing
+    benchmark = assets.mean(axis=1) + rng.standard_normal(500) * 0.002
+    return assets, benchmark
+
+
+def test_component_shares_sum_to_one(returns):
+    assets, benchmark = returns
+    weights = np.array([0.4, 0.3, 0.2, 0.1])
+    risk = compute_risk(assets, benchmark, weights)
+
+    assert risk["component_share"].sum() == pytest.approx(1.0, abs=1e-12)
+    assert risk["component"].sum() == pytest.approx(risk["portfolio_volatility"], rel=1e-12)
+
+
+def test_portfolio_volatility_matches_direct_computation(returns):
+    assets, benchmark = returns
+    weights = np.array([0.25, 0.25, 0.25, 0.25])
+    risk = compute_risk(assets, benchmark, weights)
+
+    expected = np.std(assets @ weights, ddof=1) * np.sqrt(TRADING_DAYS)
+    assert risk["portfolio_volatility"] == pytest.approx(expected, rel=1e-12)
+    assert risk["portfolio_beta"] == pytest.approx(weights @ risk["betas"], rel=1e-12)
+    np.testing.assert_allclose(np.diag(risk["correlation"]), 1.0)
+
+
+def test_var_and_cvar_ordering(returns):
+    assets, benchmark = returns
+    risk = compute_risk(assets, benchmark, np.array([0.4, 0.3, 0.2, 0.1]), confidence=0.99)
+    assert risk["cvar_historical"] >= risk["var_historical"] > 0
+    assert risk["cvar_parametric"] >= risk["var_parametric"] > 0
@@ -0,0 +1,52 @@
+"""portfolio_simulation: 같은 seed면 프로세스 풀 사용 여부와 관계없이 같은 결과"""
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.services.portfolio_simulation import PortfolioSimulationService
+from app.services.sweep import sweep_runner
+
+STEPS = np.arange(1, 65)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """묶음이 여러 개가 되도록 묶음 크기를 줄이고 워커 2개 풀 사용"""
+    monkeypatch.setattr(settings, "simulation_chunk_mb", 1)
+    monkeypatch.setattr(sweep_runner, "max_workers", 2)
+    yield
+    sweep_runner.shutdown()
+
+
+def _gbm_task() -> dict:
+    return {
+        "weights": np.array([0.6, 0.4]),
+        "mean": np.array([0.0004, 0.0002]),
+        "cholesky": np.linalg.cholesky(np.array([[1.0, 0.3], [0.3, 1.0]]) * 1e-4),
+        "block_size": 5,
+    }
+
+
+def _bootstrap_task() -> dict:
+    rng = np.random.default_rng(0)
+    return {"weights": np.array([0.5, 0.5]), "history": rng.standard_normal((300, 2)) * 0.01, "block_size": 5}
+
+
+@pytest.mark.parametrize("method, task", [("gbm", _gbm_task()), ("bootstrap", _bootstrap_task())])
+def test_same_seed_same_result_with_and_without_pool(small_chunks, method, task):
+    serial = PortfolioSimulationService._run(method, 20_000, 252, STEPS, 42, task, parallel=False)
+    pooled = PortfolioSimulationService._run(method, 20_000, 252, STEPS, 42, task, parallel=True)
+
+    assert serial[2] == 1 and pooled[2] == 2
+    np.testing.assert_array_equal(serial[0], pooled[0])
+    np.testing.assert_array_equal(serial[1], pooled[1])
+
+
+def test_seed_controls_paths():
+    task = _gbm_task()
+    first = PortfolioSimulationService._run("gbm", 2_000, 60, STEPS[:30], 1, task, parallel=False)
+    again = PortfolioSimulationService._run("gbm", 2_000, 60, STEPS[:30], 1, task, parallel=False)
+    other = PortfolioSimulationService._run("gbm", 2_000, 60, STEPS[:30], 2, task, parallel=False)
+
+    np.testing.assert_array_equal(first[0], again[0])
+    assert not np.array_equal(first[0], other[0])
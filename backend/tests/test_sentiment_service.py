@@ -0,0 +1,54 @@
+"""sentiment_service: 같은 헤드라인을 채점 중인 요청이 취소/누락되어도 다른 요청은 결과를 받음"""
+import asyncio
+
+from app.services.sentiment_service import SentimentService, article_key
+
+
+def _service(delays: dict, missing: frozenset = frozenset()):
+    """사용자별 지연 시간으로 채점하는 가짜 Gemini 호출을 붙인 서비스 (호출한 사용자 기록)"""
+    service = SentimentService()
+    calls = []
+
+    async def score_batch(titles, api_key, user_key, is_disconnected=None):
+        calls.append(user_key)
+        await asyncio.sleep(delays.get(user_key, 0))
+        return {i: 0.5 for i, title in enumerate(titles) if title not in missing}
+
+    service._score_batch = score_batch
+    return service, calls
+
+
+def test_waiter_retries_when_owner_is_cancelled():
+    service, calls = _service({"owner": 0.5})
+
+    async def main():
+        owner = asyncio.create_task(service.score_headlines(["Shares rally"], "key", "owner"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(service.score_headlines(["Shares rally"], "key", "waiter"))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == {article_key("Shares rally"): 0.5}
+    assert calls == ["owner", "waiter"]
+
+
+def test_waiter_reuses_owner_result():
+    service, calls = _service({"owner": 0.1})
+
+    async def main():
+        owner = asyncio.create_task(service.score_headlines(["Shares rally"], "key", "owner"))
+        await asyncio.sleep(0.02)
+        return await asyncio.gather(owner, service.score_headlines(["Shares rally"], "key", "waiter"))
+
+    first, second = asyncio.run(main())
+    assert first == second == {article_key("Shares rally"): 0.5}
+    assert calls == ["owner"]
+
+
+def test_missing_items_are_not_scored_or_cached():
+    service, _ = _service({}, missing=frozenset({"Dropped headline"}))
+    scores = asyncio.run(service.score_headlines(["Kept headline", "Dropped headline"], "key", "user"))
+
+    assert scores == {article_key("Kept headline"): 0.5}
+    assert service.cached_score("Dropped headline") is None